@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Rutas de depuración
+===================
+
+Descarga de los perfiles de peticiones guardados por ``ProfilingMiddleware``.
+Solo se registran con ``PROFILING_ENABLED`` y exigen la cabecera
+``Authorization: Bearer <PROFILING_TOKEN>``.
+"""
+
+import json
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+
+from ..config import settings
+from ..profiling import PROFILES_PATH, RequestProfile, profile_store
+
+
+def require_profiling_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Comprueba el token de acceso a los perfiles.
+
+    Raises:
+        HTTPException: 403 si no hay token configurado o no coincide
+    """
+    expected = settings.PROFILING_TOKEN
+    scheme, _, token = (authorization or "").partition(" ")
+    if not expected or scheme.lower() != "bearer" or not secrets.compare_digest(token.strip(), expected):
+        raise HTTPException(status_code=403, detail="Acceso a los perfiles no autorizado")
+
+
+# Router de depuración, fuera del esquema OpenAPI
+debug_router = APIRouter(
+    prefix=PROFILES_PATH,
+    include_in_schema=False,
+    dependencies=[Depends(require_profiling_token)]
+)
+
+
+def _get_profile(profile_id: int) -> RequestProfile:
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Perfil {profile_id} no encontrado")
+    return profile
+
+
+def _download(content: bytes, media_type: str, filename: str) -> Response:
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"}
+    )
+
+
+@debug_router.get("")
+async def list_profiles():
+    """
+    Lista los perfiles guardados, del más reciente al más antiguo.
+
+    Returns:
+        list: Datos generales de cada perfil
+    """
+    return [profile.summary() for profile in profile_store.list()]
+
+
+@debug_router.get("/{profile_id}")
+async def get_profile(profile_id: int):
+    """
+    Obtiene un perfil con sus consultas agrupadas por sentencia.
+
+    Returns:
+        dict: Datos del perfil y consultas de más a menos tiempo
+    """
+    return _get_profile(profile_id).detail()
+
+
+@debug_router.get("/{profile_id}/speedscope")
+async def download_speedscope(profile_id: int):
+    """
+    Descarga un perfil para abrirlo en https://www.speedscope.app.
+
+    Returns:
+        Response: Archivo JSON de speedscope
+    """
+    profile = _get_profile(profile_id)
+    content = json.dumps(profile.to_speedscope(), separators=(",", ":")).encode()
+    return _download(content, "application/json", f"profile-{profile_id}.speedscope.json")
+
+
+@debug_router.get("/{profile_id}/pstats")
+async def download_pstats(profile_id: int):
+    """
+    Descarga un perfil en formato pstats (``python -m pstats profile-N.pstats``).
+
+    Returns:
+        Response: Archivo binario de pstats
+    """
+    profile = _get_profile(profile_id)
+    return _download(profile.to_pstats(), "application/octet-stream", f"profile-{profile_id}.pstats")
@@ -7,21 +7,30 @@ Este módulo contiene todas las rutas de la API REST para el manejo
 de directorios y archivos PDF.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
-from fastapi.responses import FileResponse
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from typing import List, Optional, Tuple, Union
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
 import time
-import os
+import re
 
 from ..services import DirectoryService, FileService, DocumentService
 from ..pydantic_models import (
-    DirectoryInfo, FileInfo, DirectoryResponse, FileUploadResponse,
+    DirectoryInfo, DirectoryDeletionStatus, FileInfo, DirectoryResponse, FileUploadResponse,
     ErrorResponse, HealthCheck, DocumentUploadResponse, DocumentResponse,
     DocumentTypeResponse, ClientResponse, CategoryResponse,
     DocumentTypeCreate, DocumentTypeUpdate, CategoryCreate, CategoryUpdate,
-    ClientCreate, ClientUpdate
+    ClientCreate, ClientUpdate, UploadSessionCreate, UploadSessionResponse, PoolStatus,
+    DocumentPage, DocumentSearchPage, ExtractionStatusResponse, FilePage,
+    BatchUploadFileMetadata, BatchUploadResponse,
+    BulkDeleteRequest, BulkMoveRequest, BulkOperationResponse, DocumentStatsResponse
 )
 from ..config import settings
+from ..database import get_async_db, get_pool_status
+from ..responses import build_file_response, etag_matches
+from ..thumbnails import THUMBNAIL_MEDIA_TYPE, thumbnail_service
 
 # Crear router para la API
 api_router = APIRouter(prefix="/api/v1", tags=["API"])
@@ -34,6 +43,104 @@ document_service = DocumentService()
 # Variable para tracking de uptime
 start_time = time.time()
 
+# Cabecera Content-Range de los fragmentos de subida: "bytes inicio-fin/total"
+CONTENT_RANGE_PATTERN = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+def _parse_content_range(content_range: Optional[str]) -> Tuple[int, int, Optional[int]]:
+    """
+    Interpreta la cabecera Content-Range de un fragmento de subida.
+    
+    Args:
+        content_range (Optional[str]): Valor de la cabecera
+        
+    Returns:
+        Tuple[int, int, Optional[int]]: Primer byte, último byte y tamaño total (si se indica)
+        
+    Raises:
+        HTTPException: Si la cabecera falta o no es válida
+    """
+    match = CONTENT_RANGE_PATTERN.match(content_range or "")
+    if not match:
+        raise HTTPException(
+            status_code=400,
+            detail="Cabecera Content-Range inválida. Use 'bytes inicio-fin/total'"
+        )
+    
+    start, end = int(match.group(1)), int(match.group(2))
+    total = None if match.group(3) == "*" else int(match.group(3))
+    
+    if end < start:
+        raise HTTPException(
+            status_code=400,
+            detail="Cabecera Content-Range inválida: el último byte es anterior al primero"
+        )
+    
+    return start, end, total
+
+
+async def _reference_response(request: Request, response: Response, db: AsyncSession, kind: str):
+    """
+    Devuelve datos de referencia cacheados con validación por ETag.
+    
+    Si el cliente envía un If-None-Match que coincide con el ETag actual se
+    responde 304 sin cuerpo.
+    
+    Args:
+        request (Request): Petición entrante
+        response (Response): Respuesta en la que fijar las cabeceras
+        db (AsyncSession): Sesión de base de datos de la petición
+        kind (str): "document_types", "categories" o "clients"
+        
+    Returns:
+        Union[List, Response]: Elementos solicitados o respuesta 304
+    """
+    reference = await document_service.get_reference_data(db, kind)
+    headers = {"ETag": reference["etag"], "Cache-Control": "no-cache"}
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if reference["etag"] in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return reference["items"]
+
+
+async def _thumbnail_response(request: Request, stored_path, file_hash: Optional[str], name: str) -> Response:
+    """
+    Construye la respuesta de una miniatura, cacheable por el navegador.
+    
+    La miniatura depende solo del contenido, así que el ETag se deriva del
+    hash y una petición condicional se responde con 304 sin renderizar nada.
+    
+    Args:
+        request (Request): Petición
+        stored_path (Path): Ruta del PDF en disco
+        file_hash (Optional[str]): Hash del documento (None si no está registrado)
+        name (str): Documento pedido, para los mensajes de error
+        
+    Returns:
+        Response: Miniatura JPEG (200) o sin cambios (304)
+        
+    Raises:
+        HTTPException: Si las miniaturas están desactivadas o no se pueden generar
+    """
+    if not thumbnail_service.running:
+        raise HTTPException(status_code=503, detail="Las miniaturas no están disponibles")
+    if file_hash is None:
+        raise HTTPException(status_code=404, detail=f"'{name}' no es un documento registrado")
+    
+    etag = thumbnail_service.etag(file_hash)
+    headers = {"etag": etag, "cache-control": f"public, max-age={settings.THUMBNAIL_MAX_AGE}"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    content = await thumbnail_service.get(file_hash, stored_path)
+    if content is None:
+        raise HTTPException(status_code=404, detail=f"No se pudo generar la miniatura de '{name}'")
+    return Response(content=content, media_type=THUMBNAIL_MEDIA_TYPE, headers=headers)
+
 
 @api_router.get("/health", response_model=HealthCheck)
 async def health_check():
@@ -47,12 +154,38 @@ async def health_check():
     return HealthCheck(
         status="healthy",
         version="1.0.0",
-        uptime=uptime
+        uptime=uptime,
+        database_pool=PoolStatus(**get_pool_status())
     )
 
 
+@api_router.get("/stats", response_model=DocumentStatsResponse)
+async def get_document_stats(db: AsyncSession = Depends(get_async_db)):
+    """
+    Estadísticas de los documentos activos para el panel de control.
+    
+    Los totales se mantienen de forma incremental en la base de datos, así
+    que consultarlos con frecuencia no recorre la tabla de documentos.
+    
+    Returns:
+        DocumentStatsResponse: Totales generales y por tipo, categoría, cliente y mes
+    """
+    try:
+        return await document_service.get_document_stats(db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
 @api_router.post("/directories", response_model=DirectoryResponse)
-async def create_directory(path: str = Form(..., description="Ruta del directorio a crear")):
+async def create_directory(
+    path: str = Form(..., description="Ruta del directorio a crear"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Crea un nuevo directorio.
     
@@ -66,7 +199,7 @@ async def create_directory(path: str = Form(..., description="Ruta del directori
         HTTPException: Si hay un error al crear el directorio
     """
     try:
-        directory_info = await directory_service.create_directory(path)
+        directory_info = await directory_service.create_directory(db, path)
         return DirectoryResponse(
             message=f"Directorio '{path}' creado exitosamente",
             path=directory_info.path,
@@ -82,10 +215,16 @@ async def create_directory(path: str = Form(..., description="Ruta del directori
 
 
 @api_router.get("/directories", response_model=List[str])
-async def list_directories():
+async def list_directories(
+    prefix: Optional[str] = Query(None, description="Limitar el listado a este directorio y sus subdirectorios"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Lista todos los directorios disponibles.
     
+    Args:
+        prefix (Optional[str]): Directorio raíz del subárbol a listar
+        
     Returns:
         List[str]: Lista de rutas de directorios
         
@@ -93,7 +232,7 @@ async def list_directories():
         HTTPException: Si hay un error al listar directorios
     """
     try:
-        return await directory_service.list_directories()
+        return await directory_service.list_directories(db, prefix)
     except HTTPException:
         raise
     except Exception as e:
@@ -104,7 +243,7 @@ async def list_directories():
 
 
 @api_router.get("/directories/{path:path}", response_model=DirectoryInfo)
-async def get_directory_info(path: str):
+async def get_directory_info(path: str, db: AsyncSession = Depends(get_async_db)):
     """
     Obtiene información detallada de un directorio.
     
@@ -118,7 +257,7 @@ async def get_directory_info(path: str):
         HTTPException: Si el directorio no existe o hay un error
     """
     try:
-        return await directory_service.get_directory_info(path)
+        return await directory_service.get_directory_info(db, path)
     except HTTPException:
         raise
     except Exception as e:
@@ -131,7 +270,8 @@ async def get_directory_info(path: str):
 @api_router.post("/files/upload", response_model=FileUploadResponse)
 async def upload_file(
     file: UploadFile = File(..., description="Archivo PDF a subir"),
-    path: str = Form("", description="Directorio destino")
+    path: str = Form("", description="Directorio destino"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Sube un archivo PDF a un directorio específico.
@@ -150,7 +290,7 @@ async def upload_file(
         # Si path está vacío, usar la raíz
         upload_path = path.strip() if path else ""
         
-        file_info = await file_service.upload_file(file, upload_path)
+        file_info = await file_service.upload_file(file, upload_path, db)
         return FileUploadResponse(
             message=f"PDF '{file_info.name}' subido exitosamente a '{upload_path or 'raíz'}'",
             filename=file_info.name,
@@ -168,82 +308,137 @@ async def upload_file(
 
 
 @api_router.get("/files/download/{path:path}")
-async def download_file(path: str):
+@api_router.head("/files/download/{path:path}", include_in_schema=False)
+async def download_file(path: str, request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Descarga un archivo PDF.
     
+    Admite peticiones condicionales (If-None-Match, If-Modified-Since) y
+    rangos de bytes (Range, If-Range), que usan los visores de PDF para
+    cargar documentos linealizados por partes.
+    
     Args:
         path (str): Ruta del archivo a descargar
         
     Returns:
-        FileResponse: Archivo para descarga
+        Response: Archivo completo (200), rangos (206), sin cambios (304)
+            o rango no satisfacible (416)
         
     Raises:
         HTTPException: Si el archivo no existe o hay un error
     """
     try:
-        print(f"🔍 Intentando descargar archivo: {path}")
-        file_path = await file_service.get_file_path(path)
-        
-        # Verificar que el archivo existe y es accesible
-        if not file_path.exists():
-            raise HTTPException(
-                status_code=404,
-                detail=f"Archivo '{path}' no encontrado en el servidor"
-            )
+        file_path = file_service.resolve_file_path(path)
         
-        if not file_path.is_file():
-            raise HTTPException(
-                status_code=400,
-                detail=f"'{path}' no es un archivo válido"
-            )
+        try:
+            # Ubicación en disco y ETag fuerte a partir del hash registrado
+            stored_path, file_hash = await document_service.get_stored_file(db, file_path)
+        finally:
+            # Liberar la conexión antes de empezar a enviar el archivo
+            await db.close()
         
-        # Verificar que el archivo es legible
-        if not os.access(file_path, os.R_OK):
-            raise HTTPException(
-                status_code=403,
-                detail=f"No tienes permisos para acceder al archivo '{path}'"
-            )
+        fd, stat_result = file_service.open_file(stored_path, path)
         
-        # Obtener información del archivo
-        stat = file_path.stat()
-        file_size = stat.st_size
-        print(f"✅ Archivo encontrado: {file_path}")
-        print(f"📏 Tamaño: {file_size} bytes")
+        return build_file_response(
+            request.headers,
+            fd,
+            stat_result,
+            file_path.name,
+            etag=f'"{file_hash}"' if file_hash else None,
+            method=request.method
+        )
         
-        # Retornar el archivo para descarga
-        return FileResponse(
-            path=str(file_path),
-            filename=file_path.name,
-            media_type="application/pdf"
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
         )
+
+
+@api_router.get("/files/thumbnail/{path:path}")
+async def get_file_thumbnail(path: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Miniatura de la primera página de un documento, por su ruta.
+    
+    Igual que ``/documents/{id}/thumbnail``, para el explorador, que
+    lista los archivos por ruta.
+    
+    Args:
+        path (str): Ruta del documento
+        
+    Returns:
+        Response: Miniatura JPEG (200) o sin cambios (304)
+        
+    Raises:
+        HTTPException: Si el documento no existe o no tiene miniatura
+    """
+    try:
+        file_path = file_service.resolve_file_path(path)
+        try:
+            stored_path, file_hash = await document_service.get_stored_file(db, file_path)
+        finally:
+            # Liberar la conexión antes de renderizar
+            await db.close()
+        
+        return await _thumbnail_response(request, stored_path, file_hash, path)
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error al descargar archivo '{path}': {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Error interno del servidor: {str(e)}"
         )
 
 
-@api_router.get("/files/{path:path}", response_model=List[FileInfo])
-async def list_files(path: str):
+@api_router.get("/files/{path:path}", response_model=Union[List[FileInfo], FilePage])
+async def list_files(
+    path: str,
+    limit: Optional[int] = Query(None, ge=1, le=settings.FILES_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort: Optional[str] = Query(None, pattern="^(name|size|mtime)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Lista todos los archivos en un directorio.
     
+    Sin ``limit`` ni ``cursor`` se devuelve la lista completa. Con
+    cualquiera de ellos se devuelve una página (``FilePage``); la siguiente
+    se pide con el mismo orden y el ``next_cursor`` de la respuesta.
+    Con ``format=ndjson`` se envía un archivo por línea a medida que se
+    recorre el directorio.
+    
     Args:
         path (str): Ruta del directorio
+        limit (Optional[int]): Archivos por página (máximo FILES_MAX_PAGE_SIZE)
+        cursor (Optional[str]): Cursor de la página anterior
+        sort (Optional[str]): Ordenar por "name", "size" o "mtime" (por nombre al paginar)
+        order (str): "asc" o "desc"
+        format (str): "json" o "ndjson"
         
     Returns:
-        List[FileInfo]: Lista de información de archivos
+        List[FileInfo] | FilePage | StreamingResponse: Archivos del directorio
         
     Raises:
         HTTPException: Si hay un error al listar archivos
     """
     try:
-        return await file_service.list_files(path)
+        descending = order == "desc"
+        
+        if format == "ndjson":
+            lines = await file_service.stream_files(path, db, sort, descending)
+            return StreamingResponse(lines, media_type="application/x-ndjson")
+        
+        if limit is not None or cursor is not None:
+            return await file_service.list_files_page(
+                path, db, limit or settings.FILES_PAGE_SIZE, cursor, sort or "name", descending
+            )
+        
+        return await file_service.list_files(path, db, sort, descending)
     except HTTPException:
         raise
     except Exception as e:
@@ -254,10 +449,10 @@ async def list_files(path: str):
 
 
 @api_router.delete("/files/{path:path}")
-async def delete_file(path: str):
+async def delete_file(path: str, db: AsyncSession = Depends(get_async_db)):
     """
     Elimina un archivo PDF. Si el archivo está registrado en la base de datos,
-    también elimina el registro correspondiente.
+    el documento se marca como eliminado y se puede restaurar.
     
     Args:
         path (str): Ruta del archivo a eliminar
@@ -269,32 +464,9 @@ async def delete_file(path: str):
         HTTPException: Si el archivo no existe o hay un error
     """
     try:
-        # Intentar eliminar como documento (con metadatos)
-        try:
-            return await document_service.delete_document(path)
-        except HTTPException as e:
-            if e.status_code == 404:
-                # Si no está en la base de datos, eliminar solo del sistema de archivos
-                file_path = await file_service.get_file_path(path)
-                
-                # Verificar que el archivo existe
-                if not file_path.exists():
-                    raise HTTPException(
-                        status_code=404,
-                        detail=f"Archivo '{path}' no encontrado"
-                    )
-                
-                # Eliminar el archivo
-                file_path.unlink()
-                
-                return {
-                    "message": f"Archivo '{path}' eliminado exitosamente del sistema de archivos",
-                    "deleted_at": time.time(),
-                    "from_database": False
-                }
-            else:
-                raise e
-        
+        # El servicio decide: los documentos registrados se marcan como
+        # eliminados y los archivos sin registro se borran actualizando el índice
+        return await document_service.delete_document(db, path)
     except HTTPException:
         raise
     except Exception as e:
@@ -304,48 +476,58 @@ async def delete_file(path: str):
         )
 
 
-@api_router.delete("/directories/{path:path}")
-async def delete_directory(path: str):
+@api_router.delete("/directories/{path:path}", response_model=DirectoryDeletionStatus)
+async def delete_directory(path: str, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Elimina un directorio y todo su contenido.
     
+    Los documentos del directorio y sus subdirectorios se marcan como
+    eliminados. Si los archivos tardan en eliminarse del disco se responde
+    202 y el progreso se consulta en ``/directory-deletions/{id}``.
+    
     Args:
         path (str): Ruta del directorio a eliminar
         
     Returns:
-        dict: Mensaje de confirmación
+        DirectoryDeletionStatus: Estado de la eliminación
         
     Raises:
         HTTPException: Si el directorio no existe o hay un error
     """
     try:
-        from pathlib import Path
-        from ..config import get_upload_path
-        
-        upload_path = get_upload_path()
-        full_path = upload_path / path
-        
-        # Verificar que el directorio existe
-        if not full_path.exists():
-            raise HTTPException(
-                status_code=404,
-                detail=f"Directorio '{path}' no encontrado"
-            )
+        deletion = await directory_service.delete_directory(db, path)
+        if deletion.status == "running":
+            response.status_code = 202
+            response.headers["Location"] = f"{api_router.prefix}/directory-deletions/{deletion.id}"
+        return deletion
         
-        if not full_path.is_dir():
-            raise HTTPException(
-                status_code=400,
-                detail=f"'{path}' no es un directorio"
-            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.get("/directory-deletions/{deletion_id}", response_model=DirectoryDeletionStatus)
+async def get_directory_deletion(deletion_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Consulta el progreso de la eliminación de un directorio.
+    
+    Responde cualquier worker, no solo el que inició la eliminación.
+    
+    Args:
+        deletion_id (str): Identificador devuelto al eliminar el directorio
         
-        # Eliminar el directorio y todo su contenido
-        import shutil
-        shutil.rmtree(full_path)
+    Returns:
+        DirectoryDeletionStatus: Estado de la eliminación
         
-        return {
-            "message": f"Directorio '{path}' y todo su contenido eliminado exitosamente",
-            "deleted_at": time.time()
-        }
+    Raises:
+        HTTPException: Si el identificador no corresponde a ninguna eliminación reciente
+    """
+    try:
+        return await directory_service.get_deletion_status(db, deletion_id)
         
     except HTTPException:
         raise
@@ -360,6 +542,227 @@ async def delete_directory(path: str):
 # RUTAS PARA DOCUMENTOS CON METADATOS
 # ============================================================================
 
+@api_router.get("/documents", response_model=DocumentPage)
+async def list_documents(
+    limit: int = Query(settings.DOCUMENTS_PAGE_SIZE, ge=1, le=settings.DOCUMENTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    document_type_id: Optional[int] = Query(None),
+    category_id: Optional[int] = Query(None),
+    client_id: Optional[int] = Query(None),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Lista los documentos registrados, del más reciente al más antiguo.
+    
+    Para obtener la página siguiente se repite la petición con los mismos
+    filtros y el ``next_cursor`` de la respuesta anterior.
+    
+    Args:
+        limit (int): Documentos por página (máximo DOCUMENTS_MAX_PAGE_SIZE)
+        cursor (Optional[str]): Cursor de la página anterior
+        document_type_id (Optional[int]): Filtrar por tipo de documento
+        category_id (Optional[int]): Filtrar por categoría
+        client_id (Optional[int]): Filtrar por cliente
+        date_from (Optional[datetime]): Fecha de subida mínima (incluida)
+        date_to (Optional[datetime]): Fecha de subida máxima (excluida)
+        
+    Returns:
+        DocumentPage: Documentos de la página y cursor de la siguiente
+        
+    Raises:
+        HTTPException: Si el cursor no es válido o hay un error al listar
+    """
+    try:
+        return await document_service.list_documents(
+            db, limit, cursor, document_type_id, category_id, client_id, date_from, date_to
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.get("/documents/search", response_model=DocumentSearchPage)
+async def search_documents(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=settings.DOCUMENTS_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=settings.SEARCH_MAX_OFFSET),
+    document_type_id: Optional[int] = Query(None),
+    category_id: Optional[int] = Query(None),
+    client_id: Optional[int] = Query(None),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Busca documentos por nombre y contenido, ordenados por relevancia.
+    
+    Args:
+        q (str): Texto a buscar (admite "frases", OR y -exclusiones)
+        limit (int): Resultados por página
+        offset (int): Resultados a saltar
+        document_type_id (Optional[int]): Filtrar por tipo de documento
+        category_id (Optional[int]): Filtrar por categoría
+        client_id (Optional[int]): Filtrar por cliente
+        date_from (Optional[datetime]): Fecha de subida mínima (incluida)
+        date_to (Optional[datetime]): Fecha de subida máxima (excluida)
+        
+    Returns:
+        DocumentSearchPage: Resultados con fragmentos resaltados
+        
+    Raises:
+        HTTPException: Si la búsqueda no es válida o hay un error al buscar
+    """
+    try:
+        return await document_service.search_documents(
+            db, q, limit, offset, document_type_id, category_id, client_id, date_from, date_to
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.get("/documents/{document_id}/extraction", response_model=ExtractionStatusResponse)
+async def get_extraction_status(document_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Consulta el estado de la extracción de texto de un documento.
+    
+    Args:
+        document_id (int): ID del documento
+        
+    Returns:
+        ExtractionStatusResponse: Estado de la extracción
+        
+    Raises:
+        HTTPException: Si el documento no existe
+    """
+    try:
+        return await document_service.get_extraction_status(db, document_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.get("/documents/{document_id:int}")
+@api_router.head("/documents/{document_id:int}", include_in_schema=False)
+async def download_document(document_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Descarga el archivo de un documento por su ID.
+    
+    Igual que ``/files/download/{path}`` (rangos y peticiones condicionales),
+    pero localiza el documento por su clave primaria.
+    
+    Args:
+        document_id (int): ID del documento
+        
+    Returns:
+        Response: Archivo completo (200), rangos (206), sin cambios (304)
+            o rango no satisfacible (416)
+        
+    Raises:
+        HTTPException: Si el documento no existe o hay un error
+    """
+    try:
+        try:
+            stored_path, file_hash, filename = await document_service.get_document_file(db, document_id)
+        finally:
+            # Liberar la conexión antes de empezar a enviar el archivo
+            await db.close()
+        
+        fd, stat_result = file_service.open_file(stored_path, filename)
+        
+        return build_file_response(
+            request.headers,
+            fd,
+            stat_result,
+            filename,
+            etag=f'"{file_hash}"',
+            method=request.method
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.get("/documents/{document_id:int}/thumbnail")
+async def get_document_thumbnail(document_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Miniatura JPEG de la primera página de un documento.
+    
+    Se genera en segundo plano al subir el documento (o al pedirla por
+    primera vez) y se guarda en una caché en disco por contenido. La
+    respuesta lleva ETag y Cache-Control para que el navegador la reutilice.
+    
+    Args:
+        document_id (int): ID del documento
+        
+    Returns:
+        Response: Miniatura JPEG (200) o sin cambios (304)
+        
+    Raises:
+        HTTPException: Si el documento no existe o no tiene miniatura
+    """
+    try:
+        try:
+            stored_path, file_hash, _ = await document_service.get_document_file(db, document_id)
+        finally:
+            # Liberar la conexión antes de renderizar
+            await db.close()
+        
+        return await _thumbnail_response(request, stored_path, file_hash, f"documento {document_id}")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.post("/documents/{document_id}/restore", response_model=DocumentResponse)
+async def restore_document(document_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Restaura un documento eliminado durante el periodo de retención.
+    
+    Args:
+        document_id (int): ID del documento
+        
+    Returns:
+        DocumentResponse: Documento restaurado
+        
+    Raises:
+        HTTPException: Si el documento no existe, no está eliminado o ya no se puede restaurar
+    """
+    try:
+        return await document_service.restore_document(db, document_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
 @api_router.post("/documents/upload", response_model=DocumentUploadResponse)
 async def upload_document_with_metadata(
     file: UploadFile = File(..., description="Archivo PDF a subir"),
@@ -367,7 +770,8 @@ async def upload_document_with_metadata(
     document_type_id: int = Form(..., description="ID del tipo de documento"),
     category_id: int = Form(..., description="ID de la categoría"),
     client_id: Optional[int] = Form(None, description="ID del cliente (opcional)"),
-    upload_date: Optional[str] = Form(None, description="Fecha de subida (YYYY-MM-DD HH:MM:SS)")
+    upload_date: Optional[str] = Form(None, description="Fecha de subida (YYYY-MM-DD HH:MM:SS)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Sube un documento PDF y lo registra en la base de datos con metadatos.
@@ -405,6 +809,7 @@ async def upload_document_with_metadata(
             client_id = None
         
         document = await document_service.upload_document_with_metadata(
+            db=db,
             file=file,
             path=path,
             document_type_id=document_type_id,
@@ -428,8 +833,289 @@ async def upload_document_with_metadata(
         )
 
 
+@api_router.post("/documents/upload/batch", response_model=BatchUploadResponse)
+async def upload_documents_batch(
+    files: List[UploadFile] = File(..., description="Archivos PDF a subir"),
+    path: Optional[str] = Form(None, description="Directorio destino común"),
+    document_type_id: Optional[int] = Form(None, description="ID del tipo de documento común"),
+    category_id: Optional[int] = Form(None, description="ID de la categoría común"),
+    client_id: Optional[int] = Form(None, description="ID del cliente común (opcional)"),
+    metadata: Optional[str] = Form(
+        None,
+        description="Lista JSON con los metadatos propios de cada archivo, en el mismo orden que files"
+    ),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Sube varios documentos PDF y los registra en una sola petición.
+    
+    Los metadatos comunes del formulario se aplican a todos los archivos;
+    ``metadata`` permite sobrescribirlos archivo a archivo. La respuesta
+    incluye el resultado de cada archivo: un duplicado o un dato no válido
+    no impide registrar el resto.
+    
+    Args:
+        files (List[UploadFile]): Archivos PDF a subir
+        path (str, optional): Directorio destino común
+        document_type_id (int, optional): ID del tipo de documento común
+        category_id (int, optional): ID de la categoría común
+        client_id (int, optional): ID del cliente común
+        metadata (str, optional): Lista JSON de BatchUploadFileMetadata
+        
+    Returns:
+        BatchUploadResponse: Resultado de cada archivo
+        
+    Raises:
+        HTTPException: Si la petición no es válida o falla el lote completo
+    """
+    try:
+        if len(files) > settings.BATCH_UPLOAD_MAX_FILES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Se permiten como máximo {settings.BATCH_UPLOAD_MAX_FILES} archivos por lote"
+            )
+        
+        # Metadatos propios de cada archivo (opcionales)
+        per_file: List[BatchUploadFileMetadata] = [BatchUploadFileMetadata() for _ in files]
+        if metadata:
+            try:
+                per_file = TypeAdapter(List[BatchUploadFileMetadata]).validate_json(metadata)
+            except ValidationError as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"metadata no es una lista JSON válida: {e.errors()[0]['msg']}"
+                )
+            if len(per_file) != len(files):
+                raise HTTPException(
+                    status_code=400,
+                    detail="metadata debe tener un elemento por archivo"
+                )
+        
+        defaults = {
+            "path": path,
+            "document_type_id": document_type_id,
+            "category_id": category_id,
+            "client_id": client_id
+        }
+        entries = []
+        for file, file_metadata in zip(files, per_file):
+            merged = {**defaults, **file_metadata.model_dump(exclude_none=True)}
+            # Convertir client_id a None si es 0 o negativo
+            if merged.get("client_id") is not None and merged["client_id"] <= 0:
+                merged["client_id"] = None
+            entries.append((file, merged))
+        
+        return await document_service.upload_documents_batch(db, entries)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.post("/documents/bulk/delete", response_model=BulkOperationResponse)
+async def bulk_delete_documents(request: BulkDeleteRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Elimina varios documentos por ID o todos los de un directorio (incluidos subdirectorios).
+    
+    Args:
+        request (BulkDeleteRequest): IDs o directorio a vaciar
+        
+    Returns:
+        BulkOperationResponse: Documentos eliminados y operaciones pendientes
+        
+    Raises:
+        HTTPException: Si la selección no es válida o hay un error
+    """
+    try:
+        return await document_service.bulk_delete_documents(db, ids=request.ids, prefix=request.prefix)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.post("/documents/bulk/move", response_model=BulkOperationResponse)
+async def bulk_move_documents(request: BulkMoveRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Mueve varios documentos por ID, o un directorio completo, a otro directorio.
+    
+    Args:
+        request (BulkMoveRequest): IDs o directorio de origen, y directorio destino
+        
+    Returns:
+        BulkOperationResponse: Documentos movidos, conflictos y operaciones pendientes
+        
+    Raises:
+        HTTPException: Si la selección o el destino no son válidos o hay un error
+    """
+    try:
+        return await document_service.bulk_move_documents(
+            db, request.destination, ids=request.ids, prefix=request.prefix
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+# ============================================================================
+# RUTAS PARA SUBIDAS REANUDABLES
+# ============================================================================
+
+@api_router.post("/documents/uploads", response_model=UploadSessionResponse)
+async def create_upload_session(session: UploadSessionCreate):
+    """
+    Inicia una sesión de subida reanudable para un documento.
+    
+    Args:
+        session (UploadSessionCreate): Nombre, destino, tamaño y metadatos del documento
+        
+    Returns:
+        UploadSessionResponse: Estado inicial de la sesión
+    """
+    try:
+        return await document_service.create_upload_session(session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.get("/documents/uploads/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(session_id: str):
+    """
+    Obtiene el estado de una sesión de subida y el offset desde el que reanudar.
+    
+    Args:
+        session_id (str): Identificador de la sesión
+        
+    Returns:
+        UploadSessionResponse: Estado de la sesión
+    """
+    try:
+        return await document_service.get_upload_session(session_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.put("/documents/uploads/{session_id}", response_model=UploadSessionResponse)
+async def upload_session_chunk(session_id: str, request: Request):
+    """
+    Envía un rango de bytes de una sesión de subida.
+    
+    El cuerpo contiene los bytes en crudo y la cabecera Content-Range indica
+    su posición (ej: "bytes 0-1048575/41943040"). El rango debe comenzar en
+    el offset actual de la sesión.
+    
+    Args:
+        session_id (str): Identificador de la sesión
+        request (Request): Petición con el fragmento en el cuerpo
+        
+    Returns:
+        UploadSessionResponse: Estado de la sesión tras recibir el rango
+    """
+    try:
+        start, end, total = _parse_content_range(request.headers.get("content-range"))
+        
+        session = await document_service.append_upload_chunk(
+            session_id=session_id,
+            start=start,
+            end=end,
+            chunks=request.stream(),
+            total_size=total
+        )
+        
+        if session.offset != end + 1:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Se recibieron {session.offset - start} bytes pero el rango indicaba {end - start + 1}",
+                headers={"Upload-Offset": str(session.offset)}
+            )
+        
+        return session
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.post("/documents/uploads/{session_id}/finalize", response_model=DocumentUploadResponse)
+async def finalize_upload_session(session_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Completa una sesión de subida y registra el documento con sus metadatos.
+    
+    Args:
+        session_id (str): Identificador de la sesión
+        
+    Returns:
+        DocumentUploadResponse: Información del documento creado
+    """
+    try:
+        document = await document_service.finalize_upload_session(db, session_id)
+        
+        return DocumentUploadResponse(
+            message=f"Documento '{document.filename}' subido y registrado exitosamente",
+            document=document,
+            uploaded_at=document.upload_date
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.delete("/documents/uploads/{session_id}")
+async def cancel_upload_session(session_id: str):
+    """
+    Cancela una sesión de subida y descarta los bytes recibidos.
+    
+    Args:
+        session_id (str): Identificador de la sesión
+        
+    Returns:
+        dict: Mensaje de confirmación
+    """
+    try:
+        await document_service.cancel_upload_session(session_id)
+        return {
+            "message": f"Sesión de subida '{session_id}' cancelada",
+            "deleted_at": time.time()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
 @api_router.get("/documents/types", response_model=List[DocumentTypeResponse])
-async def get_document_types():
+async def get_document_types(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Obtiene todos los tipos de documento disponibles.
     
@@ -440,7 +1126,7 @@ async def get_document_types():
         HTTPException: Si hay un error al obtener los tipos
     """
     try:
-        return await document_service.get_document_types()
+        return await _reference_response(request, response, db, "document_types")
     except HTTPException:
         raise
     except Exception as e:
@@ -451,7 +1137,7 @@ async def get_document_types():
 
 
 @api_router.get("/documents/clients", response_model=List[ClientResponse])
-async def get_clients():
+async def get_clients(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Obtiene todos los clientes disponibles.
     
@@ -462,7 +1148,7 @@ async def get_clients():
         HTTPException: Si hay un error al obtener los clientes
     """
     try:
-        return await document_service.get_clients()
+        return await _reference_response(request, response, db, "clients")
     except HTTPException:
         raise
     except Exception as e:
@@ -473,7 +1159,7 @@ async def get_clients():
 
 
 @api_router.get("/documents/categories", response_model=List[CategoryResponse])
-async def get_categories():
+async def get_categories(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Obtiene todas las categorías disponibles.
     
@@ -484,7 +1170,35 @@ async def get_categories():
         HTTPException: Si hay un error al obtener las categorías
     """
     try:
-        return await document_service.get_categories()
+        return await _reference_response(request, response, db, "categories")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@api_router.delete("/documents/{document_id:int}")
+async def delete_document_by_id(document_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Elimina un documento por su ID.
+    
+    Debe declararse antes de ``/documents/{path:path}``, que también
+    aceptaría la ruta.
+    
+    Args:
+        document_id (int): ID del documento
+        
+    Returns:
+        dict: Información del documento eliminado
+        
+    Raises:
+        HTTPException: Si el documento no existe o hay un error
+    """
+    try:
+        return await document_service.delete_document_by_id(db, document_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -495,7 +1209,7 @@ async def get_categories():
 
 
 @api_router.delete("/documents/{path:path}")
-async def delete_document(path: str):
+async def delete_document(path: str, db: AsyncSession = Depends(get_async_db)):
     """
     Elimina un documento tanto del sistema de archivos como de la base de datos.
     
@@ -509,7 +1223,7 @@ async def delete_document(path: str):
         HTTPException: Si el documento no existe o hay un error
     """
     try:
-        return await document_service.delete_document(path)
+        return await document_service.delete_document(db, path)
         
     except HTTPException:
         raise
@@ -526,7 +1240,7 @@ async def delete_document(path: str):
 
 # Document Types CRUD
 @api_router.post("/metadata/document-types", response_model=DocumentTypeResponse)
-async def create_document_type(document_type: DocumentTypeCreate):
+async def create_document_type(document_type: DocumentTypeCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Crea un nuevo tipo de documento.
     
@@ -537,7 +1251,7 @@ async def create_document_type(document_type: DocumentTypeCreate):
         DocumentTypeResponse: Tipo de documento creado
     """
     try:
-        return await document_service.create_document_type(document_type)
+        return await document_service.create_document_type(db, document_type)
     except HTTPException:
         raise
     except Exception as e:
@@ -547,7 +1261,7 @@ async def create_document_type(document_type: DocumentTypeCreate):
         )
 
 @api_router.put("/metadata/document-types/{type_id}", response_model=DocumentTypeResponse)
-async def update_document_type(type_id: int, document_type: DocumentTypeUpdate):
+async def update_document_type(type_id: int, document_type: DocumentTypeUpdate, db: AsyncSession = Depends(get_async_db)):
     """
     Actualiza un tipo de documento existente.
     
@@ -559,7 +1273,7 @@ async def update_document_type(type_id: int, document_type: DocumentTypeUpdate):
         DocumentTypeResponse: Tipo de documento actualizado
     """
     try:
-        return await document_service.update_document_type(type_id, document_type)
+        return await document_service.update_document_type(db, type_id, document_type)
     except HTTPException:
         raise
     except Exception as e:
@@ -569,7 +1283,7 @@ async def update_document_type(type_id: int, document_type: DocumentTypeUpdate):
         )
 
 @api_router.delete("/metadata/document-types/{type_id}")
-async def delete_document_type(type_id: int):
+async def delete_document_type(type_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Elimina un tipo de documento.
     
@@ -580,7 +1294,7 @@ async def delete_document_type(type_id: int):
         dict: Mensaje de confirmación
     """
     try:
-        await document_service.delete_document_type(type_id)
+        await document_service.delete_document_type(db, type_id)
         return {
             "message": f"Tipo de documento con ID {type_id} eliminado exitosamente",
             "deleted_at": time.time()
@@ -595,7 +1309,7 @@ async def delete_document_type(type_id: int):
 
 # Categories CRUD
 @api_router.post("/metadata/categories", response_model=CategoryResponse)
-async def create_category(category: CategoryCreate):
+async def create_category(category: CategoryCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Crea una nueva categoría.
     
@@ -606,7 +1320,7 @@ async def create_category(category: CategoryCreate):
         CategoryResponse: Categoría creada
     """
     try:
-        return await document_service.create_category(category)
+        return await document_service.create_category(db, category)
     except HTTPException:
         raise
     except Exception as e:
@@ -616,7 +1330,7 @@ async def create_category(category: CategoryCreate):
         )
 
 @api_router.put("/metadata/categories/{category_id}", response_model=CategoryResponse)
-async def update_category(category_id: int, category: CategoryUpdate):
+async def update_category(category_id: int, category: CategoryUpdate, db: AsyncSession = Depends(get_async_db)):
     """
     Actualiza una categoría existente.
     
@@ -628,7 +1342,7 @@ async def update_category(category_id: int, category: CategoryUpdate):
         CategoryResponse: Categoría actualizada
     """
     try:
-        return await document_service.update_category(category_id, category)
+        return await document_service.update_category(db, category_id, category)
     except HTTPException:
         raise
     except Exception as e:
@@ -638,7 +1352,7 @@ async def update_category(category_id: int, category: CategoryUpdate):
         )
 
 @api_router.delete("/metadata/categories/{category_id}")
-async def delete_category(category_id: int):
+async def delete_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Elimina una categoría.
     
@@ -649,7 +1363,7 @@ async def delete_category(category_id: int):
         dict: Mensaje de confirmación
     """
     try:
-        await document_service.delete_category(category_id)
+        await document_service.delete_category(db, category_id)
         return {
             "message": f"Categoría con ID {category_id} eliminada exitosamente",
             "deleted_at": time.time()
@@ -664,7 +1378,7 @@ async def delete_category(category_id: int):
 
 # Clients CRUD
 @api_router.post("/metadata/clients", response_model=ClientResponse)
-async def create_client(client: ClientCreate):
+async def create_client(client: ClientCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Crea un nuevo cliente.
     
@@ -675,7 +1389,7 @@ async def create_client(client: ClientCreate):
         ClientResponse: Cliente creado
     """
     try:
-        return await document_service.create_client(client)
+        return await document_service.create_client(db, client)
     except HTTPException:
         raise
     except Exception as e:
@@ -685,7 +1399,7 @@ async def create_client(client: ClientCreate):
         )
 
 @api_router.put("/metadata/clients/{client_id}", response_model=ClientResponse)
-async def update_client(client_id: int, client: ClientUpdate):
+async def update_client(client_id: int, client: ClientUpdate, db: AsyncSession = Depends(get_async_db)):
     """
     Actualiza un cliente existente.
     
@@ -697,7 +1411,7 @@ async def update_client(client_id: int, client: ClientUpdate):
         ClientResponse: Cliente actualizado
     """
     try:
-        return await document_service.update_client(client_id, client)
+        return await document_service.update_client(db, client_id, client)
     except HTTPException:
         raise
     except Exception as e:
@@ -707,7 +1421,7 @@ async def update_client(client_id: int, client: ClientUpdate):
         )
 
 @api_router.delete("/metadata/clients/{client_id}")
-async def delete_client(client_id: int):
+async def delete_client(client_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Elimina un cliente.
     
@@ -718,7 +1432,7 @@ async def delete_client(client_id: int):
         dict: Mensaje de confirmación
     """
     try:
-        await document_service.delete_client(client_id)
+        await document_service.delete_client(db, client_id)
         return {
             "message": f"Cliente con ID {client_id} eliminado exitosamente",
             "deleted_at": time.time()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Caché en memoria
+================
+
+Este módulo contiene una caché sencilla con expiración por tiempo (TTL)
+para datos que cambian poco y se consultan continuamente, como los tipos
+de documento, las categorías y los clientes.
+
+La caché es local a cada proceso: con varios workers, un cambio hecho en
+uno se ve en los demás como mucho al cabo de ``ttl`` segundos.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Caché clave-valor en memoria con expiración por tiempo.
+
+    Las cargas concurrentes de una misma clave se agrupan: si varias
+    peticiones encuentran la entrada caducada a la vez, solo una ejecuta la
+    consulta y el resto espera su resultado.
+
+    Attributes:
+        ttl (float): Segundos que una entrada se considera válida
+    """
+
+    def __init__(self, ttl: float):
+        """
+        Inicializa la caché vacía.
+
+        Args:
+            ttl (float): Segundos que una entrada se considera válida
+        """
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Se incrementa al invalidar, para no guardar cargas que empezaron antes
+        self._generations: Dict[str, int] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Obtiene un valor si existe y no ha caducado.
+
+        Args:
+            key (str): Clave de la entrada
+
+        Returns:
+            Optional[Any]: Valor almacenado o None si no existe o ha caducado
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Almacena un valor durante ``ttl`` segundos.
+
+        Args:
+            key (str): Clave de la entrada
+            value (Any): Valor a almacenar
+        """
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Obtiene un valor de la caché o lo carga si no está disponible.
+
+        Args:
+            key (str): Clave de la entrada
+            loader (Callable[[], Awaitable[Any]]): Función que obtiene el valor actualizado
+
+        Returns:
+            Any: Valor almacenado o recién cargado
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Otra petición pudo cargarlo mientras se esperaba el lock
+            value = self.get(key)
+            if value is None:
+                generation = self._generations.get(key, 0)
+                value = await loader()
+                if self._generations.get(key, 0) == generation:
+                    self.set(key, value)
+            return value
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Descarta una entrada o toda la caché.
+
+        Args:
+            key (Optional[str]): Clave a descartar (todas si no se indica)
+        """
+        keys = set(self._entries) | set(self._locks) if key is None else [key]
+        for k in keys:
+            self._entries.pop(k, None)
+            self._generations[k] = self._generations.get(k, 0) + 1
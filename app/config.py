@@ -33,16 +33,89 @@ class Settings(BaseSettings):
     DB_USER: str = "pdf_manager_user"
     DB_PASSWORD: str = "pdf_manager_password"
     
+    # Configuración del pool de conexiones (por proceso y por motor)
+    DB_POOL_SIZE: int = 5  # Conexiones que se mantienen abiertas
+    DB_MAX_OVERFLOW: int = 10  # Conexiones extra permitidas en picos
+    DB_POOL_TIMEOUT: int = 30  # Segundos de espera máxima por una conexión
+    DB_POOL_RECYCLE: int = 300  # Reciclar conexiones cada 5 minutos
+    
     # Configuración de archivos
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB por lectura al volcar subidas a disco
+    BATCH_UPLOAD_MAX_FILES: int = 500  # Archivos máximos por subida por lotes
+    BATCH_UPLOAD_CONCURRENCY: int = 8  # Archivos volcados y hasheados a la vez en un lote
     ALLOWED_EXTENSIONS: list = [".pdf"]
     
+    # Configuración de almacenamiento
+    STORAGE_BACKEND: str = "local"  # "local" (ruta visible) o "cas" (por contenido)
+    BLOB_DIR: str = ".blobs"  # Relativo a UPLOAD_DIR, usado por el backend "cas"
+    
+    # Configuración de operaciones masivas
+    BULK_MAX_IDS: int = 10000  # IDs máximos por petición de borrado o movimiento masivo
+    BULK_BATCH_SIZE: int = 500  # Documentos por transacción
+    FILE_OPERATION_CONCURRENCY: int = 16  # Archivos eliminados o renombrados a la vez
+    TRASH_DIR: str = ".trash"  # Relativo a UPLOAD_DIR: directorios pendientes de eliminar del disco
+    DIRECTORY_DELETE_WAIT: float = 2.0  # Segundos que espera la petición antes de responder 202
+    DIRECTORY_DELETE_PROGRESS_INTERVAL: float = 1.0  # Segundos entre escrituras del progreso de una eliminación
+    DELETED_RETENTION_DAYS: int = 30  # Días que se conservan los documentos eliminados antes de purgarlos
+    REAPER_INTERVAL: int = 3600  # Segundos entre ejecuciones del recolector de documentos eliminados
+    
+    # Configuración de subidas reanudables
+    UPLOAD_SESSION_DIR: str = ".upload_sessions"  # Relativo a UPLOAD_DIR
+    UPLOAD_SESSION_TTL: int = 24 * 60 * 60  # Segundos sin actividad antes de descartar una sesión
+    
+    # Configuración del listado de documentos
+    DOCUMENTS_PAGE_SIZE: int = 50  # Documentos por página si no se indica
+    DOCUMENTS_MAX_PAGE_SIZE: int = 200  # Límite máximo por página
+    SEARCH_MAX_OFFSET: int = 1000  # Resultados máximos que se pueden saltar en una búsqueda
+    
+    # Configuración del listado de archivos
+    FILES_PAGE_SIZE: int = 100  # Archivos por página si se pide paginación sin límite
+    FILES_MAX_PAGE_SIZE: int = 1000  # Límite máximo por página
+    FILES_STREAM_BATCH: int = 500  # Archivos leídos por bloque en el listado NDJSON
+    
+    # Configuración de extracción de texto
+    EXTRACTION_ENABLED: bool = True
+    EXTRACTION_WORKERS: int = 2  # Procesos dedicados a extraer texto
+    EXTRACTION_TIMEOUT: int = 60  # Segundos máximos por documento
+    EXTRACTION_MAX_PAGES: int = 500  # Páginas máximas procesadas por documento
+    EXTRACTION_MAX_CHARS: int = 2_000_000  # Caracteres máximos guardados por documento
+    EXTRACTION_BATCH_SIZE: int = 20  # Resultados por escritura en la base de datos
+    EXTRACTION_FLUSH_INTERVAL: float = 2.0  # Segundos máximos antes de escribir un lote incompleto
+    
+    # Configuración de miniaturas
+    THUMBNAILS_ENABLED: bool = True
+    THUMBNAIL_DIR: str = ".thumbnails"  # Relativo a UPLOAD_DIR: caché de miniaturas por contenido
+    THUMBNAIL_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # Tamaño máximo de la caché (LRU)
+    THUMBNAIL_WIDTH: int = 240  # Ancho de las miniaturas en píxeles
+    THUMBNAIL_QUALITY: int = 75  # Calidad JPEG
+    THUMBNAIL_WORKERS: int = 2  # Procesos dedicados a renderizar miniaturas
+    THUMBNAIL_TIMEOUT: int = 30  # Segundos máximos por miniatura
+    THUMBNAIL_MAX_AGE: int = 7 * 24 * 60 * 60  # Segundos que los navegadores pueden reutilizar una miniatura
+    
+    # Configuración de caché
+    REFERENCE_CACHE_TTL: int = 300  # Segundos que se cachean tipos, categorías y clientes
+    
+    # Configuración de métricas
+    METRICS_ENABLED: bool = True  # Exponer /metrics y medir peticiones y consultas
+    EVENT_LOOP_LAG_INTERVAL: float = 0.5  # Segundos entre mediciones del retraso del event loop
+    
+    # Configuración de perfilado (desactivado por defecto)
+    PROFILING_ENABLED: bool = False  # Perfilar peticiones y servir los perfiles en /debug/profiles
+    PROFILING_SAMPLE_RATE: float = 0.01  # Fracción de peticiones perfiladas al azar
+    PROFILING_SLOW_THRESHOLD: float = 1.0  # Segundos a partir de los que se guarda el perfil (0: solo muestreo)
+    PROFILING_INTERVAL: float = 0.005  # Segundos entre muestras de pila
+    PROFILING_MAX_PROFILES: int = 50  # Perfiles conservados en memoria
+    PROFILING_TOKEN: str = ""  # Token Bearer de /debug/profiles; sin él, el acceso se deniega
+    
     # Configuración de seguridad
     SECRET_KEY: str = "tu-clave-secreta-aqui-cambiala-en-produccion"
     
     # Configuración de logs
     LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" (una línea por registro) o "text" (legible, para desarrollo)
+    SQL_ECHO: bool = False  # Registrar cada sentencia SQL (logger sqlalchemy.engine)
     
     class Config:
         env_file = ".env"
@@ -53,6 +126,11 @@ class Settings(BaseSettings):
         """Construye la URL de la base de datos desde componentes individuales."""
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def async_database_url(self) -> str:
+        """Construye la URL de la base de datos para el driver asíncrono (asyncpg)."""
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
 
 # Instancia global de configuración
 settings = Settings()
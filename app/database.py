@@ -4,27 +4,165 @@ Configuración de la base de datos
 =================================
 
 Este módulo contiene la configuración de SQLAlchemy para PostgreSQL.
+
+Se exponen dos motores sobre la misma base de datos:
+
+- ``engine`` / ``SessionLocal``: síncronos (psycopg2), para scripts y
+  utilidades que no se ejecutan dentro del event loop.
+- ``async_engine`` / ``AsyncSessionLocal``: asíncronos (asyncpg), para los
+  servicios de la API, de modo que una consulta lenta no bloquee al resto
+  de peticiones del worker.
 """
 
-from sqlalchemy import create_engine
+import threading
+import time
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
 
+
+class PoolStatistics:
+    """
+    Estadísticas acumuladas de obtención de conexiones de un pool.
+    
+    Attributes:
+        checkouts (int): Conexiones entregadas
+        timeouts (int): Esperas que superaron ``DB_POOL_TIMEOUT``
+        total_wait (float): Tiempo total esperando una conexión, en segundos
+        max_wait (float): Mayor espera registrada, en segundos
+    """
+    
+    def __init__(self):
+        """Inicializa los contadores a cero."""
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        """
+        Registra una solicitud de conexión al pool.
+        
+        Args:
+            wait (float): Segundos transcurridos hasta obtener la conexión (o rendirse)
+            timed_out (bool): Si la solicitud terminó por timeout
+        """
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+    
+    def snapshot(self, pool) -> dict:
+        """
+        Combina los contadores acumulados con el estado actual del pool.
+        
+        Args:
+            pool: Pool de conexiones del motor
+            
+        Returns:
+            dict: Ocupación actual y estadísticas de espera
+        """
+        with self._lock:
+            requests = self.checkouts + self.timeouts
+            return {
+                "size": pool.size(),
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(1000 * self.total_wait / requests, 3) if requests else 0.0,
+                "wait_max_ms": round(1000 * self.max_wait, 3)
+            }
+
+
+def _timed_pool_class(base, statistics: PoolStatistics):
+    """
+    Crea una subclase del pool que mide cuánto se espera por cada conexión.
+    
+    SQLAlchemy no ofrece un evento previo a la obtención de la conexión, por
+    lo que se envuelve ``_do_get``, que es donde el pool espera a que quede
+    una conexión libre (o abre una nueva si hay hueco).
+    
+    Args:
+        base: Clase de pool a instrumentar
+        statistics (PoolStatistics): Destino de las mediciones
+        
+    Returns:
+        type: Clase de pool instrumentada
+    """
+    class TimedPool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                statistics.record(time.perf_counter() - started, timed_out=True)
+                raise
+            statistics.record(time.perf_counter() - started)
+            return connection
+    
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+# Estadísticas de los pools de conexiones
+pool_statistics = PoolStatistics()
+async_pool_statistics = PoolStatistics()
+
+# Parámetros comunes de los pools de conexiones
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": True  # Verificar conexión antes de usar
+}
+
 # Crear el motor de la base de datos
 engine = create_engine(
     settings.database_url,
-    echo=settings.DEBUG,  # Mostrar SQL en modo debug
-    pool_pre_ping=True,   # Verificar conexión antes de usar
-    pool_recycle=300      # Reciclar conexiones cada 5 minutos
+    poolclass=_timed_pool_class(QueuePool, pool_statistics),
+    **POOL_OPTIONS
 )
 
 # Crear la sesión de la base de datos
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Crear el motor asíncrono de la base de datos
+async_engine = create_async_engine(
+    settings.async_database_url,
+    poolclass=_timed_pool_class(AsyncAdaptedQueuePool, async_pool_statistics),
+    **POOL_OPTIONS
+)
+
+# Crear la sesión asíncrona de la base de datos. Los objetos no se expiran
+# al hacer commit porque en modo asíncrono no se pueden recargar de forma
+# implícita al acceder a sus atributos.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base para los modelos
 Base = declarative_base()
 
+# Espacios de nombres de los bloqueos consultivos (primer argumento de
+# ``pg_advisory_*``), para que los bloqueos de módulos distintos no coincidan
+ADVISORY_LOCK_BLOBS = 1
+ADVISORY_LOCK_DIRECTORY_INDEX = 2
+
 
 def get_db():
     """
@@ -43,6 +181,34 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Dependencia de FastAPI que proporciona una sesión asíncrona por petición.
+    
+    La sesión se cierra siempre al terminar la petición, también si se
+    produce una excepción, de modo que la conexión vuelve al pool. Las
+    transacciones que no se hayan confirmado se deshacen.
+    
+    Yields:
+        AsyncSession: Sesión asíncrona de SQLAlchemy
+        
+    Raises:
+        Exception: Si hay error en la conexión
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_pool_status() -> dict:
+    """
+    Obtiene el estado del pool de conexiones que usa la API.
+    
+    Returns:
+        dict: Ocupación actual y estadísticas de espera del pool asíncrono
+    """
+    return async_pool_statistics.snapshot(async_engine.pool)
+
+
 def create_tables():
     """
     Crea todas las tablas en la base de datos.
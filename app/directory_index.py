@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Índice de directorios
+=====================
+
+Mantiene la tabla ``directories`` sincronizada con ``UPLOAD_DIR`` para que
+listar directorios y contar sus archivos sea una consulta indexada en lugar
+de un recorrido del sistema de archivos.
+
+- Crear un directorio o subir un archivo registra el directorio y todos sus
+  ascendientes con un único ``INSERT ... ON CONFLICT``.
+- Subir o eliminar archivos ajusta ``files_count`` y ``total_bytes`` en la
+  misma transacción que el registro del documento.
+- ``rebuild`` reconstruye el índice desde disco; se ejecuta al arrancar si la
+  tabla está vacía (instalaciones existentes o tras vaciarla a mano). Un
+  bloqueo consultivo hace que, si arrancan varios workers a la vez, solo uno
+  la reconstruya y el resto la encuentre ya llena.
+
+Los directorios y archivos ocultos (staging de subidas, blobs) no se indexan,
+y solo se cuentan los archivos con extensión permitida, igual que en el
+listado de archivos.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, insert, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from . import database
+from .config import settings, get_upload_path, validate_file_extension
+from .models.directory import Directory
+from .models.document import Document
+from .storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+
+def directory_key(directory: Path) -> Optional[str]:
+    """
+    Obtiene la clave de índice de un directorio.
+
+    Args:
+        directory (Path): Ruta completa o relativa a UPLOAD_DIR
+
+    Returns:
+        Optional[str]: Ruta relativa con separador "/", o None para la raíz
+    """
+    if directory.is_absolute():
+        directory = directory.relative_to(get_storage().root)
+    key = directory.as_posix().strip("/")
+    return None if key in ("", ".") else key
+
+
+def is_hidden(key: str) -> bool:
+    """
+    Indica si una clave está en un directorio oculto (staging de subidas,
+    blobs, papelera, miniaturas), que no forma parte del índice.
+
+    Args:
+        key (str): Clave del directorio
+
+    Returns:
+        bool: True si algún componente empieza por "."
+    """
+    return any(part.startswith(".") for part in key.split("/"))
+
+
+def escape_like(value: str) -> str:
+    """Escapa los comodines de LIKE (con ``\\`` como carácter de escape)."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def subtree_filter(key: str):
+    """
+    Condición que selecciona un directorio y todos sus descendientes.
+
+    Args:
+        key (str): Clave del directorio raíz del subárbol
+
+    Returns:
+        Condición SQLAlchemy sobre ``Directory.path``
+    """
+    return or_(Directory.path == key, Directory.path.like(escape_like(key) + "/%", escape="\\"))
+
+
+def _with_ancestors(keys: Iterable[str]) -> List[str]:
+    """Devuelve las claves junto con las de todos sus ascendientes, ordenadas."""
+    result = set()
+    for key in keys:
+        parts = key.split("/")
+        for depth in range(1, len(parts) + 1):
+            result.add("/".join(parts[:depth]))
+    return sorted(result)
+
+
+def _row(key: str, files_count: int = 0, total_bytes: int = 0) -> dict:
+    parent, _, _ = key.rpartition("/")
+    return {
+        "path": key,
+        "parent_path": parent or None,
+        "depth": key.count("/") + 1,
+        "files_count": files_count,
+        "total_bytes": total_bytes,
+    }
+
+
+async def ensure_directories(db: AsyncSession, directories: Iterable[Path]) -> None:
+    """
+    Registra directorios (y sus ascendientes) que aún no estén en el índice.
+
+    No confirma la transacción.
+
+    Args:
+        db (AsyncSession): Sesión de base de datos
+        directories (Iterable[Path]): Directorios a registrar
+    """
+    await apply_changes(db, {key: (0, 0) for key in map(directory_key, directories) if key})
+
+
+async def apply_changes(db: AsyncSession, changes: Dict[str, Tuple[int, int]]) -> None:
+    """
+    Ajusta los contadores de varios directorios en una sola sentencia.
+
+    Los directorios que no existan se crean junto con sus ascendientes. Las
+    filas se escriben en orden de ruta para que transacciones concurrentes
+    no se bloqueen mutuamente. No confirma la transacción.
+
+    Args:
+        db (AsyncSession): Sesión de base de datos
+        changes (Dict[str, Tuple[int, int]]): Variación de (archivos, bytes) por clave
+    """
+    if not changes:
+        return
+
+    keys = _with_ancestors(changes)
+    deltas = {key: changes.get(key, (0, 0)) for key in keys}
+    statement = pg_insert(Directory).values([
+        _row(key, max(files, 0), max(size, 0)) for key, (files, size) in deltas.items()
+    ])
+
+    if any(files or size for files, size in deltas.values()):
+        # Los valores insertados no sirven para restar: la variación de cada
+        # fila existente se obtiene con un CASE sobre la ruta
+        new_files = Directory.files_count + case(
+            {key: files for key, (files, _) in deltas.items()}, value=Directory.path, else_=0
+        )
+        new_bytes = Directory.total_bytes + case(
+            {key: size for key, (_, size) in deltas.items()}, value=Directory.path, else_=0
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[Directory.path],
+            set_={
+                "files_count": case((new_files < 0, 0), else_=new_files),
+                "total_bytes": case((new_bytes < 0, 0), else_=new_bytes),
+                "updated_at": func.now(),
+            }
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=[Directory.path])
+
+    await db.execute(statement)
+
+
+async def add_files(db: AsyncSession, files: Iterable[Tuple[Path, int]]) -> None:
+    """
+    Suma archivos a los contadores de sus directorios. No confirma la transacción.
+
+    Args:
+        db (AsyncSession): Sesión de base de datos
+        files (Iterable[Tuple[Path, int]]): Ruta completa y tamaño de cada archivo
+    """
+    await apply_changes(db, _group(files, 1))
+
+
+async def remove_files(db: AsyncSession, files: Iterable[Tuple[Path, int]]) -> None:
+    """
+    Resta archivos de los contadores de sus directorios. No confirma la transacción.
+
+    Args:
+        db (AsyncSession): Sesión de base de datos
+        files (Iterable[Tuple[Path, int]]): Ruta completa y tamaño de cada archivo
+    """
+    await apply_changes(db, _group(files, -1))
+
+
+async def move_files(db: AsyncSession, moves: Iterable[Tuple[Path, Path, int]]) -> None:
+    """
+    Pasa archivos de un directorio a otro en una sola sentencia. No confirma la transacción.
+
+    Args:
+        db (AsyncSession): Sesión de base de datos
+        moves (Iterable[Tuple[Path, Path, int]]): Ruta de origen, ruta de destino y tamaño
+    """
+    moves = list(moves)
+    changes = _group(((source, size) for source, _, size in moves), -1)
+    for key, (count, total) in _group(((target, size) for _, target, size in moves), 1).items():
+        previous_count, previous_total = changes.get(key, (0, 0))
+        changes[key] = (previous_count + count, previous_total + total)
+    await apply_changes(db, changes)
+
+
+def _group(files: Iterable[Tuple[Path, int]], sign: int) -> Dict[str, Tuple[int, int]]:
+    changes: Dict[str, Tuple[int, int]] = {}
+    for file_path, size in files:
+        key = directory_key(Path(file_path).parent)
+        if key is None:
+            # Los archivos en la raíz no pertenecen a ningún directorio
+            continue
+        count, total = changes.get(key, (0, 0))
+        changes[key] = (count + sign, total + sign * (size or 0))
+    return changes
+
+
+def scan_upload_dir(root: Path) -> Dict[str, dict]:
+    """
+    Recorre UPLOAD_DIR y calcula las filas del índice.
+
+    Se ejecuta en un hilo: es la única operación que recorre todo el árbol.
+
+    Args:
+        root (Path): Directorio base
+
+    Returns:
+        Dict[str, dict]: Fila de cada directorio por clave
+    """
+    rows: Dict[str, dict] = {}
+    pending = [root]
+    while pending:
+        current = pending.pop()
+        key = directory_key(current.relative_to(root))
+        row = None
+        if key is not None:
+            row = rows[key] = _row(key)
+            row["created_at"] = datetime.fromtimestamp(current.stat().st_ctime)
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(Path(entry.path))
+                elif (
+                    row is not None
+                    and entry.is_file(follow_symlinks=False)
+                    and validate_file_extension(entry.name)
+                ):
+                    row["files_count"] += 1
+                    row["total_bytes"] += entry.stat(follow_symlinks=False).st_size
+    return rows
+
+
+async def rebuild(db: AsyncSession) -> int:
+    """
+    Reconstruye el índice completo desde disco y confirma.
+
+    Los documentos guardados por contenido no están en su ruta visible, así
+    que se suman a partir de la base de datos. Las reconstrucciones
+    simultáneas se ejecutan una detrás de otra.
+
+    Args:
+        db (AsyncSession): Sesión de base de datos
+
+    Returns:
+        int: Número de directorios indexados
+    """
+    await _lock(db)
+    root = get_upload_path()
+    rows = await asyncio.to_thread(scan_upload_dir, root)
+
+    stored = await db.execute(
+        select(Document.local_path, Document.file_size)
+        .where(Document.storage_key.like(f"{settings.BLOB_DIR}/%"), Document.is_active == True)  # noqa: E712
+    )
+    for local_path, file_size in stored:
+        key = directory_key(Path(local_path).parent)
+        if key is None:
+            continue
+        for ancestor in _with_ancestors([key]):
+            rows.setdefault(ancestor, {**_row(ancestor), "created_at": datetime.now()})
+        rows[key]["files_count"] += 1
+        rows[key]["total_bytes"] += file_size or 0
+
+    await db.execute(delete(Directory))
+    if rows:
+        await db.execute(insert(Directory), list(rows.values()))
+    await db.commit()
+    return len(rows)
+
+
+async def _lock(db: AsyncSession) -> None:
+    """Bloquea la reconstrucción del índice hasta el final de la transacción."""
+    await db.execute(select(func.pg_advisory_xact_lock(database.ADVISORY_LOCK_DIRECTORY_INDEX, 0)))
+
+
+async def ensure_built() -> None:
+    """
+    Reconstruye el índice si la tabla está vacía (llamado al arrancar).
+
+    La comprobación se hace con el bloqueo de reconstrucción tomado: un
+    worker que arranca mientras otro reconstruye espera y encuentra la tabla llena.
+    """
+    async with database.AsyncSessionLocal() as db:
+        await _lock(db)
+        if await db.scalar(select(Directory.id).limit(1)) is None:
+            count = await rebuild(db)
+            logger.info("Índice de directorios reconstruido: %d directorios", count)
+        else:
+            await db.commit()
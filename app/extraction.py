@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+"""
+Extracción de texto en segundo plano
+====================================
+
+Este módulo rellena ``Document.extracted_text`` fuera del ciclo de la
+petición de subida:
+
+- La subida encola el ID del documento (``extraction_worker.enqueue``).
+- Unos consumidores asíncronos reclaman cada documento en la base de datos
+  (``pending`` -> ``processing``) y envían la extracción a un pool de
+  procesos, de modo que PyPDF2 no bloquea el event loop ni compite por el GIL.
+- Los resultados se escriben en lotes con un único UPDATE por lote.
+
+Cada documento está acotado por ``EXTRACTION_MAX_PAGES`` y
+``EXTRACTION_TIMEOUT``: el proceso hijo deja de leer páginas al agotar el
+plazo y, si una sola página lo excede, se terminan los procesos del pool y
+se crea uno nuevo, para que un PDF malicioso no deje el pool bloqueado.
+
+El texto se recorta además para que su ``search_vector`` quepa en el límite
+de 1 MB de ``tsvector``. Si aun así un lote no se puede escribir, se escribe
+documento a documento y los que fallan quedan en ``failed`` con el motivo,
+sin bloquear los resultados de los demás.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, select, update
+
+from . import database
+from .config import settings
+from .models.document import Document
+from .storage import physical_path
+
+logger = logging.getLogger(__name__)
+
+# Estados posibles de Document.extraction_status
+EXTRACTION_PENDING = "pending"
+EXTRACTION_PROCESSING = "processing"
+EXTRACTION_COMPLETED = "completed"
+EXTRACTION_FAILED = "failed"
+
+# PostgreSQL rechaza un tsvector cuyos lexemas y posiciones ocupen más de
+# 1 MB; se reserva margen para los del nombre del archivo
+TSVECTOR_MAX_BYTES = 1024 * 1024 - 1
+SEARCH_VECTOR_BUDGET = TSVECTOR_MAX_BYTES - 16 * 1024
+# Posiciones que PostgreSQL guarda como máximo por lexema
+TSVECTOR_MAX_POSITIONS = 256
+
+# Palabra o secuencia sin espacios que empieza y termina en carácter de palabra
+_TOKEN = re.compile(r"\w(?:\S*\w)?")
+_WORD = re.compile(r"\w+")
+
+
+def fit_search_vector(text: str, budget: int = SEARCH_VECTOR_BUDGET) -> str:
+    """
+    Recorta el texto para que su tsvector no supere el límite de PostgreSQL.
+
+    Estima por exceso lo que PostgreSQL contabiliza: por cada lexema distinto
+    sus bytes, 3 de cabecera y alineación y 2 por posición. El stemming y las
+    palabras vacías solo lo reducen; las secuencias con puntuación interna
+    (palabras compuestas, URLs, correos) cuentan como la secuencia completa
+    más cada una de sus partes, igual que las trata el analizador.
+
+    Args:
+        text (str): Texto extraído
+        budget (int): Bytes disponibles para el tsvector
+
+    Returns:
+        str: El texto completo o su parte inicial, cortada entre palabras
+    """
+    positions: Dict[str, int] = {}
+    size = 0
+    for match in _TOKEN.finditer(text):
+        token = match.group().lower()
+        lexemes = [token] if _WORD.fullmatch(token) else [token, *_WORD.findall(token)]
+        for lexeme in lexemes:
+            count = positions.get(lexeme, 0)
+            if count == 0:
+                size += len(lexeme.encode("utf-8")) + 3 + 2
+            elif count < TSVECTOR_MAX_POSITIONS:
+                size += 2
+            positions[lexeme] = count + 1
+        if size > budget:
+            return text[:match.start()]
+    return text
+
+
+def extract_pdf_text(file_path: str, max_pages: int, max_chars: int, time_budget: float) -> dict:
+    """
+    Extrae el texto de un PDF página a página.
+
+    Se ejecuta en un proceso del pool. Deja de leer al alcanzar el límite de
+    páginas, de caracteres o de tiempo, e indica si el resultado es parcial.
+
+    Args:
+        file_path (str): Ruta del PDF
+        max_pages (int): Número máximo de páginas a procesar
+        max_chars (int): Número máximo de caracteres a devolver
+        time_budget (float): Segundos disponibles para la extracción
+
+    Returns:
+        dict: Texto extraído ("text"), páginas procesadas ("pages"),
+            páginas totales ("total_pages") y si está truncado ("truncated")
+    """
+    from PyPDF2 import PdfReader
+
+    deadline = time.monotonic() + time_budget
+    reader = PdfReader(file_path)
+    total_pages = len(reader.pages)
+
+    parts: List[str] = []
+    chars = 0
+    pages = 0
+    for page in reader.pages:
+        if pages >= max_pages or chars >= max_chars or time.monotonic() >= deadline:
+            break
+        text = page.extract_text() or ""
+        parts.append(text)
+        chars += len(text) + 1
+        pages += 1
+
+    # PostgreSQL no admite el carácter nulo en columnas de texto
+    full_text = "\n".join(parts).replace("\x00", "")
+    text = fit_search_vector(full_text[:max_chars])
+    return {
+        "text": text,
+        "pages": pages,
+        "total_pages": total_pages,
+        "truncated": pages < total_pages or len(text) < len(full_text)
+    }
+
+
+class ExtractionWorker:
+    """
+    Cola de extracción de texto con pool de procesos y escritura por lotes.
+
+    Attributes:
+        queue (asyncio.Queue): IDs de documentos pendientes de extraer
+    """
+
+    def __init__(self):
+        """Inicializa el worker sin arrancar el pool."""
+        self.queue: Optional[asyncio.Queue] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._results: List[Dict] = []
+        self._flush_event: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        """Indica si el worker está arrancado."""
+        return self._pool is not None
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # spawn evita heredar el event loop y las conexiones del proceso padre
+        return ProcessPoolExecutor(
+            max_workers=settings.EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def _reset_pool(self) -> None:
+        """Termina los procesos del pool (p. ej. tras un timeout) y crea uno nuevo."""
+        pool, self._pool = self._pool, self._create_pool()
+        if pool is None:
+            return
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def start(self) -> None:
+        """
+        Arranca el pool, los consumidores y el volcado por lotes.
+
+        Además reencola los documentos pendientes, incluidos los que quedaron
+        en ``processing`` por una parada anterior.
+        """
+        if self.running or not settings.EXTRACTION_ENABLED:
+            return
+
+        self.queue = asyncio.Queue()
+        self._flush_event = asyncio.Event()
+        self._pool = self._create_pool()
+        self._tasks = [
+            asyncio.create_task(self._consume())
+            for _ in range(settings.EXTRACTION_WORKERS)
+        ]
+        self._tasks.append(asyncio.create_task(self._flush_loop()))
+
+        try:
+            await self._recover_pending()
+        except Exception as e:
+            # Sin base de datos la aplicación debe poder arrancar igualmente
+            logger.warning("No se pudieron recuperar las extracciones pendientes: %s", e)
+
+    async def stop(self) -> None:
+        """Detiene los consumidores, vuelca los resultados y cierra el pool."""
+        if not self.running:
+            return
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        await self._flush()
+
+        pool, self._pool = self._pool, None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def enqueue(self, document_id: int) -> None:
+        """
+        Encola un documento para extraer su texto.
+
+        Si el worker no está arrancado el documento queda en ``pending`` y se
+        recoge en el siguiente arranque.
+
+        Args:
+            document_id (int): ID del documento
+        """
+        if self.running:
+            self.queue.put_nowait(document_id)
+
+    async def _recover_pending(self) -> None:
+        """Reencola los documentos pendientes y los abandonados en ``processing``."""
+        stale_before = datetime.now() - timedelta(seconds=2 * settings.EXTRACTION_TIMEOUT)
+
+        async with database.AsyncSessionLocal() as db:
+            await db.execute(
+                update(Document)
+                .where(
+                    Document.extraction_status == EXTRACTION_PROCESSING,
+                    Document.updated_at < stale_before
+                )
+                .values(extraction_status=EXTRACTION_PENDING)
+            )
+            await db.commit()
+
+            document_ids = await db.scalars(
+                select(Document.id)
+                .where(Document.extraction_status == EXTRACTION_PENDING, Document.is_active == True)  # noqa: E712
+                .order_by(Document.id)
+            )
+            for document_id in document_ids:
+                self.queue.put_nowait(document_id)
+
+    async def _claim(self, document_id: int) -> Optional[str]:
+        """
+        Marca un documento como ``processing`` si sigue pendiente.
+
+        La transición es atómica, así que con varios procesos de la API cada
+        documento lo procesa uno solo.
+
+        Args:
+            document_id (int): ID del documento
+
+        Returns:
+            Optional[str]: Ruta del PDF en disco, o None si otro proceso ya lo reclamó
+        """
+        async with database.AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Document)
+                .where(Document.id == document_id, Document.extraction_status == EXTRACTION_PENDING)
+                .values(extraction_status=EXTRACTION_PROCESSING)
+                .returning(Document.local_path, Document.storage_key)
+            )
+            row = result.first()
+            await db.commit()
+            return str(physical_path(row.local_path, row.storage_key)) if row else None
+
+    async def _consume(self) -> None:
+        """Procesa documentos de la cola de uno en uno."""
+        while True:
+            document_id = await self.queue.get()
+            try:
+                local_path = await self._claim(document_id)
+                if local_path is not None:
+                    self._add_result(document_id, **await self._extract(local_path))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._add_result(document_id, error=f"Error al extraer texto: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    async def _extract(self, local_path: str) -> dict:
+        """
+        Ejecuta la extracción en el pool con un límite de tiempo estricto.
+
+        Args:
+            local_path (str): Ruta del PDF
+
+        Returns:
+            dict: Resultado de ``extract_pdf_text`` sin tocar, o solo ``error``
+                si la extracción se canceló por tiempo
+        """
+        # El hijo se detiene por sí mismo al agotar el plazo; el margen
+        # restante cubre una sola página que no termine nunca
+        budget = settings.EXTRACTION_TIMEOUT * 0.8
+        arguments = (
+            extract_pdf_text, local_path, settings.EXTRACTION_MAX_PAGES,
+            settings.EXTRACTION_MAX_CHARS, budget
+        )
+
+        try:
+            try:
+                return await asyncio.wait_for(
+                    asyncio.wrap_future(self._pool.submit(*arguments)), settings.EXTRACTION_TIMEOUT
+                )
+            except BrokenProcessPool:
+                # Otro documento provocó el reinicio del pool: se reintenta una vez
+                return await asyncio.wait_for(
+                    asyncio.wrap_future(self._pool.submit(*arguments)), settings.EXTRACTION_TIMEOUT
+                )
+        except asyncio.TimeoutError:
+            self._reset_pool()
+            return {"error": f"Extracción cancelada tras {settings.EXTRACTION_TIMEOUT} segundos"}
+
+    def _add_result(
+        self,
+        document_id: int,
+        text: Optional[str] = None,
+        error: Optional[str] = None,
+        pages: Optional[int] = None,
+        total_pages: Optional[int] = None,
+        truncated: Optional[bool] = None
+    ) -> None:
+        """Añade un resultado al lote y lo vuelca si está lleno."""
+        self._results.append({
+            "document_id": document_id,
+            "extracted_text": text,
+            "extraction_status": EXTRACTION_FAILED if error else EXTRACTION_COMPLETED,
+            "extraction_error": error,
+            "extraction_pages": pages,
+            "extraction_total_pages": total_pages,
+            "extraction_truncated": truncated
+        })
+        if len(self._results) >= settings.EXTRACTION_BATCH_SIZE:
+            self._flush_event.set()
+
+    async def _flush_loop(self) -> None:
+        """Vuelca los resultados cuando el lote se llena o cada EXTRACTION_FLUSH_INTERVAL segundos."""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), settings.EXTRACTION_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            try:
+                await self._flush()
+            except Exception:
+                logger.exception("Error al guardar resultados de extracción")
+
+    async def _flush(self) -> None:
+        """
+        Escribe los resultados acumulados con un único UPDATE por lotes.
+
+        Si el lote falla se escriben uno a uno, para que un documento que no
+        se puede guardar no bloquee los demás.
+        """
+        if not self._results:
+            return
+
+        batch, self._results = self._results, []
+        try:
+            await self._write(batch)
+        except Exception as e:
+            logger.warning("Error al guardar %d resultados de extracción, se guardan uno a uno: %s", len(batch), e)
+            await self._write_each(batch)
+
+    async def _write_each(self, batch: List[Dict]) -> None:
+        """
+        Escribe los resultados de uno en uno; los que fallan quedan en ``failed``.
+
+        Si tampoco se puede guardar el fallo, la base de datos no está
+        disponible: el resto del lote se conserva para el siguiente intento.
+        """
+        for index, result in enumerate(batch):
+            try:
+                await self._write([result])
+                continue
+            except Exception as e:
+                error = f"Error al guardar el texto extraído: {str(getattr(e, 'orig', None) or e)}"
+                logger.warning("Extracción del documento %s no guardada: %s", result["document_id"], error)
+
+            try:
+                await self._write([{
+                    **result,
+                    "extracted_text": None,
+                    "extraction_status": EXTRACTION_FAILED,
+                    "extraction_error": error
+                }])
+            except Exception:
+                self._results = batch[index:] + self._results
+                raise
+
+    @staticmethod
+    async def _write(results: List[Dict]) -> None:
+        """Escribe un lote de resultados en una transacción."""
+        # UPDATE de Core por lotes: a diferencia del UPDATE masivo del ORM no
+        # falla si un documento se eliminó antes de volcar su resultado
+        table = Document.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("document_id"))
+            .values(
+                extracted_text=bindparam("extracted_text"),
+                extraction_status=bindparam("extraction_status"),
+                extraction_error=bindparam("extraction_error"),
+                extraction_pages=bindparam("extraction_pages"),
+                extraction_total_pages=bindparam("extraction_total_pages"),
+                extraction_truncated=bindparam("extraction_truncated")
+            )
+        )
+        async with database.AsyncSessionLocal() as db:
+            await db.execute(statement, results)
+            await db.commit()
+
+
+# Instancia global, arrancada en el evento de inicio de la aplicación
+extraction_worker = ExtractionWorker()
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Registro de operaciones de archivo
+==================================
+
+Las operaciones masivas cambian la base de datos y el disco en dos fases:
+
+1. En una misma transacción se modifican los documentos y se registran las
+   operaciones de archivo pendientes (``pending_file_operations``).
+2. Tras confirmar se aplican en paralelo (eliminar o renombrar) y se borran
+   del registro las que terminaron bien.
+
+Si el proceso se detiene entre ambas fases, o alguna operación falla, las
+filas que quedan se vuelven a aplicar con ``replay`` al arrancar. Todas las
+operaciones son idempotentes: eliminar un archivo que ya no existe o mover
+uno que ya está en su destino no es un error.
+
+Un blob del almacenamiento por contenido puede estar compartido: una subida
+con el mismo contenido reutiliza el existente sin escribirlo. Para que no se
+elimine un blob que una transacción en curso empieza a usar, ambos caminos
+toman el bloqueo consultivo del blob (``lock_blobs``) y lo mantienen hasta
+confirmar:
+
+- La subida lo toma antes de insertar el documento y guardar el blob.
+- ``apply`` lo toma antes de comprobar si algún documento usa el blob y lo
+  libera después de eliminarlo.
+
+Orden de bloqueo: primero los bloqueos de blob, en orden de clave, y después
+las filas de ``documents``. Quien elimina filas (recolector, borrado
+definitivo) confirma antes de llamar a ``apply``, de modo que nunca espera un
+bloqueo de blob con filas bloqueadas.
+"""
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import database
+from .config import settings
+from .models.document import Document
+from .models.pending_file_operation import PendingFileOperation
+from .storage import get_storage, is_blob_key
+
+logger = logging.getLogger(__name__)
+
+OPERATION_DELETE = "delete"
+OPERATION_MOVE = "move"
+
+
+def storage_key_of(local_path: str, storage_key: Optional[str]) -> Optional[str]:
+    """
+    Obtiene la clave de almacenamiento de un documento, también en los antiguos.
+
+    Args:
+        local_path (str): Ruta visible del documento
+        storage_key (Optional[str]): Clave registrada (None en documentos antiguos)
+
+    Returns:
+        Optional[str]: Clave relativa a UPLOAD_DIR, o None si el archivo está fuera
+    """
+    if storage_key is not None:
+        return storage_key
+    try:
+        return Path(local_path).relative_to(get_storage().root).as_posix()
+    except ValueError:
+        return None
+
+
+async def lock_blobs(db: AsyncSession, storage_keys: Iterable[Optional[str]]) -> None:
+    """
+    Bloquea los blobs indicados hasta el final de la transacción.
+
+    Las claves que no son blobs se ignoran. Se bloquean en orden de clave
+    para que dos transacciones con varios blobs no se esperen mutuamente.
+
+    Args:
+        db (AsyncSession): Sesión de base de datos (con la transacción que mantiene el bloqueo)
+        storage_keys (Iterable[Optional[str]]): Claves de almacenamiento
+    """
+    for storage_key in sorted({key for key in storage_keys if is_blob_key(key)}):
+        await db.execute(
+            select(func.pg_advisory_xact_lock(database.ADVISORY_LOCK_BLOBS, func.hashtext(storage_key)))
+        )
+
+
+async def record(db: AsyncSession, operations: Iterable[Tuple[str, str, Optional[str]]]) -> List[tuple]:
+    """
+    Registra operaciones pendientes con una sola sentencia. No confirma la transacción.
+
+    Args:
+        db (AsyncSession): Sesión de base de datos
+        operations (Iterable[Tuple[str, str, Optional[str]]]): Operación, clave
+            de origen y clave de destino
+
+    Returns:
+        List[tuple]: Filas registradas (id, operation, storage_key, target_key)
+    """
+    rows = [
+        {"operation": operation, "storage_key": storage_key, "target_key": target_key}
+        for operation, storage_key, target_key in operations
+    ]
+    if not rows:
+        return []
+    result = await db.execute(
+        insert(PendingFileOperation)
+        .values(rows)
+        .returning(
+            PendingFileOperation.id,
+            PendingFileOperation.operation,
+            PendingFileOperation.storage_key,
+            PendingFileOperation.target_key
+        )
+    )
+    return result.all()
+
+
+def apply_one(root: Path, operation: str, storage_key: str, target_key: Optional[str]) -> None:
+    """Aplica una operación en disco (en un hilo)."""
+    source = root / storage_key
+    if operation == OPERATION_DELETE:
+        source.unlink(missing_ok=True)
+        if storage_key.startswith(f"{settings.TRASH_DIR}/documents/"):
+            # Cada documento eliminado tiene su propio directorio en la papelera
+            try:
+                source.parent.rmdir()
+            except OSError:
+                pass
+        return
+
+    target = root / target_key
+    if not source.exists():
+        # Ya movido en un intento anterior (o eliminado entretanto)
+        return
+    if target.exists():
+        raise FileExistsError(f"El destino '{target_key}' ya existe")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.rename(source, target)
+
+
+async def apply(db: AsyncSession, operations: List[tuple]) -> int:
+    """
+    Aplica operaciones registradas en paralelo y borra del registro las completadas.
+
+    Los blobs compartidos por contenido solo se eliminan si ningún documento
+    los sigue usando. La comprobación y la eliminación se hacen con los blobs
+    bloqueados (``lock_blobs``), así que ninguna subida puede empezar a usar
+    uno entre ambas.
+
+    Args:
+        db (AsyncSession): Sesión de base de datos
+        operations (List[tuple]): Filas devueltas por ``record``
+
+    Returns:
+        int: Operaciones que fallaron y siguen pendientes
+    """
+    if not operations:
+        return 0
+
+    blob_keys = [
+        operation.storage_key for operation in operations
+        if operation.operation == OPERATION_DELETE and is_blob_key(operation.storage_key)
+    ]
+    in_use = set()
+    if blob_keys:
+        await lock_blobs(db, blob_keys)
+        in_use = set(await db.scalars(
+            select(Document.storage_key).where(Document.storage_key.in_(blob_keys))
+        ))
+
+    root = get_storage().root
+    semaphore = asyncio.Semaphore(settings.FILE_OPERATION_CONCURRENCY)
+
+    async def run(operation) -> Optional[int]:
+        if operation.operation == OPERATION_DELETE and operation.storage_key in in_use:
+            return operation.id
+        async with semaphore:
+            try:
+                await asyncio.to_thread(
+                    apply_one, root, operation.operation, operation.storage_key, operation.target_key
+                )
+            except OSError as e:
+                logger.warning("Operación de archivo pendiente %s (%s): %s", operation.id, operation.operation, e)
+                return None
+        return operation.id
+
+    done = [operation_id for operation_id in await asyncio.gather(*map(run, operations)) if operation_id]
+    if done:
+        await db.execute(delete(PendingFileOperation).where(PendingFileOperation.id.in_(done)))
+    # Confirmar libera también los bloqueos de los blobs
+    await db.commit()
+    return len(operations) - len(done)
+
+
+async def discard(db: AsyncSession, storage_keys: List[str]) -> None:
+    """
+    Elimina los archivos guardados por una subida que no llegó a confirmarse.
+
+    Como en ``apply``, un blob solo se elimina si, con el bloqueo tomado,
+    ningún documento lo usa: otra subida del mismo contenido puede haberlo
+    reutilizado en cuanto se deshizo la transacción.
+
+    Args:
+        db (AsyncSession): Sesión de base de datos (sin transacción pendiente)
+        storage_keys (List[str]): Claves guardadas por la subida
+    """
+    if not storage_keys:
+        return
+    await lock_blobs(db, storage_keys)
+    in_use = set(await db.scalars(
+        select(Document.storage_key).where(Document.storage_key.in_(storage_keys))
+    ))
+    root = get_storage().root
+    for storage_key in storage_keys:
+        if storage_key not in in_use:
+            await asyncio.to_thread(apply_one, root, OPERATION_DELETE, storage_key, None)
+    await db.commit()
+
+
+async def replay() -> None:
+    """Vuelve a aplicar las operaciones que quedaron pendientes (llamado al arrancar)."""
+    async with database.AsyncSessionLocal() as db:
+        last_id = 0
+        while True:
+            operations = (await db.execute(
+                select(
+                    PendingFileOperation.id,
+                    PendingFileOperation.operation,
+                    PendingFileOperation.storage_key,
+                    PendingFileOperation.target_key
+                )
+                .where(PendingFileOperation.id > last_id)
+                .order_by(PendingFileOperation.id)
+                .limit(settings.BULK_BATCH_SIZE)
+            )).all()
+            if not operations:
+                break
+            last_id = operations[-1].id
+            failed = await apply(db, operations)
+            if failed:
+                logger.warning("%d operaciones de archivo siguen pendientes", failed)
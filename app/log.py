@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Registro (logging)
+==================
+
+Configura el logging de la aplicación a partir de ``LOG_LEVEL``:
+
+- Los módulos registran con ``logging.getLogger(__name__)`` y argumentos
+  diferidos (``logger.debug("... %s", valor)``): si el nivel está
+  desactivado, la llamada termina en la comprobación del nivel, sin
+  formatear nada.
+- El registro en el hilo que llama solo fija el mensaje y lo encola
+  (``QueueHandler``). Formatear a JSON, las trazas de excepciones y la
+  escritura en la salida se hacen en un hilo aparte (``QueueListener``), fuera
+  del event loop.
+- Cada petición HTTP lleva un identificador de correlación (cabecera
+  ``X-Request-ID``, recibida o generada) que se añade a todos los registros
+  emitidos mientras se atiende, también desde tareas creadas por ella, y se
+  devuelve en la respuesta.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import re
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+# Identificador de la petición en curso (None fuera de una petición)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Identificadores de petición aceptados desde el cliente
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+# Atributos propios de LogRecord; el resto son campos pasados con extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+logger = logging.getLogger(__name__)
+
+_listener: Optional[QueueListener] = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Añade a cada registro el identificador de la petición en curso."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como un objeto JSON en una línea."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legible para desarrollo, con el identificador de petición."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-8s %(name)s [%(request_id)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = "-"
+        return super().format(record)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    ``QueueHandler`` que no formatea en el hilo que registra.
+
+    El ``QueueHandler`` estándar formatea el registro completo (incluidas las
+    trazas) antes de encolarlo. Aquí solo se resuelven los argumentos del
+    mensaje, para que no cambien si el objeto se modifica después, y el
+    formateo queda para el hilo del ``QueueListener``.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging() -> None:
+    """
+    Configura el logging raíz según ``LOG_LEVEL`` y ``LOG_FORMAT``.
+
+    Se puede llamar varias veces: solo la primera instala los handlers.
+    También redirige los registros de uvicorn a la misma cola y activa el
+    registro de SQL de SQLAlchemy si ``SQL_ECHO`` está activado.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(records)
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    # uvicorn instala sus propios handlers; sus registros pasan a la cola.
+    # El acceso lo registra RequestContextMiddleware con la ruta y la duración.
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+    logging.getLogger("uvicorn.access").disabled = True
+
+    if settings.SQL_ECHO:
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Escribe los registros pendientes y detiene el hilo de escritura."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestContextMiddleware:
+    """
+    Middleware ASGI que asigna un identificador de correlación a cada petición.
+
+    Usa el ``X-Request-ID`` recibido si es válido o genera uno nuevo, lo
+    devuelve en la respuesta y registra al terminar el método, la ruta, el
+    estado y la duración.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Envuelve la aplicación ASGI."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if REQUEST_ID_PATTERN.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "%s %s %s",
+                    scope["method"], scope["path"], status,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                    }
+                )
+            request_id_var.reset(token)
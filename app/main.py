@@ -4,16 +4,31 @@ FastAPI Main Application
 """
 
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import logging
 import os
 import time
 from pathlib import Path
 
 from .config import settings, get_upload_path
+from .log import RequestContextMiddleware, configure_logging
 from .api.routes import api_router
+from .api.debug import debug_router
 from .pydantic_models import HealthCheck
+from .extraction import extraction_worker
+from .reaper import document_reaper
+from .thumbnails import thumbnail_service
+from .services import empty_trash
+from .database import engine, async_engine
+from .metrics import MetricsMiddleware, event_loop_monitor, instrument_engine, registry, CONTENT_TYPE
+from . import directory_index, file_journal, profiling
+
+# Configure logging before anything else logs
+configure_logging()
+logger = logging.getLogger(__name__)
 
 # Create FastAPI application
 app = FastAPI(
@@ -33,11 +48,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request, database and event loop metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine, "sync")
+    instrument_engine(async_engine.sync_engine, "async")
+
+# Opt-in request profiling (inside the request context, so profiles carry the request id)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(profiling.ProfilingMiddleware)
+    profiling.instrument_engine(engine)
+    profiling.instrument_engine(async_engine.sync_engine)
+
+# Correlation ids and access log (outermost, so every record carries the id)
+app.add_middleware(RequestContextMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Include API routes
 app.include_router(api_router)
+if settings.PROFILING_ENABLED:
+    app.include_router(debug_router)
 
 # Uptime tracking
 start_time = time.time()
@@ -96,32 +128,70 @@ async def health_check():
     )
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    async def metrics():
+        """Metrics in Prometheus text format."""
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
 @app.on_event("startup")
 async def startup_event():
     """Application startup event."""
     try:
         # Create uploads directory
         upload_path = get_upload_path()
-        print(f"Uploads directory created: {upload_path}")
+        logger.info("Uploads directory created: %s", upload_path)
         
         # Create static directory if it doesn't exist
         static_path = Path("static")
         static_path.mkdir(exist_ok=True)
-        print(f"Static directory verified: {static_path}")
+        logger.info("Static directory verified: %s", static_path)
         
-        print("Application started successfully")
-        print(f"Documentation available at: http://{settings.HOST}:{settings.PORT}/docs")
-        print(f"Frontend available at: http://{settings.HOST}:{settings.PORT}/")
+        # Build the directory index on first start
+        try:
+            await directory_index.ensure_built()
+        except Exception as e:
+            # The API must start even if the database is unavailable
+            logger.warning("Could not build the directory index: %s", e)
         
-    except Exception as e:
-        print(f"Error during startup: {str(e)}")
+        try:
+            await file_journal.replay()
+        except Exception as e:
+            logger.warning("Could not replay pending file operations: %s", e)
+        
+        # Remove directories left in the trash by interrupted deletes
+        asyncio.create_task(empty_trash())
+        
+        # Start background text extraction
+        await extraction_worker.start()
+        
+        # Purge deleted documents once their retention window expires
+        await document_reaper.start()
+        
+        # Render first-page thumbnails in the background
+        await thumbnail_service.start()
+        
+        if settings.METRICS_ENABLED:
+            await event_loop_monitor.start()
+        
+        logger.info("Application started successfully")
+        logger.info("Documentation available at: http://%s:%s/docs", settings.HOST, settings.PORT)
+        logger.info("Frontend available at: http://%s:%s/", settings.HOST, settings.PORT)
+        
+    except Exception:
+        logger.exception("Error during startup")
         raise
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown event."""
-    print("Application closed")
+    await extraction_worker.stop()
+    await document_reaper.stop()
+    await thumbnail_service.stop()
+    await event_loop_monitor.stop()
+    logger.info("Application closed")
 
 
 # Custom error handler
@@ -164,5 +234,6 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
-        log_level=settings.LOG_LEVEL.lower()
+        log_level=settings.LOG_LEVEL.lower(),
+        access_log=False  # RequestContextMiddleware logs each request
     ) 
\ No newline at end of file
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+"""
+Métricas de la aplicación
+=========================
+
+Métricas en formato de texto de Prometheus, servidas en ``/metrics``:
+
+- Peticiones HTTP: total, latencia (histograma) y bytes recibidos y
+  enviados por plantilla de ruta (``/api/v1/documents/{document_id}``, no la
+  URL concreta), y peticiones en curso.
+- Subidas: bytes recibidos (``rate()`` da los bytes por segundo) y
+  velocidad de cada subida.
+- Base de datos: consultas y su duración por motor y tipo de sentencia,
+  medidas con los eventos de SQLAlchemy, y ocupación de los pools.
+- Retraso del event loop: cuánto tarda en despertar una tarea que duerme
+  un intervalo fijo; si sube, algo está bloqueando el loop.
+
+Solo usa la biblioteca estándar para no añadir dependencias. Las métricas
+son locales a cada proceso: con varios workers hay que recogerlas de cada uno.
+"""
+
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+# Límites de los histogramas de latencia, en segundos
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Límites del histograma de velocidad de subida, en bytes por segundo
+THROUGHPUT_BUCKETS = tuple(2 ** exponent * 1024 for exponent in range(4, 19, 2))  # 16KB/s .. 256MB/s
+
+# Tipos de sentencia SQL con etiqueta propia; el resto cuenta como "other"
+SQL_OPERATIONS = {"select", "insert", "update", "delete"}
+
+# Starlette añade "; charset=utf-8" a los tipos text/*
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """
+    Base de las métricas: nombre, ayuda, etiquetas y valores por combinación.
+
+    Attributes:
+        name (str): Nombre de la métrica
+        documentation (str): Descripción mostrada en ``# HELP``
+        labelnames (Tuple[str, ...]): Nombres de las etiquetas
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        """
+        Inicializa la métrica sin valores.
+
+        Args:
+            name (str): Nombre de la métrica
+            documentation (str): Descripción mostrada en ``# HELP``
+            labelnames (Iterable[str]): Nombres de las etiquetas
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def collect(self) -> List[str]:
+        """Devuelve las líneas de la métrica en formato de texto de Prometheus."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in sorted(values):
+            lines.extend(self._samples(labels, value))
+        return lines
+
+    def _samples(self, labels: Tuple[str, ...], value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"]
+
+
+class Counter(Metric):
+    """Valor que solo crece (peticiones, bytes, consultas)."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Incrementa el contador de una combinación de etiquetas.
+
+        Args:
+            *labels (str): Valores de las etiquetas, en el orden de ``labelnames``
+            amount (float): Incremento
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Valor que sube y baja (peticiones en curso, conexiones ocupadas).
+
+    Con ``callback`` el valor se calcula al exponer las métricas.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+    ):
+        """
+        Inicializa el indicador.
+
+        Args:
+            name (str): Nombre de la métrica
+            documentation (str): Descripción mostrada en ``# HELP``
+            labelnames (Iterable[str]): Nombres de las etiquetas
+            callback (Optional[Callable]): Función que devuelve los valores por etiquetas
+        """
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def set(self, value: float, *labels: str) -> None:
+        """Fija el valor de una combinación de etiquetas."""
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Suma al valor de una combinación de etiquetas."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """Resta al valor de una combinación de etiquetas."""
+        self.inc(*labels, amount=-amount)
+
+    def collect(self) -> List[str]:
+        if self.callback is not None:
+            try:
+                values = self.callback()
+            except Exception:
+                values = {}
+            with self._lock:
+                self._values = dict(values)
+        return super().collect()
+
+
+class Histogram(Metric):
+    """
+    Distribución de valores en cubetas acumuladas (latencias, tamaños).
+
+    Cada observación incrementa una sola cubeta; los acumulados se calculan
+    al exponer las métricas.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        """
+        Inicializa el histograma.
+
+        Args:
+            name (str): Nombre de la métrica
+            documentation (str): Descripción mostrada en ``# HELP``
+            labelnames (Iterable[str]): Nombres de las etiquetas
+            buckets: Límites superiores de las cubetas, en orden creciente
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Registra una observación.
+
+        Args:
+            value (float): Valor observado
+            *labels (str): Valores de las etiquetas, en el orden de ``labelnames``
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self, labels: Tuple[str, ...], value) -> List[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            bucket_labels = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        plain = _format_labels(self.labelnames, labels)
+        lines.append(f"{self.name}_sum{plain} {_format_value(total)}")
+        lines.append(f"{self.name}_count{plain} {count}")
+        return lines
+
+
+class Registry:
+    """Conjunto de métricas expuestas en ``/metrics``."""
+
+    def __init__(self):
+        """Inicializa el registro vacío."""
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        """Añade una métrica al registro y la devuelve."""
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Genera la exposición completa en formato de texto de Prometheus.
+
+        Returns:
+            str: Texto de todas las métricas
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status")
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Duración de las peticiones HTTP", ("method", "route")
+))
+http_request_bytes = registry.register(Counter(
+    "http_request_bytes_total", "Bytes recibidos en el cuerpo de las peticiones", ("method", "route")
+))
+http_response_bytes = registry.register(Counter(
+    "http_response_bytes_total", "Bytes enviados en el cuerpo de las respuestas", ("method", "route")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Peticiones HTTP en curso"
+))
+upload_bytes = registry.register(Counter(
+    "upload_bytes_total", "Bytes de archivos subidos (rate() da los bytes por segundo)", ("kind",)
+))
+upload_throughput = registry.register(Histogram(
+    "upload_throughput_bytes_per_second", "Velocidad de cada subida", ("kind",), buckets=THROUGHPUT_BUCKETS
+))
+db_queries = registry.register(Counter(
+    "db_queries_total", "Consultas ejecutadas en la base de datos", ("engine", "operation")
+))
+db_query_errors = registry.register(Counter(
+    "db_query_errors_total", "Consultas que terminaron con error", ("engine",)
+))
+db_query_duration = registry.register(Histogram(
+    "db_query_duration_seconds", "Duración de las consultas a la base de datos", ("engine", "operation")
+))
+event_loop_lag = registry.register(Histogram(
+    "event_loop_lag_seconds", "Retraso del event loop al despertar una tarea periódica",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+))
+
+
+def _pool_status() -> Dict[Tuple[str, ...], float]:
+    from .database import get_pool_status
+    status = get_pool_status()
+    return {(field,): status[field] for field in ("size", "checked_out", "checked_in", "overflow")}
+
+
+registry.register(Gauge(
+    "db_pool_connections", "Conexiones del pool asíncrono por estado", ("state",), callback=_pool_status
+))
+
+
+def record_upload(kind: str, size: int, elapsed: float) -> None:
+    """
+    Registra una subida completada (o un fragmento de una subida reanudable).
+
+    Args:
+        kind (str): "multipart" o "session"
+        size (int): Bytes recibidos
+        elapsed (float): Segundos que se tardó en recibirlos
+    """
+    upload_bytes.inc(kind, amount=size)
+    if size and elapsed > 0:
+        upload_throughput.observe(size / elapsed, kind)
+
+
+def _sql_operation(statement: str) -> str:
+    keyword = statement.lstrip()[:6].lower()
+    return keyword if keyword in SQL_OPERATIONS else "other"
+
+
+def instrument_engine(engine, name: str) -> None:
+    """
+    Mide las consultas de un motor con los eventos de SQLAlchemy.
+
+    Para el motor asíncrono se instrumenta su ``sync_engine``: los eventos
+    se ejecutan dentro del event loop, alrededor de cada consulta.
+
+    Args:
+        engine: Motor síncrono de SQLAlchemy
+        name (str): Valor de la etiqueta ``engine``
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        operation = _sql_operation(statement)
+        db_queries.inc(name, operation)
+        if started is not None:
+            db_query_duration.observe(time.perf_counter() - started, name, operation)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        db_query_errors.inc(name)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Obtiene la plantilla de la ruta que atendió la petición.
+
+    Se usa la plantilla y no la URL para que el número de series no crezca
+    con cada ruta de archivo o ID distinto.
+
+    Args:
+        scope (Scope): Scope ASGI tras el enrutado
+
+    Returns:
+        str: Plantilla de la ruta, o "<unmatched>" si ninguna coincidió
+    """
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if path:
+        return path
+    root_path = scope.get("root_path", "")
+    if scope.get("app_root_path") is not None and root_path:
+        # Aplicaciones montadas (archivos estáticos): solo el punto de montaje
+        return f"{root_path}/*"
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mide cada petición HTTP.
+
+    Es un middleware ASGI puro (no ``BaseHTTPMiddleware``) para no añadir
+    una tarea por petición ni interferir con las respuestas en streaming o
+    el envío sin copia de las descargas.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Envuelve la aplicación ASGI."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        received = 0
+        sent = 0
+        status = 500
+
+        async def receive_wrapper() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal sent, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            elif message["type"] == "http.response.zerocopysend":
+                sent += message.get("count") or 0
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            method = scope["method"]
+            route = route_template(scope)
+            http_requests.inc(method, route, str(status))
+            http_request_duration.observe(time.perf_counter() - started, method, route)
+            http_request_bytes.inc(method, route, amount=received)
+            http_response_bytes.inc(method, route, amount=sent)
+
+
+class EventLoopMonitor:
+    """Tarea que mide periódicamente el retraso del event loop."""
+
+    def __init__(self):
+        """Inicializa el monitor sin arrancarlo."""
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Arranca la medición periódica."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Detiene la medición periódica."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = settings.EVENT_LOOP_LAG_INTERVAL
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            event_loop_lag.observe(max(loop.time() - started - interval, 0.0))
+
+
+# Instancia global del monitor del event loop
+event_loop_monitor = EventLoopMonitor()
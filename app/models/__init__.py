@@ -12,8 +12,16 @@ from .document import Document
 from .client import Client
 from .category import Category
 from .document_type import DocumentType
+from .directory import Directory
+from .directory_deletion import DirectoryDeletion
+from .pending_file_operation import PendingFileOperation
+from .document_stat import DocumentStat
+from .document_view import documents_view
 
 __all__ = [
     # Modelos SQLAlchemy
-    "Document", "Client", "Category", "DocumentType"
+    "Document", "Client", "Category", "DocumentType", "Directory", "DirectoryDeletion", "PendingFileOperation",
+    "DocumentStat",
+    # Vistas (solo lectura)
+    "documents_view"
 ] 
\ No newline at end of file
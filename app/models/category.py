@@ -6,7 +6,7 @@ Modelo Category
 Modelo SQLAlchemy para la tabla de categorías.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -28,10 +28,15 @@ class Category(Base):
     """
     
     __tablename__ = "categories"
+    __table_args__ = (
+        Index("idx_categories_name", "name"),
+        Index("idx_categories_active", "is_active"),
+        {"comment": "Categorías para organizar documentos"},
+    )
     
     # Campos principales
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), nullable=False, unique=True, index=True)
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False, unique=True)
     description = Column(Text, nullable=True)
     color = Column(String(7), nullable=True, default="#3b82f6")  # Color hex
     
@@ -6,7 +6,7 @@ Modelo Client
 Modelo SQLAlchemy para la tabla de clientes.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -30,11 +30,17 @@ class Client(Base):
     """
     
     __tablename__ = "clients"
+    __table_args__ = (
+        Index("idx_clients_name", "name"),
+        Index("idx_clients_email", "email"),
+        Index("idx_clients_active", "is_active"),
+        {"comment": "Clientes asociados a los documentos"},
+    )
     
     # Campos principales
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), nullable=False, index=True)
-    email = Column(String(255), nullable=True, index=True)
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    email = Column(String(255), nullable=True)
     phone = Column(String(50), nullable=True)
     address = Column(Text, nullable=True)
     notes = Column(Text, nullable=True)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo Directory
+================
+
+Modelo SQLAlchemy para el índice de directorios de ``UPLOAD_DIR``.
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class Directory(Base):
+    """
+    Modelo para la tabla de directorios.
+    
+    Refleja el árbol de ``UPLOAD_DIR`` para que listar directorios y contar
+    archivos no requiera recorrer el sistema de archivos. Las consultas de
+    subárbol usan el prefijo de la ruta (``path LIKE 'a/b/%'``).
+    
+    Attributes:
+        id (int): ID único del directorio
+        path (str): Ruta relativa a UPLOAD_DIR con separador "/" (ej: "Documentos/2024")
+        parent_path (str): Ruta del directorio padre (nula en el primer nivel)
+        depth (int): Número de componentes de la ruta
+        files_count (int): Archivos directamente dentro del directorio
+        total_bytes (int): Bytes de esos archivos
+        created_at (datetime): Fecha de creación
+        updated_at (datetime): Fecha de última actualización
+    """
+    
+    __tablename__ = "directories"
+    __table_args__ = (
+        # Búsqueda por prefijo (subárboles) independiente de la collation
+        Index("idx_directories_path_prefix", "path", postgresql_ops={"path": "varchar_pattern_ops"}),
+        Index("idx_directories_parent_path", "parent_path"),
+        {"comment": "Índice de directorios de UPLOAD_DIR con sus contadores de archivos"},
+    )
+    
+    # Campos principales
+    id = Column(Integer, primary_key=True)
+    path = Column(String(500), nullable=False, unique=True, comment="Ruta relativa a UPLOAD_DIR con separador /")
+    parent_path = Column(String(500), nullable=True)
+    depth = Column(Integer, nullable=False)
+    
+    # Contadores mantenidos al subir y eliminar archivos
+    files_count = Column(Integer, nullable=False, default=0, comment="Archivos directamente dentro del directorio")
+    total_bytes = Column(
+        BigInteger, nullable=False, default=0, comment="Tamaño total en bytes de los archivos del directorio"
+    )
+    
+    # Campos de auditoría
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<Directory(id={self.id}, path='{self.path}', files_count={self.files_count})>"
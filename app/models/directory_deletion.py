@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo DirectoryDeletion
+========================
+
+Modelo SQLAlchemy para el estado de las eliminaciones de directorios.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class DirectoryDeletion(Base):
+    """
+    Modelo para la tabla de eliminaciones de directorios.
+    
+    La fila se crea en la misma transacción que marca los documentos como
+    eliminados, y el proceso que borra los archivos actualiza el progreso,
+    así que cualquier worker puede responder a la consulta del estado.
+    
+    Attributes:
+        id (str): Identificador de la eliminación
+        path (str): Ruta del directorio eliminado
+        status (str): "running", "completed" o "failed"
+        message (str): Mensaje descriptivo
+        documents_deleted (int): Documentos marcados como eliminados
+        files_total (int): Archivos a eliminar del disco (nulo mientras se cuentan)
+        files_deleted (int): Archivos ya eliminados del disco
+        error (str): Error al eliminar los archivos
+        started_at (datetime): Inicio de la eliminación
+        finished_at (datetime): Fin de la eliminación
+    """
+    
+    __tablename__ = "directory_deletions"
+    __table_args__ = {
+        "comment": "Estado y progreso de las eliminaciones de directorios"
+    }
+    
+    id = Column(String(32), primary_key=True)
+    path = Column(String(500), nullable=False)
+    status = Column(String(20), nullable=False, comment="running, completed o failed")
+    message = Column(Text, nullable=False)
+    documents_deleted = Column(Integer, nullable=False, default=0)
+    files_total = Column(Integer, nullable=True, comment="Archivos a eliminar del disco (nulo mientras se cuentan)")
+    files_deleted = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, default=func.now(), nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<DirectoryDeletion(id='{self.id}', path='{self.path}', status='{self.status}')>"
@@ -6,8 +6,9 @@ Modelo Document
 Modelo SQLAlchemy para la tabla de documentos.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Computed, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from datetime import datetime
 import hashlib
@@ -15,6 +16,9 @@ import os
 
 from ..database import Base
 
+# Configuración de texto de PostgreSQL usada para indexar y buscar
+SEARCH_CONFIG = "spanish"
+
 
 class Document(Base):
     """
@@ -23,35 +27,113 @@ class Document(Base):
     Attributes:
         id (int): ID único del documento
         filename (str): Nombre original del archivo
-        file_hash (str): Hash único del archivo para evitar duplicados
+        file_hash (str): Hash del archivo para evitar duplicados (único entre los activos)
         document_type_id (int): ID del tipo de documento
         client_id (int): ID del cliente (opcional)
         category_id (int): ID de la categoría
         local_path (str): Ruta local del archivo
+        storage_key (str): Ubicación de los bytes relativa a UPLOAD_DIR (nula en documentos antiguos)
         extracted_text (str): Texto extraído del PDF
+        extraction_status (str): Estado de la extracción (pending, processing, completed, failed)
+        extraction_error (str): Motivo del fallo de la extracción (si aplica)
+        extraction_pages (int): Páginas de las que se extrajo texto
+        extraction_total_pages (int): Páginas totales del PDF
+        extraction_truncated (bool): Si el texto guardado es parcial (límites de páginas, tiempo o tamaño)
+        search_vector (tsvector): Índice de texto completo (nombre y texto), generado por PostgreSQL
         file_size (int): Tamaño del archivo en bytes
         upload_date (datetime): Fecha de subida
-        is_active (bool): Si el documento está activo
+        is_active (bool): Si el documento está activo (False si se eliminó)
+        deleted_at (datetime): Fecha de eliminación (se purga tras DELETED_RETENTION_DAYS días)
         created_at (datetime): Fecha de creación del registro
         updated_at (datetime): Fecha de última actualización
     """
     
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("idx_documents_filename", "filename"),
+        Index("idx_documents_file_hash", "file_hash"),
+        Index("idx_documents_document_type_id", "document_type_id"),
+        Index("idx_documents_client_id", "client_id"),
+        Index("idx_documents_category_id", "category_id"),
+        Index("idx_documents_upload_date", "upload_date"),
+        Index("idx_documents_active", "is_active"),
+        Index("idx_documents_created_at", "created_at"),
+        Index("idx_documents_storage_key", "storage_key"),
+        Index("idx_documents_extraction_status", "extraction_status"),
+        # Cola de extracción de texto
+        Index(
+            "idx_documents_extraction_pending",
+            "id",
+            postgresql_where=text("extraction_status IN ('pending', 'processing')")
+        ),
+        Index("idx_documents_search_vector", "search_vector", postgresql_using="gin"),
+        Index("idx_documents_search", "filename", "document_type_id", "category_id", "is_active"),
+        # Un mismo contenido solo puede estar una vez entre los documentos activos
+        Index(
+            "uq_documents_file_hash_active",
+            "file_hash",
+            unique=True,
+            postgresql_where=text("is_active = TRUE")
+        ),
+        # Búsqueda por ruta exacta y por prefijo de directorio (LIKE 'ruta/%')
+        Index(
+            "idx_documents_local_path",
+            "local_path",
+            postgresql_ops={"local_path": "varchar_pattern_ops"},
+            postgresql_where=text("is_active = TRUE")
+        ),
+        # Documentos eliminados pendientes de purgar, por antigüedad
+        Index("idx_documents_deleted_at", "deleted_at", postgresql_where=text("is_active = FALSE")),
+        {"comment": "Documentos almacenados en el sistema"},
+    )
     
     # Campos principales
-    id = Column(Integer, primary_key=True, index=True)
-    filename = Column(String(255), nullable=False, index=True)
-    file_hash = Column(String(64), unique=True, nullable=False, index=True)
-    document_type_id = Column(Integer, ForeignKey("document_types.id"), nullable=False)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=True)
-    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
-    local_path = Column(String(500), nullable=False)
-    extracted_text = Column(Text, nullable=True)
-    file_size = Column(Integer, nullable=False)
+    id = Column(Integer, primary_key=True)
+    filename = Column(String(255), nullable=False)
+    file_hash = Column(
+        String(64), nullable=False,
+        comment="Hash SHA-256 del archivo para evitar duplicados (único entre los documentos activos)"
+    )
+    document_type_id = Column(Integer, ForeignKey("document_types.id", ondelete="RESTRICT"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="SET NULL"), nullable=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="RESTRICT"), nullable=False)
+    local_path = Column(String(500), nullable=False, comment="Ruta local donde se almacena el archivo físico")
+    storage_key = Column(
+        String(500), nullable=True,
+        comment="Ubicación de los bytes relativa a UPLOAD_DIR (ruta visible o blob por contenido)"
+    )
+    extracted_text = Column(Text, nullable=True, comment="Texto extraído del PDF para búsquedas")
+    extraction_status = Column(
+        String(20), default="pending", nullable=False,
+        comment="Estado de la extracción de texto: pending, processing, completed o failed"
+    )
+    extraction_error = Column(Text, nullable=True)
+    extraction_pages = Column(Integer, nullable=True, comment="Páginas de las que se extrajo texto")
+    extraction_total_pages = Column(Integer, nullable=True, comment="Páginas totales del PDF")
+    extraction_truncated = Column(
+        Boolean, nullable=True,
+        comment="Si el texto guardado es parcial por los límites de páginas, tiempo o tamaño"
+    )
+    # Columna generada: el nombre pesa más que el contenido al ordenar por relevancia.
+    # Diferida para no cargarla al leer documentos completos.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(filename, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(extracted_text, '')), 'B')",
+            persisted=True
+        ),
+        comment="Vector de búsqueda de texto completo (nombre con peso A, texto con peso B)"
+    ))
+    file_size = Column(Integer, nullable=False, comment="Tamaño del archivo en bytes")
     
     # Campos de auditoría
     upload_date = Column(DateTime, default=func.now(), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    deleted_at = Column(
+        DateTime, nullable=True,
+        comment="Fecha de eliminación; el documento se purga pasado el periodo de retención"
+    )
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
     
@@ -111,4 +193,16 @@ class Document(Base):
         Returns:
             bool: True si el archivo existe, False en caso contrario
         """
-        return os.path.exists(self.local_path) 
\ No newline at end of file
+        return os.path.exists(self.local_path)
+
+
+
+# Listado paginado por cursor (upload_date, id), con y sin filtros. Se declaran
+# tras la clase porque ordenan en descendente sobre las columnas del modelo.
+_LISTING_ORDER = (Document.upload_date.desc(), Document.id.desc())
+_ACTIVE = text("is_active = TRUE")
+
+Index("idx_documents_listing", *_LISTING_ORDER, postgresql_where=_ACTIVE)
+Index("idx_documents_type_listing", Document.document_type_id, *_LISTING_ORDER, postgresql_where=_ACTIVE)
+Index("idx_documents_category_listing", Document.category_id, *_LISTING_ORDER, postgresql_where=_ACTIVE)
+Index("idx_documents_client_listing", Document.client_id, *_LISTING_ORDER, postgresql_where=_ACTIVE)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo DocumentStat
+===================
+
+Modelo SQLAlchemy para los totales de documentos activos por dimensión.
+"""
+
+from sqlalchemy import Column, BigInteger, String, DateTime
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+# Dimensiones de los totales y formato de su clave
+STAT_DIMENSIONS = ("type", "category", "client", "month")
+
+
+class DocumentStat(Base):
+    """
+    Modelo para la tabla de estadísticas de documentos.
+    
+    Los triggers de ``documents`` (por sentencia, con tablas de transición)
+    suman y restan las filas que entran o salen de los documentos activos,
+    así que leer las estadísticas nunca recorre ``documents``. La tabla solo
+    la escriben esos triggers.
+    
+    Attributes:
+        dimension (str): "type", "category", "client" o "month"
+        key (str): ID del tipo, categoría o cliente ("" sin cliente) o mes "YYYY-MM"
+        documents (int): Documentos activos
+        total_bytes (int): Tamaño total de esos documentos
+        updated_at (datetime): Fecha de última actualización
+    """
+    
+    __tablename__ = "document_stats"
+    __table_args__ = {
+        "comment": "Totales de documentos activos por tipo, categoría, cliente y mes (mantenidos por triggers)"
+    }
+    
+    dimension = Column(String(10), primary_key=True)
+    key = Column(String(20), primary_key=True)
+    documents = Column(BigInteger, nullable=False, default=0)
+    total_bytes = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<DocumentStat(dimension='{self.dimension}', key='{self.key}', documents={self.documents})>"
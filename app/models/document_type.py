@@ -6,7 +6,7 @@ Modelo DocumentType
 Modelo SQLAlchemy para la tabla de tipos de documentos.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -28,10 +28,15 @@ class DocumentType(Base):
     """
     
     __tablename__ = "document_types"
+    __table_args__ = (
+        Index("idx_document_types_name", "name"),
+        Index("idx_document_types_active", "is_active"),
+        {"comment": "Tipos de documentos disponibles en el sistema"},
+    )
     
     # Campos principales
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), nullable=False, unique=True, index=True)
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False, unique=True)
     description = Column(Text, nullable=True)
     icon = Column(String(50), nullable=True, default="fas fa-file-pdf")
     
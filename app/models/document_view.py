@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Vista documents_view
+====================
+
+Tabla SQLAlchemy (solo lectura) para la vista ``documents_view`` creada por
+las migraciones de Alembic. Se declara con un MetaData propio para que ni
+``create_tables()`` ni ``alembic revision --autogenerate`` la traten como tabla.
+"""
+
+from sqlalchemy import Table, Column, Integer, String, DateTime, Text, Boolean, MetaData
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# MetaData independiente del de los modelos: las vistas las gestionan las migraciones
+view_metadata = MetaData()
+
+documents_view = Table(
+    "documents_view",
+    view_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("filename", String(255)),
+    Column("file_hash", String(64)),
+    Column("local_path", String(500)),
+    Column("extracted_text", Text),
+    Column("file_size", Integer),
+    Column("upload_date", DateTime),
+    Column("is_active", Boolean),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("document_type_name", String(100)),
+    Column("document_type_icon", String(50)),
+    Column("client_name", String(255)),
+    Column("client_email", String(255)),
+    Column("category_name", String(100)),
+    Column("category_color", String(7)),
+    Column("document_type_id", Integer),
+    Column("client_id", Integer),
+    Column("category_id", Integer),
+    Column("search_vector", TSVECTOR),
+)
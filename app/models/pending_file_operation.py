@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo PendingFileOperation
+===========================
+
+Modelo SQLAlchemy para el registro de operaciones de archivo pendientes.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class PendingFileOperation(Base):
+    """
+    Modelo para la tabla de operaciones de archivo pendientes.
+    
+    Las operaciones masivas confirman primero el cambio en la base de datos
+    junto con estas filas y después tocan el disco. Si el proceso se detiene
+    entre ambas fases, las filas que quedan se vuelven a aplicar al arrancar.
+    
+    Attributes:
+        id (int): ID único de la operación
+        operation (str): "delete" o "move"
+        storage_key (str): Clave de almacenamiento de origen (relativa a UPLOAD_DIR)
+        target_key (str): Clave de destino (solo en "move")
+        created_at (datetime): Fecha de registro
+    """
+    
+    __tablename__ = "pending_file_operations"
+    __table_args__ = {
+        "comment": "Operaciones de archivo (delete/move) confirmadas en base de datos y pendientes en disco"
+    }
+    
+    id = Column(Integer, primary_key=True)
+    operation = Column(String(10), nullable=False)
+    storage_key = Column(String(500), nullable=False, comment="Clave de origen relativa a UPLOAD_DIR")
+    target_key = Column(String(500), nullable=True, comment="Clave de destino (solo en move)")
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<PendingFileOperation(id={self.id}, operation='{self.operation}', storage_key='{self.storage_key}')>"
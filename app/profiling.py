@@ -0,0 +1,452 @@
+# -*- coding: utf-8 -*-
+"""
+Perfilado de peticiones
+=======================
+
+Perfilado opcional (``PROFILING_ENABLED``) para averiguar por qué una
+petición es lenta en producción:
+
+- Un hilo muestrea cada ``PROFILING_INTERVAL`` segundos la pila de cada
+  petición en curso. Si la tarea de la petición se está ejecutando se toma
+  la pila real del hilo del event loop; si está suspendida, la cadena de
+  corrutinas que espera, terminada en un marco ``<await ...>``. El perfil es
+  de tiempo real (wall clock): incluye el tiempo esperando a la base de
+  datos o al disco, que suele ser el motivo de la lentitud.
+- Las consultas que emite la petición se agrupan por sentencia con los
+  eventos de SQLAlchemy (número, tiempo total y máximo).
+- Se conserva el perfil de una fracción aleatoria de peticiones
+  (``PROFILING_SAMPLE_RATE``) y de todas las que superan
+  ``PROFILING_SLOW_THRESHOLD``; el resto se descarta al terminar. Solo se
+  guardan los ``PROFILING_MAX_PROFILES`` últimos, en memoria.
+
+Los perfiles se descargan desde ``/debug/profiles`` en formato speedscope
+(https://www.speedscope.app) o pstats (``python -m pstats``). En pstats las
+llamadas son muestras: los tiempos son fiables, los contadores de llamadas no.
+
+Solo se muestrea la tarea de la petición: el trabajo que esta delega en
+otros hilos o tareas (respuestas en streaming, ``run_in_threadpool``) aparece
+como la espera correspondiente.
+"""
+
+import asyncio
+import itertools
+import logging
+import marshal
+import random
+import sys
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .log import request_id_var
+from .metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+# Prefijo de las rutas de descarga de perfiles, que no se perfilan
+PROFILES_PATH = "/debug/profiles"
+
+# Máximo de muestras por perfil (a 5 ms, algo más de un minuto de petición)
+MAX_SAMPLES = 15000
+
+# Máximo de sentencias distintas por perfil y longitud guardada de cada una
+MAX_STATEMENTS = 200
+MAX_STATEMENT_LENGTH = 2000
+
+# Marco de una pila: (archivo, línea de definición, función)
+Frame = Tuple[str, int, str]
+
+# Perfil de la petición en curso, para atribuirle las consultas
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+
+class RequestProfile:
+    """Muestras de pila y consultas de una petición."""
+
+    def __init__(self, scope: Scope, task: asyncio.Task, loop: asyncio.AbstractEventLoop, sampled: bool):
+        """
+        Inicializa el perfil de una petición que empieza.
+
+        Args:
+            scope (Scope): Scope ASGI de la petición
+            task (asyncio.Task): Tarea que atiende la petición
+            loop (asyncio.AbstractEventLoop): Event loop de la tarea
+            sampled (bool): Si la petición entró en la fracción muestreada
+        """
+        self.id: Optional[int] = None
+        self.request_id = request_id_var.get()
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.route: Optional[str] = None
+        self.status = 500
+        self.reason: Optional[str] = None
+        self.sampled = sampled
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.duration = 0.0
+
+        self.task = task
+        self.loop = loop
+        self.thread_id = threading.get_ident()
+
+        # Marcos internados: cada muestra guarda índices en self.frames
+        self.frames: List[Frame] = []
+        self._frame_index: Dict[Frame, int] = {}
+        self.samples: List[Tuple[int, ...]] = []
+        self.weights: List[float] = []
+
+        # Sentencia -> [consultas, segundos totales, segundos máximo]
+        self.queries: Dict[str, List[float]] = {}
+        self.query_count = 0
+        self.query_time = 0.0
+
+    def add_sample(self, stack: List[Frame], weight: float) -> None:
+        """Añade una pila (de la raíz a la hoja) que ha durado ``weight`` segundos."""
+        if len(self.samples) >= MAX_SAMPLES:
+            return
+        indexes = []
+        for frame in stack:
+            index = self._frame_index.get(frame)
+            if index is None:
+                index = self._frame_index[frame] = len(self.frames)
+                self.frames.append(frame)
+            indexes.append(index)
+        self.samples.append(tuple(indexes))
+        self.weights.append(weight)
+
+    def add_query(self, statement: str, elapsed: float) -> None:
+        """Registra una consulta y su duración."""
+        self.query_count += 1
+        self.query_time += elapsed
+        statement = statement.strip()[:MAX_STATEMENT_LENGTH]
+        entry = self.queries.get(statement)
+        if entry is None:
+            if len(self.queries) >= MAX_STATEMENTS:
+                statement = "<otras sentencias>"
+                entry = self.queries.setdefault(statement, [0, 0.0, 0.0])
+            else:
+                entry = self.queries[statement] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+
+    def summary(self) -> Dict[str, Any]:
+        """Datos generales del perfil, sin muestras ni consultas."""
+        return {
+            "id": self.id,
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "reason": self.reason,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 2),
+            "samples": len(self.samples),
+            "db_queries": self.query_count,
+            "db_time_ms": round(self.query_time * 1000, 2),
+        }
+
+    def detail(self) -> Dict[str, Any]:
+        """Datos del perfil con las consultas agrupadas por sentencia, de más a menos tiempo."""
+        queries = [
+            {
+                "statement": statement,
+                "count": count,
+                "total_ms": round(total * 1000, 2),
+                "max_ms": round(longest * 1000, 2),
+            }
+            for statement, (count, total, longest) in self.queries.items()
+        ]
+        queries.sort(key=lambda query: query["total_ms"], reverse=True)
+        return {**self.summary(), "queries": queries}
+
+    def to_speedscope(self) -> Dict[str, Any]:
+        """
+        Exporta el perfil en el formato de archivo de speedscope.
+
+        Returns:
+            Dict[str, Any]: Documento JSON con un perfil de tipo "sampled"
+        """
+        name = f"{self.method} {self.path} ({self.duration * 1000:.0f} ms)"
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "document-manager-app",
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": function, "file": filename, "line": line}
+                    for filename, line, function in self.frames
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(self.weights),
+                    "samples": [list(sample) for sample in self.samples],
+                    "weights": self.weights,
+                }
+            ],
+        }
+
+    def to_pstats(self) -> bytes:
+        """
+        Exporta el perfil en el formato de ``pstats`` (marshal de las estadísticas).
+
+        Cada muestra cuenta como una llamada a cada función de su pila; el
+        tiempo propio es el de las muestras en que la función es la hoja y el
+        acumulado el de las muestras en que aparece.
+
+        Returns:
+            bytes: Contenido del archivo .pstats
+        """
+        # función -> [llamadas, tiempo propio, tiempo acumulado, {llamante: [llamadas, propio, acumulado]}]
+        stats: Dict[Frame, list] = {}
+        for sample, weight in zip(self.samples, self.weights):
+            stack = [self.frames[index] for index in sample]
+            seen = set()
+            edges = set()
+            for position, frame in enumerate(stack):
+                entry = stats.setdefault(frame, [0, 0.0, 0.0, {}])
+                is_leaf = position == len(stack) - 1
+                if is_leaf:
+                    entry[1] += weight
+                if frame not in seen:
+                    seen.add(frame)
+                    entry[0] += 1
+                    entry[2] += weight
+                if position > 0 and (stack[position - 1], frame) not in edges:
+                    edges.add((stack[position - 1], frame))
+                    caller = entry[3].setdefault(stack[position - 1], [0, 0.0, 0.0])
+                    caller[0] += 1
+                    caller[2] += weight
+                    if is_leaf:
+                        caller[1] += weight
+        return marshal.dumps({
+            frame: (
+                calls, calls, own, cumulative,
+                {caller: (count, count, caller_own, caller_cumulative)
+                 for caller, (count, caller_own, caller_cumulative) in callers.items()}
+            )
+            for frame, (calls, own, cumulative, callers) in stats.items()
+        })
+
+
+def _code_frame(code) -> Frame:
+    return (code.co_filename, code.co_firstlineno, getattr(code, "co_qualname", code.co_name))
+
+
+def _running_stack(task: asyncio.Task, frame) -> Optional[List[Frame]]:
+    """Pila del hilo desde la hoja hasta la corrutina raíz de la tarea."""
+    root = task.get_coro()
+    root_frame = getattr(root, "cr_frame", None)
+    stack = []
+    while frame is not None:
+        stack.append(_code_frame(frame.f_code))
+        if frame is root_frame:
+            stack.reverse()
+            return stack
+        frame = frame.f_back
+    # La tarea ya no estaba en el hilo cuando se leyó la pila
+    return None
+
+
+def _suspended_stack(task: asyncio.Task) -> List[Frame]:
+    """Cadena de corrutinas que espera la tarea, terminada en lo que espera."""
+    stack = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = (
+            getattr(awaitable, "cr_frame", None)
+            or getattr(awaitable, "gi_frame", None)
+            or getattr(awaitable, "ag_frame", None)
+        )
+        if frame is None:
+            stack.append(("", 0, f"<await {type(awaitable).__name__}>"))
+            break
+        stack.append(_code_frame(frame.f_code))
+        awaitable = (
+            getattr(awaitable, "cr_await", None)
+            or getattr(awaitable, "gi_yieldfrom", None)
+            or getattr(awaitable, "ag_await", None)
+        )
+    return stack
+
+
+class StackSampler:
+    """
+    Hilo que muestrea periódicamente la pila de las peticiones en curso.
+
+    Solo está activo mientras hay peticiones registradas.
+    """
+
+    def __init__(self):
+        """Inicializa el muestreador sin arrancar el hilo."""
+        self._profiles: Dict[int, RequestProfile] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, profile: RequestProfile) -> None:
+        """Empieza a muestrear una petición."""
+        with self._lock:
+            self._profiles[id(profile)] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+
+    def unregister(self, profile: RequestProfile) -> None:
+        """Deja de muestrear una petición."""
+        with self._lock:
+            self._profiles.pop(id(profile), None)
+
+    def _run(self) -> None:
+        interval = settings.PROFILING_INTERVAL
+        last = time.perf_counter()
+        while True:
+            with self._lock:
+                while not self._profiles:
+                    self._wakeup.wait()
+                    last = time.perf_counter()
+                profiles = list(self._profiles.values())
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            try:
+                self._sample(profiles, elapsed)
+            except Exception:
+                logger.exception("Error al muestrear las pilas de las peticiones")
+            time.sleep(interval)
+
+    @staticmethod
+    def _sample(profiles: List[RequestProfile], elapsed: float) -> None:
+        thread_frames = sys._current_frames()
+        for profile in profiles:
+            task, loop = profile.task, profile.loop
+            if task is None or task.done():
+                continue
+            stack = None
+            if asyncio.current_task(loop) is task:
+                stack = _running_stack(task, thread_frames.get(profile.thread_id))
+            if stack is None:
+                stack = _suspended_stack(task)
+            # La primera muestra cubre solo el tiempo desde el inicio de la petición
+            weight = min(elapsed, time.perf_counter() - profile.started)
+            profile.add_sample(stack, weight)
+
+
+class ProfileStore:
+    """Últimos perfiles conservados, en memoria."""
+
+    def __init__(self):
+        """Inicializa el almacén vacío."""
+        self._profiles: Deque[RequestProfile] = deque(maxlen=settings.PROFILING_MAX_PROFILES)
+        self._ids = itertools.count(1)
+
+    def add(self, profile: RequestProfile) -> None:
+        """Guarda un perfil, descartando el más antiguo si no caben más."""
+        profile.id = next(self._ids)
+        self._profiles.append(profile)
+
+    def list(self) -> List[RequestProfile]:
+        """Perfiles guardados, del más reciente al más antiguo."""
+        return list(reversed(self._profiles))
+
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        """Busca un perfil por su ID."""
+        for profile in self._profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+
+# Instancias globales
+stack_sampler = StackSampler()
+profile_store = ProfileStore()
+
+
+def instrument_engine(engine) -> None:
+    """
+    Atribuye las consultas de un motor a la petición perfilada en curso.
+
+    Para el motor asíncrono se instrumenta su ``sync_engine``.
+
+    Args:
+        engine: Motor síncrono de SQLAlchemy
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and _current_profile.get() is not None:
+            context._profiling_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _current_profile.get()
+        started = getattr(context, "_profiling_started", None)
+        if profile is not None and started is not None:
+            profile.add_query(statement, time.perf_counter() - started)
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que perfila las peticiones HTTP.
+
+    Decide al empezar si la petición entra en la muestra; si además hay
+    umbral de lentitud, perfila todas y al terminar descarta las que no
+    entraron en la muestra ni lo superaron.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Envuelve la aplicación ASGI."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(PROFILES_PATH):
+            await self.app(scope, receive, send)
+            return
+
+        sampled = random.random() < settings.PROFILING_SAMPLE_RATE
+        slow_threshold = settings.PROFILING_SLOW_THRESHOLD
+        if not sampled and slow_threshold <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope, asyncio.current_task(), asyncio.get_running_loop(), sampled)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+            await send(message)
+
+        token = _current_profile.set(profile)
+        stack_sampler.register(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stack_sampler.unregister(profile)
+            _current_profile.reset(token)
+            profile.duration = time.perf_counter() - profile.started
+            if slow_threshold > 0 and profile.duration >= slow_threshold:
+                profile.reason = "slow"
+            elif sampled:
+                profile.reason = "sampled"
+            if profile.reason is not None:
+                profile.route = route_template(scope)
+                # Sin referencias a la tarea ni al loop una vez terminada
+                profile.task = profile.loop = None
+                profile_store.add(profile)
+                logger.info(
+                    "Perfil %s guardado: %s %s %.0f ms (%s)",
+                    profile.id, profile.method, profile.path, profile.duration * 1000, profile.reason
+                )
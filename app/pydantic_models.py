@@ -62,14 +62,52 @@ class DirectoryInfo(BaseModel):
         name (str): Nombre del directorio
         path (str): Ruta completa del directorio
         files_count (int): Número de archivos en el directorio
+        total_bytes (int): Tamaño total de esos archivos
+        subdirectories_count (int): Número de subdirectorios a cualquier profundidad
+        subtree_files_count (int): Archivos del directorio y sus subdirectorios
+        subtree_bytes (int): Tamaño total del directorio y sus subdirectorios
         created_at (datetime): Fecha de creación del directorio
     """
     name: str = Field(..., description="Nombre del directorio")
     path: str = Field(..., description="Ruta completa del directorio")
     files_count: int = Field(..., description="Número de archivos en el directorio")
+    total_bytes: int = Field(0, description="Tamaño total de los archivos del directorio en bytes")
+    subdirectories_count: int = Field(0, description="Número de subdirectorios a cualquier profundidad")
+    subtree_files_count: int = Field(0, description="Archivos del directorio y sus subdirectorios")
+    subtree_bytes: int = Field(0, description="Tamaño total del directorio y sus subdirectorios en bytes")
     created_at: datetime = Field(..., description="Fecha de creación del directorio")
 
 
+class DirectoryDeletionStatus(BaseModel):
+    """
+    Estado de la eliminación de un directorio.
+    
+    Attributes:
+        id (str): Identificador de la eliminación
+        path (str): Ruta del directorio eliminado
+        status (str): "running", "completed" o "failed"
+        message (str): Mensaje descriptivo
+        documents_deleted (int): Documentos marcados como eliminados
+        files_total (Optional[int]): Archivos a eliminar del disco (None mientras se cuentan)
+        files_deleted (int): Archivos ya eliminados del disco
+        started_at (datetime): Inicio de la eliminación
+        finished_at (Optional[datetime]): Fin de la eliminación
+        deleted_at (Optional[float]): Marca de tiempo de finalización
+        error (Optional[str]): Error al eliminar los archivos
+    """
+    id: str = Field(..., description="Identificador de la eliminación")
+    path: str = Field(..., description="Ruta del directorio eliminado")
+    status: str = Field(..., description="running, completed o failed")
+    message: str = Field(..., description="Mensaje descriptivo")
+    documents_deleted: int = Field(0, description="Documentos marcados como eliminados")
+    files_total: Optional[int] = Field(None, description="Archivos a eliminar del disco")
+    files_deleted: int = Field(0, description="Archivos ya eliminados del disco")
+    started_at: datetime = Field(..., description="Inicio de la eliminación")
+    finished_at: Optional[datetime] = Field(None, description="Fin de la eliminación")
+    deleted_at: Optional[float] = Field(None, description="Marca de tiempo de finalización")
+    error: Optional[str] = Field(None, description="Error al eliminar los archivos")
+
+
 class FileInfo(BaseModel):
     """
     Modelo para información de archivos.
@@ -88,6 +126,22 @@ class FileInfo(BaseModel):
     modified_at: datetime = Field(..., description="Fecha de última modificación")
 
 
+class FilePage(BaseModel):
+    """
+    Modelo de respuesta para una página del listado de archivos.
+    
+    Attributes:
+        items (List[FileInfo]): Archivos de la página
+        limit (int): Tamaño de página aplicado
+        next_cursor (Optional[str]): Cursor para pedir la página siguiente
+        has_more (bool): Si hay más archivos después de esta página
+    """
+    items: List[FileInfo] = Field(..., description="Archivos de la página")
+    limit: int = Field(..., description="Tamaño de página aplicado")
+    next_cursor: Optional[str] = Field(None, description="Cursor para pedir la página siguiente")
+    has_more: bool = Field(..., description="Si hay más archivos después de esta página")
+
+
 class ErrorResponse(BaseModel):
     """
     Modelo para respuestas de error.
@@ -102,6 +156,32 @@ class ErrorResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now, description="Fecha y hora del error")
 
 
+class PoolStatus(BaseModel):
+    """
+    Modelo para el estado del pool de conexiones a la base de datos.
+    
+    Attributes:
+        size (int): Conexiones que el pool mantiene abiertas
+        max_overflow (int): Conexiones extra permitidas en picos
+        checked_out (int): Conexiones en uso en este momento
+        checked_in (int): Conexiones libres en el pool
+        overflow (int): Conexiones extra abiertas en este momento
+        checkouts (int): Conexiones entregadas desde el arranque
+        timeouts (int): Esperas que agotaron el timeout del pool
+        wait_avg_ms (float): Espera media por una conexión en milisegundos
+        wait_max_ms (float): Mayor espera por una conexión en milisegundos
+    """
+    size: int = Field(..., description="Conexiones que el pool mantiene abiertas")
+    max_overflow: int = Field(..., description="Conexiones extra permitidas en picos")
+    checked_out: int = Field(..., description="Conexiones en uso")
+    checked_in: int = Field(..., description="Conexiones libres")
+    overflow: int = Field(..., description="Conexiones extra abiertas")
+    checkouts: int = Field(..., description="Conexiones entregadas desde el arranque")
+    timeouts: int = Field(..., description="Esperas que agotaron el timeout del pool")
+    wait_avg_ms: float = Field(..., description="Espera media por una conexión (ms)")
+    wait_max_ms: float = Field(..., description="Mayor espera por una conexión (ms)")
+
+
 class HealthCheck(BaseModel):
     """
     Modelo para verificación de salud de la aplicación.
@@ -111,11 +191,13 @@ class HealthCheck(BaseModel):
         version (str): Versión de la aplicación
         uptime (float): Tiempo de actividad en segundos
         timestamp (datetime): Fecha y hora de la verificación
+        database_pool (Optional[PoolStatus]): Estado del pool de conexiones
     """
     status: str = Field(..., description="Estado de la aplicación")
     version: str = Field(..., description="Versión de la aplicación")
     uptime: float = Field(..., description="Tiempo de actividad en segundos")
     timestamp: datetime = Field(default_factory=datetime.now, description="Fecha y hora de la verificación")
+    database_pool: Optional[PoolStatus] = Field(None, description="Estado del pool de conexiones")
 
 
 # ============================================================================
@@ -193,6 +275,306 @@ class DocumentUploadResponse(BaseModel):
     uploaded_at: datetime = Field(default_factory=datetime.now, description="Fecha de subida")
 
 
+class BatchUploadFileMetadata(BaseModel):
+    """
+    Metadatos propios de un archivo en una subida por lotes.
+    
+    Los campos no indicados toman el valor común del formulario.
+    
+    Attributes:
+        path (Optional[str]): Directorio destino
+        document_type_id (Optional[int]): ID del tipo de documento
+        category_id (Optional[int]): ID de la categoría
+        client_id (Optional[int]): ID del cliente
+        upload_date (Optional[datetime]): Fecha de subida
+    """
+    path: Optional[str] = Field(None, description="Directorio destino")
+    document_type_id: Optional[int] = Field(None, description="ID del tipo de documento")
+    category_id: Optional[int] = Field(None, description="ID de la categoría")
+    client_id: Optional[int] = Field(None, description="ID del cliente")
+    upload_date: Optional[datetime] = Field(None, description="Fecha de subida")
+
+
+class BatchUploadResult(BaseModel):
+    """
+    Resultado de un archivo en una subida por lotes.
+    
+    Attributes:
+        index (int): Posición del archivo en la petición
+        filename (Optional[str]): Nombre del archivo
+        status (str): "created", "duplicate" o "error"
+        status_code (int): Código HTTP equivalente (201, 409, 400...)
+        detail (Optional[str]): Motivo del error
+        document (Optional[DocumentResponse]): Documento creado
+    """
+    index: int = Field(..., description="Posición del archivo en la petición")
+    filename: Optional[str] = Field(None, description="Nombre del archivo")
+    status: str = Field(..., description="created, duplicate o error")
+    status_code: int = Field(..., description="Código HTTP equivalente")
+    detail: Optional[str] = Field(None, description="Motivo del error")
+    document: Optional[DocumentResponse] = Field(None, description="Documento creado")
+
+
+class BatchUploadResponse(BaseModel):
+    """
+    Modelo de respuesta para una subida por lotes.
+    
+    Attributes:
+        total (int): Archivos recibidos
+        created (int): Documentos creados
+        duplicates (int): Archivos rechazados por duplicados
+        failed (int): Archivos con otros errores
+        results (List[BatchUploadResult]): Resultado de cada archivo, en orden
+    """
+    total: int = Field(..., description="Archivos recibidos")
+    created: int = Field(..., description="Documentos creados")
+    duplicates: int = Field(..., description="Archivos rechazados por duplicados")
+    failed: int = Field(..., description="Archivos con otros errores")
+    results: List[BatchUploadResult] = Field(..., description="Resultado de cada archivo, en orden")
+
+
+class BulkDeleteRequest(BaseModel):
+    """
+    Modelo para eliminar documentos de forma masiva.
+    
+    Se indica ``ids`` o ``prefix``, no ambos.
+    
+    Attributes:
+        ids (Optional[List[int]]): IDs de los documentos
+        prefix (Optional[str]): Directorio cuyos documentos (incluidos subdirectorios) se eliminan
+    """
+    ids: Optional[List[int]] = Field(None, description="IDs de los documentos")
+    prefix: Optional[str] = Field(None, description="Directorio cuyos documentos se eliminan")
+
+
+class BulkMoveRequest(BulkDeleteRequest):
+    """
+    Modelo para mover documentos de forma masiva.
+    
+    Attributes:
+        destination (str): Directorio destino (ni la raíz ni un directorio oculto)
+    """
+    destination: str = Field(..., description="Directorio destino (ni la raíz ni un directorio oculto)")
+
+
+class BulkConflict(BaseModel):
+    """
+    Documento que no se pudo mover.
+    
+    Attributes:
+        id (int): ID del documento
+        local_path (str): Ruta actual del documento
+        detail (str): Motivo
+    """
+    id: int = Field(..., description="ID del documento")
+    local_path: str = Field(..., description="Ruta actual del documento")
+    detail: str = Field(..., description="Motivo")
+
+
+class BulkOperationResponse(BaseModel):
+    """
+    Modelo de respuesta para operaciones masivas.
+    
+    Attributes:
+        matched (int): Documentos encontrados
+        processed (List[int]): IDs eliminados o movidos
+        not_found (List[int]): IDs indicados que no existen
+        conflicts (List[BulkConflict]): Documentos no movidos por conflicto de nombres
+        files_pending (int): Operaciones de archivo que fallaron y se reintentarán al arrancar
+    """
+    matched: int = Field(..., description="Documentos encontrados")
+    processed: List[int] = Field(..., description="IDs eliminados o movidos")
+    not_found: List[int] = Field(default_factory=list, description="IDs indicados que no existen")
+    conflicts: List[BulkConflict] = Field(default_factory=list, description="Documentos no movidos por conflicto")
+    files_pending: int = Field(0, description="Operaciones de archivo pendientes de reintento")
+
+
+class DocumentListItem(BaseModel):
+    """
+    Modelo de un documento en el listado paginado.
+    
+    Attributes:
+        id (int): ID del documento
+        filename (str): Nombre del archivo
+        file_hash (str): Hash del archivo
+        document_type_id (int): ID del tipo de documento
+        document_type (Optional[str]): Tipo de documento
+        category_id (int): ID de la categoría
+        category (Optional[str]): Categoría
+        client_id (Optional[int]): ID del cliente (si aplica)
+        client (Optional[str]): Cliente (si aplica)
+        local_path (str): Ruta local del archivo
+        file_size (int): Tamaño del archivo
+        upload_date (datetime): Fecha de subida
+        created_at (datetime): Fecha de creación del registro
+    """
+    id: int = Field(..., description="ID del documento")
+    filename: str = Field(..., description="Nombre del archivo")
+    file_hash: str = Field(..., description="Hash del archivo")
+    document_type_id: int = Field(..., description="ID del tipo de documento")
+    document_type: Optional[str] = Field(None, description="Tipo de documento")
+    category_id: int = Field(..., description="ID de la categoría")
+    category: Optional[str] = Field(None, description="Categoría")
+    client_id: Optional[int] = Field(None, description="ID del cliente (si aplica)")
+    client: Optional[str] = Field(None, description="Cliente (si aplica)")
+    local_path: str = Field(..., description="Ruta local del archivo")
+    file_size: int = Field(..., description="Tamaño del archivo")
+    upload_date: datetime = Field(..., description="Fecha de subida")
+    created_at: datetime = Field(..., description="Fecha de creación del registro")
+
+
+class DocumentPage(BaseModel):
+    """
+    Modelo de respuesta para una página del listado de documentos.
+    
+    Attributes:
+        items (List[DocumentListItem]): Documentos de la página
+        limit (int): Tamaño de página aplicado
+        next_cursor (Optional[str]): Cursor para pedir la página siguiente
+        has_more (bool): Si hay más documentos después de esta página
+    """
+    items: List[DocumentListItem] = Field(..., description="Documentos de la página")
+    limit: int = Field(..., description="Tamaño de página aplicado")
+    next_cursor: Optional[str] = Field(None, description="Cursor para pedir la página siguiente")
+    has_more: bool = Field(..., description="Si hay más documentos después de esta página")
+
+
+class DocumentSearchResult(DocumentListItem):
+    """
+    Modelo de un resultado de búsqueda de texto completo.
+    
+    Attributes:
+        rank (float): Relevancia del documento para la búsqueda
+        snippet (Optional[str]): Fragmento con los términos resaltados con <mark>
+    """
+    rank: float = Field(..., description="Relevancia del documento para la búsqueda")
+    snippet: Optional[str] = Field(None, description="Fragmento con los términos resaltados con <mark>")
+
+
+class DocumentSearchPage(BaseModel):
+    """
+    Modelo de respuesta para una página de resultados de búsqueda.
+    
+    Attributes:
+        items (List[DocumentSearchResult]): Resultados ordenados por relevancia
+        limit (int): Tamaño de página aplicado
+        offset (int): Resultados saltados
+        has_more (bool): Si hay más resultados después de esta página
+    """
+    items: List[DocumentSearchResult] = Field(..., description="Resultados ordenados por relevancia")
+    limit: int = Field(..., description="Tamaño de página aplicado")
+    offset: int = Field(..., description="Resultados saltados")
+    has_more: bool = Field(..., description="Si hay más resultados después de esta página")
+
+
+class ExtractionStatusResponse(BaseModel):
+    """
+    Modelo de respuesta para el estado de la extracción de texto.
+    
+    Attributes:
+        document_id (int): ID del documento
+        status (str): pending, processing, completed o failed
+        error (Optional[str]): Motivo del fallo (si aplica)
+        text_length (int): Caracteres de texto extraídos
+        pages (Optional[int]): Páginas de las que se extrajo texto
+        total_pages (Optional[int]): Páginas totales del PDF
+        truncated (Optional[bool]): Si el texto guardado es parcial
+    """
+    document_id: int = Field(..., description="ID del documento")
+    status: str = Field(..., description="Estado: pending, processing, completed o failed")
+    error: Optional[str] = Field(None, description="Motivo del fallo (si aplica)")
+    text_length: int = Field(0, description="Caracteres de texto extraídos")
+    pages: Optional[int] = Field(None, description="Páginas de las que se extrajo texto")
+    total_pages: Optional[int] = Field(None, description="Páginas totales del PDF")
+    truncated: Optional[bool] = Field(
+        None, description="Si el texto guardado es parcial por los límites de páginas, tiempo o tamaño"
+    )
+
+
+class StatsBucket(BaseModel):
+    """
+    Modelo de respuesta para los totales de un tipo, categoría, cliente o mes.
+    
+    Attributes:
+        key (str): ID del tipo, categoría o cliente ("" sin cliente) o mes "YYYY-MM"
+        name (str): Nombre del tipo, categoría o cliente, o el propio mes
+        documents (int): Documentos activos
+        total_bytes (int): Tamaño total en bytes
+    """
+    key: str = Field(..., description="ID o mes (YYYY-MM) del grupo")
+    name: str = Field(..., description="Nombre del grupo")
+    documents: int = Field(..., description="Documentos activos")
+    total_bytes: int = Field(..., description="Tamaño total en bytes")
+
+
+class DocumentStatsResponse(BaseModel):
+    """
+    Modelo de respuesta para las estadísticas de documentos.
+    
+    Attributes:
+        total_documents (int): Documentos activos
+        total_size_bytes (int): Tamaño total en bytes
+        avg_file_size (float): Tamaño medio en bytes
+        by_type (List[StatsBucket]): Totales por tipo de documento
+        by_category (List[StatsBucket]): Totales por categoría
+        by_client (List[StatsBucket]): Totales por cliente
+        by_month (List[StatsBucket]): Totales por mes de subida, en orden cronológico
+    """
+    total_documents: int = Field(..., description="Documentos activos")
+    total_size_bytes: int = Field(..., description="Tamaño total en bytes")
+    avg_file_size: float = Field(..., description="Tamaño medio en bytes")
+    by_type: List[StatsBucket] = Field(default_factory=list, description="Totales por tipo de documento")
+    by_category: List[StatsBucket] = Field(default_factory=list, description="Totales por categoría")
+    by_client: List[StatsBucket] = Field(default_factory=list, description="Totales por cliente")
+    by_month: List[StatsBucket] = Field(default_factory=list, description="Totales por mes de subida")
+
+
+class UploadSessionCreate(BaseModel):
+    """
+    Modelo para iniciar una sesión de subida reanudable.
+    
+    Attributes:
+        filename (str): Nombre del archivo a subir
+        path (str): Ruta del directorio destino
+        total_size (int): Tamaño total del archivo en bytes
+        document_type_id (int): ID del tipo de documento
+        category_id (int): ID de la categoría
+        client_id (Optional[int]): ID del cliente (opcional)
+        upload_date (Optional[datetime]): Fecha de subida (automática si no se especifica)
+    """
+    filename: str = Field(..., description="Nombre del archivo a subir")
+    path: str = Field(..., description="Ruta del directorio destino")
+    total_size: int = Field(..., gt=0, description="Tamaño total del archivo en bytes")
+    document_type_id: int = Field(..., description="ID del tipo de documento")
+    category_id: int = Field(..., description="ID de la categoría")
+    client_id: Optional[int] = Field(None, description="ID del cliente (opcional)")
+    upload_date: Optional[datetime] = Field(None, description="Fecha de subida")
+
+
+class UploadSessionResponse(BaseModel):
+    """
+    Modelo de respuesta para el estado de una sesión de subida reanudable.
+    
+    Attributes:
+        session_id (str): Identificador de la sesión
+        filename (str): Nombre del archivo
+        path (str): Ruta del directorio destino
+        offset (int): Bytes recibidos hasta el momento
+        total_size (int): Tamaño total del archivo en bytes
+        completed (bool): Si ya se han recibido todos los bytes
+        created_at (datetime): Fecha de creación de la sesión
+        expires_at (datetime): Fecha a partir de la cual se descarta si no hay actividad
+    """
+    session_id: str = Field(..., description="Identificador de la sesión")
+    filename: str = Field(..., description="Nombre del archivo")
+    path: str = Field(..., description="Ruta del directorio destino")
+    offset: int = Field(..., description="Bytes recibidos hasta el momento")
+    total_size: int = Field(..., description="Tamaño total del archivo en bytes")
+    completed: bool = Field(..., description="Si ya se han recibido todos los bytes")
+    created_at: datetime = Field(..., description="Fecha de creación de la sesión")
+    expires_at: datetime = Field(..., description="Fecha de expiración por inactividad")
+
+
 class DocumentTypeResponse(BaseModel):
     """
     Modelo de respuesta para tipos de documento.
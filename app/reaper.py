@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Recolector de documentos eliminados
+===================================
+
+Eliminar un documento solo lo marca como inactivo (``is_active = FALSE``,
+``deleted_at``) y aparta su archivo a la papelera, así que la petición no
+depende del tamaño del archivo y la eliminación se puede deshacer.
+
+Este recolector purga cada ``REAPER_INTERVAL`` segundos los documentos
+eliminados hace más de ``DELETED_RETENTION_DAYS`` días, en lotes de
+``BULK_BATCH_SIZE``: borra las filas con un único ``DELETE ... RETURNING``
+por lote, registra la eliminación de sus archivos en la misma transacción y
+los elimina después con ``file_journal``. Los blobs compartidos por
+contenido solo se eliminan cuando ningún documento los usa.
+
+El ``DELETE`` de cada lote se confirma antes de eliminar los archivos, así
+que el recolector nunca tiene filas bloqueadas mientras espera el bloqueo de
+un blob. ``file_journal.apply`` comprueba el uso de los blobs con el bloqueo
+tomado, el mismo que toman las subidas y la restauración: una subida del
+mismo contenido que un documento recién purgado, o la restauración de otro
+documento con ese contenido, espera a que termine la eliminación o hace que
+el blob se conserve.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, select
+
+from . import database, file_journal
+from .config import settings
+from .models.document import Document
+from .storage import is_blob_key
+
+logger = logging.getLogger(__name__)
+
+
+def _is_purgeable_key(storage_key: Optional[str]) -> bool:
+    """Solo se eliminan blobs y archivos de la papelera, nunca una ruta visible."""
+    return is_blob_key(storage_key) or bool(storage_key) and storage_key.startswith(f"{settings.TRASH_DIR}/")
+
+
+class DocumentReaper:
+    """Tarea periódica que purga los documentos eliminados fuera del periodo de retención."""
+
+    def __init__(self):
+        """Inicializa el recolector sin arrancarlo."""
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Arranca la tarea periódica."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Detiene la tarea periódica."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                purged = await self.purge()
+                if purged:
+                    logger.info("Documentos eliminados purgados: %d", purged)
+            except Exception:
+                logger.exception("Error al purgar documentos eliminados")
+            await asyncio.sleep(settings.REAPER_INTERVAL)
+
+    async def purge(self, before: Optional[datetime] = None) -> int:
+        """
+        Purga los documentos eliminados antes de una fecha.
+
+        Args:
+            before (Optional[datetime]): Fecha límite (por defecto, ahora
+                menos ``DELETED_RETENTION_DAYS``)
+
+        Returns:
+            int: Documentos purgados
+        """
+        before = before or datetime.now() - timedelta(days=settings.DELETED_RETENTION_DAYS)
+        purged = 0
+        async with database.AsyncSessionLocal() as db:
+            while True:
+                expired = (
+                    select(Document.id)
+                    .where(Document.is_active == False, Document.deleted_at < before)  # noqa: E712
+                    .order_by(Document.deleted_at)
+                    .limit(settings.BULK_BATCH_SIZE)
+                )
+                rows = (await db.execute(
+                    delete(Document)
+                    .where(Document.id.in_(expired.scalar_subquery()))
+                    .returning(Document.storage_key)
+                    .execution_options(synchronize_session=False)
+                )).all()
+                if not rows:
+                    await db.commit()
+                    return purged
+
+                operations = await file_journal.record(db, (
+                    (file_journal.OPERATION_DELETE, row.storage_key, None)
+                    for row in rows if _is_purgeable_key(row.storage_key)
+                ))
+                await db.commit()
+                await file_journal.apply(db, operations)
+                purged += len(rows)
+
+
+# Instancia global, arrancada en el evento de inicio de la aplicación
+document_reaper = DocumentReaper()
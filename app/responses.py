@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+Respuestas de descarga de archivos
+==================================
+
+Este módulo contiene la respuesta usada para descargar PDFs, con soporte de:
+
+- Peticiones condicionales (``If-None-Match`` / ``If-Modified-Since`` -> 304).
+- Rangos de bytes (``Range`` -> 206), incluidos varios rangos en una misma
+  respuesta ``multipart/byteranges`` e ``If-Range``.
+- Envío sin copia (``sendfile``) cuando el servidor ASGI anuncia la extensión
+  ``http.response.zerocopysend``; si no, se lee con ``os.pread`` en bloques.
+
+El archivo se abre una sola vez y se usa el ``fstat`` del descriptor abierto,
+así que cada petición hace una única llamada ``stat``.
+"""
+
+import os
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+# Rangos máximos por petición; con más se responde el archivo completo
+MAX_RANGES = 16
+
+# Bytes leídos por bloque cuando no hay envío sin copia
+READ_CHUNK_SIZE = 256 * 1024
+
+
+def parse_range_header(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Interpreta una cabecera Range de bytes.
+
+    Los rangos solapados o contiguos se fusionan y se devuelven ordenados.
+
+    Args:
+        header (str): Valor de la cabecera (ej: "bytes=0-499,1000-")
+        size (int): Tamaño del archivo en bytes
+
+    Returns:
+        Optional[List[Tuple[int, int]]]: Rangos (inicio, fin) inclusivos; lista
+            vacía si ninguno es satisfacible, o None si la cabecera debe
+            ignorarse (sintaxis inválida o demasiados rangos)
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+
+    specs = [spec.strip() for spec in specs.split(",") if spec.strip()]
+    if not specs or len(specs) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for spec in specs:
+        first, sep, last = spec.partition("-")
+        if not sep:
+            return None
+        try:
+            if not first:
+                # Sufijo: los últimos N bytes
+                length = int(last)
+                if length <= 0:
+                    continue
+                start, end = max(0, size - length), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+                if last and end < start:
+                    return None
+                end = min(end, size - 1)
+        except ValueError:
+            return None
+
+        if start < size:
+            ranges.append((start, end))
+
+    ranges.sort()
+    merged: List[Tuple[int, int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _etag_list(header: str) -> List[str]:
+    """Separa una lista de ETags quitando el prefijo débil ``W/``."""
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.append(tag)
+    return tags
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Indica si una cabecera If-None-Match incluye el ETag (comparación débil).
+
+    Args:
+        if_none_match (str): Valor de la cabecera
+        etag (str): ETag actual
+
+    Returns:
+        bool: True si coincide o la cabecera es ``*``
+    """
+    tags = _etag_list(if_none_match)
+    return "*" in tags or _etag_list(etag)[0] in tags
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, last_modified: float) -> bool:
+    """
+    Evalúa If-None-Match e If-Modified-Since (este solo si no hay If-None-Match).
+
+    Args:
+        headers (Mapping[str, str]): Cabeceras de la petición
+        etag (str): ETag actual del archivo
+        last_modified (float): Fecha de modificación (timestamp)
+
+    Returns:
+        bool: True si se debe responder 304
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+
+def if_range_allows(headers: Mapping[str, str], etag: str, last_modified: str) -> bool:
+    """
+    Evalúa If-Range: el rango solo se aplica si la representación no ha cambiado.
+
+    Args:
+        headers (Mapping[str, str]): Cabeceras de la petición
+        etag (str): ETag actual del archivo
+        last_modified (str): Cabecera Last-Modified actual
+
+    Returns:
+        bool: True si se puede responder con el rango solicitado
+    """
+    if_range = headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"'):
+        # Solo comparación fuerte: un ETag débil nunca valida un rango
+        return not etag.startswith("W/") and if_range == etag
+    return if_range == last_modified
+
+
+class FileRangeResponse(Response):
+    """
+    Respuesta que envía un archivo completo o uno o varios rangos de bytes.
+
+    Recibe un descriptor ya abierto y lo cierra al terminar.
+
+    Attributes:
+        fd (int): Descriptor del archivo
+        ranges (List[Tuple[int, int]]): Rangos a enviar (vacío para el archivo completo)
+    """
+
+    def __init__(
+        self,
+        fd: int,
+        stat_result: os.stat_result,
+        ranges: Optional[List[Tuple[int, int]]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: str = "application/pdf",
+        method: str = "GET"
+    ):
+        """
+        Prepara las cabeceras de la respuesta.
+
+        Args:
+            fd (int): Descriptor abierto del archivo
+            stat_result (os.stat_result): Resultado de ``os.fstat`` del descriptor
+            ranges (Optional[List[Tuple[int, int]]]): Rangos solicitados y satisfacibles
+            headers (Optional[Mapping[str, str]]): Cabeceras adicionales
+            media_type (str): Tipo MIME del archivo
+            method (str): Método HTTP (HEAD no envía cuerpo)
+        """
+        self.fd = fd
+        self.size = stat_result.st_size
+        self.ranges = ranges or []
+        self.send_header_only = method.upper() == "HEAD"
+        self.background = None
+        self.status_code = 206 if self.ranges else 200
+        self.media_type = media_type
+        self.init_headers(headers)
+        self.headers["accept-ranges"] = "bytes"
+
+        # Segmentos a enviar: (prefijo, inicio, número de bytes)
+        self._segments: List[Tuple[bytes, int, int]] = []
+        self._epilogue = b""
+
+        if not self.ranges:
+            self._segments.append((b"", 0, self.size))
+            self.headers["content-type"] = media_type
+        elif len(self.ranges) == 1:
+            start, end = self.ranges[0]
+            self._segments.append((b"", start, end - start + 1))
+            self.headers["content-type"] = media_type
+            self.headers["content-range"] = f"bytes {start}-{end}/{self.size}"
+        else:
+            boundary = uuid.uuid4().hex
+            self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+            for start, end in self.ranges:
+                prefix = (
+                    f"--{boundary}\r\n"
+                    f"Content-Type: {media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{self.size}\r\n\r\n"
+                ).encode()
+                # Cada parte termina con CRLF antes del siguiente delimitador
+                if self._segments:
+                    prefix = b"\r\n" + prefix
+                self._segments.append((prefix, start, end - start + 1))
+            self._epilogue = f"\r\n--{boundary}--\r\n".encode()
+
+        content_length = sum(len(prefix) + count for prefix, _, count in self._segments) + len(self._epilogue)
+        self.headers["content-length"] = str(content_length)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        file = None
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            })
+            if self.send_header_only:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+
+            zero_copy = "http.response.zerocopysend" in scope.get("extensions", {})
+            if zero_copy:
+                file = open(self.fd, "rb", closefd=False)
+
+            for prefix, offset, count in self._segments:
+                if prefix:
+                    await send({"type": "http.response.body", "body": prefix, "more_body": True})
+                if zero_copy:
+                    await send({
+                        "type": "http.response.zerocopysend",
+                        "file": file,
+                        "offset": offset,
+                        "count": count,
+                        "more_body": True,
+                    })
+                    continue
+                end = offset + count
+                while offset < end:
+                    chunk = await anyio.to_thread.run_sync(
+                        os.pread, self.fd, min(READ_CHUNK_SIZE, end - offset), offset
+                    )
+                    if not chunk:
+                        # El archivo se truncó durante el envío
+                        raise RuntimeError("El archivo cambió durante la descarga")
+                    offset += len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+            await send({"type": "http.response.body", "body": self._epilogue, "more_body": False})
+        finally:
+            # El envoltorio no es dueño del descriptor (closefd=False): se cierran ambos
+            if file is not None:
+                file.close()
+            os.close(self.fd)
+
+
+def build_file_response(
+    request_headers: Mapping[str, str],
+    fd: int,
+    stat_result: os.stat_result,
+    filename: str,
+    etag: Optional[str] = None,
+    method: str = "GET",
+    media_type: str = "application/pdf"
+) -> Response:
+    """
+    Construye la respuesta de descarga adecuada: 200, 206, 304 o 416.
+
+    Args:
+        request_headers (Mapping[str, str]): Cabeceras de la petición
+        fd (int): Descriptor abierto del archivo (se cierra siempre)
+        stat_result (os.stat_result): Resultado de ``os.fstat`` del descriptor
+        filename (str): Nombre ofrecido al cliente en Content-Disposition
+        etag (Optional[str]): ETag fuerte (entre comillas); si no se indica se
+            usa uno débil derivado de la fecha de modificación y el tamaño
+        method (str): Método HTTP
+        media_type (str): Tipo MIME del archivo
+
+    Returns:
+        Response: Respuesta a devolver desde la ruta
+    """
+    size = stat_result.st_size
+    etag = etag or f'W/"{stat_result.st_mtime_ns:x}-{size:x}"'
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+
+    quoted = quote(filename)
+    if quoted != filename:
+        content_disposition = f"attachment; filename*=utf-8''{quoted}"
+    else:
+        content_disposition = f'attachment; filename="{filename}"'
+
+    headers = {
+        "etag": etag,
+        "last-modified": last_modified,
+        "content-disposition": content_disposition,
+    }
+
+    try:
+        if is_not_modified(request_headers, etag, stat_result.st_mtime):
+            os.close(fd)
+            return Response(status_code=304, headers={"etag": etag, "last-modified": last_modified})
+
+        ranges = None
+        range_header = request_headers.get("range")
+        if range_header and if_range_allows(request_headers, etag, last_modified):
+            ranges = parse_range_header(range_header, size)
+            if ranges == []:
+                os.close(fd)
+                return Response(
+                    status_code=416,
+                    headers={"content-range": f"bytes */{size}", "accept-ranges": "bytes"}
+                )
+
+        return FileRangeResponse(fd, stat_result, ranges, headers, media_type, method)
+    except BaseException:
+        os.close(fd)
+        raise
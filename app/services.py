@@ -8,21 +8,421 @@ y archivos, separada de las rutas de la API.
 """
 
 import os
+import re
+import json
+import base64
 import shutil
+import asyncio
+import hashlib
+import heapq
+import uuid
+import logging
 import aiofiles
+from contextlib import asynccontextmanager
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional, Tuple
-from datetime import datetime
+from stat import S_ISREG
+from typing import AsyncIterator, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from datetime import datetime, timedelta
 from fastapi import UploadFile, HTTPException
+from pydantic import BaseModel
 from .config import settings, get_upload_path, validate_file_extension, get_safe_filename
-from .pydantic_models import DirectoryInfo, FileInfo
-from .models.document import Document
+from .pydantic_models import (
+    DirectoryInfo, DirectoryDeletionStatus, FileInfo, FilePage, BatchUploadResult, BatchUploadResponse,
+    BulkConflict, BulkOperationResponse
+)
+from .models.document import Document, SEARCH_CONFIG
 from .models.document_type import DocumentType
 from .models.category import Category
 from .models.client import Client
-from .database import get_db
+from .models.directory import Directory
+from .models.directory_deletion import DirectoryDeletion
+from .models.document_stat import DocumentStat, STAT_DIMENSIONS
+from .models.document_view import documents_view
+from sqlalchemy import Integer, String, case, cast, column, delete, func, literal, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import REGCONFIG, insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import TTLCache
+from .extraction import extraction_worker
+from .thumbnails import thumbnail_service
+from .storage import get_storage, physical_path, is_blob_key
+from . import database, directory_index, file_journal, metrics
 import time
 
+try:
+    import fcntl
+except ImportError:  # Windows: las sesiones de subida solo se bloquean dentro del proceso
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Los identificadores de sesión de subida son uuid4 en hexadecimal
+SESSION_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Columnas de documents_view devueltas por el listado y la búsqueda
+LISTING_COLUMNS = [
+    documents_view.c.id, documents_view.c.filename, documents_view.c.file_hash,
+    documents_view.c.local_path, documents_view.c.file_size,
+    documents_view.c.upload_date, documents_view.c.created_at,
+    documents_view.c.document_type_id, documents_view.c.document_type_name,
+    documents_view.c.category_id, documents_view.c.category_name,
+    documents_view.c.client_id, documents_view.c.client_name
+]
+
+# Modelos de los datos de referencia cacheados por DocumentService
+REFERENCE_MODELS = {
+    "document_types": DocumentType,
+    "categories": Category,
+    "clients": Client
+}
+
+# Campo de los metadatos de un documento y mensaje si el ID no existe, por tipo de referencia
+REFERENCE_FIELDS = (
+    ("document_types", "document_type_id", "Tipo de documento con ID {} no encontrado"),
+    ("categories", "category_id", "Categoría con ID {} no encontrada"),
+    ("clients", "client_id", "Cliente con ID {} no encontrado")
+)
+
+
+async def stream_upload_to_temp(file: UploadFile, directory: Path) -> Tuple[Path, int, str]:
+    """
+    Vuelca un archivo subido a un fichero temporal leyendo en bloques.
+
+    El contenido nunca se mantiene completo en memoria: cada bloque se
+    escribe a disco y se añade al hash SHA-256 incremental, ambos en hilos
+    (hashlib libera el GIL), de modo que varias subidas simultáneas se
+    procesan en paralelo sin bloquear el event loop. Si se supera
+    ``settings.MAX_FILE_SIZE`` se aborta la lectura y se elimina el temporal.
+
+    Args:
+        file (UploadFile): Archivo recibido en la petición
+        directory (Path): Directorio donde crear el temporal (el mismo que el
+            destino final, para que el renombrado sea atómico)
+
+    Returns:
+        Tuple[Path, int, str]: Ruta del temporal, tamaño en bytes y hash SHA-256
+
+    Raises:
+        HTTPException: 413 si el archivo excede el tamaño máximo
+    """
+    temp_path = directory / f".{uuid.uuid4().hex}.part"
+    hash_sha256 = hashlib.sha256()
+    size = 0
+    started = time.perf_counter()
+
+    try:
+        async with aiofiles.open(temp_path, 'wb') as f:
+            while True:
+                chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if size > settings.MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"El archivo excede el tamaño máximo de {settings.MAX_FILE_SIZE} bytes"
+                    )
+
+                await asyncio.gather(f.write(chunk), asyncio.to_thread(hash_sha256.update, chunk))
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    metrics.record_upload("multipart", size, time.perf_counter() - started)
+    return temp_path, size, hash_sha256.hexdigest()
+
+
+def promote_temp_file(temp_path: Path, destination: Path) -> None:
+    """
+    Mueve un fichero temporal a su ruta definitiva de forma atómica, sin sobrescribir.
+
+    Args:
+        temp_path (Path): Fichero temporal creado por ``stream_upload_to_temp``
+        destination (Path): Ruta final del archivo (mismo sistema de ficheros)
+
+    Raises:
+        FileExistsError: Si otra petición creó el destino después de comprobarlo
+    """
+    # A diferencia de os.replace, os.link falla si el destino ya existe
+    os.link(temp_path, destination)
+    temp_path.unlink()
+
+
+def encode_listing_cursor(upload_date: datetime, document_id: int) -> str:
+    """
+    Codifica la posición de un documento en el listado como cursor opaco.
+
+    Args:
+        upload_date (datetime): Fecha de subida del último documento devuelto
+        document_id (int): ID del último documento devuelto
+
+    Returns:
+        str: Cursor en base64 apto para URLs
+    """
+    payload = json.dumps([upload_date.isoformat(), document_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_listing_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodifica un cursor generado por ``encode_listing_cursor``.
+
+    Args:
+        cursor (str): Cursor recibido del cliente
+
+    Returns:
+        Tuple[datetime, int]: Fecha de subida e ID del último documento visto
+
+    Raises:
+        HTTPException: 400 si el cursor no es válido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        upload_date, document_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(upload_date), int(document_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
+class FileRecord(NamedTuple):
+    """Archivo de un listado: nombre, tamaño y fecha de modificación (None si aún no se llamó a stat)."""
+    name: str
+    size: Optional[int]
+    mtime: Optional[float]
+
+
+def scan_directory_files(directory: Path, with_stat: bool) -> Iterator[FileRecord]:
+    """
+    Recorre los archivos de un directorio con ``os.scandir``.
+    
+    El tipo de cada entrada viene en el propio dirent, así que solo se llama
+    a ``stat`` si se pide el tamaño y la fecha. Se omiten los archivos
+    ocultos (temporales de subida) y las extensiones no permitidas.
+    
+    Args:
+        directory (Path): Directorio a recorrer
+        with_stat (bool): Obtener tamaño y fecha de modificación
+        
+    Returns:
+        Iterator[FileRecord]: Archivos en el orden del directorio
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not validate_file_extension(entry.name):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                if not with_stat:
+                    yield FileRecord(entry.name, None, None)
+                    continue
+                stat_result = entry.stat()
+            except FileNotFoundError:
+                # Eliminado durante el recorrido
+                continue
+            yield FileRecord(entry.name, stat_result.st_size, stat_result.st_mtime)
+
+
+def complete_file_records(directory: Path, records: List[FileRecord]) -> List[FileRecord]:
+    """
+    Añade tamaño y fecha a los archivos recorridos sin ``stat``.
+    
+    Args:
+        directory (Path): Directorio de los archivos
+        records (List[FileRecord]): Archivos del listado
+        
+    Returns:
+        List[FileRecord]: Archivos con tamaño y fecha (sin los eliminados entretanto)
+    """
+    completed = []
+    for record in records:
+        if record.size is None:
+            try:
+                stat_result = os.stat(directory / record.name)
+            except FileNotFoundError:
+                continue
+            record = FileRecord(record.name, stat_result.st_size, stat_result.st_mtime)
+        completed.append(record)
+    return completed
+
+
+def file_sort_key(sort: str, record: FileRecord) -> tuple:
+    """
+    Clave de orden de un archivo; el nombre desempata en tamaño y fecha.
+    
+    Args:
+        sort (str): "name", "size" o "mtime"
+        record (FileRecord): Archivo
+        
+    Returns:
+        tuple: Clave comparable
+    """
+    if sort == "size":
+        return (record.size, record.name)
+    if sort == "mtime":
+        return (record.mtime, record.name)
+    return (record.name,)
+
+
+def file_record_info(directory: Path, record: FileRecord) -> FileInfo:
+    """
+    Convierte un archivo del listado en su modelo de respuesta.
+    
+    Args:
+        directory (Path): Ruta relativa sanitizada del directorio
+        record (FileRecord): Archivo con tamaño y fecha
+        
+    Returns:
+        FileInfo: Información del archivo
+    """
+    return FileInfo(
+        name=record.name,
+        path=str(directory / record.name),
+        size=record.size,
+        extension=Path(record.name).suffix,
+        modified_at=datetime.fromtimestamp(record.mtime)
+    )
+
+
+def encode_file_cursor(sort_key: tuple) -> str:
+    """
+    Codifica la clave de orden del último archivo devuelto como cursor opaco.
+    
+    Args:
+        sort_key (tuple): Clave calculada con ``file_sort_key``
+        
+    Returns:
+        str: Cursor en base64 apto para URLs
+    """
+    payload = json.dumps(list(sort_key))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_file_cursor(cursor: str, sort: str) -> tuple:
+    """
+    Decodifica un cursor generado por ``encode_file_cursor``.
+    
+    Args:
+        cursor (str): Cursor recibido
+        sort (str): Orden de la petición actual
+        
+    Returns:
+        tuple: Clave de orden del último archivo de la página anterior
+        
+    Raises:
+        HTTPException: 400 si el cursor no es válido para el orden pedido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if sort == "name":
+            name, = key
+            return (str(name),)
+        value, name = key
+        return (float(value) if sort == "mtime" else int(value), str(name))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
+def remove_tree(root: Path, progress: DirectoryDeletionStatus) -> None:
+    """
+    Elimina un árbol de directorios actualizando el progreso por el camino.
+    
+    Se ejecuta en un hilo. Primero cuenta los archivos (``files_total``) y
+    después los elimina de abajo arriba (``files_deleted``). Las entradas que
+    ya no existen se ignoran.
+    
+    Args:
+        root (Path): Directorio a eliminar
+        progress (DirectoryDeletionStatus): Estado de la eliminación a actualizar
+    """
+    progress.files_total = sum(len(files) for _, _, files in os.walk(root))
+    for current, directories, files in os.walk(root, topdown=False):
+        for name in files:
+            try:
+                os.unlink(os.path.join(current, name))
+            except FileNotFoundError:
+                pass
+            progress.files_deleted += 1
+        for name in directories:
+            # os.walk no sigue los enlaces a directorios: se eliminan como enlaces
+            entry = os.path.join(current, name)
+            if os.path.islink(entry):
+                os.unlink(entry)
+        try:
+            os.rmdir(current)
+        except FileNotFoundError:
+            pass
+
+
+def trashed_storage_key():
+    """
+    Clave de almacenamiento de un documento al marcarlo como eliminado (expresión SQL).
+    
+    Los blobs por contenido conservan su clave; el resto de archivos pasan a
+    ``<TRASH_DIR>/documents/<id>/<nombre>``, fuera de su ruta visible, hasta
+    que se restauran o los purga el recolector.
+    """
+    return case(
+        (Document.storage_key.like(f"{settings.BLOB_DIR}/%"), Document.storage_key),
+        else_=literal(f"{settings.TRASH_DIR}/documents/") + cast(Document.id, String) + "/" + Document.filename
+    )
+
+
+def deletion_status(deletion: DirectoryDeletion) -> DirectoryDeletionStatus:
+    """
+    Convierte una fila de ``directory_deletions`` en su modelo de respuesta.
+    
+    Args:
+        deletion (DirectoryDeletion): Eliminación registrada
+        
+    Returns:
+        DirectoryDeletionStatus: Estado de la eliminación
+    """
+    return DirectoryDeletionStatus(
+        id=deletion.id,
+        path=deletion.path,
+        status=deletion.status,
+        message=deletion.message,
+        documents_deleted=deletion.documents_deleted,
+        files_total=deletion.files_total,
+        files_deleted=deletion.files_deleted,
+        started_at=deletion.started_at,
+        finished_at=deletion.finished_at,
+        deleted_at=deletion.finished_at.timestamp() if deletion.finished_at else None,
+        error=deletion.error
+    )
+
+
+async def empty_trash() -> None:
+    """
+    Elimina los directorios que quedaron en la papelera (llamado al arrancar).
+    
+    Las eliminaciones que seguían en curso al iniciar este proceso (las
+    interrumpidas por un reinicio) se dan por terminadas al vaciarla.
+    """
+    started = datetime.now()
+    trash_path = get_upload_path() / settings.TRASH_DIR / "directories"
+    if trash_path.exists():
+        await asyncio.to_thread(shutil.rmtree, trash_path, True)
+    
+    try:
+        async with database.AsyncSessionLocal() as db:
+            await db.execute(
+                update(DirectoryDeletion)
+                .where(DirectoryDeletion.status == "running", DirectoryDeletion.started_at < started)
+                .values(
+                    status="completed",
+                    message="Eliminación interrumpida por un reinicio; los archivos se eliminaron al arrancar",
+                    finished_at=func.now()
+                )
+            )
+            await db.commit()
+    except Exception as e:
+        logger.warning("No se pudieron cerrar las eliminaciones de directorios interrumpidas: %s", e)
+
 
 class DirectoryService:
     """
@@ -35,12 +435,15 @@ class DirectoryService:
     def __init__(self):
         """Inicializa el servicio con la ruta base de uploads."""
         self.upload_path = get_upload_path()
+        # Tareas que eliminan del disco los directorios borrados por este proceso
+        self._deletion_tasks: Dict[str, asyncio.Task] = {}
     
-    async def create_directory(self, path: str) -> DirectoryInfo:
+    async def create_directory(self, db: AsyncSession, path: str) -> DirectoryInfo:
         """
-        Crea un nuevo directorio.
+        Crea un nuevo directorio y lo registra en el índice de directorios.
         
         Args:
+            db (AsyncSession): Sesión de base de datos de la petición
             path (str): Ruta del directorio a crear
             
         Returns:
@@ -57,26 +460,30 @@ class DirectoryService:
             # Crear el directorio
             full_path.mkdir(parents=True, exist_ok=True)
             
-            # Obtener información del directorio
-            stat = full_path.stat()
+            # Registrarlo (con sus ascendientes) en el índice
+            await directory_index.ensure_directories(db, [full_path])
+            await db.commit()
             
-            return DirectoryInfo(
-                name=full_path.name,
-                path=str(safe_path),
-                files_count=len([f for f in full_path.iterdir() if f.is_file()]),
-                created_at=datetime.fromtimestamp(stat.st_ctime)
-            )
+            return await self.get_directory_info(db, path)
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Error al crear directorio '{path}': {str(e)}"
             )
     
-    async def list_directories(self) -> List[str]:
+    async def list_directories(self, db: AsyncSession, prefix: Optional[str] = None) -> List[str]:
         """
         Lista todos los directorios disponibles.
         
+        Se consulta el índice de directorios, sin recorrer el sistema de archivos.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            prefix (Optional[str]): Limitar el listado a este directorio y sus descendientes
+            
         Returns:
             List[str]: Lista de rutas de directorios
             
@@ -84,29 +491,32 @@ class DirectoryService:
             HTTPException: Si hay un error al listar directorios
         """
         try:
-            directories = []
+            query = select(Directory.path).order_by(Directory.path)
             
-            for root, dirs, files in os.walk(self.upload_path):
-                for dir_name in dirs:
-                    rel_path = os.path.relpath(
-                        os.path.join(root, dir_name), 
-                        self.upload_path
-                    )
-                    directories.append(rel_path)
+            if prefix:
+                key = directory_index.directory_key(self._sanitize_path(prefix))
+                if key:
+                    query = query.where(directory_index.subtree_filter(key))
             
-            return directories
+            return list(await db.scalars(query))
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Error al listar directorios: {str(e)}"
             )
     
-    async def get_directory_info(self, path: str) -> DirectoryInfo:
+    async def get_directory_info(self, db: AsyncSession, path: str) -> DirectoryInfo:
         """
         Obtiene información detallada de un directorio.
         
+        Los contadores del directorio y de su subárbol se leen del índice de
+        directorios con una única consulta.
+        
         Args:
+            db (AsyncSession): Sesión de base de datos de la petición
             path (str): Ruta del directorio
             
         Returns:
@@ -116,39 +526,234 @@ class DirectoryService:
             HTTPException: Si el directorio no existe o hay un error
         """
         try:
-            safe_path = self._sanitize_path(path)
-            full_path = self.upload_path / safe_path
+            key = directory_index.directory_key(self._sanitize_path(path))
+            if key is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Ruta de directorio inválida"
+                )
             
-            if not full_path.exists():
+            # El propio directorio y los agregados de su subárbol en una sola consulta
+            is_self = Directory.path == key
+            row = (await db.execute(
+                select(
+                    func.max(case((is_self, Directory.files_count))).label("files_count"),
+                    func.max(case((is_self, Directory.total_bytes))).label("total_bytes"),
+                    func.max(case((is_self, Directory.created_at))).label("created_at"),
+                    func.count().label("directories"),
+                    func.coalesce(func.sum(Directory.files_count), 0).label("subtree_files_count"),
+                    func.coalesce(func.sum(Directory.total_bytes), 0).label("subtree_bytes")
+                ).where(directory_index.subtree_filter(key))
+            )).one()
+            
+            if row.created_at is None:
                 raise HTTPException(
                     status_code=404,
                     detail=f"Directorio '{path}' no encontrado"
                 )
             
-            if not full_path.is_dir():
+            return DirectoryInfo(
+                name=key.rsplit("/", 1)[-1],
+                path=key,
+                files_count=row.files_count,
+                total_bytes=row.total_bytes,
+                subdirectories_count=row.directories - 1,
+                subtree_files_count=row.subtree_files_count,
+                subtree_bytes=row.subtree_bytes,
+                created_at=row.created_at
+            )
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al obtener información del directorio: {str(e)}"
+            )
+    
+    async def delete_directory(self, db: AsyncSession, path: str) -> DirectoryDeletionStatus:
+        """
+        Elimina un directorio, sus subdirectorios y sus documentos.
+        
+        1. El directorio se renombra a la papelera (``TRASH_DIR``), así que
+           desaparece de inmediato sin recorrerlo.
+        2. En una sola transacción se marcan como eliminados todos los
+           documentos del subárbol (un ``UPDATE`` por prefijo de ruta) y se
+           quita el subárbol del índice de directorios. Si falla, el
+           directorio vuelve a su sitio. Los documentos guardados por
+           contenido se pueden restaurar hasta que los purga el recolector;
+           los demás se eliminan del disco con el directorio.
+        3. Los archivos se eliminan en un hilo. Si no termina en
+           ``DIRECTORY_DELETE_WAIT`` segundos se responde con el estado
+           "running" y el progreso se consulta con ``get_deletion_status``.
+           El estado se registra en ``directory_deletions`` en la misma
+           transacción del paso 2 y el progreso se guarda cada
+           ``DIRECTORY_DELETE_PROGRESS_INTERVAL`` segundos.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            path (str): Ruta del directorio a eliminar
+            
+        Returns:
+            DirectoryDeletionStatus: Estado de la eliminación
+            
+        Raises:
+            HTTPException: Si el directorio no existe, no es válido o hay un error
+        """
+        try:
+            key = directory_index.directory_key(self._sanitize_path(path))
+            if key is None or directory_index.is_hidden(key):
                 raise HTTPException(
                     status_code=400,
-                    detail=f"'{path}' no es un directorio"
+                    detail="Ruta de directorio inválida"
                 )
+            full_path = self.upload_path / key
+            
+            on_disk = await asyncio.to_thread(full_path.is_dir)
+            if not on_disk:
+                if await asyncio.to_thread(full_path.exists):
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"'{path}' no es un directorio"
+                    )
+                # Con almacenamiento por contenido puede existir solo en el índice
+                if await db.scalar(select(Directory.id).where(Directory.path == key)) is None:
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"Directorio '{path}' no encontrado"
+                    )
             
-            stat = full_path.stat()
-            files_count = len([f for f in full_path.iterdir() if f.is_file()])
+            deletion_id = uuid.uuid4().hex
+            trash_path = self.upload_path / settings.TRASH_DIR / "directories" / deletion_id
+            if on_disk:
+                await asyncio.to_thread(trash_path.parent.mkdir, parents=True, exist_ok=True)
+                await asyncio.to_thread(os.rename, full_path, trash_path)
+            
+            try:
+                pattern = directory_index.escape_like(str(full_path)) + "/%"
+                result = await db.execute(
+                    update(Document)
+                    .where(Document.local_path.like(pattern, escape="\\"), Document.is_active == True)  # noqa: E712
+                    .values(is_active=False, deleted_at=func.now(), storage_key=trashed_storage_key())
+                    .execution_options(synchronize_session=False)
+                )
+                await db.execute(delete(Directory).where(directory_index.subtree_filter(key)))
+                
+                # Estado visible para todos los workers; se olvidan las terminadas hace más de una hora
+                await db.execute(
+                    delete(DirectoryDeletion)
+                    .where(DirectoryDeletion.finished_at < datetime.now() - timedelta(hours=1))
+                )
+                deletion_row = DirectoryDeletion(
+                    id=deletion_id,
+                    path=key,
+                    status="running",
+                    message=f"Eliminando el directorio '{path}'",
+                    documents_deleted=result.rowcount,
+                    files_total=None if on_disk else 0,
+                    files_deleted=0,
+                    started_at=datetime.now()
+                )
+                db.add(deletion_row)
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                if on_disk:
+                    await asyncio.to_thread(os.rename, trash_path, full_path)
+                raise
+            
+            deletion = deletion_status(deletion_row)
+            task = asyncio.create_task(self._remove_deleted_tree(deletion, trash_path if on_disk else None))
+            self._deletion_tasks[deletion_id] = task
+            
+            # Los directorios pequeños terminan antes de responder
+            await asyncio.wait([task], timeout=settings.DIRECTORY_DELETE_WAIT)
+            return deletion.model_copy()
             
-            return DirectoryInfo(
-                name=full_path.name,
-                path=str(safe_path),
-                files_count=files_count,
-                created_at=datetime.fromtimestamp(stat.st_ctime)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al eliminar directorio '{path}': {str(e)}"
             )
+    
+    async def get_deletion_status(self, db: AsyncSession, deletion_id: str) -> DirectoryDeletionStatus:
+        """
+        Obtiene el progreso de la eliminación de un directorio.
+        
+        El estado está en la base de datos, así que se conoce sea cual sea el
+        worker que inició la eliminación. Las terminadas se conservan una hora.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            deletion_id (str): Identificador devuelto al eliminar el directorio
+            
+        Returns:
+            DirectoryDeletionStatus: Estado de la eliminación
+            
+        Raises:
+            HTTPException: Si el identificador no corresponde a ninguna eliminación reciente
+        """
+        try:
+            deletion = await db.get(DirectoryDeletion, deletion_id)
+            if deletion is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Eliminación '{deletion_id}' no encontrada"
+                )
+            return deletion_status(deletion)
             
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(
                 status_code=400,
-                detail=f"Error al obtener información del directorio: {str(e)}"
+                detail=f"Error al obtener el estado de la eliminación: {str(e)}"
             )
     
+    async def _remove_deleted_tree(self, deletion: DirectoryDeletionStatus, trash_path: Optional[Path]) -> None:
+        """Elimina del disco un directorio ya movido a la papelera y guarda su progreso y estado."""
+        try:
+            if trash_path is not None:
+                removal = asyncio.ensure_future(asyncio.to_thread(remove_tree, trash_path, deletion))
+                while not removal.done():
+                    await asyncio.wait([removal], timeout=settings.DIRECTORY_DELETE_PROGRESS_INTERVAL)
+                    if not removal.done():
+                        await self._save_deletion(deletion)
+                removal.result()
+            deletion.status = "completed"
+            deletion.message = f"Directorio '{deletion.path}' y todo su contenido eliminado exitosamente"
+        except Exception as e:
+            deletion.status = "failed"
+            deletion.message = f"El directorio '{deletion.path}' se eliminó, pero quedaron archivos en la papelera"
+            deletion.error = str(e)
+        finally:
+            deletion.finished_at = datetime.now()
+            deletion.deleted_at = time.time()
+            await self._save_deletion(deletion)
+            self._deletion_tasks.pop(deletion.id, None)
+    
+    async def _save_deletion(self, deletion: DirectoryDeletionStatus) -> None:
+        """Guarda el progreso y el estado de una eliminación en ``directory_deletions``."""
+        try:
+            async with database.AsyncSessionLocal() as db:
+                await db.execute(
+                    update(DirectoryDeletion)
+                    .where(DirectoryDeletion.id == deletion.id)
+                    .values(
+                        status=deletion.status,
+                        message=deletion.message,
+                        files_total=deletion.files_total,
+                        files_deleted=deletion.files_deleted,
+                        error=deletion.error,
+                        finished_at=deletion.finished_at
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning("No se pudo guardar el estado de la eliminación %s: %s", deletion.id, e)
+    
     def _sanitize_path(self, path: str) -> Path:
         """
         Sanitiza una ruta para evitar ataques de path traversal.
@@ -200,13 +805,15 @@ class FileService:
         """Inicializa el servicio con la ruta base de uploads."""
         self.upload_path = get_upload_path()
     
-    async def upload_file(self, file: UploadFile, path: str) -> FileInfo:
+    async def upload_file(self, file: UploadFile, path: str, db: Optional[AsyncSession] = None) -> FileInfo:
         """
         Sube un archivo a un directorio específico.
         
         Args:
             file (UploadFile): Archivo a subir
             path (str): Ruta del directorio destino
+            db (Optional[AsyncSession]): Sesión de base de datos para actualizar
+                el índice de directorios
             
         Returns:
             FileInfo: Información del archivo subido
@@ -244,26 +851,33 @@ class FileService:
                     detail=f"El archivo '{safe_filename}' ya existe en el directorio"
                 )
             
-            # Guardar el archivo
-            content = await file.read()
-            
-            # Verificar tamaño del archivo
-            if len(content) > settings.MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"El archivo excede el tamaño máximo de {settings.MAX_FILE_SIZE} bytes"
-                )
-            
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(content)
+            # Guardar el archivo por bloques en un temporal y moverlo a su sitio
+            temp_path, file_size, _ = await stream_upload_to_temp(file, full_dir_path)
+            try:
+                if db is not None:
+                    await directory_index.add_files(db, [(file_path, file_size)])
+                promote_temp_file(temp_path, file_path)
+            except Exception as e:
+                temp_path.unlink(missing_ok=True)
+                if db is not None:
+                    await db.rollback()
+                if isinstance(e, FileExistsError):
+                    raise HTTPException(
+                        status_code=409,
+                        detail=f"El archivo '{safe_filename}' ya existe en el directorio"
+                    )
+                raise
             
+            if db is not None:
+                await db.commit()
+
             # Obtener información del archivo
             stat = file_path.stat()
-            
+
             return FileInfo(
                 name=safe_filename,
                 path=str(safe_path / safe_filename),
-                size=len(content),
+                size=file_size,
                 extension=file_path.suffix,
                 modified_at=datetime.fromtimestamp(stat.st_mtime)
             )
@@ -276,12 +890,24 @@ class FileService:
                 detail=f"Error al subir archivo: {str(e)}"
             )
     
-    async def list_files(self, path: str) -> List[FileInfo]:
+    async def list_files(
+        self,
+        path: str,
+        db: Optional[AsyncSession] = None,
+        sort: Optional[str] = None,
+        descending: bool = False
+    ) -> List[FileInfo]:
         """
         Lista todos los archivos en un directorio.
         
+        Con almacenamiento por contenido los documentos no existen en su ruta
+        visible, así que se añaden los registrados en la base de datos.
+        
         Args:
             path (str): Ruta del directorio
+            db (Optional[AsyncSession]): Sesión de base de datos de la petición
+            sort (Optional[str]): Orden ("name", "size" o "mtime"); sin él, el del directorio
+            descending (bool): Orden descendente
             
         Returns:
             List[FileInfo]: Lista de información de archivos
@@ -290,34 +916,16 @@ class FileService:
             HTTPException: Si hay un error al listar archivos
         """
         try:
-            safe_path = self._sanitize_path(path)
-            full_path = self.upload_path / safe_path
-            
-            if not full_path.exists():
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Directorio '{path}' no encontrado"
-                )
+            safe_path, full_path = self._resolve_directory(path)
             
-            if not full_path.is_dir():
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"'{path}' no es un directorio"
-                )
+            records = await asyncio.to_thread(lambda: list(scan_directory_files(full_path, with_stat=True)))
+            if db is not None:
+                records.extend(await self._stored_file_records(db, full_path))
             
-            files = []
-            for file_path in full_path.iterdir():
-                if file_path.is_file() and validate_file_extension(file_path.name):
-                    stat = file_path.stat()
-                    files.append(FileInfo(
-                        name=file_path.name,
-                        path=str(safe_path / file_path.name),
-                        size=stat.st_size,
-                        extension=file_path.suffix,
-                        modified_at=datetime.fromtimestamp(stat.st_mtime)
-                    ))
+            if sort:
+                records.sort(key=lambda record: file_sort_key(sort, record), reverse=descending)
             
-            return files
+            return [file_record_info(safe_path, record) for record in records]
             
         except HTTPException:
             raise
@@ -327,89 +935,350 @@ class FileService:
                 detail=f"Error al listar archivos: {str(e)}"
             )
     
-    async def get_file_path(self, path: str) -> Path:
+    async def list_files_page(
+        self,
+        path: str,
+        db: Optional[AsyncSession],
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: str = "name",
+        descending: bool = False
+    ) -> FilePage:
         """
-        Obtiene la ruta completa de un archivo.
+        Obtiene una página del listado de archivos de un directorio.
+        
+        El directorio se recorre con ``os.scandir`` sin guardar el listado
+        completo: solo se conservan los ``limit + 1`` primeros archivos
+        posteriores al cursor. Al ordenar por nombre, ``stat`` se llama
+        únicamente para los archivos de la página.
         
         Args:
-            path (str): Ruta del archivo (ej: "Documentos/archivo.pdf")
+            path (str): Ruta del directorio
+            db (Optional[AsyncSession]): Sesión de base de datos de la petición
+            limit (int): Archivos por página
+            cursor (Optional[str]): Cursor devuelto en la página anterior
+            sort (str): Orden ("name", "size" o "mtime")
+            descending (bool): Orden descendente
             
         Returns:
-            Path: Ruta completa del archivo
+            FilePage: Archivos de la página y cursor de la siguiente
             
         Raises:
-            HTTPException: Si el archivo no existe
+            HTTPException: Si el directorio o el cursor no son válidos
         """
         try:
-            print(f"🔍 Buscando archivo: {path}")
-            
-            # Obtener la ruta completa del archivo
-            # Separar el directorio del nombre del archivo
-            path_parts = Path(path).parts
-            if len(path_parts) < 2:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Ruta de archivo inválida: debe incluir directorio y nombre de archivo"
-                )
-            
-            # El último elemento es el nombre del archivo
-            filename = path_parts[-1]
-            # El resto es el directorio
-            directory_parts = path_parts[:-1]
-            directory_path = Path(*directory_parts)
-            
-            print(f"📁 Directorio: {directory_path}")
-            print(f"📄 Archivo: {filename}")
-            
-            # Sanitizar el directorio
-            safe_directory = self._sanitize_path(str(directory_path))
-            file_path = self.upload_path / safe_directory / filename
-            
-            print(f"📂 Ruta completa: {file_path}")
-            print(f"📂 Ruta absoluta: {file_path.absolute()}")
-            print(f"📂 Existe: {file_path.exists()}")
-            
-            if not file_path.exists():
-                print(f"❌ Archivo no encontrado: {file_path}")
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Archivo '{path}' no encontrado"
-                )
-            
-            if not file_path.is_file():
-                print(f"❌ No es un archivo: {file_path}")
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"'{path}' no es un archivo"
+            safe_path, full_path = self._resolve_directory(path)
+            after = decode_file_cursor(cursor, sort) if cursor else None
+            
+            def is_after(record) -> bool:
+                if after is None:
+                    return True
+                key = file_sort_key(sort, record)
+                return key < after if descending else key > after
+            
+            def select_page() -> list:
+                candidates = (
+                    record for record in scan_directory_files(full_path, with_stat=sort != "name")
+                    if is_after(record)
                 )
-            
-            print(f"✅ Archivo encontrado: {file_path}")
-            return file_path
+                select_first = heapq.nlargest if descending else heapq.nsmallest
+                return select_first(limit + 1, candidates, key=lambda record: file_sort_key(sort, record))
+            
+            records = await asyncio.to_thread(select_page)
+            if db is not None:
+                stored = await self._stored_file_records(db, full_path, sort, descending, after, limit + 1)
+                records = sorted(
+                    records + stored,
+                    key=lambda record: file_sort_key(sort, record),
+                    reverse=descending
+                )[:limit + 1]
+            
+            has_more = len(records) > limit
+            records = records[:limit]
+            
+            # Al ordenar por nombre el recorrido no llamó a stat
+            records = await asyncio.to_thread(complete_file_records, full_path, records)
+            
+            return FilePage(
+                items=[file_record_info(safe_path, record) for record in records],
+                limit=limit,
+                next_cursor=encode_file_cursor(file_sort_key(sort, records[-1])) if has_more and records else None,
+                has_more=has_more
+            )
             
         except HTTPException:
             raise
         except Exception as e:
-            print(f"❌ Error al obtener archivo '{path}': {str(e)}")
             raise HTTPException(
                 status_code=400,
-                detail=f"Error al obtener archivo: {str(e)}"
+                detail=f"Error al listar archivos: {str(e)}"
             )
     
-    def _sanitize_path(self, path: str) -> Path:
+    async def stream_files(
+        self,
+        path: str,
+        db: Optional[AsyncSession] = None,
+        sort: Optional[str] = None,
+        descending: bool = False
+    ) -> AsyncIterator[bytes]:
         """
-        Sanitiza una ruta para evitar ataques de path traversal.
+        Prepara el listado completo de un directorio como NDJSON (un FileInfo por línea).
+        
+        La ruta se valida antes de devolver el iterador, de modo que los
+        errores llegan como respuesta HTTP normal. Sin orden, los archivos se
+        envían en el orden del directorio a medida que se leen, en bloques de
+        ``FILES_STREAM_BATCH``; con orden, primero hay que recorrer el
+        directorio completo.
         
         Args:
-            path (str): Ruta a sanitizar
+            path (str): Ruta del directorio
+            db (Optional[AsyncSession]): Sesión de base de datos de la petición
+            sort (Optional[str]): Orden ("name", "size" o "mtime")
+            descending (bool): Orden descendente
             
         Returns:
-            Path: Ruta sanitizada
+            AsyncIterator[bytes]: Líneas NDJSON
             
         Raises:
-            HTTPException: Si la ruta es inválida
+            HTTPException: Si el directorio no existe o no es válido
         """
-        # Limpiar la ruta de caracteres peligrosos
-        clean_path = Path(path)
+        safe_path, full_path = self._resolve_directory(path)
+        batch_size = settings.FILES_STREAM_BATCH
+        
+        def encode(records) -> bytes:
+            return "".join(file_record_info(safe_path, record).model_dump_json() + "\n" for record in records).encode()
+        
+        async def sorted_lines():
+            records = await self.list_files(path, db, sort, descending)
+            for start in range(0, len(records), batch_size):
+                yield "".join(info.model_dump_json() + "\n" for info in records[start:start + batch_size]).encode()
+        
+        async def directory_order_lines():
+            files = scan_directory_files(full_path, with_stat=True)
+            try:
+                while True:
+                    batch = await asyncio.to_thread(lambda: list(islice(files, batch_size)))
+                    if not batch:
+                        break
+                    yield encode(batch)
+            finally:
+                files.close()
+            
+            if db is not None:
+                stored = await self._stored_file_records(db, full_path)
+                for start in range(0, len(stored), batch_size):
+                    yield encode(stored[start:start + batch_size])
+        
+        return sorted_lines() if sort else directory_order_lines()
+    
+    def _resolve_directory(self, path: str) -> Tuple[Path, Path]:
+        """
+        Valida la ruta de un directorio existente.
+        
+        Args:
+            path (str): Ruta del directorio
+            
+        Returns:
+            Tuple[Path, Path]: Ruta relativa sanitizada y ruta completa
+            
+        Raises:
+            HTTPException: Si el directorio no existe o no es un directorio
+        """
+        safe_path = self._sanitize_path(path)
+        full_path = self.upload_path / safe_path
+        
+        if not full_path.exists():
+            raise HTTPException(
+                status_code=404,
+                detail=f"Directorio '{path}' no encontrado"
+            )
+        
+        if not full_path.is_dir():
+            raise HTTPException(
+                status_code=400,
+                detail=f"'{path}' no es un directorio"
+            )
+        
+        return safe_path, full_path
+    
+    async def _stored_file_records(
+        self,
+        db: AsyncSession,
+        full_path: Path,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        after: Optional[tuple] = None,
+        limit: Optional[int] = None
+    ) -> List["FileRecord"]:
+        """
+        Obtiene los documentos de un directorio guardados por contenido.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            full_path (Path): Ruta completa del directorio
+            sort (Optional[str]): Orden ("name", "size" o "mtime")
+            descending (bool): Orden descendente
+            after (Optional[tuple]): Clave de orden del cursor
+            limit (Optional[int]): Número máximo de documentos
+            
+        Returns:
+            List[FileRecord]: Documentos cuyo archivo no está en su ruta visible
+        """
+        # Hijos directos del directorio: mismo prefijo y sin más separadores
+        prefix = directory_index.escape_like(str(full_path)) + "/"
+        query = (
+            select(Document.filename, Document.file_size, Document.upload_date)
+            .where(
+                Document.local_path.like(prefix + "%", escape="\\"),
+                Document.local_path.not_like(prefix + "%/%", escape="\\"),
+                Document.storage_key.like(f"{settings.BLOB_DIR}/%"),
+                Document.is_active == True  # noqa: E712
+            )
+        )
+        
+        if sort:
+            # Orden binario, como la comparación de cadenas de Python en el recorrido del disco
+            columns = [Document.filename.collate("C")]
+            if sort != "name":
+                columns.insert(0, Document.file_size if sort == "size" else Document.upload_date)
+            if after is not None:
+                # La clave de mtime se guarda como timestamp
+                bound = list(after)
+                if sort == "mtime":
+                    bound[0] = datetime.fromtimestamp(bound[0])
+                condition = tuple_(*columns) < tuple_(*bound) if descending else tuple_(*columns) > tuple_(*bound)
+                query = query.where(condition)
+            query = query.order_by(*(column.desc() if descending else column for column in columns))
+        
+        if limit is not None:
+            query = query.limit(limit)
+        
+        return [
+            FileRecord(row.filename, row.file_size, row.upload_date.timestamp())
+            for row in await db.execute(query)
+        ]
+    
+    def resolve_file_path(self, path: str) -> Path:
+        """
+        Calcula la ruta completa de un archivo sin acceder al disco.
+        
+        Args:
+            path (str): Ruta del archivo (ej: "Documentos/archivo.pdf")
+            
+        Returns:
+            Path: Ruta completa del archivo
+            
+        Raises:
+            HTTPException: Si la ruta no incluye directorio y nombre de archivo
+        """
+        # Separar el directorio del nombre del archivo
+        path_parts = Path(path).parts
+        if len(path_parts) < 2:
+            raise HTTPException(
+                status_code=400,
+                detail="Ruta de archivo inválida: debe incluir directorio y nombre de archivo"
+            )
+        
+        # El último elemento es el nombre del archivo y el resto el directorio
+        filename = path_parts[-1]
+        directory_path = Path(*path_parts[:-1])
+        
+        # Sanitizar el directorio
+        safe_directory = self._sanitize_path(str(directory_path))
+        return self.upload_path / safe_directory / filename
+    
+    async def get_file_path(self, path: str) -> Path:
+        """
+        Obtiene la ruta completa de un archivo.
+        
+        Args:
+            path (str): Ruta del archivo (ej: "Documentos/archivo.pdf")
+            
+        Returns:
+            Path: Ruta completa del archivo
+            
+        Raises:
+            HTTPException: Si el archivo no existe
+        """
+        try:
+            file_path = self.resolve_file_path(path)
+            
+            if not file_path.exists():
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Archivo '{path}' no encontrado"
+                )
+            
+            if not file_path.is_file():
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"'{path}' no es un archivo"
+                )
+            
+            return file_path
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al obtener archivo: {str(e)}"
+            )
+    
+    def open_file(self, file_path: Path, path: str) -> Tuple[int, os.stat_result]:
+        """
+        Abre un archivo para su descarga con una única llamada a ``fstat``.
+        
+        El llamador es responsable de cerrar el descriptor devuelto.
+        
+        Args:
+            file_path (Path): Ruta del archivo en disco
+            path (str): Ruta pedida por el cliente, para los mensajes de error
+            
+        Returns:
+            Tuple[int, os.stat_result]: Descriptor abierto y su stat
+            
+        Raises:
+            HTTPException: Si el archivo no existe, no es un archivo o no es legible
+        """
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Archivo '{path}' no encontrado en el servidor"
+            )
+        except PermissionError:
+            raise HTTPException(
+                status_code=403,
+                detail=f"No tienes permisos para acceder al archivo '{path}'"
+            )
+        
+        stat_result = os.fstat(fd)
+        if not S_ISREG(stat_result.st_mode):
+            os.close(fd)
+            raise HTTPException(
+                status_code=400,
+                detail=f"'{path}' no es un archivo válido"
+            )
+        
+        return fd, stat_result
+    
+    def _sanitize_path(self, path: str) -> Path:
+        """
+        Sanitiza una ruta para evitar ataques de path traversal.
+        
+        Args:
+            path (str): Ruta a sanitizar
+            
+        Returns:
+            Path: Ruta sanitizada
+            
+        Raises:
+            HTTPException: Si la ruta es inválida
+        """
+        # Limpiar la ruta de caracteres peligrosos
+        clean_path = Path(path)
         
         # Verificar que no contenga componentes peligrosos
         for part in clean_path.parts:
@@ -445,9 +1314,19 @@ class DocumentService:
     def __init__(self):
         """Inicializa el servicio con la ruta base de uploads."""
         self.upload_path = get_upload_path()
+        self.storage = get_storage()
+        
+        # Caché de tipos de documento, categorías y clientes
+        self.reference_cache = TTLCache(ttl=settings.REFERENCE_CACHE_TTL)
+        
+        # Estado en memoria de las sesiones de subida reanudable: hash
+        # incremental con los bytes que cubre y cerrojo dentro del proceso
+        self._session_hashers: Dict[str, Tuple["hashlib._Hash", int]] = {}
+        self._session_locks: Dict[str, asyncio.Lock] = {}
     
     async def upload_document_with_metadata(
-        self, 
+        self,
+        db: AsyncSession,
         file: UploadFile, 
         path: str, 
         document_type_id: int,
@@ -459,6 +1338,7 @@ class DocumentService:
         Sube un documento y lo registra en la base de datos con metadatos.
         
         Args:
+            db (AsyncSession): Sesión de base de datos de la petición
             file (UploadFile): Archivo a subir
             path (str): Ruta del directorio destino
             document_type_id (int): ID del tipo de documento
@@ -472,74 +1352,129 @@ class DocumentService:
         Raises:
             HTTPException: Si hay un error al subir el documento
         """
-        from .database import get_db
-        from .models.document import Document
-        from .models.document_type import DocumentType
-        from .models.category import Category
-        from .models.client import Client
-        from .pydantic_models import DocumentResponse
-        
         try:
-            # Validar el archivo
-            if not file.filename:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Nombre de archivo no válido"
-                )
-            
-            if not validate_file_extension(file.filename):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Solo se permiten archivos con extensiones: {settings.ALLOWED_EXTENSIONS}"
-                )
-            
-            # Crear el directorio si no existe
-            safe_path = self._sanitize_path(path)
-            full_dir_path = self.upload_path / safe_path
-            full_dir_path.mkdir(parents=True, exist_ok=True)
-            
-            # Generar nombre seguro para el archivo
-            safe_filename = get_safe_filename(file.filename)
-            file_path = full_dir_path / safe_filename
-            
-            # Verificar si el archivo ya existe
-            if file_path.exists():
-                raise HTTPException(
-                    status_code=409,
-                    detail=f"El archivo '{safe_filename}' ya existe en el directorio"
-                )
+            file_path = self._prepare_document_destination(file.filename, path)
             
-            # Leer el contenido del archivo
-            content = await file.read()
+            # Volcar el archivo a un temporal calculando tamaño y hash por bloques
+            temp_path, file_size, file_hash = await stream_upload_to_temp(file, file_path.parent)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al subir documento: {str(e)}"
+            )
+        
+        try:
+            return await self._register_document(
+                db=db,
+                temp_path=temp_path,
+                file_path=file_path,
+                file_hash=file_hash,
+                file_size=file_size,
+                document_type_id=document_type_id,
+                category_id=category_id,
+                client_id=client_id,
+                upload_date=upload_date
+            )
+        finally:
+            # Si el temporal no llegó a moverse (duplicado, metadatos inválidos...) se descarta
+            temp_path.unlink(missing_ok=True)
+    
+    def _prepare_document_destination(self, filename: Optional[str], path: str) -> Path:
+        """
+        Valida el nombre del archivo y prepara su ruta de destino.
+        
+        Args:
+            filename (Optional[str]): Nombre original del archivo
+            path (str): Ruta del directorio destino
             
-            # Verificar tamaño del archivo
-            if len(content) > settings.MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"El archivo excede el tamaño máximo de {settings.MAX_FILE_SIZE} bytes"
-                )
+        Returns:
+            Path: Ruta completa donde se guardará el archivo
             
-            # Generar hash del archivo
-            file_hash = Document.generate_file_hash_from_content(content)
+        Raises:
+            HTTPException: Si el nombre no es válido o el archivo ya existe
+        """
+        if not filename:
+            raise HTTPException(
+                status_code=400,
+                detail="Nombre de archivo no válido"
+            )
+        
+        if not validate_file_extension(filename):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Solo se permiten archivos con extensiones: {settings.ALLOWED_EXTENSIONS}"
+            )
+        
+        # Crear el directorio si no existe
+        safe_path = self._sanitize_path(path)
+        full_dir_path = self.upload_path / safe_path
+        full_dir_path.mkdir(parents=True, exist_ok=True)
+        
+        # Generar nombre seguro para el archivo
+        safe_filename = get_safe_filename(filename)
+        file_path = full_dir_path / safe_filename
+        
+        # Verificar si el archivo ya existe
+        if file_path.exists():
+            raise HTTPException(
+                status_code=409,
+                detail=f"El archivo '{safe_filename}' ya existe en el directorio"
+            )
+        
+        return file_path
+    
+    async def _register_document(
+        self,
+        db: AsyncSession,
+        temp_path: Path,
+        file_path: Path,
+        file_hash: str,
+        file_size: int,
+        document_type_id: int,
+        category_id: int,
+        client_id: Optional[int] = None,
+        upload_date: Optional[datetime] = None
+    ):
+        """
+        Registra en la base de datos un archivo ya volcado a disco.
+        
+        Valida los metadatos contra la caché de referencia e inserta el
+        registro con ``ON CONFLICT (file_hash) DO NOTHING RETURNING``, de modo
+        que la detección de duplicados y la inserción son un único viaje a la
+        base de datos. Después mueve el temporal a su ruta definitiva y confirma.
+        El temporal no se elimina aquí: es responsabilidad del llamador.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            temp_path (Path): Fichero temporal con el contenido completo
+            file_path (Path): Ruta definitiva del archivo
+            file_hash (str): Hash SHA-256 del contenido
+            file_size (int): Tamaño del archivo en bytes
+            document_type_id (int): ID del tipo de documento
+            category_id (int): ID de la categoría
+            client_id (Optional[int]): ID del cliente (opcional)
+            upload_date (Optional[datetime]): Fecha de subida (automática si no se especifica)
             
-            # Verificar si ya existe un documento con el mismo hash
-            db = next(get_db())
-            existing_document = db.query(Document).filter(Document.file_hash == file_hash).first()
-            if existing_document:
-                raise HTTPException(
-                    status_code=409,
-                    detail=f"Ya existe un documento con el mismo contenido (hash: {file_hash[:8]}...)"
-                )
+        Returns:
+            DocumentResponse: Información del documento creado
             
-            # Verificar que existan los tipos, categorías y cliente
-            document_type = db.query(DocumentType).filter(DocumentType.id == document_type_id).first()
+        Raises:
+            HTTPException: Si el documento está duplicado o los metadatos no son válidos
+        """
+        from .pydantic_models import DocumentResponse
+        
+        try:
+            # Validar los metadatos contra la caché, sin consultas en caliente
+            document_type = await self._lookup_reference(db, "document_types", document_type_id)
             if not document_type:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Tipo de documento con ID {document_type_id} no encontrado"
                 )
             
-            category = db.query(Category).filter(Category.id == category_id).first()
+            category = await self._lookup_reference(db, "categories", category_id)
             if not category:
                 raise HTTPException(
                     status_code=400,
@@ -548,32 +1483,96 @@ class DocumentService:
             
             client = None
             if client_id:
-                client = db.query(Client).filter(Client.id == client_id).first()
+                client = await self._lookup_reference(db, "clients", client_id)
                 if not client:
                     raise HTTPException(
                         status_code=400,
                         detail=f"Cliente con ID {client_id} no encontrado"
                     )
             
-            # Guardar el archivo
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(content)
+            # Sin archivo en la ruta visible, la comprobación de nombre repetido
+            # del directorio se hace en la base de datos
+            if not self.storage.materializes_paths:
+                existing_path = await db.scalar(
+                    select(Document.id)
+                    .where(Document.local_path == str(file_path), Document.is_active == True)  # noqa: E712
+                    .limit(1)
+                )
+                if existing_path:
+                    raise HTTPException(
+                        status_code=409,
+                        detail=f"El archivo '{file_path.name}' ya existe en el directorio"
+                    )
             
-            # Crear el registro en la base de datos
-            document = Document(
-                filename=safe_filename,
-                file_hash=file_hash,
-                document_type_id=document_type_id,
-                client_id=client_id,
-                category_id=category_id,
-                local_path=str(file_path),
-                file_size=len(content),
-                upload_date=upload_date or datetime.now()
+            # Insertar en una sola sentencia: el índice único de file_hash
+            # resuelve los duplicados y las claves foráneas garantizan que los
+            # metadatos siguen existiendo
+            upload_date = upload_date or datetime.now()
+            storage_key = self.storage.key_for(file_path, file_hash)
+            
+            # El blob no se puede eliminar hasta confirmar el registro que lo usa
+            await file_journal.lock_blobs(db, [storage_key])
+            statement = (
+                pg_insert(Document)
+                .values(
+                    filename=file_path.name,
+                    file_hash=file_hash,
+                    document_type_id=document_type_id,
+                    client_id=client_id,
+                    category_id=category_id,
+                    local_path=str(file_path),
+                    storage_key=storage_key,
+                    file_size=file_size,
+                    upload_date=upload_date
+                )
+                .on_conflict_do_nothing(
+                    index_elements=[Document.file_hash],
+                    index_where=Document.is_active == True  # noqa: E712
+                )
+                .returning(Document.id, Document.created_at)
             )
             
-            db.add(document)
-            db.commit()
-            db.refresh(document)
+            try:
+                inserted = (await db.execute(statement)).first()
+            except IntegrityError as e:
+                await db.rollback()
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Metadatos no válidos: el tipo, la categoría o el cliente ya no existen ({e.orig})"
+                )
+            
+            if inserted is None:
+                await db.rollback()
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Ya existe un documento con el mismo contenido (hash: {file_hash[:8]}...)"
+                )
+            
+            # Contadores del directorio en la misma transacción que el registro
+            await directory_index.add_files(db, [(file_path, file_size)])
+            
+            # Guardar el temporal en su ubicación definitiva antes de confirmar
+            created = False
+            try:
+                created = self.storage.store(temp_path, storage_key)
+                await db.commit()
+            except FileExistsError:
+                # Otra petición creó un archivo con el mismo nombre tras la comprobación
+                await db.rollback()
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"El archivo '{file_path.name}' ya existe en el directorio"
+                )
+            except Exception:
+                # Sin registro no debe quedar el archivo huérfano en disco
+                await db.rollback()
+                if created:
+                    await file_journal.discard(db, [storage_key])
+                raise
+            
+            # El texto y la miniatura se generan en segundo plano para no retrasar la respuesta
+            extraction_worker.enqueue(inserted.id)
+            thumbnail_service.enqueue(file_hash, physical_path(str(file_path), storage_key))
             
             # Obtener información relacionada para la respuesta
             document_type_name = document_type.name  # type: ignore
@@ -581,18 +1580,18 @@ class DocumentService:
             client_name = client.name if client else None  # type: ignore
             
             return DocumentResponse(
-                id=document.id,  # type: ignore
-                filename=document.filename,  # type: ignore
-                file_hash=document.file_hash,  # type: ignore
+                id=inserted.id,  # type: ignore
+                filename=file_path.name,  # type: ignore
+                file_hash=file_hash,  # type: ignore
                 document_type=document_type_name,  # type: ignore
                 client=client_name,  # type: ignore
                 category=category_name,  # type: ignore
-                local_path=document.local_path,  # type: ignore
-                file_size=document.file_size,  # type: ignore
-                upload_date=document.upload_date,  # type: ignore
-                created_at=document.created_at  # type: ignore
+                local_path=str(file_path),  # type: ignore
+                file_size=file_size,  # type: ignore
+                upload_date=upload_date,  # type: ignore
+                created_at=inserted.created_at  # type: ignore
             )
-            
+
         except HTTPException:
             raise
         except Exception as e:
@@ -601,20 +1600,833 @@ class DocumentService:
                 detail=f"Error al subir documento: {str(e)}"
             )
     
-    async def get_document_types(self):
+    async def upload_documents_batch(
+        self,
+        db: AsyncSession,
+        entries: List[Tuple[UploadFile, dict]]
+    ) -> BatchUploadResponse:
         """
-        Obtiene todos los tipos de documento disponibles.
+        Sube y registra varios documentos en una sola petición.
+        
+        Los archivos se vuelcan a disco y se hashean de forma concurrente
+        (hasta ``BATCH_UPLOAD_CONCURRENCY`` a la vez), los IDs de metadatos se
+        validan una sola vez por valor y todos los registros se insertan con
+        una única sentencia ``INSERT ... ON CONFLICT DO NOTHING RETURNING``.
+        Los errores de un archivo (duplicado, metadatos o nombre no válidos)
+        se informan en su resultado sin afectar al resto del lote.
         
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            entries (List[Tuple[UploadFile, dict]]): Archivo y metadatos de cada
+                documento ("path", "document_type_id", "category_id",
+                "client_id" y "upload_date")
+            
         Returns:
-            List[DocumentTypeResponse]: Lista de tipos de documento
+            BatchUploadResponse: Resultado de cada archivo en el orden recibido
+            
+        Raises:
+            HTTPException: Si falla el guardado o la confirmación del lote completo
         """
-        from .database import get_db
-        from .models.document_type import DocumentType
-        from .pydantic_models import DocumentTypeResponse
+        results: List[Optional[BatchUploadResult]] = [None] * len(entries)
         
-        try:
-            db = next(get_db())
-            document_types = db.query(DocumentType).all()
+        def fail(index: int, status_code: int, detail: str) -> None:
+            results[index] = BatchUploadResult(
+                index=index,
+                filename=entries[index][0].filename,
+                status="duplicate" if status_code == 409 else "error",
+                status_code=status_code,
+                detail=detail
+            )
+        
+        # Validar cada ID distinto una sola vez (desde la caché de referencia)
+        references: Dict[Tuple[str, int], Optional[BaseModel]] = {}
+        for _, metadata in entries:
+            for kind, field, _ in REFERENCE_FIELDS:
+                item_id = metadata.get(field)
+                if item_id and (kind, item_id) not in references:
+                    references[kind, item_id] = await self._lookup_reference(db, kind, item_id)
+        
+        semaphore = asyncio.Semaphore(settings.BATCH_UPLOAD_CONCURRENCY)
+        
+        async def stage(index: int, file: UploadFile, metadata: dict) -> Optional[dict]:
+            try:
+                for kind, field, not_found in REFERENCE_FIELDS:
+                    item_id = metadata.get(field)
+                    if item_id is None and field != "client_id":
+                        raise HTTPException(status_code=400, detail=f"Falta {field}")
+                    if item_id and references[kind, item_id] is None:
+                        raise HTTPException(status_code=400, detail=not_found.format(item_id))
+                if metadata.get("path") is None:
+                    raise HTTPException(status_code=400, detail="Falta el directorio destino (path)")
+                
+                file_path = self._prepare_document_destination(file.filename, metadata["path"])
+                async with semaphore:
+                    temp_path, file_size, file_hash = await stream_upload_to_temp(file, file_path.parent)
+                return {
+                    "index": index,
+                    "file_path": file_path,
+                    "temp_path": temp_path,
+                    "file_size": file_size,
+                    "file_hash": file_hash,
+                    "metadata": metadata
+                }
+            except HTTPException as e:
+                fail(index, e.status_code, e.detail)
+            except Exception as e:
+                fail(index, 400, f"Error al subir documento: {str(e)}")
+            return None
+        
+        staged = [
+            item for item in await asyncio.gather(*(
+                stage(index, file, metadata) for index, (file, metadata) in enumerate(entries)
+            ))
+            if item is not None
+        ]
+        
+        try:
+            # Duplicados dentro del propio lote: se queda el primero
+            seen_hashes: Dict[str, int] = {}
+            seen_paths: Dict[str, int] = {}
+            pending = []
+            for item in staged:
+                local_path = str(item["file_path"])
+                if item["file_hash"] in seen_hashes:
+                    fail(item["index"], 409, f"Mismo contenido que el archivo {seen_hashes[item['file_hash']]} del lote")
+                elif local_path in seen_paths:
+                    fail(item["index"], 409, f"Mismo nombre que el archivo {seen_paths[local_path]} del lote")
+                else:
+                    seen_hashes[item["file_hash"]] = seen_paths[local_path] = item["index"]
+                    pending.append(item)
+            
+            # Sin archivo en la ruta visible, los nombres repetidos se comprueban en la base de datos
+            if pending and not self.storage.materializes_paths:
+                existing = set(await db.scalars(
+                    select(Document.local_path).where(
+                        Document.local_path.in_(list(seen_paths)),
+                        Document.is_active == True  # noqa: E712
+                    )
+                ))
+                for item in [item for item in pending if str(item["file_path"]) in existing]:
+                    fail(item["index"], 409, f"El archivo '{item['file_path'].name}' ya existe en el directorio")
+                    pending.remove(item)
+            
+            if pending:
+                for result in await self._insert_batch(db, pending, references, fail):
+                    results[result.index] = result
+            
+            for index, result in enumerate(results):
+                if result is None:
+                    fail(index, 400, "Archivo no procesado")
+            
+            created = sum(1 for result in results if result.status == "created")
+            duplicates = sum(1 for result in results if result.status == "duplicate")
+            return BatchUploadResponse(
+                total=len(results),
+                created=created,
+                duplicates=duplicates,
+                failed=len(results) - created - duplicates,
+                results=results
+            )
+        finally:
+            # Los temporales que no llegaron a moverse se descartan
+            for item in staged:
+                item["temp_path"].unlink(missing_ok=True)
+    
+    async def _insert_batch(
+        self,
+        db: AsyncSession,
+        pending: List[dict],
+        references: Dict[Tuple[str, int], Optional[BaseModel]],
+        fail: Callable[[int, int, str], None]
+    ) -> List[BatchUploadResult]:
+        """
+        Inserta los documentos de un lote con una única sentencia y guarda sus archivos.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            pending (List[dict]): Archivos ya volcados a disco y validados
+            references (Dict[Tuple[str, int], Optional[BaseModel]]): Metadatos validados por (tipo, ID)
+            fail (Callable[[int, int, str], None]): Registra el error de un archivo del lote
+            
+        Returns:
+            List[BatchUploadResult]: Resultados de los documentos creados
+        """
+        from .pydantic_models import DocumentResponse
+        
+        now = datetime.now()
+        for item in pending:
+            item["upload_date"] = item["metadata"].get("upload_date") or now
+            item["storage_key"] = self.storage.key_for(item["file_path"], item["file_hash"])
+        
+        while True:
+            # Los blobs no se pueden eliminar hasta confirmar los registros que los usan
+            await file_journal.lock_blobs(db, (item["storage_key"] for item in pending))
+            statement = (
+                pg_insert(Document)
+                .values([
+                    {
+                        "filename": item["file_path"].name,
+                        "file_hash": item["file_hash"],
+                        "document_type_id": item["metadata"]["document_type_id"],
+                        "client_id": item["metadata"].get("client_id"),
+                        "category_id": item["metadata"]["category_id"],
+                        "local_path": str(item["file_path"]),
+                        "storage_key": item["storage_key"],
+                        "file_size": item["file_size"],
+                        "upload_date": item["upload_date"]
+                    }
+                    for item in pending
+                ])
+                .on_conflict_do_nothing(
+                    index_elements=[Document.file_hash],
+                    index_where=Document.is_active == True  # noqa: E712
+                )
+                .returning(Document.id, Document.file_hash, Document.created_at)
+            )
+            
+            try:
+                inserted = {row.file_hash: row for row in await db.execute(statement)}
+                break
+            except IntegrityError as e:
+                # Un tipo, categoría o cliente se eliminó tras la validación:
+                # se descartan solo los archivos que lo usan y se reintenta
+                await db.rollback()
+                pending = await self._drop_missing_references(db, pending, references, fail)
+                if pending is None:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Error al guardar el lote: {str(e.orig)}"
+                    )
+                if not pending:
+                    return []
+        
+        created = [item for item in pending if item["file_hash"] in inserted]
+        for item in pending:
+            if item["file_hash"] not in inserted:
+                fail(item["index"], 409, f"Ya existe un documento con el mismo contenido (hash: {item['file_hash'][:8]}...)")
+        
+        if not created:
+            await db.rollback()
+            return []
+        
+        # Guardar todos los archivos antes de confirmar; si uno falla no se registra ninguno
+        stored = []
+        try:
+            for item in list(created):
+                try:
+                    if self.storage.store(item["temp_path"], item["storage_key"]):
+                        stored.append(item["storage_key"])
+                except FileExistsError:
+                    # Otra petición creó un archivo con el mismo nombre tras la
+                    # comprobación: solo ese documento se descarta del lote
+                    await db.execute(delete(Document).where(Document.id == inserted[item["file_hash"]].id))
+                    fail(item["index"], 409, f"El archivo '{item['file_path'].name}' ya existe en el directorio")
+                    created.remove(item)
+            
+            await directory_index.add_files(db, [(item["file_path"], item["file_size"]) for item in created])
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            await file_journal.discard(db, stored)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al guardar el lote: {str(e)}"
+            )
+        
+        results = []
+        for item in created:
+            row = inserted[item["file_hash"]]
+            metadata = item["metadata"]
+            client = references.get(("clients", metadata.get("client_id")))
+            
+            # El texto y la miniatura se generan en segundo plano para no retrasar la respuesta
+            extraction_worker.enqueue(row.id)
+            thumbnail_service.enqueue(
+                item["file_hash"], physical_path(str(item["file_path"]), item["storage_key"])
+            )
+            
+            results.append(BatchUploadResult(
+                index=item["index"],
+                filename=item["file_path"].name,
+                status="created",
+                status_code=201,
+                document=DocumentResponse(
+                    id=row.id,
+                    filename=item["file_path"].name,
+                    file_hash=item["file_hash"],
+                    document_type=references["document_types", metadata["document_type_id"]].name,
+                    client=client.name if client else None,
+                    category=references["categories", metadata["category_id"]].name,
+                    local_path=str(item["file_path"]),
+                    file_size=item["file_size"],
+                    upload_date=item["upload_date"],
+                    created_at=row.created_at
+                )
+            ))
+        return results
+    
+    async def _drop_missing_references(
+        self,
+        db: AsyncSession,
+        pending: List[dict],
+        references: Dict[Tuple[str, int], Optional[BaseModel]],
+        fail: Callable[[int, int, str], None]
+    ) -> Optional[List[dict]]:
+        """
+        Vuelve a comprobar en la base de datos los metadatos de un lote tras un
+        error de integridad y descarta los archivos cuyas referencias ya no existen.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            pending (List[dict]): Archivos pendientes de insertar
+            references (Dict[Tuple[str, int], Optional[BaseModel]]): Metadatos validados por (tipo, ID)
+            fail (Callable[[int, int, str], None]): Registra el error de un archivo del lote
+            
+        Returns:
+            Optional[List[dict]]: Archivos que se pueden reintentar, o None si
+            todas las referencias existen y el error tiene otra causa
+        """
+        missing = set()
+        for kind, field, _ in REFERENCE_FIELDS:
+            ids = {item["metadata"][field] for item in pending if item["metadata"].get(field)}
+            if ids:
+                model = REFERENCE_MODELS[kind]
+                found = set(await db.scalars(select(model.id).where(model.id.in_(ids))))
+                missing.update((kind, item_id) for item_id in ids - found)
+        
+        if not missing:
+            return None
+        
+        for kind in {kind for kind, _ in missing}:
+            self.reference_cache.invalidate(kind)
+        
+        remaining = []
+        for item in pending:
+            not_found = next(
+                (message.format(item["metadata"][field]) for kind, field, message in REFERENCE_FIELDS
+                 if (kind, item["metadata"].get(field)) in missing),
+                None
+            )
+            if not_found:
+                fail(item["index"], 400, not_found)
+            else:
+                remaining.append(item)
+        for key in missing:
+            references[key] = None
+        return remaining
+    
+    async def list_documents(
+        self,
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        document_type_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        client_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ):
+        """
+        Lista los documentos activos, del más reciente al más antiguo.
+        
+        Usa paginación por cursor sobre (upload_date, id): cada página parte
+        del último documento de la anterior, de modo que el coste no crece con
+        el número de páginas recorridas y los índices ``idx_documents_*listing``
+        resuelven el orden y los filtros.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            limit (int): Número máximo de documentos (acotado a DOCUMENTS_MAX_PAGE_SIZE)
+            cursor (Optional[str]): Cursor devuelto por la página anterior
+            document_type_id (Optional[int]): Filtrar por tipo de documento
+            category_id (Optional[int]): Filtrar por categoría
+            client_id (Optional[int]): Filtrar por cliente
+            date_from (Optional[datetime]): Fecha de subida mínima (incluida)
+            date_to (Optional[datetime]): Fecha de subida máxima (excluida)
+            
+        Returns:
+            DocumentPage: Documentos de la página y cursor de la siguiente
+            
+        Raises:
+            HTTPException: Si el cursor no es válido o hay un error en la consulta
+        """
+        from .pydantic_models import DocumentListItem, DocumentPage
+        
+        try:
+            limit = max(1, min(limit, settings.DOCUMENTS_MAX_PAGE_SIZE))
+            view = documents_view.c
+            query = select(*LISTING_COLUMNS)
+            
+            query = self._filter_documents(
+                query, document_type_id, category_id, client_id, date_from, date_to
+            )
+            if cursor:
+                last_upload_date, last_id = decode_listing_cursor(cursor)
+                query = query.where(tuple_(view.upload_date, view.id) < tuple_(last_upload_date, last_id))
+            
+            # Se pide un documento de más para saber si hay página siguiente
+            query = query.order_by(view.upload_date.desc(), view.id.desc()).limit(limit + 1)
+            rows = (await db.execute(query)).all()
+            
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            
+            items = [DocumentListItem(**self._listing_fields(row)) for row in rows]
+            
+            next_cursor = None
+            if has_more:
+                next_cursor = encode_listing_cursor(rows[-1].upload_date, rows[-1].id)
+            
+            return DocumentPage(items=items, limit=limit, next_cursor=next_cursor, has_more=has_more)
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al listar documentos: {str(e)}"
+            )
+    
+    async def search_documents(
+        self,
+        db: AsyncSession,
+        q: str,
+        limit: int,
+        offset: int = 0,
+        document_type_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        client_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ):
+        """
+        Busca documentos por su nombre y su texto extraído.
+        
+        La consulta admite la sintaxis de ``websearch_to_tsquery`` (frases
+        entre comillas, ``OR`` y ``-palabra``). Los filtros se aplican en la
+        misma consulta que usa el índice GIN, los resultados se ordenan por
+        relevancia y los fragmentos resaltados solo se calculan para los
+        documentos de la página.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            q (str): Texto a buscar
+            limit (int): Número máximo de resultados (acotado a DOCUMENTS_MAX_PAGE_SIZE)
+            offset (int): Resultados a saltar
+            document_type_id (Optional[int]): Filtrar por tipo de documento
+            category_id (Optional[int]): Filtrar por categoría
+            client_id (Optional[int]): Filtrar por cliente
+            date_from (Optional[datetime]): Fecha de subida mínima (incluida)
+            date_to (Optional[datetime]): Fecha de subida máxima (excluida)
+            
+        Returns:
+            DocumentSearchPage: Resultados de la página
+            
+        Raises:
+            HTTPException: Si la búsqueda está vacía o hay un error en la consulta
+        """
+        from .pydantic_models import DocumentSearchResult, DocumentSearchPage
+        
+        try:
+            if not q.strip():
+                raise HTTPException(
+                    status_code=400,
+                    detail="El texto de búsqueda no puede estar vacío"
+                )
+            
+            limit = max(1, min(limit, settings.DOCUMENTS_MAX_PAGE_SIZE))
+            view = documents_view.c
+            config = cast(SEARCH_CONFIG, REGCONFIG)
+            ts_query = func.websearch_to_tsquery(config, q)
+            
+            # Página de resultados por relevancia, usando el índice GIN
+            rank = func.ts_rank_cd(view.search_vector, ts_query).label("rank")
+            matches = select(
+                *LISTING_COLUMNS, view.extracted_text, rank
+            ).where(view.search_vector.op("@@")(ts_query))
+            matches = self._filter_documents(
+                matches, document_type_id, category_id, client_id, date_from, date_to
+            )
+            matches = (
+                matches
+                .order_by(rank.desc(), view.id.desc())
+                .limit(limit + 1)
+                .offset(offset)
+                .subquery()
+            )
+            
+            # ts_headline es costoso: solo se calcula sobre la página
+            snippet = func.ts_headline(
+                config,
+                func.coalesce(matches.c.extracted_text, matches.c.filename),
+                ts_query,
+                "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=25, MinWords=8"
+            )
+            query = (
+                select(*[matches.c[column.name] for column in LISTING_COLUMNS], matches.c.rank, snippet.label("snippet"))
+                .order_by(matches.c.rank.desc(), matches.c.id.desc())
+            )
+            rows = (await db.execute(query)).all()
+            
+            has_more = len(rows) > limit
+            items = [
+                DocumentSearchResult(**self._listing_fields(row), rank=row.rank, snippet=row.snippet)
+                for row in rows[:limit]
+            ]
+            
+            return DocumentSearchPage(items=items, limit=limit, offset=offset, has_more=has_more)
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al buscar documentos: {str(e)}"
+            )
+    
+    def _filter_documents(
+        self,
+        query,
+        document_type_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        client_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ):
+        """
+        Aplica los filtros comunes del listado y la búsqueda sobre documents_view.
+        
+        Args:
+            query (Select): Consulta sobre documents_view
+            document_type_id (Optional[int]): Filtrar por tipo de documento
+            category_id (Optional[int]): Filtrar por categoría
+            client_id (Optional[int]): Filtrar por cliente
+            date_from (Optional[datetime]): Fecha de subida mínima (incluida)
+            date_to (Optional[datetime]): Fecha de subida máxima (excluida)
+            
+        Returns:
+            Select: Consulta con los filtros aplicados
+        """
+        view = documents_view.c
+        if document_type_id is not None:
+            query = query.where(view.document_type_id == document_type_id)
+        if category_id is not None:
+            query = query.where(view.category_id == category_id)
+        if client_id is not None:
+            query = query.where(view.client_id == client_id)
+        if date_from is not None:
+            query = query.where(view.upload_date >= date_from)
+        if date_to is not None:
+            query = query.where(view.upload_date < date_to)
+        return query
+    
+    def _listing_fields(self, row) -> dict:
+        """
+        Convierte una fila de LISTING_COLUMNS en los campos de DocumentListItem.
+        
+        Args:
+            row (Row): Fila de la consulta
+            
+        Returns:
+            dict: Campos del documento
+        """
+        return {
+            "id": row.id,
+            "filename": row.filename,
+            "file_hash": row.file_hash,
+            "document_type_id": row.document_type_id,
+            "document_type": row.document_type_name,
+            "category_id": row.category_id,
+            "category": row.category_name,
+            "client_id": row.client_id,
+            "client": row.client_name,
+            "local_path": row.local_path,
+            "file_size": row.file_size,
+            "upload_date": row.upload_date,
+            "created_at": row.created_at
+        }
+    
+    async def get_stored_file(self, db: AsyncSession, file_path: Path) -> Tuple[Path, Optional[str]]:
+        """
+        Obtiene dónde está en disco un archivo y su hash registrado.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            file_path (Path): Ruta visible completa del archivo
+            
+        Returns:
+            Tuple[Path, Optional[str]]: Ruta en disco y hash del documento (None
+                si el archivo no está registrado)
+        """
+        row = (await db.execute(
+            select(Document.file_hash, Document.storage_key)
+            .where(Document.local_path == str(file_path), Document.is_active == True)  # noqa: E712
+            .limit(1)
+        )).first()
+        
+        if row is None:
+            return file_path, None
+        return physical_path(str(file_path), row.storage_key), row.file_hash
+    
+    async def get_document_file(self, db: AsyncSession, document_id: int) -> Tuple[Path, str, str]:
+        """
+        Obtiene el archivo de un documento activo por su ID.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            document_id (int): ID del documento
+            
+        Returns:
+            Tuple[Path, str, str]: Ruta en disco, hash y nombre del archivo
+            
+        Raises:
+            HTTPException: Si el documento no existe
+        """
+        row = (await db.execute(
+            select(Document.filename, Document.file_hash, Document.local_path, Document.storage_key)
+            .where(Document.id == document_id, Document.is_active == True)  # noqa: E712
+        )).first()
+        
+        if row is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Documento {document_id} no encontrado"
+            )
+        return physical_path(row.local_path, row.storage_key), row.file_hash, row.filename
+    
+    async def get_extraction_status(self, db: AsyncSession, document_id: int):
+        """
+        Obtiene el estado de la extracción de texto de un documento.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            document_id (int): ID del documento
+            
+        Returns:
+            ExtractionStatusResponse: Estado de la extracción
+            
+        Raises:
+            HTTPException: Si el documento no existe
+        """
+        from .pydantic_models import ExtractionStatusResponse
+        
+        try:
+            row = (await db.execute(
+                select(
+                    Document.id,
+                    Document.extraction_status,
+                    Document.extraction_error,
+                    Document.extraction_pages,
+                    Document.extraction_total_pages,
+                    Document.extraction_truncated,
+                    func.length(Document.extracted_text).label("text_length")
+                ).where(Document.id == document_id)
+            )).first()
+            
+            if row is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Documento con ID {document_id} no encontrado"
+                )
+            
+            return ExtractionStatusResponse(
+                document_id=row.id,
+                status=row.extraction_status,
+                error=row.extraction_error,
+                text_length=row.text_length or 0,
+                pages=row.extraction_pages,
+                total_pages=row.extraction_total_pages,
+                truncated=row.extraction_truncated
+            )
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al obtener el estado de la extracción: {str(e)}"
+            )
+    
+    async def get_document_stats(self, db: AsyncSession):
+        """
+        Obtiene los totales de documentos activos por tipo, categoría, cliente y mes.
+        
+        Se leen de ``document_stats``, que los triggers de ``documents``
+        mantienen al día, y los nombres salen de la caché de datos de
+        referencia: la consulta no depende del número de documentos.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            
+        Returns:
+            DocumentStatsResponse: Totales generales y por dimensión
+        """
+        from .pydantic_models import DocumentStatsResponse, StatsBucket
+        
+        try:
+            rows = (await db.execute(
+                select(DocumentStat.dimension, DocumentStat.key, DocumentStat.documents, DocumentStat.total_bytes)
+                .where(DocumentStat.documents > 0)
+            )).all()
+            
+            names = {
+                "type": (await self.get_reference_data(db, "document_types"))["by_id"],
+                "category": (await self.get_reference_data(db, "categories"))["by_id"],
+                "client": (await self.get_reference_data(db, "clients"))["by_id"]
+            }
+            
+            buckets: Dict[str, List[StatsBucket]] = {dimension: [] for dimension in STAT_DIMENSIONS}
+            for row in rows:
+                if row.dimension not in buckets:
+                    continue
+                if row.dimension == "month":
+                    name = row.key
+                elif row.key == "":
+                    name = "Sin cliente"
+                else:
+                    item = names[row.dimension].get(int(row.key))
+                    name = item.name if item is not None else f"#{row.key}"
+                buckets[row.dimension].append(StatsBucket(
+                    key=row.key, name=name, documents=row.documents, total_bytes=row.total_bytes
+                ))
+            
+            for dimension, items in buckets.items():
+                if dimension == "month":
+                    items.sort(key=lambda bucket: bucket.key)
+                else:
+                    items.sort(key=lambda bucket: (-bucket.documents, bucket.name))
+            
+            # Todo documento tiene tipo: la suma por tipo es el total general
+            total_documents = sum(bucket.documents for bucket in buckets["type"])
+            total_bytes = sum(bucket.total_bytes for bucket in buckets["type"])
+            
+            return DocumentStatsResponse(
+                total_documents=total_documents,
+                total_size_bytes=total_bytes,
+                avg_file_size=round(total_bytes / total_documents, 2) if total_documents else 0.0,
+                by_type=buckets["type"],
+                by_category=buckets["category"],
+                by_client=buckets["client"],
+                by_month=buckets["month"]
+            )
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al obtener las estadísticas: {str(e)}"
+            )
+    
+    async def get_reference_data(self, db: AsyncSession, kind: str) -> dict:
+        """
+        Obtiene un conjunto de datos de referencia desde la caché.
+        
+        Los tipos de documento, categorías y clientes se consultan en cada
+        apertura del formulario de subida y en cada subida, pero cambian muy
+        poco. Se cachean durante ``REFERENCE_CACHE_TTL`` segundos y se
+        invalidan al crearlos, modificarlos o eliminarlos.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            kind (str): "document_types", "categories" o "clients"
+            
+        Returns:
+            dict: Lista de elementos ("items"), índice por ID ("by_id") y
+                ETag del contenido ("etag")
+        """
+        loaders = {
+            "document_types": self._load_document_types,
+            "categories": self._load_categories,
+            "clients": self._load_clients
+        }
+        
+        async def load():
+            items = await loaders[kind](db)
+            payload = json.dumps([item.model_dump(mode="json") for item in items], sort_keys=True)
+            return {
+                "items": items,
+                "by_id": {item.id: item for item in items},
+                "etag": f'"{hashlib.sha256(payload.encode()).hexdigest()[:32]}"'
+            }
+        
+        return await self.reference_cache.get_or_load(kind, load)
+    
+    async def _lookup_reference(self, db: AsyncSession, kind: str, item_id: int):
+        """
+        Busca un tipo de documento, categoría o cliente por ID usando la caché.
+        
+        Si el ID no está en la caché se comprueba en la base de datos, por si
+        se creó en otro proceso después de cargarla.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            kind (str): "document_types", "categories" o "clients"
+            item_id (int): ID a buscar
+            
+        Returns:
+            Optional[BaseModel]: Elemento encontrado o None si no existe
+        """
+        reference = await self.get_reference_data(db, kind)
+        item = reference["by_id"].get(item_id)
+        
+        if item is None and await db.get(REFERENCE_MODELS[kind], item_id) is not None:
+            self.reference_cache.invalidate(kind)
+            item = (await self.get_reference_data(db, kind))["by_id"].get(item_id)
+        
+        return item
+    
+    async def get_document_types(self, db: AsyncSession):
+        """
+        Obtiene todos los tipos de documento disponibles.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            
+        Returns:
+            List[DocumentTypeResponse]: Lista de tipos de documento
+        """
+        return (await self.get_reference_data(db, "document_types"))["items"]
+    
+    async def get_clients(self, db: AsyncSession):
+        """
+        Obtiene todos los clientes disponibles.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            
+        Returns:
+            List[ClientResponse]: Lista de clientes
+        """
+        return (await self.get_reference_data(db, "clients"))["items"]
+    
+    async def get_categories(self, db: AsyncSession):
+        """
+        Obtiene todas las categorías disponibles.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            
+        Returns:
+            List[CategoryResponse]: Lista de categorías
+        """
+        return (await self.get_reference_data(db, "categories"))["items"]
+    
+    async def _load_document_types(self, db: AsyncSession):
+        """
+        Consulta en la base de datos todos los tipos de documento.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            
+        Returns:
+            List[DocumentTypeResponse]: Lista de tipos de documento
+        """
+        from .models.document_type import DocumentType
+        from .pydantic_models import DocumentTypeResponse
+        
+        try:
+            document_types = (await db.scalars(select(DocumentType))).all()
             
             return [
                 DocumentTypeResponse(
@@ -631,20 +2443,21 @@ class DocumentService:
                 detail=f"Error al obtener tipos de documento: {str(e)}"
             )
     
-    async def get_clients(self):
+    async def _load_clients(self, db: AsyncSession):
         """
-        Obtiene todos los clientes disponibles.
+        Consulta en la base de datos todos los clientes.
         
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            
         Returns:
             List[ClientResponse]: Lista de clientes
         """
-        from .database import get_db
         from .models.client import Client
         from .pydantic_models import ClientResponse
         
         try:
-            db = next(get_db())
-            clients = db.query(Client).all()
+            clients = (await db.scalars(select(Client))).all()
             
             return [
                 ClientResponse(
@@ -656,128 +2469,627 @@ class DocumentService:
                 for c in clients
             ]
             
-        except Exception as e:
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al obtener clientes: {str(e)}"
+            )
+    
+    async def _load_categories(self, db: AsyncSession):
+        """
+        Consulta en la base de datos todas las categorías.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            
+        Returns:
+            List[CategoryResponse]: Lista de categorías
+        """
+        from .models.category import Category
+        from .pydantic_models import CategoryResponse
+        
+        try:
+            categories = (await db.scalars(select(Category))).all()
+            
+            return [
+                CategoryResponse(
+                    id=c.id,  # type: ignore
+                    name=c.name,  # type: ignore
+                    description=c.description  # type: ignore
+                )
+                for c in categories
+            ]
+            
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al obtener categorías: {str(e)}"
+            )
+    
+    async def delete_document(self, db: AsyncSession, path: str):
+        """
+        Elimina un documento.
+        
+        Los documentos registrados se marcan como eliminados y su archivo sale
+        de la ruta visible; se pueden restaurar durante ``DELETED_RETENTION_DAYS``
+        días, tras los cuales el recolector los purga. Los archivos no
+        registrados se eliminan directamente.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            path (str): Ruta del archivo a eliminar (ej: "Documentos/archivo.pdf")
+            
+        Returns:
+            dict: Información del documento eliminado
+            
+        Raises:
+            HTTPException: Si el documento no existe o hay un error
+        """
+        try:
+            # Obtener la ruta completa del archivo
+            # Separar el directorio del nombre del archivo
+            path_parts = Path(path).parts
+            if len(path_parts) < 2:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Ruta de archivo inválida: debe incluir directorio y nombre de archivo"
+                )
+            
+            # El último elemento es el nombre del archivo
+            filename = path_parts[-1]
+            # El resto es el directorio
+            directory_parts = path_parts[:-1]
+            directory_path = Path(*directory_parts)
+            
+            # Sanitizar el directorio
+            safe_directory = self._sanitize_path(str(directory_path))
+            file_path = self.upload_path / safe_directory / filename
+            
+            # Buscar el documento en la base de datos por la ruta local
+            document = await db.scalar(
+                select(Document).where(Document.local_path == str(file_path), Document.is_active == True)  # noqa: E712
+            )
+            
+            if not document:
+                # Verificar que el archivo existe
+                if not file_path.exists():
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"Archivo '{path}' no encontrado"
+                    )
+                
+                # Si no está en la base de datos, solo eliminar el archivo
+                file_size = file_path.stat().st_size
+                file_path.unlink()
+                # El índice solo cuenta los archivos con extensión permitida
+                if validate_file_extension(filename):
+                    await directory_index.remove_files(db, [(file_path, file_size)])
+                    await db.commit()
+                return {
+                    "message": f"Archivo '{path}' eliminado del sistema de archivos (no estaba registrado en la base de datos)",
+                    "deleted_at": time.time(),
+                    "from_database": False
+                }
+            
+            # Obtener información del documento antes de eliminarlo
+            document_info = {
+                "id": document.id,  # type: ignore
+                "filename": document.filename,  # type: ignore
+                "file_hash": document.file_hash,  # type: ignore
+                "local_path": document.local_path,  # type: ignore
+                "file_size": document.file_size,  # type: ignore
+                "upload_date": document.upload_date  # type: ignore
+            }
+            
+            # Marcar como eliminado; el archivo se aparta después de confirmar
+            _, operations = await self._soft_delete(db, Document.id == document.id)
+            await db.commit()
+            await file_journal.apply(db, operations)
+            
+            return {
+                "message": f"Documento '{path}' eliminado exitosamente (se puede restaurar durante {settings.DELETED_RETENTION_DAYS} días)",
+                "deleted_at": time.time(),
+                "from_database": True,
+                "document_info": document_info
+            }
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al eliminar documento: {str(e)}"
+            )
+    
+    async def delete_document_by_id(self, db: AsyncSession, document_id: int) -> dict:
+        """
+        Elimina un documento por su ID.
+        
+        Va directamente a la clave primaria: una sola sentencia marca el
+        documento como eliminado, sin resolver la ruta ni acceder al disco
+        antes de confirmar.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            document_id (int): ID del documento
+            
+        Returns:
+            dict: Información del documento eliminado
+            
+        Raises:
+            HTTPException: Si el documento no existe o hay un error
+        """
+        try:
+            rows, operations = await self._soft_delete(db, Document.id == document_id)
+            if not rows:
+                await db.rollback()
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Documento {document_id} no encontrado"
+                )
+            await db.commit()
+            await file_journal.apply(db, operations)
+            
+            row = rows[0]
+            return {
+                "message": f"Documento {document_id} eliminado exitosamente (se puede restaurar durante {settings.DELETED_RETENTION_DAYS} días)",
+                "deleted_at": time.time(),
+                "from_database": True,
+                "document_info": {
+                    "id": row.id,
+                    "filename": row.filename,
+                    "file_hash": row.file_hash,
+                    "local_path": row.local_path,
+                    "file_size": row.file_size,
+                    "upload_date": row.upload_date
+                }
+            }
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al eliminar documento: {str(e)}"
+            )
+    
+    async def _soft_delete(self, db: AsyncSession, condition) -> Tuple[list, List[tuple]]:
+        """
+        Marca como eliminados los documentos activos que cumplen una condición.
+        
+        Un único ``UPDATE ... RETURNING`` desactiva los documentos y cambia su
+        clave a la papelera; los renombrados pendientes se registran en la
+        misma transacción. No confirma: el llamador confirma y después aplica
+        las operaciones devueltas con ``file_journal.apply``.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos
+            condition: Condición SQLAlchemy sobre ``Document``
+            
+        Returns:
+            Tuple[list, List[tuple]]: Documentos eliminados (id, filename,
+                file_hash, local_path, storage_key, file_size, upload_date) y
+                operaciones de archivo registradas
+        """
+        rows = (await db.execute(
+            update(Document)
+            .where(condition, Document.is_active == True)  # noqa: E712
+            .values(is_active=False, deleted_at=func.now(), storage_key=trashed_storage_key())
+            .returning(
+                Document.id, Document.filename, Document.file_hash, Document.local_path,
+                Document.storage_key, Document.file_size, Document.upload_date
+            )
+            .execution_options(synchronize_session=False)
+        )).all()
+        
+        # En el almacenamiento local la clave anterior es la propia ruta visible
+        moves = []
+        for row in rows:
+            source_key = file_journal.storage_key_of(row.local_path, None)
+            if source_key is not None and not is_blob_key(row.storage_key):
+                moves.append((file_journal.OPERATION_MOVE, source_key, row.storage_key))
+        operations = await file_journal.record(db, moves)
+        await directory_index.remove_files(db, [(Path(row.local_path), row.file_size) for row in rows])
+        return rows, operations
+    
+    async def restore_document(self, db: AsyncSession, document_id: int):
+        """
+        Restaura un documento eliminado que aún no ha purgado el recolector.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            document_id (int): ID del documento
+            
+        Returns:
+            DocumentResponse: Documento restaurado
+            
+        Raises:
+            HTTPException: Si el documento no existe, no está eliminado, su
+                ruta o contenido ya están en uso o su archivo ya no existe
+        """
+        from .pydantic_models import DocumentResponse
+        
+        try:
+            # Bloquear el blob antes que la fila (ver file_journal): el
+            # recolector no puede eliminarlo mientras se restaura, y si ya
+            # purgó el documento la fila no existe
+            await file_journal.lock_blobs(db, [
+                await db.scalar(select(Document.storage_key).where(Document.id == document_id))
+            ])
+            document = await db.scalar(
+                select(Document).where(Document.id == document_id).with_for_update()
+            )
+            if document is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Documento {document_id} no encontrado"
+                )
+            if document.is_active:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"El documento {document_id} no está eliminado"
+                )
+            
+            # Otro documento activo puede ocupar ya su ruta o su contenido
+            taken = await db.scalar(
+                select(Document.id).where(
+                    (Document.local_path == document.local_path) | (Document.file_hash == document.file_hash),
+                    Document.is_active == True  # noqa: E712
+                ).limit(1)
+            )
+            file_path = Path(document.local_path)
+            if taken or (self.storage.materializes_paths and await asyncio.to_thread(file_path.exists)):
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Ya existe otro documento en '{file_path.name}' o con el mismo contenido"
+                )
+            
+            trash_key = document.storage_key
+            if not await asyncio.to_thread(self.storage.path(trash_key).exists):
+                raise HTTPException(
+                    status_code=410,
+                    detail=f"El archivo del documento {document_id} ya no existe"
+                )
+            
+            # Los blobs no se movieron; el resto vuelve a su ruta visible
+            storage_key = trash_key if is_blob_key(trash_key) else file_journal.storage_key_of(document.local_path, None)
+            document.is_active = True
+            document.deleted_at = None
+            document.storage_key = storage_key
+            await directory_index.add_files(db, [(file_path, document.file_size)])
+            root = self.storage.root
+            if storage_key != trash_key:
+                await asyncio.to_thread(file_journal.apply_one, root, file_journal.OPERATION_MOVE, trash_key, storage_key)
+            try:
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                if storage_key != trash_key:
+                    await asyncio.to_thread(file_journal.apply_one, root, file_journal.OPERATION_MOVE, storage_key, trash_key)
+                raise
+            
+            row = (await db.execute(
+                select(documents_view.c.document_type_name, documents_view.c.client_name, documents_view.c.category_name)
+                .where(documents_view.c.id == document_id)
+            )).one()
+            return DocumentResponse(
+                id=document.id,
+                filename=document.filename,
+                file_hash=document.file_hash,
+                document_type=row.document_type_name,
+                client=row.client_name,
+                category=row.category_name,
+                local_path=document.local_path,
+                file_size=document.file_size,
+                upload_date=document.upload_date,
+                created_at=document.created_at
+            )
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al restaurar documento: {str(e)}"
+            )
+    
+    async def _bulk_batches(
+        self,
+        db: AsyncSession,
+        ids: Optional[List[int]],
+        prefix_path: Optional[Path]
+    ) -> AsyncIterator[List[int]]:
+        """
+        Reparte los documentos de una operación masiva en lotes de ``BULK_BATCH_SIZE``.
+        
+        Con prefijo se recorre por ID (keyset), así que los documentos que
+        cambian durante la operación no se procesan dos veces.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            ids (Optional[List[int]]): IDs indicados por el cliente
+            prefix_path (Optional[Path]): Directorio cuyo subárbol se procesa
+            
+        Returns:
+            AsyncIterator[List[int]]: IDs de cada lote
+        """
+        batch_size = settings.BULK_BATCH_SIZE
+        if ids is not None:
+            unique_ids = sorted(set(ids))
+            for start in range(0, len(unique_ids), batch_size):
+                yield unique_ids[start:start + batch_size]
+            return
+        
+        pattern = directory_index.escape_like(str(prefix_path)) + "/%"
+        last_id = 0
+        while True:
+            batch = list(await db.scalars(
+                select(Document.id)
+                .where(
+                    Document.local_path.like(pattern, escape="\\"),
+                    Document.is_active == True,  # noqa: E712
+                    Document.id > last_id
+                )
+                .order_by(Document.id)
+                .limit(batch_size)
+            ))
+            if not batch:
+                return
+            last_id = batch[-1]
+            yield batch
+    
+    def _bulk_target(self, ids: Optional[List[int]], prefix: Optional[str]) -> Optional[Path]:
+        """
+        Valida la selección de una operación masiva: lista de IDs o prefijo, no ambos.
+        
+        Args:
+            ids (Optional[List[int]]): IDs de documentos
+            prefix (Optional[str]): Directorio cuyo subárbol se procesa
+            
+        Returns:
+            Optional[Path]: Ruta completa del prefijo (None si se usan IDs)
+            
+        Raises:
+            HTTPException: Si la selección no es válida
+        """
+        if (ids is None) == (prefix is None):
+            raise HTTPException(
+                status_code=400,
+                detail="Indique una lista de IDs (ids) o un directorio (prefix), pero no ambos"
+            )
+        
+        if ids is not None:
+            if len(ids) > settings.BULK_MAX_IDS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Se permiten como máximo {settings.BULK_MAX_IDS} IDs por petición"
+                )
+            return None
+        
+        return self._bulk_directory(prefix, "El prefijo")
+    
+    def _bulk_directory(self, path: str, role: str) -> Path:
+        """
+        Valida el directorio de una operación masiva (prefijo o destino).
+        
+        Las rutas de descarga y eliminación necesitan un directorio, y los
+        directorios ocultos son del sistema (blobs, papelera, subidas).
+        
+        Args:
+            path (str): Ruta del directorio
+            role (str): Nombre del parámetro en los mensajes de error
+            
+        Returns:
+            Path: Ruta completa del directorio
+            
+        Raises:
+            HTTPException: Si la ruta es la raíz o un directorio oculto
+        """
+        key = directory_index.directory_key(self._sanitize_path(path))
+        if key is None:
             raise HTTPException(
                 status_code=400,
-                detail=f"Error al obtener clientes: {str(e)}"
+                detail=f"{role} debe ser un directorio, no la raíz"
             )
+        if directory_index.is_hidden(key):
+            raise HTTPException(
+                status_code=400,
+                detail=f"{role} no puede ser un directorio oculto"
+            )
+        return self.upload_path / key
     
-    async def get_categories(self):
+    async def bulk_delete_documents(
+        self,
+        db: AsyncSession,
+        ids: Optional[List[int]] = None,
+        prefix: Optional[str] = None
+    ) -> BulkOperationResponse:
         """
-        Obtiene todas las categorías disponibles.
+        Elimina varios documentos por ID o todos los de un directorio y sus subdirectorios.
         
+        Cada lote es una transacción con un único ``UPDATE ... RETURNING`` que
+        marca los documentos como eliminados y registra a la vez el traslado
+        de cada archivo a la papelera. Después de confirmar, los archivos se
+        mueven en paralelo; si algo falla o el proceso se detiene, el registro
+        se vuelve a aplicar al arrancar. Los documentos se pueden restaurar
+        hasta que los purga el recolector.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            ids (Optional[List[int]]): IDs de los documentos
+            prefix (Optional[str]): Directorio a vaciar de documentos (ej: "Clientes/ACME")
+            
         Returns:
-            List[CategoryResponse]: Lista de categorías
+            BulkOperationResponse: Documentos eliminados y operaciones pendientes
+            
+        Raises:
+            HTTPException: Si la selección no es válida o hay un error
         """
-        from .database import get_db
-        from .models.category import Category
-        from .pydantic_models import CategoryResponse
-        
         try:
-            db = next(get_db())
-            categories = db.query(Category).all()
-            
-            return [
-                CategoryResponse(
-                    id=c.id,  # type: ignore
-                    name=c.name,  # type: ignore
-                    description=c.description  # type: ignore
-                )
-                for c in categories
-            ]
+            prefix_path = self._bulk_target(ids, prefix)
+            processed: List[int] = []
+            files_pending = 0
+            
+            async for batch in self._bulk_batches(db, ids, prefix_path):
+                rows, operations = await self._soft_delete(db, Document.id.in_(batch))
+                await db.commit()
+                
+                processed.extend(row.id for row in rows)
+                files_pending += await file_journal.apply(db, operations)
+            
+            return BulkOperationResponse(
+                matched=len(processed),
+                processed=processed,
+                not_found=sorted(set(ids) - set(processed)) if ids is not None else [],
+                files_pending=files_pending
+            )
             
+        except HTTPException:
+            raise
         except Exception as e:
+            await db.rollback()
             raise HTTPException(
                 status_code=400,
-                detail=f"Error al obtener categorías: {str(e)}"
+                detail=f"Error al eliminar documentos: {str(e)}"
             )
     
-    async def delete_document(self, path: str):
+    async def bulk_move_documents(
+        self,
+        db: AsyncSession,
+        destination: str,
+        ids: Optional[List[int]] = None,
+        prefix: Optional[str] = None
+    ) -> BulkOperationResponse:
         """
-        Elimina un documento tanto del sistema de archivos como de la base de datos.
+        Mueve varios documentos por ID, o un directorio completo, a otro directorio.
+        
+        Con IDs cada documento pasa a ``destination/<nombre>``; con prefijo se
+        conserva la estructura de subdirectorios bajo ``destination``. Cada
+        lote actualiza las rutas con una única sentencia y registra los
+        renombrados pendientes en la misma transacción; después se renombran
+        los archivos en paralelo. Con almacenamiento por contenido solo
+        cambia la base de datos.
         
         Args:
-            path (str): Ruta del archivo a eliminar (ej: "Documentos/archivo.pdf")
+            db (AsyncSession): Sesión de base de datos de la petición
+            destination (str): Directorio destino (ni la raíz ni un directorio oculto)
+            ids (Optional[List[int]]): IDs de los documentos
+            prefix (Optional[str]): Directorio cuyo contenido se mueve
             
         Returns:
-            dict: Información del documento eliminado
+            BulkOperationResponse: Documentos movidos, conflictos y operaciones pendientes
             
         Raises:
-            HTTPException: Si el documento no existe o hay un error
+            HTTPException: Si la selección o el destino no son válidos o hay un error
         """
-        from .database import get_db
-        from .models.document import Document
-        
         try:
-            # Obtener la ruta completa del archivo
-            # Separar el directorio del nombre del archivo
-            path_parts = Path(path).parts
-            if len(path_parts) < 2:
+            prefix_path = self._bulk_target(ids, prefix)
+            destination_path = self._bulk_directory(destination, "El destino")
+            if prefix_path is not None and (destination_path == prefix_path or prefix_path in destination_path.parents):
                 raise HTTPException(
                     status_code=400,
-                    detail="Ruta de archivo inválida: debe incluir directorio y nombre de archivo"
+                    detail="No se puede mover un directorio dentro de sí mismo"
                 )
             
-            # El último elemento es el nombre del archivo
-            filename = path_parts[-1]
-            # El resto es el directorio
-            directory_parts = path_parts[:-1]
-            directory_path = Path(*directory_parts)
-            
-            # Sanitizar el directorio
-            safe_directory = self._sanitize_path(str(directory_path))
-            file_path = self.upload_path / safe_directory / filename
-            
-            # Verificar que el archivo existe
-            if not file_path.exists():
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Archivo '{path}' no encontrado"
+            table = Document.__table__
+            
+            processed: List[int] = []
+            conflicts: List[BulkConflict] = []
+            files_pending = 0
+            
+            async for batch in self._bulk_batches(db, ids, prefix_path):
+                rows = (await db.execute(
+                    select(Document.id, Document.local_path, Document.storage_key, Document.file_size)
+                    .where(Document.id.in_(batch), Document.is_active == True)  # noqa: E712
+                    .order_by(Document.id)
+                )).all()
+                
+                # Calcular el destino de cada documento
+                targets = {}
+                for row in rows:
+                    source = Path(row.local_path)
+                    if prefix_path is not None:
+                        targets[row.id] = destination_path / source.relative_to(prefix_path)
+                    else:
+                        targets[row.id] = destination_path / source.name
+                
+                # Conflictos: destinos repetidos en el lote, ya registrados o ya en disco
+                taken = set(await db.scalars(
+                    select(Document.local_path).where(
+                        Document.local_path.in_([str(path) for path in targets.values()]),
+                        Document.is_active == True  # noqa: E712
+                    )
+                ))
+                on_disk = await asyncio.to_thread(
+                    lambda: {str(path) for path in targets.values() if path.exists()}
                 )
-            
-            # Buscar el documento en la base de datos por la ruta local
-            db = next(get_db())
-            document = db.query(Document).filter(Document.local_path == str(file_path)).first()
-            
-            if not document:
-                # Si no está en la base de datos, solo eliminar el archivo
-                file_path.unlink()
-                return {
-                    "message": f"Archivo '{path}' eliminado del sistema de archivos (no estaba registrado en la base de datos)",
-                    "deleted_at": time.time(),
-                    "from_database": False
-                }
-            
-            # Obtener información del documento antes de eliminarlo
-            document_info = {
-                "id": document.id,  # type: ignore
-                "filename": document.filename,  # type: ignore
-                "file_hash": document.file_hash,  # type: ignore
-                "local_path": document.local_path,  # type: ignore
-                "file_size": document.file_size,  # type: ignore
-                "upload_date": document.upload_date  # type: ignore
-            }
-            
-            # Eliminar el registro de la base de datos
-            db.delete(document)
-            db.commit()
-            
-            # Eliminar el archivo del sistema de archivos
-            file_path.unlink()
-            
-            return {
-                "message": f"Documento '{path}' eliminado exitosamente del sistema de archivos y la base de datos",
-                "deleted_at": time.time(),
-                "from_database": True,
-                "document_info": document_info
-            }
+                moves = []
+                claimed = set()
+                for row in rows:
+                    target = str(targets[row.id])
+                    if target == row.local_path:
+                        processed.append(row.id)
+                        continue
+                    if target in claimed or target in taken or target in on_disk:
+                        conflicts.append(BulkConflict(id=row.id, local_path=row.local_path, detail=f"El destino '{target}' ya existe"))
+                        continue
+                    claimed.add(target)
+                    moves.append((row, targets[row.id]))
+                
+                if not moves:
+                    continue
+                
+                # Rutas y claves nuevas en una sola sentencia (UPDATE ... FROM
+                # VALUES), con los renombrados pendientes
+                new_paths = []
+                renames = []
+                for row, target in moves:
+                    source_key = file_journal.storage_key_of(row.local_path, row.storage_key)
+                    if is_blob_key(source_key):
+                        target_key = source_key
+                    else:
+                        target_key = target.relative_to(self.upload_path).as_posix()
+                        renames.append((file_journal.OPERATION_MOVE, source_key, target_key))
+                    new_paths.append((row.id, str(target), target_key))
+                
+                targets_table = values(
+                    column("id", Integer), column("local_path", String), column("storage_key", String),
+                    name="targets"
+                ).data(new_paths)
+                await db.execute(
+                    update(table)
+                    .where(table.c.id == targets_table.c.id)
+                    .values(local_path=targets_table.c.local_path, storage_key=targets_table.c.storage_key)
+                )
+                operations = await file_journal.record(db, renames)
+                await directory_index.move_files(db, [(Path(row.local_path), target, row.file_size) for row, target in moves])
+                
+                # Los directorios destino deben existir aunque los archivos no estén en ellos
+                await asyncio.to_thread(
+                    lambda: [parent.mkdir(parents=True, exist_ok=True) for parent in {target.parent for _, target in moves}]
+                )
+                await db.commit()
+                
+                processed.extend(row.id for row, _ in moves)
+                files_pending += await file_journal.apply(db, operations)
+            
+            found = set(processed) | {conflict.id for conflict in conflicts}
+            return BulkOperationResponse(
+                matched=len(found),
+                processed=processed,
+                not_found=sorted(set(ids) - found) if ids is not None else [],
+                conflicts=conflicts,
+                files_pending=files_pending
+            )
             
         except HTTPException:
             raise
         except Exception as e:
+            await db.rollback()
             raise HTTPException(
                 status_code=400,
-                detail=f"Error al eliminar documento: {str(e)}"
+                detail=f"Error al mover documentos: {str(e)}"
             )
     
     def _sanitize_path(self, path: str) -> Path:
@@ -822,11 +3134,12 @@ class DocumentService:
     # MÉTODOS CRUD PARA METADATOS
     # ============================================================================
 
-    async def create_document_type(self, document_type_data):
+    async def create_document_type(self, db: AsyncSession, document_type_data):
         """
         Crea un nuevo tipo de documento.
         
         Args:
+            db (AsyncSession): Sesión de base de datos de la petición
             document_type_data: Datos del tipo de documento
             
         Returns:
@@ -835,10 +3148,8 @@ class DocumentService:
         from .pydantic_models import DocumentTypeResponse
         
         try:
-            db = next(get_db())
-            
             # Verificar si ya existe un tipo con el mismo nombre
-            existing_type = db.query(DocumentType).filter(DocumentType.name == document_type_data.name).first()
+            existing_type = await db.scalar(select(DocumentType).where(DocumentType.name == document_type_data.name))
             if existing_type:
                 raise HTTPException(
                     status_code=409,
@@ -852,8 +3163,9 @@ class DocumentService:
             )
             
             db.add(document_type)
-            db.commit()
-            db.refresh(document_type)
+            await db.commit()
+            self.reference_cache.invalidate("document_types")
+            await db.refresh(document_type)
             
             return DocumentTypeResponse(
                 id=document_type.id,  # type: ignore
@@ -869,11 +3181,12 @@ class DocumentService:
                 detail=f"Error al crear tipo de documento: {str(e)}"
             )
 
-    async def update_document_type(self, type_id: int, document_type_data):
+    async def update_document_type(self, db: AsyncSession, type_id: int, document_type_data):
         """
         Actualiza un tipo de documento existente.
         
         Args:
+            db (AsyncSession): Sesión de base de datos de la petición
             type_id (int): ID del tipo de documento
             document_type_data: Datos actualizados
             
@@ -883,10 +3196,8 @@ class DocumentService:
         from .pydantic_models import DocumentTypeResponse
         
         try:
-            db = next(get_db())
-            
             # Buscar el tipo de documento
-            document_type = db.query(DocumentType).filter(DocumentType.id == type_id).first()
+            document_type = await db.get(DocumentType, type_id)
             if not document_type:
                 raise HTTPException(
                     status_code=404,
@@ -895,10 +3206,10 @@ class DocumentService:
             
             # Verificar si el nuevo nombre ya existe (si se está cambiando)
             if document_type_data.name and document_type_data.name != document_type.name:
-                existing_type = db.query(DocumentType).filter(
+                existing_type = await db.scalar(select(DocumentType).where(
                     DocumentType.name == document_type_data.name,
                     DocumentType.id != type_id
-                ).first()
+                ))
                 if existing_type:
                     raise HTTPException(
                         status_code=409,
@@ -911,8 +3222,9 @@ class DocumentService:
             if document_type_data.description is not None:
                 document_type.description = document_type_data.description  # type: ignore
             
-            db.commit()
-            db.refresh(document_type)
+            await db.commit()
+            self.reference_cache.invalidate("document_types")
+            await db.refresh(document_type)
             
             return DocumentTypeResponse(
                 id=document_type.id,  # type: ignore
@@ -928,21 +3240,20 @@ class DocumentService:
                 detail=f"Error al actualizar tipo de documento: {str(e)}"
             )
 
-    async def delete_document_type(self, type_id: int):
+    async def delete_document_type(self, db: AsyncSession, type_id: int):
         """
         Elimina un tipo de documento.
         
         Args:
+            db (AsyncSession): Sesión de base de datos de la petición
             type_id (int): ID del tipo de documento
             
         Raises:
             HTTPException: Si el tipo no existe o está en uso
         """
         try:
-            db = next(get_db())
-            
             # Buscar el tipo de documento
-            document_type = db.query(DocumentType).filter(DocumentType.id == type_id).first()
+            document_type = await db.get(DocumentType, type_id)
             if not document_type:
                 raise HTTPException(
                     status_code=404,
@@ -950,7 +3261,7 @@ class DocumentService:
                 )
             
             # Verificar si está siendo usado por algún documento
-            documents_using_type = db.query(Document).filter(Document.document_type_id == type_id).count()
+            documents_using_type = await db.scalar(select(func.count()).select_from(Document).where(Document.document_type_id == type_id))
             if documents_using_type > 0:
                 raise HTTPException(
                     status_code=400,
@@ -958,8 +3269,9 @@ class DocumentService:
                 )
             
             # Eliminar el tipo de documento
-            db.delete(document_type)
-            db.commit()
+            await db.delete(document_type)
+            await db.commit()
+            self.reference_cache.invalidate("document_types")
             
         except HTTPException:
             raise
@@ -969,11 +3281,12 @@ class DocumentService:
                 detail=f"Error al eliminar tipo de documento: {str(e)}"
             )
 
-    async def create_category(self, category_data):
+    async def create_category(self, db: AsyncSession, category_data):
         """
         Crea una nueva categoría.
         
         Args:
+            db (AsyncSession): Sesión de base de datos de la petición
             category_data: Datos de la categoría
             
         Returns:
@@ -982,10 +3295,8 @@ class DocumentService:
         from .pydantic_models import CategoryResponse
         
         try:
-            db = next(get_db())
-            
             # Verificar si ya existe una categoría con el mismo nombre
-            existing_category = db.query(Category).filter(Category.name == category_data.name).first()
+            existing_category = await db.scalar(select(Category).where(Category.name == category_data.name))
             if existing_category:
                 raise HTTPException(
                     status_code=409,
@@ -999,8 +3310,9 @@ class DocumentService:
             )
             
             db.add(category)
-            db.commit()
-            db.refresh(category)
+            await db.commit()
+            self.reference_cache.invalidate("categories")
+            await db.refresh(category)
             
             return CategoryResponse(
                 id=category.id,  # type: ignore
@@ -1016,11 +3328,12 @@ class DocumentService:
                 detail=f"Error al crear categoría: {str(e)}"
             )
 
-    async def update_category(self, category_id: int, category_data):
+    async def update_category(self, db: AsyncSession, category_id: int, category_data):
         """
         Actualiza una categoría existente.
         
         Args:
+            db (AsyncSession): Sesión de base de datos de la petición
             category_id (int): ID de la categoría
             category_data: Datos actualizados
             
@@ -1030,10 +3343,8 @@ class DocumentService:
         from .pydantic_models import CategoryResponse
         
         try:
-            db = next(get_db())
-            
             # Buscar la categoría
-            category = db.query(Category).filter(Category.id == category_id).first()
+            category = await db.get(Category, category_id)
             if not category:
                 raise HTTPException(
                     status_code=404,
@@ -1042,10 +3353,10 @@ class DocumentService:
             
             # Verificar si el nuevo nombre ya existe (si se está cambiando)
             if category_data.name and category_data.name != category.name:
-                existing_category = db.query(Category).filter(
+                existing_category = await db.scalar(select(Category).where(
                     Category.name == category_data.name,
                     Category.id != category_id
-                ).first()
+                ))
                 if existing_category:
                     raise HTTPException(
                         status_code=409,
@@ -1058,8 +3369,9 @@ class DocumentService:
             if category_data.description is not None:
                 category.description = category_data.description  # type: ignore
             
-            db.commit()
-            db.refresh(category)
+            await db.commit()
+            self.reference_cache.invalidate("categories")
+            await db.refresh(category)
             
             return CategoryResponse(
                 id=category.id,  # type: ignore
@@ -1075,21 +3387,20 @@ class DocumentService:
                 detail=f"Error al actualizar categoría: {str(e)}"
             )
 
-    async def delete_category(self, category_id: int):
+    async def delete_category(self, db: AsyncSession, category_id: int):
         """
         Elimina una categoría.
         
         Args:
+            db (AsyncSession): Sesión de base de datos de la petición
             category_id (int): ID de la categoría
             
         Raises:
             HTTPException: Si la categoría no existe o está en uso
         """
         try:
-            db = next(get_db())
-            
             # Buscar la categoría
-            category = db.query(Category).filter(Category.id == category_id).first()
+            category = await db.get(Category, category_id)
             if not category:
                 raise HTTPException(
                     status_code=404,
@@ -1097,7 +3408,7 @@ class DocumentService:
                 )
             
             # Verificar si está siendo usada por algún documento
-            documents_using_category = db.query(Document).filter(Document.category_id == category_id).count()
+            documents_using_category = await db.scalar(select(func.count()).select_from(Document).where(Document.category_id == category_id))
             if documents_using_category > 0:
                 raise HTTPException(
                     status_code=400,
@@ -1105,8 +3416,9 @@ class DocumentService:
                 )
             
             # Eliminar la categoría
-            db.delete(category)
-            db.commit()
+            await db.delete(category)
+            await db.commit()
+            self.reference_cache.invalidate("categories")
             
         except HTTPException:
             raise
@@ -1116,11 +3428,12 @@ class DocumentService:
                 detail=f"Error al eliminar categoría: {str(e)}"
             )
 
-    async def create_client(self, client_data):
+    async def create_client(self, db: AsyncSession, client_data):
         """
         Crea un nuevo cliente.
         
         Args:
+            db (AsyncSession): Sesión de base de datos de la petición
             client_data: Datos del cliente
             
         Returns:
@@ -1129,10 +3442,8 @@ class DocumentService:
         from .pydantic_models import ClientResponse
         
         try:
-            db = next(get_db())
-            
             # Verificar si ya existe un cliente con el mismo nombre
-            existing_client = db.query(Client).filter(Client.name == client_data.name).first()
+            existing_client = await db.scalar(select(Client).where(Client.name == client_data.name))
             if existing_client:
                 raise HTTPException(
                     status_code=409,
@@ -1147,8 +3458,9 @@ class DocumentService:
             )
             
             db.add(client)
-            db.commit()
-            db.refresh(client)
+            await db.commit()
+            self.reference_cache.invalidate("clients")
+            await db.refresh(client)
             
             return ClientResponse(
                 id=client.id,  # type: ignore
@@ -1165,11 +3477,12 @@ class DocumentService:
                 detail=f"Error al crear cliente: {str(e)}"
             )
 
-    async def update_client(self, client_id: int, client_data):
+    async def update_client(self, db: AsyncSession, client_id: int, client_data):
         """
         Actualiza un cliente existente.
         
         Args:
+            db (AsyncSession): Sesión de base de datos de la petición
             client_id (int): ID del cliente
             client_data: Datos actualizados
             
@@ -1179,10 +3492,8 @@ class DocumentService:
         from .pydantic_models import ClientResponse
         
         try:
-            db = next(get_db())
-            
             # Buscar el cliente
-            client = db.query(Client).filter(Client.id == client_id).first()
+            client = await db.get(Client, client_id)
             if not client:
                 raise HTTPException(
                     status_code=404,
@@ -1191,10 +3502,10 @@ class DocumentService:
             
             # Verificar si el nuevo nombre ya existe (si se está cambiando)
             if client_data.name and client_data.name != client.name:
-                existing_client = db.query(Client).filter(
+                existing_client = await db.scalar(select(Client).where(
                     Client.name == client_data.name,
                     Client.id != client_id
-                ).first()
+                ))
                 if existing_client:
                     raise HTTPException(
                         status_code=409,
@@ -1209,8 +3520,9 @@ class DocumentService:
             if client_data.phone is not None:
                 client.phone = client_data.phone  # type: ignore
             
-            db.commit()
-            db.refresh(client)
+            await db.commit()
+            self.reference_cache.invalidate("clients")
+            await db.refresh(client)
             
             return ClientResponse(
                 id=client.id,  # type: ignore
@@ -1227,21 +3539,20 @@ class DocumentService:
                 detail=f"Error al actualizar cliente: {str(e)}"
             )
 
-    async def delete_client(self, client_id: int):
+    async def delete_client(self, db: AsyncSession, client_id: int):
         """
         Elimina un cliente.
         
         Args:
+            db (AsyncSession): Sesión de base de datos de la petición
             client_id (int): ID del cliente
             
         Raises:
             HTTPException: Si el cliente no existe o está en uso
         """
         try:
-            db = next(get_db())
-            
             # Buscar el cliente
-            client = db.query(Client).filter(Client.id == client_id).first()
+            client = await db.get(Client, client_id)
             if not client:
                 raise HTTPException(
                     status_code=404,
@@ -1249,7 +3560,7 @@ class DocumentService:
                 )
             
             # Verificar si está siendo usado por algún documento
-            documents_using_client = db.query(Document).filter(Document.client_id == client_id).count()
+            documents_using_client = await db.scalar(select(func.count()).select_from(Document).where(Document.client_id == client_id))
             if documents_using_client > 0:
                 raise HTTPException(
                     status_code=400,
@@ -1257,8 +3568,9 @@ class DocumentService:
                 )
             
             # Eliminar el cliente
-            db.delete(client)
-            db.commit()
+            await db.delete(client)
+            await db.commit()
+            self.reference_cache.invalidate("clients")
             
         except HTTPException:
             raise
@@ -1266,4 +3578,425 @@ class DocumentService:
             raise HTTPException(
                 status_code=400,
                 detail=f"Error al eliminar cliente: {str(e)}"
-            ) 
\ No newline at end of file
+            )
+
+    # ============================================================================
+    # SESIONES DE SUBIDA REANUDABLE
+    # ============================================================================
+
+    def _get_sessions_path(self) -> Path:
+        """
+        Obtiene el directorio de staging de las sesiones de subida.
+        
+        Returns:
+            Path: Ruta del directorio de sesiones (se crea si no existe)
+        """
+        sessions_path = self.upload_path / settings.UPLOAD_SESSION_DIR
+        sessions_path.mkdir(parents=True, exist_ok=True)
+        return sessions_path
+
+    def _get_session_files(self, session_id: str) -> Tuple[Path, Path]:
+        """
+        Obtiene las rutas del estado y de los datos de una sesión.
+        
+        Args:
+            session_id (str): Identificador de la sesión
+            
+        Returns:
+            Tuple[Path, Path]: Fichero JSON con el estado y fichero con los bytes recibidos
+            
+        Raises:
+            HTTPException: Si el identificador no es válido
+        """
+        if not SESSION_ID_PATTERN.match(session_id):
+            raise HTTPException(
+                status_code=400,
+                detail="Identificador de sesión inválido"
+            )
+        
+        sessions_path = self._get_sessions_path()
+        return sessions_path / f"{session_id}.json", sessions_path / f"{session_id}.part"
+
+    def _load_upload_session(self, session_id: str) -> dict:
+        """
+        Carga el estado persistido de una sesión de subida.
+        
+        Args:
+            session_id (str): Identificador de la sesión
+            
+        Returns:
+            dict: Estado de la sesión
+            
+        Raises:
+            HTTPException: Si la sesión no existe
+        """
+        state_path, _ = self._get_session_files(session_id)
+        
+        if not state_path.exists():
+            raise HTTPException(
+                status_code=404,
+                detail=f"Sesión de subida '{session_id}' no encontrada"
+            )
+        
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _build_session_response(self, session: dict, offset: int, last_activity: float):
+        """
+        Construye la respuesta con el estado de una sesión.
+        
+        Args:
+            session (dict): Estado persistido de la sesión
+            offset (int): Bytes recibidos
+            last_activity (float): Marca de tiempo de la última actividad
+            
+        Returns:
+            UploadSessionResponse: Estado de la sesión
+        """
+        from .pydantic_models import UploadSessionResponse
+        
+        return UploadSessionResponse(
+            session_id=session["session_id"],
+            filename=session["filename"],
+            path=session["path"],
+            offset=offset,
+            total_size=session["total_size"],
+            completed=offset == session["total_size"],
+            created_at=datetime.fromisoformat(session["created_at"]),
+            expires_at=datetime.fromtimestamp(last_activity + settings.UPLOAD_SESSION_TTL)
+        )
+
+    def _discard_upload_session(self, session_id: str) -> None:
+        """
+        Elimina el estado, los datos y el hash en memoria de una sesión.
+        
+        Args:
+            session_id (str): Identificador de la sesión
+        """
+        state_path, data_path = self._get_session_files(session_id)
+        data_path.unlink(missing_ok=True)
+        state_path.unlink(missing_ok=True)
+        self._session_hashers.pop(session_id, None)
+        self._session_locks.pop(session_id, None)
+
+    def _purge_expired_upload_sessions(self) -> None:
+        """Descarta las sesiones sin actividad durante más de ``UPLOAD_SESSION_TTL``."""
+        limit = time.time() - settings.UPLOAD_SESSION_TTL
+        
+        for state_path in self._get_sessions_path().glob("*.json"):
+            session_id = state_path.stem
+            data_path = state_path.with_suffix(".part")
+            last_activity = data_path.stat().st_mtime if data_path.exists() else state_path.stat().st_mtime
+            
+            lock = self._session_locks.get(session_id)
+            
+            if last_activity < limit and not (lock and lock.locked()):
+                try:
+                    fd = os.open(state_path, os.O_RDONLY)
+                except FileNotFoundError:
+                    continue
+                try:
+                    # Otro proceso puede estar recibiendo un fragmento de la sesión
+                    if fcntl is not None:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    self._discard_upload_session(session_id)
+                except BlockingIOError:
+                    pass
+                finally:
+                    os.close(fd)
+        
+        # Hashes de sesiones completadas o canceladas en otro worker
+        for session_id in list(self._session_hashers):
+            if not self._get_session_files(session_id)[0].exists():
+                self._session_hashers.pop(session_id, None)
+
+    @asynccontextmanager
+    async def _lock_upload_session(self, session_id: str):
+        """
+        Bloquea una sesión frente a otras peticiones, también de otros workers.
+        
+        Dentro del proceso las peticiones esperan en un ``asyncio.Lock``; entre
+        procesos, con ``flock`` sobre el fichero de estado, de modo que los
+        fragmentos de una misma sesión nunca se escriben intercalados.
+        
+        Args:
+            session_id (str): Identificador de la sesión
+            
+        Raises:
+            HTTPException: Si la sesión no existe
+        """
+        state_path, _ = self._get_session_files(session_id)
+        lock = self._session_locks.setdefault(session_id, asyncio.Lock())
+        
+        async with lock:
+            try:
+                fd = os.open(state_path, os.O_RDONLY)
+            except FileNotFoundError:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Sesión de subida '{session_id}' no encontrada"
+                )
+            try:
+                if fcntl is not None:
+                    await asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                # Cerrar el descriptor libera el flock
+                os.close(fd)
+
+    async def _get_session_hasher(self, session_id: str, data_path: Path, size: int):
+        """
+        Obtiene el hash SHA-256 incremental de una sesión al día con el disco.
+        
+        Normalmente se mantiene en memoria entre fragmentos. Si cubre menos
+        bytes de los que hay en disco (otro worker recibió fragmentos o el
+        proceso se reinició), se añaden los que faltan leyéndolos del fichero.
+        
+        Args:
+            session_id (str): Identificador de la sesión
+            data_path (Path): Fichero con los bytes recibidos
+            size (int): Bytes recibidos según el disco
+            
+        Returns:
+            hashlib._Hash: Objeto hash con los ``size`` primeros bytes del fichero
+        """
+        hasher, hashed = self._session_hashers.get(session_id, (None, 0))
+        
+        if hasher is None or hashed > size:
+            hasher, hashed = hashlib.sha256(), 0
+        
+        if hashed < size:
+            def catch_up():
+                with open(data_path, "rb") as f:
+                    f.seek(hashed)
+                    remaining = size - hashed
+                    while remaining > 0:
+                        chunk = f.read(min(settings.UPLOAD_CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        hasher.update(chunk)
+                        remaining -= len(chunk)
+            
+            await asyncio.to_thread(catch_up)
+            self._session_hashers[session_id] = (hasher, size)
+        
+        return hasher
+
+    async def create_upload_session(self, session_data):
+        """
+        Inicia una sesión de subida reanudable.
+        
+        Args:
+            session_data (UploadSessionCreate): Nombre, destino, tamaño y metadatos del documento
+            
+        Returns:
+            UploadSessionResponse: Estado inicial de la sesión
+            
+        Raises:
+            HTTPException: Si el archivo no es válido o excede el tamaño máximo
+        """
+        try:
+            if session_data.total_size > settings.MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"El archivo excede el tamaño máximo de {settings.MAX_FILE_SIZE} bytes"
+                )
+            
+            # Validar nombre y destino antes de recibir ningún byte
+            self._prepare_document_destination(session_data.filename, session_data.path)
+            
+            self._purge_expired_upload_sessions()
+            
+            session_id = uuid.uuid4().hex
+            state_path, data_path = self._get_session_files(session_id)
+            session = {
+                "session_id": session_id,
+                "filename": session_data.filename,
+                "path": session_data.path,
+                "total_size": session_data.total_size,
+                "document_type_id": session_data.document_type_id,
+                "category_id": session_data.category_id,
+                "client_id": session_data.client_id,
+                "upload_date": session_data.upload_date.isoformat() if session_data.upload_date else None,
+                "created_at": datetime.now().isoformat()
+            }
+            
+            data_path.touch()
+            with open(state_path, "w", encoding="utf-8") as f:
+                json.dump(session, f)
+            
+            self._session_hashers[session_id] = (hashlib.sha256(), 0)
+            
+            return self._build_session_response(session, 0, time.time())
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al crear la sesión de subida: {str(e)}"
+            )
+
+    async def get_upload_session(self, session_id: str):
+        """
+        Obtiene el estado de una sesión, incluido el offset desde el que reanudar.
+        
+        Args:
+            session_id (str): Identificador de la sesión
+            
+        Returns:
+            UploadSessionResponse: Estado de la sesión
+            
+        Raises:
+            HTTPException: Si la sesión no existe
+        """
+        session = self._load_upload_session(session_id)
+        _, data_path = self._get_session_files(session_id)
+        stat = data_path.stat()
+        
+        return self._build_session_response(session, stat.st_size, stat.st_mtime)
+
+    async def append_upload_chunk(
+        self,
+        session_id: str,
+        start: int,
+        end: int,
+        chunks: AsyncIterator[bytes],
+        total_size: Optional[int] = None
+    ):
+        """
+        Añade un rango de bytes al final de una sesión de subida.
+        
+        El rango debe empezar exactamente en el offset actual. Los bytes se
+        escriben a disco y se añaden al hash a medida que llegan, de modo que
+        si la conexión se corta el offset refleja lo que realmente se guardó.
+        Un cuerpo que se pasa del último byte del rango se rechaza sin
+        escribir el exceso.
+        
+        Args:
+            session_id (str): Identificador de la sesión
+            start (int): Primer byte del rango enviado
+            end (int): Último byte del rango enviado
+            chunks (AsyncIterator[bytes]): Cuerpo de la petición en bloques
+            total_size (Optional[int]): Tamaño total indicado por el cliente
+            
+        Returns:
+            UploadSessionResponse: Estado de la sesión tras añadir el rango
+            
+        Raises:
+            HTTPException: Si el offset no coincide o se excede el rango o el tamaño declarado
+        """
+        async with self._lock_upload_session(session_id):
+            session = self._load_upload_session(session_id)
+            _, data_path = self._get_session_files(session_id)
+            
+            if total_size is not None and total_size != session["total_size"]:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"El tamaño total indicado ({total_size}) no coincide con el de la sesión ({session['total_size']})"
+                )
+            
+            if end >= session["total_size"]:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"El rango excede el tamaño declarado de {session['total_size']} bytes"
+                )
+            
+            offset = data_path.stat().st_size
+            if start != offset:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"El rango debe comenzar en el byte {offset}",
+                    headers={"Upload-Offset": str(offset)}
+                )
+            
+            hasher = await self._get_session_hasher(session_id, data_path, offset)
+            started, start_offset = time.perf_counter(), offset
+            
+            try:
+                async with aiofiles.open(data_path, 'ab') as f:
+                    async for chunk in chunks:
+                        if not chunk:
+                            continue
+                        
+                        if offset + len(chunk) > end + 1:
+                            raise HTTPException(
+                                status_code=400,
+                                detail=f"El cuerpo excede el rango indicado ({end - start + 1} bytes)",
+                                headers={"Upload-Offset": str(offset)}
+                            )
+                        
+                        await f.write(chunk)
+                        await f.flush()
+                        hasher.update(chunk)
+                        offset += len(chunk)
+            finally:
+                # Si una escritura falló a medias, el siguiente fragmento
+                # completa el hash con lo que haya quedado en disco
+                self._session_hashers[session_id] = (hasher, offset)
+            
+            metrics.record_upload("session", offset - start_offset, time.perf_counter() - started)
+            return self._build_session_response(session, offset, time.time())
+
+    async def finalize_upload_session(self, db: AsyncSession, session_id: str):
+        """
+        Completa una sesión de subida y registra el documento.
+        
+        Reutiliza el hash calculado de forma incremental, por lo que no se
+        vuelve a leer el archivo. La deduplicación y el registro de metadatos
+        son los mismos que en la subida directa.
+        
+        Args:
+            db (AsyncSession): Sesión de base de datos de la petición
+            session_id (str): Identificador de la sesión
+            
+        Returns:
+            DocumentResponse: Información del documento creado
+            
+        Raises:
+            HTTPException: Si la sesión está incompleta, el documento está
+                duplicado o los metadatos no son válidos
+        """
+        async with self._lock_upload_session(session_id):
+            session = self._load_upload_session(session_id)
+            _, data_path = self._get_session_files(session_id)
+            
+            offset = data_path.stat().st_size
+            if offset != session["total_size"]:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Subida incompleta: recibidos {offset} de {session['total_size']} bytes",
+                    headers={"Upload-Offset": str(offset)}
+                )
+            
+            file_path = self._prepare_document_destination(session["filename"], session["path"])
+            hasher = await self._get_session_hasher(session_id, data_path, offset)
+            
+            document = await self._register_document(
+                db=db,
+                temp_path=data_path,
+                file_path=file_path,
+                file_hash=hasher.hexdigest(),
+                file_size=offset,
+                document_type_id=session["document_type_id"],
+                category_id=session["category_id"],
+                client_id=session["client_id"],
+                upload_date=datetime.fromisoformat(session["upload_date"]) if session["upload_date"] else None
+            )
+            
+            self._discard_upload_session(session_id)
+            return document
+
+    async def cancel_upload_session(self, session_id: str) -> None:
+        """
+        Cancela una sesión de subida y elimina los bytes recibidos.
+        
+        Args:
+            session_id (str): Identificador de la sesión
+            
+        Raises:
+            HTTPException: Si la sesión no existe
+        """
+        async with self._lock_upload_session(session_id):
+            self._load_upload_session(session_id)
+            self._discard_upload_session(session_id)
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Almacenamiento de archivos
+==========================
+
+Este módulo separa la ruta visible de un documento (``Document.local_path``)
+de dónde se guardan sus bytes (``Document.storage_key``, relativa a
+``UPLOAD_DIR``). Hay dos implementaciones, elegidas con ``STORAGE_BACKEND``:
+
+- ``local`` (por defecto): el archivo se guarda en su ruta visible, como
+  hasta ahora. Mover o renombrar implica mover el archivo.
+- ``cas``: almacenamiento direccionable por contenido. El archivo se guarda
+  en ``<BLOB_DIR>/ab/cd/<sha256>`` y la ruta visible es solo un dato de la
+  base de datos. Mover o renombrar no toca el disco, un mismo contenido se
+  guarda una única vez y ningún directorio supera 256 subdirectorios.
+
+Los documentos anteriores a ``storage_key`` (valor nulo) siguen leyéndose
+desde ``local_path``.
+
+Los archivos se eliminan con ``file_journal``, que con ``cas`` comprueba
+antes, con el blob bloqueado, que ningún documento lo use.
+"""
+
+import os
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from .config import settings, get_upload_path
+
+
+class StorageBackend(ABC):
+    """
+    Interfaz común de los backends de almacenamiento.
+
+    Attributes:
+        root (Path): Directorio base (``UPLOAD_DIR``)
+        materializes_paths (bool): Si el archivo existe en su ruta visible
+        shares_keys (bool): Si varios documentos pueden compartir una misma clave
+    """
+
+    materializes_paths = True
+    shares_keys = False
+
+    def __init__(self, root: Path):
+        """
+        Inicializa el backend.
+
+        Args:
+            root (Path): Directorio base (``UPLOAD_DIR``)
+        """
+        self.root = root
+
+    @abstractmethod
+    def key_for(self, file_path: Path, file_hash: str) -> str:
+        """
+        Calcula la clave de almacenamiento de un archivo.
+
+        Args:
+            file_path (Path): Ruta visible completa del documento
+            file_hash (str): Hash SHA-256 del contenido
+
+        Returns:
+            str: Clave relativa a ``root``
+        """
+
+    def path(self, storage_key: str) -> Path:
+        """
+        Obtiene la ruta física de una clave.
+
+        Args:
+            storage_key (str): Clave de almacenamiento
+
+        Returns:
+            Path: Ruta del archivo en disco
+        """
+        return self.root / storage_key
+
+    def store(self, temp_path: Path, storage_key: str) -> bool:
+        """
+        Mueve un temporal (en el mismo sistema de ficheros) a su clave sin sobrescribir.
+
+        Args:
+            temp_path (Path): Fichero temporal con el contenido completo
+            storage_key (str): Clave calculada con ``key_for``
+
+        Returns:
+            bool: True si se creó el archivo, False si ya existía ese contenido
+
+        Raises:
+            FileExistsError: Si ya existe un archivo en la clave (p. ej. creado
+                por otra petición después de comprobar el nombre)
+        """
+        destination = self.path(storage_key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        # A diferencia de os.replace, os.link falla si el destino ya existe
+        os.link(temp_path, destination)
+        temp_path.unlink()
+        return True
+
+    @abstractmethod
+    def move(self, storage_key: str, new_file_path: Path, file_hash: str) -> str:
+        """
+        Cambia la ruta visible de un archivo ya almacenado.
+
+        Args:
+            storage_key (str): Clave actual
+            new_file_path (Path): Nueva ruta visible completa
+            file_hash (str): Hash SHA-256 del contenido
+
+        Returns:
+            str: Clave tras el movimiento
+        """
+
+
+class LocalStorage(StorageBackend):
+    """Guarda cada archivo en su ruta visible dentro de ``UPLOAD_DIR``."""
+
+    def key_for(self, file_path: Path, file_hash: str) -> str:
+        return file_path.relative_to(self.root).as_posix()
+
+    def move(self, storage_key: str, new_file_path: Path, file_hash: str) -> str:
+        new_key = self.key_for(new_file_path, file_hash)
+        new_file_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.path(storage_key), new_file_path)
+        return new_key
+
+
+class ContentAddressableStorage(StorageBackend):
+    """Guarda cada contenido una sola vez en ``<BLOB_DIR>/ab/cd/<sha256>``."""
+
+    materializes_paths = False
+    shares_keys = True
+
+    def key_for(self, file_path: Path, file_hash: str) -> str:
+        return f"{settings.BLOB_DIR}/{file_hash[:2]}/{file_hash[2:4]}/{file_hash}"
+
+    def store(self, temp_path: Path, storage_key: str) -> bool:
+        if not self.path(storage_key).exists():
+            try:
+                return super().store(temp_path, storage_key)
+            except FileExistsError:
+                # Otra petición guardó el mismo contenido entre tanto
+                pass
+        # El contenido ya está guardado: basta con descartar el temporal
+        temp_path.unlink(missing_ok=True)
+        return False
+
+    def move(self, storage_key: str, new_file_path: Path, file_hash: str) -> str:
+        # La ruta visible solo vive en la base de datos
+        return storage_key
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> StorageBackend:
+    """
+    Obtiene el backend configurado en ``STORAGE_BACKEND``.
+
+    Returns:
+        StorageBackend: Backend de almacenamiento
+
+    Raises:
+        ValueError: Si el backend configurado no existe
+    """
+    backends = {"local": LocalStorage, "cas": ContentAddressableStorage}
+    if settings.STORAGE_BACKEND not in backends:
+        raise ValueError(f"STORAGE_BACKEND desconocido: {settings.STORAGE_BACKEND}")
+    return backends[settings.STORAGE_BACKEND](get_upload_path())
+
+
+def physical_path(local_path: str, storage_key: Optional[str]) -> Path:
+    """
+    Obtiene la ruta en disco de un documento.
+
+    Args:
+        local_path (str): Ruta visible del documento
+        storage_key (Optional[str]): Clave de almacenamiento (None en documentos antiguos)
+
+    Returns:
+        Path: Ruta del archivo en disco
+    """
+    if storage_key is None:
+        return Path(local_path)
+    return get_storage().path(storage_key)
+
+
+def is_blob_key(storage_key: Optional[str]) -> bool:
+    """
+    Indica si una clave pertenece al almacenamiento por contenido.
+
+    Args:
+        storage_key (Optional[str]): Clave de almacenamiento
+
+    Returns:
+        bool: True si la clave apunta a ``BLOB_DIR``
+    """
+    return bool(storage_key) and storage_key.startswith(f"{settings.BLOB_DIR}/")
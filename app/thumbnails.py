@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+Miniaturas de documentos
+========================
+
+Genera una miniatura JPEG de la primera página de cada documento para que
+el explorador la muestre sin descargar el PDF:
+
+- Al subir un documento se encola su miniatura (``thumbnail_service.enqueue``)
+  y unos consumidores la renderizan en un pool de procesos (pypdfium2 y
+  Pillow), fuera del event loop. Si se pide antes de que esté lista, o es de
+  un documento anterior, se renderiza en ese momento; las peticiones
+  simultáneas del mismo contenido comparten un único renderizado.
+- Las miniaturas se guardan por contenido (``file_hash``) en
+  ``<THUMBNAIL_DIR>/ab/<sha256>-<ancho>.jpg``: los documentos movidos o
+  renombrados conservan la suya y los duplicados la comparten.
+- La caché en disco está limitada a ``THUMBNAIL_CACHE_MAX_BYTES``; al
+  superarla se eliminan las menos usadas (LRU). El orden de uso se guarda en
+  la fecha de modificación de cada archivo, así que sobrevive a reinicios.
+
+Un PDF que no se puede renderizar no se reintenta hasta el siguiente
+arranque. Como en la extracción de texto, si un renderizado supera
+``THUMBNAIL_TIMEOUT`` se terminan los procesos del pool y se crea uno nuevo.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .config import settings, get_upload_path
+
+logger = logging.getLogger(__name__)
+
+# Tipo MIME de las miniaturas
+THUMBNAIL_MEDIA_TYPE = "image/jpeg"
+
+# Miniaturas fallidas recordadas como máximo (se olvidan todas al llenarse)
+MAX_FAILED = 10000
+
+
+def render_thumbnail(source_path: str, target_path: str, width: int, quality: int) -> int:
+    """
+    Renderiza la primera página de un PDF como JPEG de ``width`` píxeles de ancho.
+
+    Se ejecuta en un proceso del pool. La página se rasteriza directamente a
+    la escala final, sin pasar por una imagen a tamaño completo, y el alto se
+    limita al doble del ancho para páginas muy alargadas.
+
+    Args:
+        source_path (str): Ruta del PDF
+        target_path (str): Ruta del JPEG a crear
+        width (int): Ancho de la miniatura en píxeles
+        quality (int): Calidad JPEG (1-95)
+
+    Returns:
+        int: Tamaño en bytes del JPEG creado
+    """
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(source_path)
+    try:
+        if len(pdf) == 0:
+            raise ValueError("El PDF no tiene páginas")
+        page = pdf[0]
+        page_width, page_height = page.get_size()
+        scale = min(width / page_width, 2 * width / page_height)
+        image = page.render(scale=scale).to_pil().convert("RGB")
+    finally:
+        pdf.close()
+
+    # Escritura atómica: un lector nunca ve una miniatura a medias
+    Path(target_path).parent.mkdir(parents=True, exist_ok=True)
+    temp_path = f"{target_path}.{os.getpid()}.tmp"
+    try:
+        image.save(temp_path, "JPEG", quality=quality, optimize=True)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+    return os.path.getsize(target_path)
+
+
+class ThumbnailCache:
+    """
+    Caché LRU de miniaturas en disco, limitada en bytes.
+
+    El índice (clave -> tamaño, de la menos a la más usada) se mantiene en
+    memoria y solo se modifica desde el event loop.
+
+    Attributes:
+        root (Path): Directorio de la caché
+        max_bytes (int): Tamaño máximo de la caché
+        total_bytes (int): Tamaño actual de la caché
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        """Inicializa una caché vacía; ``load`` recupera la existente."""
+        self.root = root
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+
+    def path_for(self, key: str) -> Path:
+        """Ruta de la miniatura de una clave ``<sha256>-<ancho>``."""
+        return self.root / key[:2] / f"{key}.jpg"
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def load(self) -> None:
+        """
+        Recupera las miniaturas existentes en el orden de su último uso.
+
+        Elimina los temporales de renderizados interrumpidos. Es bloqueante:
+        se llama en un hilo al arrancar.
+        """
+        found: List[Tuple[float, str, int]] = []
+        self.root.mkdir(parents=True, exist_ok=True)
+        for path in self.root.glob("*/*"):
+            if path.suffix == ".tmp":
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                stat_result = path.stat()
+            except FileNotFoundError:
+                continue
+            found.append((stat_result.st_mtime, path.stem, stat_result.st_size))
+
+        self._entries = OrderedDict((key, size) for _, key, size in sorted(found))
+        self.total_bytes = sum(self._entries.values())
+        self._evict()
+
+    def touch(self, key: str) -> None:
+        """Marca una miniatura como usada ahora."""
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self.path_for(key))
+        except FileNotFoundError:
+            self.discard(key)
+
+    def add(self, key: str, size: int) -> None:
+        """Registra una miniatura nueva y elimina las menos usadas si no cabe."""
+        self.total_bytes += size - self._entries.pop(key, 0)
+        self._entries[key] = size
+        self._evict()
+
+    def discard(self, key: str) -> None:
+        """Olvida una miniatura (p. ej. eliminada del disco por otro proceso)."""
+        self.total_bytes -= self._entries.pop(key, 0)
+
+    def _evict(self) -> None:
+        # Se conserva siempre la última añadida, aunque sola supere el límite
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.path_for(key).unlink(missing_ok=True)
+
+
+class ThumbnailService:
+    """
+    Renderizado de miniaturas en segundo plano y bajo demanda.
+
+    Attributes:
+        cache (ThumbnailCache): Caché de miniaturas en disco
+        queue (asyncio.Queue): Miniaturas pendientes de renderizar (hash, ruta del PDF)
+    """
+
+    def __init__(self):
+        """Inicializa el servicio sin arrancar el pool."""
+        self.cache: Optional[ThumbnailCache] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._rendering: Dict[str, asyncio.Future] = {}
+        self._failed: set = set()
+
+    @property
+    def running(self) -> bool:
+        """Indica si el servicio está arrancado."""
+        return self._pool is not None
+
+    @staticmethod
+    def etag(file_hash: str) -> str:
+        """ETag de la miniatura de un contenido con el ancho configurado."""
+        return f'"{file_hash}-{settings.THUMBNAIL_WIDTH}"'
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # spawn evita heredar el event loop y las conexiones del proceso padre
+        return ProcessPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def _reset_pool(self) -> None:
+        """Termina los procesos del pool (p. ej. tras un timeout) y crea uno nuevo."""
+        pool, self._pool = self._pool, self._create_pool()
+        if pool is None:
+            return
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def start(self) -> None:
+        """Carga la caché y arranca el pool y los consumidores."""
+        if self.running or not settings.THUMBNAILS_ENABLED:
+            return
+
+        missing = [name for name in ("pypdfium2", "PIL") if importlib.util.find_spec(name) is None]
+        if missing:
+            logger.warning("Miniaturas desactivadas: faltan los paquetes %s", ", ".join(missing))
+            return
+
+        self.cache = ThumbnailCache(
+            get_upload_path() / settings.THUMBNAIL_DIR, settings.THUMBNAIL_CACHE_MAX_BYTES
+        )
+        await asyncio.to_thread(self.cache.load)
+
+        self.queue = asyncio.Queue()
+        self._pool = self._create_pool()
+        self._tasks = [
+            asyncio.create_task(self._consume())
+            for _ in range(settings.THUMBNAIL_WORKERS)
+        ]
+
+    async def stop(self) -> None:
+        """Detiene los consumidores y cierra el pool."""
+        if not self.running:
+            return
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        pool, self._pool = self._pool, None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def enqueue(self, file_hash: str, source_path: Path) -> None:
+        """
+        Encola la miniatura de un documento recién subido.
+
+        Args:
+            file_hash (str): Hash SHA-256 del contenido
+            source_path (Path): Ruta del PDF en disco
+        """
+        if self.running and self._key(file_hash) not in self.cache:
+            self.queue.put_nowait((file_hash, source_path))
+
+    async def get(self, file_hash: str, source_path: Path) -> Optional[bytes]:
+        """
+        Obtiene la miniatura de un contenido, renderizándola si no está en caché.
+
+        Args:
+            file_hash (str): Hash SHA-256 del contenido
+            source_path (Path): Ruta del PDF en disco
+
+        Returns:
+            Optional[bytes]: JPEG de la miniatura, o None si el PDF no se puede renderizar
+        """
+        key = self._key(file_hash)
+        for _ in range(2):
+            if key not in self.cache and not await self._render(key, source_path):
+                return None
+            try:
+                content = await asyncio.to_thread(self.cache.path_for(key).read_bytes)
+            except FileNotFoundError:
+                # Eliminada mientras tanto (expulsada de la caché): se vuelve a renderizar
+                self.cache.discard(key)
+                continue
+            if key in self.cache:
+                self.cache.touch(key)
+            return content
+        return None
+
+    @staticmethod
+    def _key(file_hash: str) -> str:
+        return f"{file_hash}-{settings.THUMBNAIL_WIDTH}"
+
+    async def _render(self, key: str, source_path: Path) -> bool:
+        """
+        Renderiza una miniatura, compartiendo el resultado con las peticiones simultáneas.
+
+        Args:
+            key (str): Clave de la miniatura
+            source_path (Path): Ruta del PDF en disco
+
+        Returns:
+            bool: True si la miniatura está en caché al terminar
+        """
+        if key in self._failed:
+            return False
+        pending = self._rendering.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._render_once(key, source_path))
+            self._rendering[key] = pending
+            pending.add_done_callback(lambda _: self._rendering.pop(key, None))
+        # shield: si se cancela una petición, el renderizado sigue para las demás
+        return await asyncio.shield(pending)
+
+    async def _render_once(self, key: str, source_path: Path) -> bool:
+        target_path = self.cache.path_for(key)
+        arguments = (
+            render_thumbnail, str(source_path), str(target_path),
+            settings.THUMBNAIL_WIDTH, settings.THUMBNAIL_QUALITY
+        )
+        try:
+            try:
+                size = await asyncio.wait_for(
+                    asyncio.wrap_future(self._pool.submit(*arguments)), settings.THUMBNAIL_TIMEOUT
+                )
+            except BrokenProcessPool:
+                # Otro renderizado provocó el reinicio del pool: se reintenta una vez
+                size = await asyncio.wait_for(
+                    asyncio.wrap_future(self._pool.submit(*arguments)), settings.THUMBNAIL_TIMEOUT
+                )
+        except asyncio.TimeoutError:
+            self._reset_pool()
+            self._mark_failed(key, f"cancelada tras {settings.THUMBNAIL_TIMEOUT} segundos")
+            return False
+        except Exception as e:
+            self._mark_failed(key, str(e))
+            return False
+
+        self.cache.add(key, size)
+        return key in self.cache
+
+    def _mark_failed(self, key: str, reason: str) -> None:
+        logger.warning("No se pudo generar la miniatura %s: %s", key, reason)
+        if len(self._failed) >= MAX_FAILED:
+            self._failed.clear()
+        self._failed.add(key)
+
+    async def _consume(self) -> None:
+        """Renderiza las miniaturas encoladas de una en una."""
+        while True:
+            file_hash, source_path = await self.queue.get()
+            try:
+                key = self._key(file_hash)
+                if key not in self.cache:
+                    await self._render(key, source_path)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error al generar la miniatura de %s", file_hash)
+            finally:
+                self.queue.task_done()
+
+
+# Instancia global, arrancada en el evento de inicio de la aplicación
+thumbnail_service = ThumbnailService()
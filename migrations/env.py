@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Entorno de Alembic
+==================
+
+Conecta las migraciones con los modelos de la aplicación: ``target_metadata``
+es ``app.database.Base.metadata``, así que ``alembic revision --autogenerate``
+compara la base de datos con los modelos, y la URL se toma de ``app.config``.
+
+Las vistas (``documents_view``, ``document_stats``) y las funciones y
+triggers se crean con SQL en las propias migraciones; no forman parte de los
+modelos y autogenerate no las compara.
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.config import settings
+from app.database import Base
+import app.models  # noqa: F401  (registra todos los modelos en Base.metadata)
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def get_url() -> str:
+    """Obtiene la URL de conexión (``-x url=...`` tiene prioridad sobre la configuración)."""
+    return context.get_x_argument(as_dictionary=True).get("url") or settings.database_url
+
+
+def run_migrations_offline() -> None:
+    """Genera el SQL de las migraciones sin conectar (``alembic upgrade head --sql``)."""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        compare_type=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Aplica las migraciones sobre una conexión a la base de datos."""
+    connectable = create_engine(get_url(), poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            compare_type=True,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,198 @@
+"""Esquema inicial
+
+Crea el esquema del antiguo ``database_schema.sql``, tal como estaba antes
+de las migraciones SQL 001 a 009: las tablas, las restricciones y los
+índices, la función y los triggers de ``updated_at`` y las vistas
+``documents_view`` y ``document_stats``. Los cambios posteriores se aplican
+en las revisiones siguientes.
+
+Las bases de datos creadas con ``database_schema.sql`` ya están en esta
+revisión: se adoptan con ``alembic stamp 0001`` seguido de
+``alembic upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tablas con columna updated_at mantenida por trigger
+UPDATED_AT_TABLES = ["document_types", "clients", "categories", "documents"]
+
+DOCUMENTS_VIEW = """
+CREATE OR REPLACE VIEW documents_view AS
+SELECT
+    d.id,
+    d.filename,
+    d.file_hash,
+    d.local_path,
+    d.extracted_text,
+    d.file_size,
+    d.upload_date,
+    d.is_active,
+    d.created_at,
+    d.updated_at,
+    dt.name as document_type_name,
+    dt.icon as document_type_icon,
+    c.name as client_name,
+    c.email as client_email,
+    cat.name as category_name,
+    cat.color as category_color
+FROM documents d
+LEFT JOIN document_types dt ON d.document_type_id = dt.id
+LEFT JOIN clients c ON d.client_id = c.id
+LEFT JOIN categories cat ON d.category_id = cat.id
+WHERE d.is_active = TRUE
+"""
+
+DOCUMENT_STATS_VIEW = """
+CREATE OR REPLACE VIEW document_stats AS
+SELECT
+    COUNT(*) as total_documents,
+    COUNT(DISTINCT client_id) as total_clients,
+    COUNT(DISTINCT category_id) as total_categories,
+    SUM(file_size) as total_size_bytes,
+    AVG(file_size) as avg_file_size,
+    MIN(upload_date) as oldest_document,
+    MAX(upload_date) as newest_document
+FROM documents
+WHERE is_active = TRUE
+"""
+
+
+def _audit_columns() -> list:
+    """Columnas is_active, created_at y updated_at (admitían NULL en el esquema original)."""
+    return [
+        sa.Column("is_active", sa.Boolean(), server_default=sa.text("TRUE"), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_types",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("icon", sa.String(length=50), server_default="fas fa-file-pdf", nullable=True),
+        *_audit_columns(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+        comment="Tipos de documentos disponibles en el sistema",
+    )
+    op.create_index("idx_document_types_name", "document_types", ["name"])
+    op.create_index("idx_document_types_active", "document_types", ["is_active"])
+
+    op.create_table(
+        "clients",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=True),
+        sa.Column("phone", sa.String(length=50), nullable=True),
+        sa.Column("address", sa.Text(), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        *_audit_columns(),
+        sa.PrimaryKeyConstraint("id"),
+        comment="Clientes asociados a los documentos",
+    )
+    op.create_index("idx_clients_name", "clients", ["name"])
+    op.create_index("idx_clients_email", "clients", ["email"])
+    op.create_index("idx_clients_active", "clients", ["is_active"])
+
+    op.create_table(
+        "categories",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("color", sa.String(length=7), server_default="#3b82f6", nullable=True),
+        *_audit_columns(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+        comment="Categorías para organizar documentos",
+    )
+    op.create_index("idx_categories_name", "categories", ["name"])
+    op.create_index("idx_categories_active", "categories", ["is_active"])
+
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column(
+            "file_hash", sa.String(length=64), nullable=False,
+            comment="Hash SHA-256 del archivo para evitar duplicados"
+        ),
+        sa.Column("document_type_id", sa.Integer(), nullable=False),
+        sa.Column("client_id", sa.Integer(), nullable=True),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "local_path", sa.String(length=500), nullable=False,
+            comment="Ruta local donde se almacena el archivo físico"
+        ),
+        sa.Column("extracted_text", sa.Text(), nullable=True, comment="Texto extraído del PDF para búsquedas"),
+        sa.Column("file_size", sa.Integer(), nullable=False, comment="Tamaño del archivo en bytes"),
+        sa.Column("upload_date", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=True),
+        *_audit_columns(),
+        sa.ForeignKeyConstraint(["document_type_id"], ["document_types.id"], ondelete="RESTRICT"),
+        sa.ForeignKeyConstraint(["client_id"], ["clients.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"], ondelete="RESTRICT"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("file_hash"),
+        comment="Documentos almacenados en el sistema",
+    )
+    op.create_index("idx_documents_filename", "documents", ["filename"])
+    op.create_index("idx_documents_file_hash", "documents", ["file_hash"])
+    op.create_index("idx_documents_document_type_id", "documents", ["document_type_id"])
+    op.create_index("idx_documents_client_id", "documents", ["client_id"])
+    op.create_index("idx_documents_category_id", "documents", ["category_id"])
+    op.create_index("idx_documents_upload_date", "documents", ["upload_date"])
+    op.create_index("idx_documents_active", "documents", ["is_active"])
+    op.create_index("idx_documents_created_at", "documents", ["created_at"])
+    op.create_index(
+        "idx_documents_search", "documents", ["filename", "document_type_id", "category_id", "is_active"]
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION update_updated_at_column()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at = CURRENT_TIMESTAMP;
+            RETURN NEW;
+        END;
+        $$ language 'plpgsql'
+        """
+    )
+    for table in UPDATED_AT_TABLES:
+        op.execute(
+            f"CREATE TRIGGER update_{table}_updated_at BEFORE UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()"
+        )
+
+    op.execute(DOCUMENTS_VIEW)
+    op.execute(DOCUMENT_STATS_VIEW)
+
+
+def downgrade() -> None:
+    op.execute("DROP VIEW IF EXISTS document_stats")
+    op.execute("DROP VIEW IF EXISTS documents_view")
+
+    for table in UPDATED_AT_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS update_{table}_updated_at ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS update_updated_at_column()")
+
+    op.drop_table("documents")
+    op.drop_table("categories")
+    op.drop_table("clients")
+    op.drop_table("document_types")
@@ -0,0 +1,221 @@
+"""Extracción, búsqueda, almacenamiento, directorios y retención
+
+Aplica sobre el esquema inicial los cambios de las antiguas migraciones SQL
+001 a 008:
+
+- ``documents_view`` expone los IDs de metadatos y ``search_vector``.
+- ``documents`` gana ``extraction_status``/``extraction_error``, la columna
+  generada ``search_vector``, ``storage_key`` y ``deleted_at``.
+- El hash solo es único entre los documentos activos (índice parcial en
+  lugar de la restricción ``documents_file_hash_key``).
+- Tablas ``directories`` y ``pending_file_operations``.
+- Las columnas de auditoría pasan a ``NOT NULL``, como en los modelos.
+
+Todas las sentencias son idempotentes (``IF NOT EXISTS``/``IF EXISTS``): una
+base de datos creada con ``database_schema.sql`` a la que ya se aplicó parte
+de aquellos scripts se adopta igualmente con ``alembic stamp 0001`` seguido de
+``alembic upgrade head``. Los índices sobre ``documents`` se crean de forma
+concurrente en la revisión 0003.
+
+Añadir ``search_vector`` reescribe la tabla ``documents``: en bases de datos
+grandes conviene ejecutarla en una ventana de mantenimiento.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:02:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columnas que el esquema inicial creaba sin NOT NULL, con el valor para las filas nulas
+AUDIT_COLUMNS = {
+    "document_types": ["is_active", "created_at", "updated_at"],
+    "clients": ["is_active", "created_at", "updated_at"],
+    "categories": ["is_active", "created_at", "updated_at"],
+    "documents": ["upload_date", "is_active", "created_at", "updated_at"],
+    "directories": ["created_at", "updated_at"],
+}
+AUDIT_DEFAULTS = {"is_active": "TRUE"}
+
+DOCUMENTS_VIEW = """
+CREATE OR REPLACE VIEW documents_view AS
+SELECT
+    d.id,
+    d.filename,
+    d.file_hash,
+    d.local_path,
+    d.extracted_text,
+    d.file_size,
+    d.upload_date,
+    d.is_active,
+    d.created_at,
+    d.updated_at,
+    dt.name as document_type_name,
+    dt.icon as document_type_icon,
+    c.name as client_name,
+    c.email as client_email,
+    cat.name as category_name,
+    cat.color as category_color,
+    d.document_type_id,
+    d.client_id,
+    d.category_id,
+    d.search_vector
+FROM documents d
+LEFT JOIN document_types dt ON d.document_type_id = dt.id
+LEFT JOIN clients c ON d.client_id = c.id
+LEFT JOIN categories cat ON d.category_id = cat.id
+WHERE d.is_active = TRUE
+"""
+
+# Vista de la revisión 0001: CREATE OR REPLACE VIEW no permite quitar columnas
+ORIGINAL_DOCUMENTS_VIEW = """
+CREATE VIEW documents_view AS
+SELECT
+    d.id,
+    d.filename,
+    d.file_hash,
+    d.local_path,
+    d.extracted_text,
+    d.file_size,
+    d.upload_date,
+    d.is_active,
+    d.created_at,
+    d.updated_at,
+    dt.name as document_type_name,
+    dt.icon as document_type_icon,
+    c.name as client_name,
+    c.email as client_email,
+    cat.name as category_name,
+    cat.color as category_color
+FROM documents d
+LEFT JOIN document_types dt ON d.document_type_id = dt.id
+LEFT JOIN clients c ON d.client_id = c.id
+LEFT JOIN categories cat ON d.category_id = cat.id
+WHERE d.is_active = TRUE
+"""
+
+COMMENTS = {
+    "documents.file_hash": "Hash SHA-256 del archivo para evitar duplicados (único entre los documentos activos)",
+    "documents.storage_key": "Ubicación de los bytes relativa a UPLOAD_DIR (ruta visible o blob por contenido)",
+    "documents.extraction_status": "Estado de la extracción de texto: pending, processing, completed o failed",
+    "documents.search_vector": "Vector de búsqueda de texto completo (nombre con peso A, texto con peso B)",
+    "documents.deleted_at": "Fecha de eliminación; el documento se purga pasado el periodo de retención",
+    "directories.path": "Ruta relativa a UPLOAD_DIR con separador /",
+    "directories.files_count": "Archivos directamente dentro del directorio",
+    "directories.total_bytes": "Tamaño total en bytes de los archivos del directorio",
+    "pending_file_operations.storage_key": "Clave de origen relativa a UPLOAD_DIR",
+    "pending_file_operations.target_key": "Clave de destino (solo en move)",
+}
+
+TABLE_COMMENTS = {
+    "directories": "Índice de directorios de UPLOAD_DIR con sus contadores de archivos",
+    "pending_file_operations": "Operaciones de archivo (delete/move) confirmadas en base de datos y pendientes en disco",
+}
+
+
+def upgrade() -> None:
+    # Extracción de texto (002) y búsqueda de texto completo (003)
+    op.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS extraction_status VARCHAR(20) NOT NULL DEFAULT 'pending'")
+    op.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS extraction_error TEXT")
+    op.execute(
+        """
+        ALTER TABLE documents ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('spanish', coalesce(filename, '')), 'A') ||
+            setweight(to_tsvector('spanish', coalesce(extracted_text, '')), 'B')
+        ) STORED
+        """
+    )
+
+    # Capa de almacenamiento (004)
+    op.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS storage_key VARCHAR(500)")
+
+    # Índice de directorios (005)
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS directories (
+            id SERIAL PRIMARY KEY,
+            path VARCHAR(500) NOT NULL UNIQUE,
+            parent_path VARCHAR(500),
+            depth INTEGER NOT NULL,
+            files_count INTEGER NOT NULL DEFAULT 0,
+            total_bytes BIGINT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_directories_parent_path ON directories(parent_path)")
+    op.execute("DROP TRIGGER IF EXISTS update_directories_updated_at ON directories")
+    op.execute(
+        "CREATE TRIGGER update_directories_updated_at BEFORE UPDATE ON directories "
+        "FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()"
+    )
+
+    # Registro de operaciones de archivo (006)
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pending_file_operations (
+            id SERIAL PRIMARY KEY,
+            operation VARCHAR(10) NOT NULL,
+            storage_key VARCHAR(500) NOT NULL,
+            target_key VARCHAR(500),
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+    # Hash único solo entre los activos (007). El índice se crea antes de
+    # eliminar la restricción para que el ON CONFLICT de las subidas siempre
+    # tenga uno de los dos.
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_documents_file_hash_active "
+        "ON documents(file_hash) WHERE is_active = TRUE"
+    )
+    op.execute("ALTER TABLE documents DROP CONSTRAINT IF EXISTS documents_file_hash_key")
+
+    # Retención de eliminados (008): los ya inactivos cuentan desde su última modificación
+    op.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP")
+    op.execute("UPDATE documents SET deleted_at = updated_at WHERE is_active = FALSE AND deleted_at IS NULL")
+
+    for table, columns in AUDIT_COLUMNS.items():
+        for column in columns:
+            default = AUDIT_DEFAULTS.get(column, "CURRENT_TIMESTAMP")
+            op.execute(f"UPDATE {table} SET {column} = {default} WHERE {column} IS NULL")
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+
+    for column, comment in COMMENTS.items():
+        op.execute(f"COMMENT ON COLUMN {column} IS '{comment}'")
+    for table, comment in TABLE_COMMENTS.items():
+        op.execute(f"COMMENT ON TABLE {table} IS '{comment}'")
+
+    # Listado y búsqueda sobre la vista (001, 003)
+    op.execute(DOCUMENTS_VIEW)
+
+
+def downgrade() -> None:
+    op.execute("DROP VIEW IF EXISTS documents_view")
+    op.execute(ORIGINAL_DOCUMENTS_VIEW)
+
+    for table, columns in AUDIT_COLUMNS.items():
+        if table != "directories":
+            for column in columns:
+                op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL")
+
+    op.execute("COMMENT ON COLUMN documents.file_hash IS 'Hash SHA-256 del archivo para evitar duplicados'")
+    # Falla si se volvió a subir el contenido de un documento eliminado
+    op.execute("ALTER TABLE documents ADD CONSTRAINT documents_file_hash_key UNIQUE (file_hash)")
+    op.execute("DROP INDEX IF EXISTS uq_documents_file_hash_active")
+
+    op.execute("DROP TABLE IF EXISTS pending_file_operations")
+    op.execute("DROP TABLE IF EXISTS directories")
+    for column in ["deleted_at", "storage_key", "search_vector", "extraction_error", "extraction_status"]:
+        op.execute(f"ALTER TABLE documents DROP COLUMN IF EXISTS {column}")
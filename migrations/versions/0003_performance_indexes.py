@@ -0,0 +1,80 @@
+"""Índices de rendimiento
+
+Índices del listado paginado, la cola de extracción, la búsqueda de texto
+completo, la capa de almacenamiento, las rutas de documentos y directorios y
+la purga de eliminados.
+
+Se crean con ``CREATE INDEX CONCURRENTLY`` para no bloquear las escrituras
+en ``documents`` mientras se construyen. ``CONCURRENTLY`` no puede ejecutarse
+dentro de una transacción, así que cada índice va en un bloque autocommit;
+si una creación se interrumpe, ``IF NOT EXISTS`` no sirve de nada sobre el
+índice inválido que queda: hay que eliminarlo (``DROP INDEX CONCURRENTLY``)
+y volver a ejecutar la migración.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text("is_active = TRUE")
+LISTING_ORDER = [sa.text("upload_date DESC"), sa.text("id DESC")]
+
+# (nombre, tabla, columnas, opciones de create_index)
+INDEXES = [
+    ("idx_documents_listing", "documents", LISTING_ORDER, {"postgresql_where": ACTIVE}),
+    (
+        "idx_documents_type_listing", "documents",
+        [sa.text("document_type_id"), *LISTING_ORDER], {"postgresql_where": ACTIVE}
+    ),
+    (
+        "idx_documents_category_listing", "documents",
+        [sa.text("category_id"), *LISTING_ORDER], {"postgresql_where": ACTIVE}
+    ),
+    (
+        "idx_documents_client_listing", "documents",
+        [sa.text("client_id"), *LISTING_ORDER], {"postgresql_where": ACTIVE}
+    ),
+    ("idx_documents_extraction_status", "documents", ["extraction_status"], {}),
+    (
+        "idx_documents_extraction_pending", "documents", ["id"],
+        {"postgresql_where": sa.text("extraction_status IN ('pending', 'processing')")}
+    ),
+    ("idx_documents_search_vector", "documents", ["search_vector"], {"postgresql_using": "gin"}),
+    ("idx_documents_storage_key", "documents", ["storage_key"], {}),
+    (
+        "idx_documents_local_path", "documents", ["local_path"],
+        {"postgresql_ops": {"local_path": "varchar_pattern_ops"}, "postgresql_where": ACTIVE}
+    ),
+    (
+        "idx_documents_deleted_at", "documents", ["deleted_at"],
+        {"postgresql_where": sa.text("is_active = FALSE")}
+    ),
+    (
+        "idx_directories_path_prefix", "directories", ["path"],
+        {"postgresql_ops": {"path": "varchar_pattern_ops"}}
+    ),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **options)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
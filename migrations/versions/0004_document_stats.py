@@ -0,0 +1,139 @@
+"""Estadísticas de documentos incrementales
+
+Sustituye la vista ``document_stats``, que agregaba toda la tabla
+``documents`` en cada consulta, por una tabla de totales por tipo,
+categoría, cliente y mes que mantienen triggers por sentencia.
+
+Los triggers usan tablas de transición: una subida por lotes, una
+eliminación masiva o el borrado de un directorio ajustan los totales con
+una única sentencia agregada, no una por documento. Las filas se escriben
+en orden de clave para que transacciones concurrentes no se bloqueen
+mutuamente.
+
+La carga inicial bloquea las escrituras en ``documents`` (``SHARE``) mientras
+se agregan los documentos existentes, para que ninguna fila se cuente dos
+veces ni se pierda entre la creación de los triggers y la carga.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Clave de cada dimensión a partir de una fila de documents (alias c)
+DIMENSIONS = """
+    (VALUES
+        ('type', c.document_type_id::text),
+        ('category', c.category_id::text),
+        ('client', coalesce(c.client_id::text, '')),
+        ('month', coalesce(to_char(c.upload_date, 'YYYY-MM'), ''))
+    ) AS b(dimension, key)
+"""
+
+UPDATE_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION update_document_stats()
+RETURNS TRIGGER AS $$
+DECLARE
+    fields TEXT := 'is_active, document_type_id, category_id, client_id, upload_date, file_size';
+    changes TEXT;
+BEGIN
+    -- Filas que entran (+1) y salen (-1) de los totales en esta sentencia
+    changes := CASE TG_OP
+        WHEN 'INSERT' THEN format('SELECT 1 AS sign, %s FROM new_rows', fields)
+        WHEN 'DELETE' THEN format('SELECT -1 AS sign, %s FROM old_rows', fields)
+        ELSE format('SELECT 1 AS sign, %s FROM new_rows UNION ALL SELECT -1, %s FROM old_rows', fields, fields)
+    END;
+
+    EXECUTE format($sql$
+        INSERT INTO document_stats AS s (dimension, key, documents, total_bytes)
+        SELECT b.dimension, b.key, SUM(c.sign), SUM(c.sign * c.file_size::bigint)
+        FROM (%s) AS c
+        CROSS JOIN LATERAL {DIMENSIONS}
+        WHERE c.is_active
+        GROUP BY b.dimension, b.key
+        HAVING SUM(c.sign) <> 0 OR SUM(c.sign * c.file_size::bigint) <> 0
+        ORDER BY b.dimension, b.key
+        ON CONFLICT (dimension, key) DO UPDATE SET
+            documents = s.documents + EXCLUDED.documents,
+            total_bytes = s.total_bytes + EXCLUDED.total_bytes,
+            updated_at = CURRENT_TIMESTAMP
+    $sql$, changes);
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql'
+"""
+
+# (evento, tablas de transición); con tablas de transición cada trigger solo admite un evento
+TRIGGERS = [
+    ("insert", "REFERENCING NEW TABLE AS new_rows"),
+    ("update", "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("delete", "REFERENCING OLD TABLE AS old_rows"),
+]
+
+
+def upgrade() -> None:
+    op.execute("DROP VIEW IF EXISTS document_stats")
+
+    op.create_table(
+        "document_stats",
+        sa.Column("dimension", sa.String(length=10), nullable=False),
+        sa.Column("key", sa.String(length=20), nullable=False),
+        sa.Column("documents", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("total_bytes", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.PrimaryKeyConstraint("dimension", "key"),
+        comment="Totales de documentos activos por tipo, categoría, cliente y mes (mantenidos por triggers)",
+    )
+
+    op.execute("LOCK TABLE documents IN SHARE MODE")
+    op.execute(UPDATE_FUNCTION)
+    for event, referencing in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER document_stats_{event} AFTER {event.upper()} ON documents {referencing} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION update_document_stats()"
+        )
+    op.execute(
+        f"""
+        INSERT INTO document_stats (dimension, key, documents, total_bytes)
+        SELECT b.dimension, b.key, COUNT(*), COALESCE(SUM(c.file_size::bigint), 0)
+        FROM documents AS c
+        CROSS JOIN LATERAL {DIMENSIONS}
+        WHERE c.is_active
+        GROUP BY b.dimension, b.key
+        """
+    )
+
+
+def downgrade() -> None:
+    for event, _ in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS document_stats_{event} ON documents")
+    op.execute("DROP FUNCTION IF EXISTS update_document_stats()")
+    op.drop_table("document_stats")
+
+    op.execute(
+        """
+        CREATE OR REPLACE VIEW document_stats AS
+        SELECT
+            COUNT(*) as total_documents,
+            COUNT(DISTINCT client_id) as total_clients,
+            COUNT(DISTINCT category_id) as total_categories,
+            SUM(file_size) as total_size_bytes,
+            AVG(file_size) as avg_file_size,
+            MIN(upload_date) as oldest_document,
+            MAX(upload_date) as newest_document
+        FROM documents
+        WHERE is_active = TRUE
+        """
+    )
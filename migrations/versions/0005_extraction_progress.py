@@ -0,0 +1,47 @@
+"""Progreso de la extracción de texto
+
+Guarda cuántas páginas se extrajeron de cuántas y si el texto es parcial,
+para que los clientes distingan un texto completo de uno recortado por los
+límites de páginas, tiempo o tamaño. Las columnas admiten nulos: añadirlas
+no reescribe la tabla.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "documents",
+        sa.Column("extraction_pages", sa.Integer(), nullable=True, comment="Páginas de las que se extrajo texto")
+    )
+    op.add_column(
+        "documents",
+        sa.Column("extraction_total_pages", sa.Integer(), nullable=True, comment="Páginas totales del PDF")
+    )
+    op.add_column(
+        "documents",
+        sa.Column(
+            "extraction_truncated", sa.Boolean(), nullable=True,
+            comment="Si el texto guardado es parcial por los límites de páginas, tiempo o tamaño"
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("documents", "extraction_truncated")
+    op.drop_column("documents", "extraction_total_pages")
+    op.drop_column("documents", "extraction_pages")
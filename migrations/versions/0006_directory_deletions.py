@@ -0,0 +1,48 @@
+"""Estado de las eliminaciones de directorios
+
+El progreso de una eliminación de directorio se guardaba en la memoria del
+worker que la inició: con varios workers la consulta del estado podía llegar
+a otro y responder 404, y un reinicio lo perdía. La tabla
+``directory_deletions`` lo guarda en la base de datos.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "directory_deletions",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("path", sa.String(length=500), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, comment="running, completed o failed"),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("documents_deleted", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "files_total", sa.Integer(), nullable=True,
+            comment="Archivos a eliminar del disco (nulo mientras se cuentan)"
+        ),
+        sa.Column("files_deleted", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        comment="Estado y progreso de las eliminaciones de directorios",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("directory_deletions")
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de latencia con carga mixta de subidas y listados
+===========================================================
+
+Lanza peticiones concurrentes contra una instancia en ejecución de la API,
+mezclando subidas de documentos con metadatos y listados de metadatos
+(ambos pasan por la base de datos), y muestra los percentiles de latencia
+por tipo de operación.
+
+Para comparar el acceso síncrono con el asíncrono a la base de datos se
+ejecuta una vez contra cada versión del servidor y se comparan resultados:
+
+    python scripts/benchmark_db_latency.py --output antes.json
+    # ... desplegar la nueva versión ...
+    python scripts/benchmark_db_latency.py --output despues.json --compare antes.json
+
+Solo usa la biblioteca estándar para no añadir dependencias.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+LIST_ENDPOINTS = [
+    "/api/v1/documents/types",
+    "/api/v1/documents/categories",
+    "/api/v1/documents/clients",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Calcula un percentil por el método del rango más cercano.
+
+    Args:
+        values (List[float]): Muestras ordenadas de menor a mayor
+        pct (float): Percentil entre 0 y 100
+
+    Returns:
+        float: Valor del percentil
+    """
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def build_pdf(size: int) -> bytes:
+    """
+    Genera un PDF sintético de tamaño aproximado y contenido único.
+
+    Args:
+        size (int): Tamaño aproximado en bytes
+
+    Returns:
+        bytes: Contenido del PDF
+    """
+    header = b"%PDF-1.4\n% benchmark " + uuid.uuid4().hex.encode() + b"\n"
+    return header + os.urandom(max(0, size - len(header) - 6)) + b"\n%%EOF"
+
+
+def encode_multipart(fields: Dict[str, str], filename: str, content: bytes) -> Tuple[bytes, str]:
+    """
+    Codifica un formulario multipart con un único archivo.
+
+    Args:
+        fields (Dict[str, str]): Campos de texto del formulario
+        filename (str): Nombre del archivo
+        content (bytes): Contenido del archivo
+
+    Returns:
+        Tuple[bytes, str]: Cuerpo de la petición y valor de Content-Type
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n".encode()
+        )
+    parts.append(
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: application/pdf\r\n\r\n".encode()
+    )
+    parts.append(content)
+    parts.append(f"\r\n--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def request(url: str, method: str = "GET", body: bytes = None, headers: Dict[str, str] = None) -> Tuple[int, bytes]:
+    """
+    Realiza una petición HTTP y devuelve el código de estado y el cuerpo.
+
+    Args:
+        url (str): URL completa
+        method (str): Método HTTP
+        body (bytes): Cuerpo de la petición
+        headers (Dict[str, str]): Cabeceras adicionales
+
+    Returns:
+        Tuple[int, bytes]: Código de estado y cuerpo de la respuesta
+    """
+    req = urllib.request.Request(url, data=body, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+class Benchmark:
+    """
+    Ejecuta la carga mixta y acumula las latencias por operación.
+
+    Attributes:
+        base_url (str): URL base del servidor
+        args (argparse.Namespace): Parámetros del benchmark
+        samples (Dict[str, List[float]]): Latencias en milisegundos por operación
+        errors (Dict[str, int]): Número de respuestas no exitosas por operación
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        """Inicializa el benchmark con los parámetros de línea de comandos."""
+        self.base_url = args.url.rstrip("/")
+        self.args = args
+        self.samples: Dict[str, List[float]] = {"upload": [], "list": []}
+        self.errors: Dict[str, int] = {"upload": 0, "list": 0}
+        self.uploaded: List[str] = []
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def _next_ratio_slot(self) -> bool:
+        """Decide de forma determinista si la siguiente operación es una subida."""
+        with self._lock:
+            self._counter += 1
+            return (self._counter * self.args.upload_ratio) % 1 < self.args.upload_ratio
+
+    def _record(self, operation: str, started: float, ok: bool) -> None:
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.samples[operation].append(elapsed)
+            if not ok:
+                self.errors[operation] += 1
+
+    def _upload(self, document_type_id: int, category_id: int) -> None:
+        filename = f"bench-{uuid.uuid4().hex}.pdf"
+        body, content_type = encode_multipart(
+            {
+                "path": self.args.path,
+                "document_type_id": str(document_type_id),
+                "category_id": str(category_id),
+            },
+            filename,
+            build_pdf(self.args.file_size),
+        )
+        started = time.perf_counter()
+        status, _ = request(
+            f"{self.base_url}/api/v1/documents/upload", "POST", body, {"Content-Type": content_type}
+        )
+        self._record("upload", started, status == 200)
+        if status == 200:
+            with self._lock:
+                self.uploaded.append(f"{self.args.path}/{filename}")
+
+    def _list(self, index: int) -> None:
+        started = time.perf_counter()
+        status, _ = request(f"{self.base_url}{LIST_ENDPOINTS[index % len(LIST_ENDPOINTS)]}")
+        self._record("list", started, status == 200)
+
+    def _worker(self, deadline: float, document_type_id: int, category_id: int) -> None:
+        index = 0
+        while time.perf_counter() < deadline:
+            if self._next_ratio_slot():
+                self._upload(document_type_id, category_id)
+            else:
+                self._list(index)
+            index += 1
+
+    def run(self) -> dict:
+        """
+        Ejecuta la carga durante el tiempo indicado.
+
+        Returns:
+            dict: Resumen con percentiles por operación
+        """
+        status, body = request(f"{self.base_url}/api/v1/documents/types")
+        types = json.loads(body) if status == 200 else []
+        status, body = request(f"{self.base_url}/api/v1/documents/categories")
+        categories = json.loads(body) if status == 200 else []
+        if not types or not categories:
+            print("❌ Se necesita al menos un tipo de documento y una categoría (scripts/init_database.py)")
+            sys.exit(1)
+
+        deadline = time.perf_counter() + self.args.duration
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            for _ in range(self.args.concurrency):
+                pool.submit(self._worker, deadline, types[0]["id"], categories[0]["id"])
+
+        if not self.args.keep_files:
+            for path in self.uploaded:
+                request(f"{self.base_url}/api/v1/documents/{path}", "DELETE")
+
+        return self.summary()
+
+    def summary(self) -> dict:
+        """
+        Resume las latencias registradas.
+
+        Returns:
+            dict: Número de peticiones, errores, throughput y percentiles por operación
+        """
+        result = {
+            "url": self.base_url,
+            "concurrency": self.args.concurrency,
+            "duration": self.args.duration,
+            "upload_ratio": self.args.upload_ratio,
+            "file_size": self.args.file_size,
+            "operations": {},
+        }
+        for operation, values in self.samples.items():
+            values = sorted(values)
+            result["operations"][operation] = {
+                "requests": len(values),
+                "errors": self.errors[operation],
+                "throughput": round(len(values) / self.args.duration, 2),
+                "mean_ms": round(statistics.fmean(values), 2) if values else 0.0,
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "max_ms": round(values[-1], 2) if values else 0.0,
+            }
+        return result
+
+
+def print_summary(result: dict, baseline: dict = None) -> None:
+    """
+    Muestra el resumen por consola, con la variación respecto a una referencia.
+
+    Args:
+        result (dict): Resultado actual
+        baseline (dict): Resultado de referencia (opcional)
+    """
+    print(f"\n📊 {result['url']} · concurrencia {result['concurrency']} · {result['duration']}s")
+    print(f"{'operación':<10}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'errores':>10}")
+    for operation, stats in result["operations"].items():
+        print(
+            f"{operation:<10}{stats['throughput']:>10}{stats['p50_ms']:>10}"
+            f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['errors']:>10}"
+        )
+        if baseline and operation in baseline.get("operations", {}):
+            before = baseline["operations"][operation]
+            deltas = []
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                if before[key]:
+                    deltas.append(f"{key[:3]} {100 * (stats[key] - before[key]) / before[key]:+.1f}%")
+            print(f"{'':<10}vs referencia: {', '.join(deltas)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de latencia con carga mixta de subidas y listados")
+    parser.add_argument("--url", default="http://localhost:8000", help="URL base del servidor")
+    parser.add_argument("--concurrency", type=int, default=32, help="Peticiones simultáneas")
+    parser.add_argument("--duration", type=float, default=30.0, help="Duración en segundos")
+    parser.add_argument("--upload-ratio", type=float, default=0.2, help="Fracción de operaciones que son subidas")
+    parser.add_argument("--file-size", type=int, default=256 * 1024, help="Tamaño de cada PDF subido en bytes")
+    parser.add_argument("--path", default="benchmark", help="Directorio destino de las subidas")
+    parser.add_argument("--keep-files", action="store_true", help="No eliminar los documentos subidos al terminar")
+    parser.add_argument("--output", help="Guardar el resultado en un fichero JSON")
+    parser.add_argument("--compare", help="Fichero JSON de una ejecución anterior con el que comparar")
+    args = parser.parse_args()
+
+    result = Benchmark(args).run()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_summary(result, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Resultado guardado en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
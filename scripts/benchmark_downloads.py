@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de descargas de archivos
+==================================
+
+Mide el rendimiento de ``GET /api/v1/files/download/{path}`` en tres
+escenarios habituales:
+
+- ``full``: descarga completa del archivo.
+- ``range``: peticiones de rangos de 64KB en posiciones aleatorias, como las
+  que hace un visor de PDF con documentos linealizados.
+- ``revalidate``: descarga repetida enviando el ETag recibido
+  (If-None-Match), como la que hace un navegador con el archivo en caché.
+
+Para comparar el manejador anterior con el nuevo se ejecuta contra cada
+versión del servidor y se comparan resultados:
+
+    python scripts/benchmark_downloads.py --file Documentos/grande.pdf --output antes.json
+    # ... desplegar la nueva versión ...
+    python scripts/benchmark_downloads.py --file Documentos/grande.pdf --output despues.json --compare antes.json
+
+Solo usa la biblioteca estándar para no añadir dependencias.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from benchmark_db_latency import percentile
+
+SCENARIOS = ["full", "range", "revalidate"]
+
+
+def fetch(url: str, headers: Dict[str, str]) -> Tuple[int, int, Dict[str, str]]:
+    """
+    Realiza una petición GET y devuelve el estado, los bytes recibidos y las cabeceras.
+
+    Args:
+        url (str): URL completa
+        headers (Dict[str, str]): Cabeceras de la petición
+
+    Returns:
+        Tuple[int, int, Dict[str, str]]: Código de estado, bytes del cuerpo y cabeceras
+    """
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            received = 0
+            while True:
+                chunk = response.read(256 * 1024)
+                if not chunk:
+                    break
+                received += len(chunk)
+            return response.status, received, dict(response.headers)
+    except urllib.error.HTTPError as e:
+        return e.code, len(e.read()), dict(e.headers)
+
+
+class DownloadBenchmark:
+    """
+    Ejecuta cada escenario de descarga y acumula latencias y bytes recibidos.
+
+    Attributes:
+        url (str): URL de descarga del archivo
+        args (argparse.Namespace): Parámetros del benchmark
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        """Inicializa el benchmark con los parámetros de línea de comandos."""
+        self.url = f"{args.url.rstrip('/')}/api/v1/files/download/{args.file}"
+        self.args = args
+        self._lock = threading.Lock()
+
+    def _probe(self) -> Tuple[int, Optional[str]]:
+        """Descarga el archivo una vez para conocer su tamaño y su ETag."""
+        status, size, headers = fetch(self.url, {})
+        if status != 200:
+            print(f"❌ No se pudo descargar {self.url} (HTTP {status})")
+            sys.exit(1)
+        return size, headers.get("ETag") or headers.get("etag")
+
+    def _headers(self, scenario: str, size: int, etag: Optional[str]) -> Dict[str, str]:
+        if scenario == "range":
+            length = min(self.args.range_size, size)
+            start = random.randint(0, max(0, size - length))
+            return {"Range": f"bytes={start}-{start + length - 1}"}
+        if scenario == "revalidate" and etag:
+            return {"If-None-Match": etag}
+        return {}
+
+    def run_scenario(self, scenario: str, size: int, etag: Optional[str]) -> dict:
+        """
+        Ejecuta un escenario durante el tiempo indicado.
+
+        Args:
+            scenario (str): "full", "range" o "revalidate"
+            size (int): Tamaño del archivo
+            etag (Optional[str]): ETag del archivo
+
+        Returns:
+            dict: Peticiones, errores, throughput, bytes y percentiles del escenario
+        """
+        samples: List[float] = []
+        received_bytes = [0]
+        statuses: Dict[int, int] = {}
+        deadline = time.perf_counter() + self.args.duration
+
+        def worker():
+            while time.perf_counter() < deadline:
+                headers = self._headers(scenario, size, etag)
+                started = time.perf_counter()
+                status, received, _ = fetch(self.url, headers)
+                elapsed = (time.perf_counter() - started) * 1000
+                with self._lock:
+                    samples.append(elapsed)
+                    received_bytes[0] += received
+                    statuses[status] = statuses.get(status, 0) + 1
+
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            for _ in range(self.args.concurrency):
+                pool.submit(worker)
+
+        samples.sort()
+        errors = sum(count for status, count in statuses.items() if status >= 400)
+        return {
+            "requests": len(samples),
+            "errors": errors,
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+            "throughput": round(len(samples) / self.args.duration, 2),
+            "mb_per_s": round(received_bytes[0] / self.args.duration / (1024 * 1024), 2),
+            "bytes_per_request": round(received_bytes[0] / len(samples)) if samples else 0,
+            "mean_ms": round(statistics.fmean(samples), 2) if samples else 0.0,
+            "p50_ms": round(percentile(samples, 50), 2),
+            "p95_ms": round(percentile(samples, 95), 2),
+            "p99_ms": round(percentile(samples, 99), 2),
+        }
+
+    def run(self) -> dict:
+        """
+        Ejecuta todos los escenarios seleccionados.
+
+        Returns:
+            dict: Resumen por escenario
+        """
+        size, etag = self._probe()
+        result = {
+            "url": self.url,
+            "file_size": size,
+            "concurrency": self.args.concurrency,
+            "duration": self.args.duration,
+            "scenarios": {},
+        }
+        for scenario in self.args.scenarios:
+            result["scenarios"][scenario] = self.run_scenario(scenario, size, etag)
+        return result
+
+
+def print_summary(result: dict, baseline: dict = None) -> None:
+    """
+    Muestra el resumen por consola, con la variación respecto a una referencia.
+
+    Args:
+        result (dict): Resultado actual
+        baseline (dict): Resultado de referencia (opcional)
+    """
+    print(f"\n📊 {result['url']} · {result['file_size']} bytes · concurrencia {result['concurrency']}")
+    print(f"{'escenario':<12}{'req/s':>10}{'MB/s':>10}{'bytes/req':>12}{'p50':>10}{'p99':>10}  estados")
+    for scenario, stats in result["scenarios"].items():
+        print(
+            f"{scenario:<12}{stats['throughput']:>10}{stats['mb_per_s']:>10}{stats['bytes_per_request']:>12}"
+            f"{stats['p50_ms']:>10}{stats['p99_ms']:>10}  {stats['statuses']}"
+        )
+        if baseline and scenario in baseline.get("scenarios", {}):
+            before = baseline["scenarios"][scenario]
+            deltas = []
+            for key in ("throughput", "bytes_per_request", "p50_ms", "p99_ms"):
+                if before[key]:
+                    deltas.append(f"{key} {100 * (stats[key] - before[key]) / before[key]:+.1f}%")
+            print(f"{'':<12}vs referencia: {', '.join(deltas)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de descargas completas, por rangos y condicionales")
+    parser.add_argument("--url", default="http://localhost:8000", help="URL base del servidor")
+    parser.add_argument("--file", required=True, help="Ruta del archivo a descargar (ej: Documentos/archivo.pdf)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Peticiones simultáneas")
+    parser.add_argument("--duration", type=float, default=15.0, help="Duración de cada escenario en segundos")
+    parser.add_argument("--range-size", type=int, default=64 * 1024, help="Bytes por petición de rango")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS, help="Escenarios a ejecutar")
+    parser.add_argument("--output", help="Guardar el resultado en un fichero JSON")
+    parser.add_argument("--compare", help="Fichero JSON de una ejecución anterior con el que comparar")
+    args = parser.parse_args()
+
+    result = DownloadBenchmark(args).run()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_summary(result, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Resultado guardado en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suite de benchmarks de subidas, listados y descargas
+====================================================
+
+Arranca la aplicación con uvicorn contra una base de datos PostgreSQL local
+dedicada (``--db-name``, que debe existir; se migra con ``alembic upgrade
+head``) y un directorio de uploads temporal, y ejecuta cargas fijas y
+reproducibles:
+
+- ``upload``: subidas concurrentes de PDF generados de varios tamaños.
+- ``listing``: listados de directorios de 10.000 y 100.000 archivos
+  (completo, paginado con cursor, NDJSON e información del directorio).
+  Los árboles se crean con subidas por lotes la primera vez y se reutilizan
+  en las ejecuciones siguientes si se conserva la base de datos y
+  ``--upload-dir``.
+- ``range``: descargas por rangos en posiciones aleatorias de un PDF grande.
+- ``metadata``: tipos, categorías, clientes, estadísticas y listado de
+  documentos.
+
+De cada medición se guarda throughput, percentiles de latencia y el pico de
+memoria residente (RSS) del servidor durante la medición, en un JSON que se
+puede comparar entre commits:
+
+    createdb pdf_manager_bench
+    python scripts/benchmark_suite.py --output antes.json
+    # ... cambiar de commit ...
+    python scripts/benchmark_suite.py --output despues.json --compare antes.json
+
+La conexión a PostgreSQL se toma de la configuración habitual (``DB_HOST``,
+``DB_USER``...) salvo el nombre de la base de datos. Con ``--url`` se usa un
+servidor ya en ejecución (el RSS solo se mide si se indica ``--pid``).
+
+La extracción de texto se desactiva en el servidor arrancado para que no
+compita por la CPU con las mediciones (``--extraction`` la mantiene).
+
+Solo usa la biblioteca estándar para no añadir dependencias.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmark_db_latency import build_pdf, encode_multipart, percentile, request
+from benchmark_downloads import fetch
+
+ROOT = Path(__file__).resolve().parent.parent
+
+WORKLOADS = ["upload", "listing", "range", "metadata"]
+
+METADATA_ENDPOINTS = {
+    "types": "/api/v1/documents/types",
+    "categories": "/api/v1/documents/categories",
+    "clients": "/api/v1/documents/clients",
+    "stats": "/api/v1/stats",
+    "documents": "/api/v1/documents?page=1",
+}
+
+# Directorio de los documentos del benchmark dentro de UPLOAD_DIR
+BENCH_PATH = "benchmark"
+
+# Métricas comparadas con la referencia: (clave, mayor es mejor)
+COMPARED = [("throughput", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False), ("peak_rss_mb", False)]
+
+
+def format_size(size: int) -> str:
+    """Tamaño legible para los nombres de las mediciones (16KB, 4MB...)."""
+    for unit, factor in (("MB", 1024 * 1024), ("KB", 1024)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return f"{size}B"
+
+
+def encode_multipart_files(fields: Dict[str, str], files: List[Tuple[str, bytes]]) -> Tuple[bytes, str]:
+    """
+    Codifica un formulario multipart con varios archivos en el campo ``files``.
+
+    Args:
+        fields (Dict[str, str]): Campos de texto del formulario
+        files (List[Tuple[str, bytes]]): Nombre y contenido de cada archivo
+
+    Returns:
+        Tuple[bytes, str]: Cuerpo de la petición y valor de Content-Type
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n".encode()
+        )
+    for filename, content in files:
+        parts.append(
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"files\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: application/pdf\r\n\r\n".encode()
+        )
+        parts.append(content)
+        parts.append(b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class RssMonitor:
+    """
+    Pico de memoria residente de un proceso, leído de ``/proc`` (Linux).
+
+    Antes de cada medición se reinicia el pico (``clear_refs``) para que
+    ``VmHWM`` refleje solo esa medición; si no se puede reiniciar, el pico es
+    el acumulado desde el arranque del proceso.
+    """
+
+    def __init__(self, pid: Optional[int]):
+        """Inicializa el monitor para el proceso indicado (None: sin medición)."""
+        self.pid = pid
+
+    def reset(self) -> None:
+        """Reinicia el pico de memoria residente del proceso."""
+        if self.pid is None:
+            return
+        try:
+            with open(f"/proc/{self.pid}/clear_refs", "w") as f:
+                f.write("5")
+        except OSError:
+            pass
+
+    def peak_mb(self) -> Optional[float]:
+        """Pico de memoria residente en MB, o None si no se puede leer."""
+        if self.pid is None:
+            return None
+        try:
+            with open(f"/proc/{self.pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            pass
+        return None
+
+
+class Server:
+    """
+    Instancia de la aplicación arrancada con uvicorn para el benchmark.
+
+    Attributes:
+        url (str): URL base del servidor
+        process (subprocess.Popen): Proceso de uvicorn
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        """Prepara el entorno del servidor a partir de los parámetros."""
+        self.args = args
+        self.port = args.port or self._free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.process: Optional[subprocess.Popen] = None
+        self.log_path = Path(args.upload_dir).parent / f"server-{self.port}.log"
+        self.env = {
+            **os.environ,
+            "DB_NAME": args.db_name,
+            "UPLOAD_DIR": str(args.upload_dir),
+            "EXTRACTION_ENABLED": "true" if args.extraction else "false",
+            "LOG_LEVEL": "WARNING",
+        }
+
+    @staticmethod
+    def _free_port() -> int:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    def start(self) -> None:
+        """Migra la base de datos y arranca uvicorn, esperando a que responda."""
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=ROOT, env=self.env, check=True, stdout=subprocess.DEVNULL
+        )
+        log = open(self.log_path, "w")
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(self.port), "--no-access-log",
+            ],
+            cwd=ROOT, env=self.env, stdout=log, stderr=subprocess.STDOUT
+        )
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                if request(f"{self.url}/api/v1/health")[0] == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.25)
+        self.stop()
+        print(f"❌ El servidor no arrancó; revisa {self.log_path}")
+        sys.exit(1)
+
+    def stop(self) -> None:
+        """Detiene el servidor."""
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class BenchmarkSuite:
+    """
+    Ejecuta las cargas seleccionadas y acumula el resultado de cada medición.
+
+    Attributes:
+        base_url (str): URL base del servidor
+        args (argparse.Namespace): Parámetros del benchmark
+        rss (RssMonitor): Medidor del pico de memoria del servidor
+        measurements (Dict[str, dict]): Resultado por medición ("upload/256KB"...)
+    """
+
+    def __init__(self, args: argparse.Namespace, base_url: str, pid: Optional[int]):
+        """Inicializa la suite contra el servidor indicado."""
+        self.args = args
+        self.base_url = base_url
+        self.rss = RssMonitor(pid)
+        self.measurements: Dict[str, dict] = {}
+        self.random = random.Random(args.seed)
+        self.document_type_id = 0
+        self.category_id = 0
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def measure(self, name: str, count: int, operation: Callable[[int], Tuple[int, int]]) -> dict:
+        """
+        Ejecuta ``count`` operaciones con la concurrencia configurada y resume las latencias.
+
+        Args:
+            name (str): Nombre de la medición
+            count (int): Número de operaciones
+            operation (Callable[[int], Tuple[int, int]]): Recibe el índice de la
+                operación y devuelve el código de estado y los bytes transferidos
+
+        Returns:
+            dict: Peticiones, errores, throughput, MB/s, percentiles y pico de RSS
+        """
+        samples: List[float] = []
+        transferred = [0]
+        errors = [0]
+        lock = threading.Lock()
+
+        def run(index: int) -> None:
+            started = time.perf_counter()
+            try:
+                status, size = operation(index)
+            except OSError:
+                status, size = 0, 0
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                samples.append(elapsed)
+                transferred[0] += size
+                if not 200 <= status < 400:
+                    errors[0] += 1
+
+        self.rss.reset()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            list(pool.map(run, range(count)))
+        wall = time.perf_counter() - started
+
+        samples.sort()
+        stats = {
+            "requests": len(samples),
+            "errors": errors[0],
+            "seconds": round(wall, 3),
+            "throughput": round(len(samples) / wall, 2) if wall else 0.0,
+            "mb_per_s": round(transferred[0] / wall / (1024 * 1024), 2) if wall else 0.0,
+            "mean_ms": round(statistics.fmean(samples), 2) if samples else 0.0,
+            "p50_ms": round(percentile(samples, 50), 2),
+            "p95_ms": round(percentile(samples, 95), 2),
+            "p99_ms": round(percentile(samples, 99), 2),
+            "max_ms": round(samples[-1], 2) if samples else 0.0,
+            "peak_rss_mb": self.rss.peak_mb(),
+        }
+        self.measurements[name] = stats
+        print(
+            f"   {name:<32}{stats['throughput']:>9} req/s  p50 {stats['p50_ms']:>8} ms  "
+            f"p99 {stats['p99_ms']:>8} ms  errores {stats['errors']}"
+        )
+        return stats
+
+    def _ensure_metadata(self) -> None:
+        """Obtiene (o crea) el tipo de documento y la categoría de las subidas."""
+        for kind, endpoint, create in (
+            ("document_type_id", "/api/v1/documents/types", "/api/v1/metadata/document-types"),
+            ("category_id", "/api/v1/documents/categories", "/api/v1/metadata/categories"),
+        ):
+            status, body = request(self._url(endpoint))
+            items = json.loads(body) if status == 200 else []
+            if not items:
+                payload = json.dumps({"name": "Benchmark"}).encode()
+                status, body = request(
+                    self._url(create), "POST", payload, {"Content-Type": "application/json"}
+                )
+                if status != 200:
+                    print(f"❌ No se pudo crear {kind} ({status}): {body[:200]!r}")
+                    sys.exit(1)
+                items = [json.loads(body)]
+            setattr(self, kind, items[0]["id"])
+
+    def _upload(self, path: str, filename: str, content: bytes) -> Tuple[int, bytes]:
+        body, content_type = encode_multipart(
+            {
+                "path": path,
+                "document_type_id": str(self.document_type_id),
+                "category_id": str(self.category_id),
+            },
+            filename,
+            content,
+        )
+        return request(self._url("/api/v1/documents/upload"), "POST", body, {"Content-Type": content_type})
+
+    def run_upload(self) -> None:
+        """Subidas concurrentes de PDF generados de cada tamaño."""
+        run_id = uuid.uuid4().hex[:8]
+        for size in self.args.upload_sizes:
+            label = format_size(size)
+            # Contenido generado antes de medir: solo se mide la subida
+            contents = [build_pdf(size) for _ in range(self.args.uploads)]
+
+            def upload(index: int) -> Tuple[int, int]:
+                status, _ = self._upload(
+                    f"{BENCH_PATH}/uploads/{run_id}/{label}", f"bench-{index}.pdf", contents[index]
+                )
+                return status, size
+
+            self.measure(f"upload/{label}", len(contents), upload)
+
+    def _seed_tree(self, path: str, files: int) -> None:
+        """Crea el directorio con ``files`` archivos pequeños si aún no los tiene."""
+        status, body = request(self._url(f"/api/v1/directories/{path}"))
+        existing = json.loads(body).get("files_count", 0) if status == 200 else 0
+        if existing >= files:
+            return
+        print(f"   creando {path} ({existing} -> {files} archivos)...")
+        batch = self.args.seed_batch
+
+        def upload_batch(start: int) -> None:
+            names = range(start, min(start + batch, files))
+            body, content_type = encode_multipart_files(
+                {
+                    "path": path,
+                    "document_type_id": str(self.document_type_id),
+                    "category_id": str(self.category_id),
+                },
+                [(f"file-{index:07d}.pdf", build_pdf(1024)) for index in names],
+            )
+            status, response = request(
+                self._url("/api/v1/documents/upload/batch"), "POST", body, {"Content-Type": content_type}
+            )
+            if status != 200:
+                raise RuntimeError(f"Subida por lotes fallida ({status}): {response[:200]!r}")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(upload_batch, range(existing, files, batch)))
+
+    def run_listing(self) -> None:
+        """Listados de directorios con 10.000 y 100.000 archivos (o los indicados)."""
+        for files in self.args.tree_sizes:
+            path = f"{BENCH_PATH}/tree-{files}"
+            self._seed_tree(path, files)
+            requests = self.args.listing_requests
+            prefix = f"listing/{files}"
+
+            def get(url: str) -> Tuple[int, int]:
+                status, size, _ = fetch(self._url(url), {})
+                return status, size
+
+            self.measure(f"{prefix}/info", requests, lambda _: get(f"/api/v1/directories/{path}"))
+            self.measure(f"{prefix}/full", requests, lambda _: get(f"/api/v1/files/{path}"))
+            self.measure(f"{prefix}/ndjson", requests, lambda _: get(f"/api/v1/files/{path}?format=ndjson"))
+
+            # Cursores repartidos por todo el directorio: las páginas profundas cuentan igual
+            cursors = [None]
+            status, body = request(self._url(f"/api/v1/files/{path}?limit=1000"))
+            while status == 200:
+                page = json.loads(body)
+                if not page["has_more"]:
+                    break
+                cursor = urllib.parse.quote(page["next_cursor"])
+                cursors.append(cursor)
+                status, body = request(self._url(f"/api/v1/files/{path}?limit=1000&cursor={cursor}"))
+            page_size = self.args.page_size
+            picks = [self.random.choice(cursors) for _ in range(requests)]
+
+            def get_page(index: int) -> Tuple[int, int]:
+                cursor = picks[index]
+                query = f"limit={page_size}" + (f"&cursor={cursor}" if cursor else "")
+                return get(f"/api/v1/files/{path}?{query}")
+
+            self.measure(f"{prefix}/page", requests, get_page)
+
+    def run_range(self) -> None:
+        """Descargas por rangos en posiciones aleatorias de un PDF grande."""
+        size = self.args.range_file_size
+        status, body = self._upload(f"{BENCH_PATH}/range", f"range-{uuid.uuid4().hex[:8]}.pdf", build_pdf(size))
+        if status != 200:
+            print(f"❌ No se pudo subir el archivo de rangos ({status})")
+            return
+        url = self._url(f"/api/v1/documents/{json.loads(body)['document']['id']}")
+        length = min(self.args.range_size, size)
+        starts = [self.random.randint(0, size - length) for _ in range(self.args.range_requests)]
+
+        def get_range(index: int) -> Tuple[int, int]:
+            status, received, _ = fetch(url, {"Range": f"bytes={starts[index]}-{starts[index] + length - 1}"})
+            return status, received
+
+        self.measure(f"range/{format_size(length)}", len(starts), get_range)
+
+    def run_metadata(self) -> None:
+        """Endpoints de metadatos y estadísticas."""
+        for name, endpoint in METADATA_ENDPOINTS.items():
+            url = self._url(endpoint)
+
+            def get(_: int) -> Tuple[int, int]:
+                status, size, _ = fetch(url, {})
+                return status, size
+
+            self.measure(f"metadata/{name}", self.args.metadata_requests, get)
+
+    def run(self) -> dict:
+        """
+        Ejecuta las cargas seleccionadas en orden.
+
+        Returns:
+            dict: Entorno, parámetros y resultado de cada medición
+        """
+        self._ensure_metadata()
+        for workload in self.args.workloads:
+            print(f"\n▶ {workload}")
+            getattr(self, f"run_{workload}")()
+        return {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "url": self.base_url,
+            "parameters": {
+                "concurrency": self.args.concurrency,
+                "workloads": self.args.workloads,
+                "upload_sizes": self.args.upload_sizes,
+                "uploads": self.args.uploads,
+                "tree_sizes": self.args.tree_sizes,
+                "listing_requests": self.args.listing_requests,
+                "page_size": self.args.page_size,
+                "range_file_size": self.args.range_file_size,
+                "range_size": self.args.range_size,
+                "range_requests": self.args.range_requests,
+                "metadata_requests": self.args.metadata_requests,
+                "extraction": self.args.extraction,
+                "seed": self.args.seed,
+            },
+            "measurements": self.measurements,
+        }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(result: dict, baseline: dict = None) -> None:
+    """
+    Muestra el resumen por consola, con la variación respecto a una referencia.
+
+    Las variaciones se marcan con ⚠️ cuando empeoran más que un 10%.
+
+    Args:
+        result (dict): Resultado actual
+        baseline (dict): Resultado de referencia (opcional)
+    """
+    title = f"\n📊 {result['url']} · commit {result['commit']} · concurrencia {result['parameters']['concurrency']}"
+    if baseline:
+        title += f" · referencia {baseline.get('commit')}"
+    print(title)
+    print(f"{'medición':<32}{'req/s':>10}{'MB/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'RSS MB':>9}{'err':>6}")
+    for name, stats in result["measurements"].items():
+        print(
+            f"{name:<32}{stats['throughput']:>10}{stats['mb_per_s']:>9}{stats['p50_ms']:>10}"
+            f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{str(stats['peak_rss_mb']):>9}{stats['errors']:>6}"
+        )
+        before = (baseline or {}).get("measurements", {}).get(name)
+        if not before:
+            continue
+        deltas = []
+        for key, higher_is_better in COMPARED:
+            if before.get(key) and stats.get(key) is not None:
+                change = 100 * (stats[key] - before[key]) / before[key]
+                worse = -change if higher_is_better else change
+                deltas.append(f"{key} {change:+.1f}%{' ⚠️' if worse > 10 else ''}")
+        print(f"{'':<32}vs referencia: {', '.join(deltas)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks de subidas, listados y descargas")
+    parser.add_argument("--url", help="Usar un servidor ya en ejecución en lugar de arrancar uno")
+    parser.add_argument("--pid", type=int, help="PID del servidor indicado con --url, para medir su RSS")
+    parser.add_argument("--port", type=int, help="Puerto del servidor arrancado (por defecto, uno libre)")
+    parser.add_argument("--db-name", default="pdf_manager_bench", help="Base de datos dedicada al benchmark")
+    parser.add_argument("--upload-dir", help="UPLOAD_DIR del servidor (por defecto, un directorio temporal)")
+    parser.add_argument("--extraction", action="store_true", help="Mantener la extracción de texto activa")
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=WORKLOADS, help="Cargas a ejecutar")
+    parser.add_argument("--concurrency", type=int, default=16, help="Peticiones simultáneas")
+    parser.add_argument(
+        "--upload-sizes", type=int, nargs="+", default=[16 * 1024, 256 * 1024, 4 * 1024 * 1024],
+        help="Tamaños de los PDF subidos en bytes"
+    )
+    parser.add_argument("--uploads", type=int, default=200, help="Subidas por tamaño")
+    parser.add_argument("--tree-sizes", type=int, nargs="+", default=[10_000, 100_000], help="Archivos por directorio")
+    parser.add_argument("--seed-batch", type=int, default=500, help="Archivos por subida al crear los directorios")
+    parser.add_argument("--listing-requests", type=int, default=50, help="Peticiones por tipo de listado")
+    parser.add_argument("--page-size", type=int, default=100, help="Archivos por página del listado paginado")
+    parser.add_argument("--range-file-size", type=int, default=32 * 1024 * 1024, help="Tamaño del PDF de rangos")
+    parser.add_argument("--range-size", type=int, default=64 * 1024, help="Bytes por petición de rango")
+    parser.add_argument("--range-requests", type=int, default=2000, help="Peticiones de rango")
+    parser.add_argument("--metadata-requests", type=int, default=1000, help="Peticiones por endpoint de metadatos")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de las posiciones aleatorias")
+    parser.add_argument("--output", help="Guardar el resultado en un fichero JSON")
+    parser.add_argument("--compare", help="Fichero JSON de una ejecución anterior con el que comparar")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        base_url, pid = args.url.rstrip("/"), args.pid
+    else:
+        args.upload_dir = Path(args.upload_dir or tempfile.mkdtemp(prefix="pdf-manager-bench-")).resolve()
+        args.upload_dir.mkdir(parents=True, exist_ok=True)
+        server = Server(args)
+        print(f"🚀 Arrancando el servidor en {server.url} (DB {args.db_name}, uploads {args.upload_dir})")
+        server.start()
+        base_url, pid = server.url, server.process.pid
+
+    try:
+        result = BenchmarkSuite(args, base_url, pid).run()
+    finally:
+        if server is not None:
+            server.stop()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_summary(result, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Resultado guardado en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,8 @@
 Script de inicialización de la base de datos
 ============================================
 
-Este script crea las tablas y inserta datos iniciales en la base de datos.
+Este script aplica las migraciones de Alembic (``alembic upgrade head``) e
+inserta los datos iniciales en la base de datos.
 """
 
 import sys
@@ -14,12 +15,17 @@ from pathlib import Path
 # Añadir el directorio raíz al path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.database import engine, create_tables, SessionLocal
+from alembic import command
+from alembic.config import Config
+
+from app.database import SessionLocal
 from app.models.document_type import DocumentType
 from app.models.category import Category
 from app.models.client import Client
 from app.config import settings
 
+ALEMBIC_INI = Path(__file__).parent.parent / "alembic.ini"
+
 
 def init_database():
     """Inicializa la base de datos con tablas y datos por defecto."""
@@ -28,10 +34,10 @@ def init_database():
     print(f"📊 URL de conexión: {settings.database_url}")
     
     try:
-        # Crear tablas
-        print("📋 Creando tablas...")
-        create_tables()
-        print("✅ Tablas creadas exitosamente")
+        # Crear o actualizar el esquema
+        print("📋 Aplicando migraciones...")
+        command.upgrade(Config(str(ALEMBIC_INI)), "head")
+        print("✅ Esquema actualizado exitosamente")
         
         # Crear sesión de base de datos
         db = SessionLocal()
@@ -69,21 +69,12 @@ psql -U postgres -c "GRANT ALL PRIVILEGES ON DATABASE pdf_manager TO postgres;"
 
 echo "✅ Permisos otorgados."
 
-# Ejecutar el esquema SQL
-echo "📋 Ejecutando esquema de base de datos..."
-if psql -U postgres -d pdf_manager -f database_schema.sql; then
-    echo "✅ Esquema de base de datos ejecutado exitosamente."
-else
-    echo "❌ Error al ejecutar el esquema de base de datos."
-    exit 1
-fi
-
 echo ""
 echo "🎉 Configuración de PostgreSQL completada!"
 echo ""
 echo "📋 Próximos pasos:"
 echo "1. Copia config.env a .env y ajusta las credenciales si es necesario"
-echo "2. Ejecuta: python scripts/init_database.py"
+echo "2. Ejecuta: python scripts/init_database.py (aplica las migraciones de Alembic)"
 echo "3. Inicia la aplicación: python main.py"
 echo ""
 echo "🔗 URLs de la aplicación:"
@@ -96,6 +96,10 @@ export class ApiService {
         return `${this.baseUrl}/files/download/${encodeURIComponent(path)}`;
     }
 
+    getThumbnailUrl(path) {
+        return `${this.baseUrl}/files/thumbnail/${encodeURIComponent(path)}`;
+    }
+
     // Método de salud
     async healthCheck() {
         return this.request('/health');
@@ -2,6 +2,8 @@
  * Renderer Module - Renderizado de elementos de la interfaz
  */
 
+import { apiService } from './api.js';
+
 export class RendererService {
     constructor() {
         this.explorerList = document.getElementById('explorerList');
@@ -64,9 +66,7 @@ export class RendererService {
                     <div class="explorer-item file">
                         <div class="directory-header">
                             <div class="directory-icon"></div>
-                            <div class="file-icon">
-                                <i class="fas fa-file-pdf"></i>
-                            </div>
+                            ${this.renderFileIcon(file)}
                             <span class="item-name">${file.name}</span>
                             <div class="item-actions">
                                 <button class="action-icon" onclick="pdfManager.downloadFile('${file.path}')" title="Descargar">
@@ -131,9 +131,7 @@ export class RendererService {
                     <div class="explorer-item file">
                         <div class="directory-header">
                             <div class="directory-icon"></div>
-                            <div class="file-icon">
-                                <i class="fas fa-file-pdf"></i>
-                            </div>
+                            ${this.renderFileIcon(file)}
                             <span class="item-name">${file.name}</span>
                             <div class="item-actions">
                                 <button class="action-icon" onclick="pdfManager.downloadFile('${file.path}')" title="Descargar">
@@ -213,6 +211,20 @@ export class RendererService {
         this.explorerList.innerHTML = html;
     }
 
+    /**
+     * Renderiza el icono de un archivo con la miniatura de su primera página.
+     * Si la miniatura no está disponible se queda el icono PDF.
+     */
+    renderFileIcon(file) {
+        return `
+            <div class="file-icon has-thumbnail">
+                <img class="file-thumbnail" src="${apiService.getThumbnailUrl(file.path)}" alt="" loading="lazy"
+                     onerror="this.parentElement.classList.remove('has-thumbnail'); this.remove();">
+                <i class="fas fa-file-pdf"></i>
+            </div>
+        `;
+    }
+
     /**
      * Renderiza una lista simple de archivos
      */
@@ -225,7 +237,7 @@ export class RendererService {
             files.forEach(file => {
                 html += `
                     <div class="list-item file">
-                        <i class="fas fa-file-pdf"></i>
+                        ${this.renderFileIcon(file)}
                         <span class="name">${file.name}</span>
                         <div class="actions">
                             <button class="action-icon" onclick="pdfManager.downloadFile('${file.path}')" title="Descargar">
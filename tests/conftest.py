@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Fixtures comunes de las pruebas.
+
+Las pruebas que necesitan PostgreSQL usan la base de datos de
+``TEST_DATABASE_URL`` (ej: ``postgresql://postgres@localhost/pdf_manager_test``)
+y se omiten si no está definida. Al empezar la sesión se recrea el esquema
+con las migraciones de Alembic y cada prueba empieza con las tablas vacías;
+no apuntes la variable a una base de datos con datos reales.
+"""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import database, file_journal
+from app.config import settings
+from app.storage import get_storage
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def database_url():
+    """URL síncrona de la base de datos de pruebas, con el esquema de ``alembic upgrade head``."""
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL no está definida")
+    for step in (["downgrade", "base"], ["upgrade", "head"]):
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "-x", f"url={url}", *step],
+            cwd=ROOT, check=True, capture_output=True
+        )
+    return url
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """Directorio de subidas temporal (los servicios deben crearse después)."""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    get_storage.cache_clear()
+    yield tmp_path / "uploads"
+    get_storage.cache_clear()
+
+
+@pytest.fixture
+def cas_storage(upload_dir, monkeypatch):
+    """Almacenamiento por contenido en el directorio de subidas temporal."""
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "cas")
+    get_storage.cache_clear()
+    return get_storage()
+
+
+@pytest.fixture
+async def sessionmaker(database_url, monkeypatch):
+    """
+    Sesiones asíncronas sobre la base de datos de pruebas, vacía salvo un
+    tipo de documento (ID 1) y una categoría (ID 1).
+
+    También sustituye ``database.AsyncSessionLocal``, que usan las tareas en
+    segundo plano (recolector, registro de operaciones, índice de directorios).
+    """
+    engine = create_async_engine(
+        make_url(database_url).set(drivername="postgresql+asyncpg"),
+        poolclass=NullPool
+    )
+    async with engine.begin() as connection:
+        tables = (await connection.execute(text(
+            "SELECT tablename FROM pg_tables "
+            "WHERE schemaname = 'public' AND tablename <> 'alembic_version'"
+        ))).scalars().all()
+        await connection.execute(text(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE"))
+        await connection.execute(text("INSERT INTO document_types (name) VALUES ('Factura')"))
+        await connection.execute(text("INSERT INTO categories (name) VALUES ('General')"))
+
+    maker = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    monkeypatch.setattr(database, "AsyncSessionLocal", maker)
+    yield maker
+    await engine.dispose()
+
+
+@pytest.fixture
+def register_document(tmp_path):
+    """
+    Registra un documento con ``DocumentService._register_document``.
+
+    Devuelve una corrutina ``(service, db, path, filename, content)`` que
+    vuelca el contenido a un temporal y devuelve el ``DocumentResponse``.
+    """
+    counter = iter(range(1_000_000))
+
+    async def register(service, db, path, filename, content):
+        temp_path = tmp_path / f"upload-{next(counter)}.tmp"
+        temp_path.write_bytes(content)
+        return await service._register_document(
+            db=db,
+            temp_path=temp_path,
+            file_path=service._prepare_document_destination(filename, path),
+            file_hash=hashlib.sha256(content).hexdigest(),
+            file_size=len(content),
+            document_type_id=1,
+            category_id=1
+        )
+
+    return register
+
+
+@pytest.fixture
+def before_file_operation(monkeypatch):
+    """
+    Ejecuta una corrutina justo antes de cada operación de ``file_journal.apply_one``.
+
+    La operación espera a que la corrutina termine, o como mucho
+    ``timeout`` segundos si se queda bloqueada (p. ej. esperando un bloqueo
+    que tiene la propia operación). Devuelve los futuros de las corrutinas.
+    """
+    def install(coroutine_factory, timeout=1.0):
+        loop = asyncio.get_running_loop()
+        original = file_journal.apply_one
+        futures = []
+
+        def apply_one(*args):
+            future = asyncio.run_coroutine_threadsafe(coroutine_factory(), loop)
+            futures.append(future)
+            concurrent.futures.wait([future], timeout=timeout)
+            original(*args)
+
+        monkeypatch.setattr(file_journal, "apply_one", apply_one)
+        return futures
+
+    return install
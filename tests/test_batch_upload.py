@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la subida de documentos por lotes.
+"""
+
+import io
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import func, select, text
+
+from app import file_journal
+from app.models.document import Document
+from app.services import DocumentService
+
+pytestmark = pytest.mark.anyio
+
+
+def upload(name, content, client_id=None):
+    """Archivo y metadatos de un elemento del lote."""
+    metadata = {"path": "docs", "document_type_id": 1, "category_id": 1, "client_id": client_id}
+    return UploadFile(file=io.BytesIO(content), filename=name), metadata
+
+
+@pytest.fixture
+async def clients(sessionmaker):
+    """Dos clientes (IDs 1 y 2)."""
+    async with sessionmaker() as db:
+        await db.execute(text("INSERT INTO clients (name) VALUES ('Uno'), ('Dos')"))
+        await db.commit()
+
+
+async def test_batch_creates_every_file(upload_dir, sessionmaker, clients):
+    async with sessionmaker() as db:
+        response = await DocumentService().upload_documents_batch(db, [
+            upload("a.pdf", b"a", client_id=1),
+            upload("b.pdf", b"b", client_id=2),
+            upload("c.pdf", b"c")
+        ])
+    assert (response.created, response.failed) == (3, 0)
+    assert [result.document.client for result in response.results] == ["Uno", "Dos", None]
+    assert sorted(path.name for path in (upload_dir / "docs").iterdir()) == ["a.pdf", "b.pdf", "c.pdf"]
+
+
+async def test_client_deleted_after_validation_only_fails_its_files(
+    upload_dir, sessionmaker, clients, monkeypatch
+):
+    original = file_journal.lock_blobs
+    calls = 0
+
+    async def lock_blobs(db, storage_keys):
+        # Otra petición elimina el cliente 2 entre la validación y la inserción
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            async with sessionmaker() as other:
+                await other.execute(text("DELETE FROM clients WHERE id = 2"))
+                await other.commit()
+        await original(db, storage_keys)
+
+    monkeypatch.setattr(file_journal, "lock_blobs", lock_blobs)
+    service = DocumentService()
+    async with sessionmaker() as db:
+        response = await service.upload_documents_batch(db, [
+            upload("a.pdf", b"a", client_id=1),
+            upload("b.pdf", b"b", client_id=2),
+            upload("c.pdf", b"c"),
+            upload("d.pdf", b"d", client_id=2)
+        ])
+
+    assert (response.created, response.failed) == (2, 2)
+    statuses = [(result.status, result.status_code) for result in response.results]
+    assert statuses == [("created", 201), ("error", 400), ("created", 201), ("error", 400)]
+    assert response.results[1].detail == "Cliente con ID 2 no encontrado"
+
+    async with sessionmaker() as db:
+        names = set(await db.scalars(select(Document.filename)))
+        assert names == {"a.pdf", "c.pdf"}
+        assert await db.scalar(select(func.count()).select_from(Document)) == 2
+        # La caché de referencia ya no ofrece el cliente eliminado
+        assert await service._lookup_reference(db, "clients", 2) is None
+    assert sorted(path.name for path in (upload_dir / "docs").iterdir()) == ["a.pdf", "c.pdf"]
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las operaciones masivas sobre documentos.
+"""
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, select
+
+from app.config import settings
+from app.models.document import Document
+from app.services import DocumentService
+from app.storage import get_storage
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("destination", ["", ".", ".trash/x", ".blobs/ab", "docs/.upload_sessions", ".thumbnails"])
+async def test_move_rejects_root_and_hidden_destinations(upload_dir, destination):
+    with pytest.raises(HTTPException) as error:
+        await DocumentService().bulk_move_documents(None, destination, ids=[1])
+    assert error.value.status_code == 400
+    assert error.value.detail.startswith("El destino")
+
+
+@pytest.mark.parametrize("prefix", ["", ".trash", ".blobs/ab/cd", "docs/.hidden"])
+async def test_move_rejects_root_and_hidden_prefixes(upload_dir, prefix):
+    with pytest.raises(HTTPException) as error:
+        await DocumentService().bulk_move_documents(None, "docs", prefix=prefix)
+    assert error.value.status_code == 400
+    assert error.value.detail.startswith("El prefijo")
+
+
+@pytest.mark.parametrize("prefix", ["", ".trash/documents"])
+async def test_delete_rejects_root_and_hidden_prefixes(upload_dir, prefix):
+    with pytest.raises(HTTPException) as error:
+        await DocumentService().bulk_delete_documents(None, prefix=prefix)
+    assert error.value.status_code == 400
+    assert error.value.detail.startswith("El prefijo")
+
+
+@pytest.fixture
+def statements(sessionmaker):
+    """Sentencias SQL ejecutadas durante la prueba (sentencia, si fue un executemany)."""
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, executemany))
+
+    engine = sessionmaker.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.parametrize("backend", ["local", "cas"])
+async def test_move_updates_batch_with_one_statement(
+    upload_dir, monkeypatch, sessionmaker, register_document, statements, backend
+):
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", backend)
+    get_storage.cache_clear()
+    service = DocumentService()
+    async with sessionmaker() as db:
+        ids = [
+            (await register_document(service, db, "src/sub" if i % 2 else "src", f"{i}.pdf", b"%d" % i)).id
+            for i in range(5)
+        ]
+
+    statements.clear()
+    async with sessionmaker() as db:
+        result = await service.bulk_move_documents(db, "dst", prefix="src")
+    assert sorted(result.processed) == ids
+    assert result.files_pending == 0
+    # Una sentencia por lote, no una ejecución por documento
+    updates = [(statement, executemany) for statement, executemany in statements if statement.startswith("UPDATE documents")]
+    assert len(updates) == 1 and not updates[0][1]
+
+    async with sessionmaker() as db:
+        rows = (await db.execute(
+            select(Document.local_path, Document.storage_key).order_by(Document.id)
+        )).all()
+    for i, row in enumerate(rows):
+        expected = upload_dir / ("dst/sub" if i % 2 else "dst") / f"{i}.pdf"
+        assert row.local_path == str(expected)
+        assert get_storage().path(row.storage_key).read_bytes() == b"%d" % i
+        if backend == "local":
+            assert row.storage_key == expected.relative_to(upload_dir).as_posix()
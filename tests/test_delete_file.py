@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la ruta de eliminación de archivos (``DELETE /files/{path}``).
+"""
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app import directory_index
+from app.api import routes
+from app.models.directory import Directory
+from app.models.document import Document
+from app.services import DocumentService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def document_service(upload_dir, monkeypatch):
+    """Servicio de la ruta sobre el directorio de subidas temporal."""
+    service = DocumentService()
+    monkeypatch.setattr(routes, "document_service", service)
+    return service
+
+
+async def directory_counts(sessionmaker, path):
+    async with sessionmaker() as db:
+        row = await db.scalar(select(Directory).where(Directory.path == path))
+        return row.files_count, row.total_bytes
+
+
+async def test_unregistered_file_updates_directory_index(document_service, upload_dir, sessionmaker):
+    (upload_dir / "docs").mkdir(parents=True)
+    (upload_dir / "docs" / "a.pdf").write_bytes(b"123")
+    (upload_dir / "docs" / "b.pdf").write_bytes(b"45")
+    async with sessionmaker() as db:
+        await directory_index.rebuild(db)
+
+    async with sessionmaker() as db:
+        response = await routes.delete_file("docs/a.pdf", db)
+
+    assert response["from_database"] is False
+    assert not (upload_dir / "docs" / "a.pdf").exists()
+    assert await directory_counts(sessionmaker, "docs") == (1, 2)
+
+
+async def test_registered_document_is_soft_deleted(
+    document_service, upload_dir, sessionmaker, register_document
+):
+    async with sessionmaker() as db:
+        document = await register_document(document_service, db, "docs", "a.pdf", b"123")
+
+    async with sessionmaker() as db:
+        response = await routes.delete_file("docs/a.pdf", db)
+
+    assert response["from_database"] is True
+    assert not (upload_dir / "docs" / "a.pdf").exists()
+    async with sessionmaker() as db:
+        assert await db.scalar(select(Document.is_active).where(Document.id == document.id)) is False
+    assert await directory_counts(sessionmaker, "docs") == (0, 0)
+
+
+async def test_missing_file_returns_404(document_service, upload_dir, sessionmaker):
+    (upload_dir / "docs").mkdir(parents=True)
+    async with sessionmaker() as db:
+        with pytest.raises(HTTPException) as error:
+            await routes.delete_file("docs/missing.pdf", db)
+    assert error.value.status_code == 404
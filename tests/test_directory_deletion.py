@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del estado de las eliminaciones de directorios.
+"""
+
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from app import services
+from app.config import settings
+from app.models.directory_deletion import DirectoryDeletion
+from app.services import DirectoryService, DocumentService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def directory(upload_dir, sessionmaker, register_document):
+    """Directorio "docs" con dos documentos y un archivo sin registrar."""
+    service = DocumentService()
+    async with sessionmaker() as db:
+        await register_document(service, db, "docs", "a.pdf", b"a")
+        await register_document(service, db, "docs/sub", "b.pdf", b"b")
+    (upload_dir / "docs" / "c.pdf").write_bytes(b"c")
+    return upload_dir / "docs"
+
+
+async def test_finished_deletion_is_visible_to_other_workers(directory, sessionmaker):
+    async with sessionmaker() as db:
+        deletion = await DirectoryService().delete_directory(db, "docs")
+    assert deletion.status == "completed"
+    assert not directory.exists()
+
+    # Otra instancia del servicio hace de otro worker
+    async with sessionmaker() as db:
+        status = await DirectoryService().get_deletion_status(db, deletion.id)
+    assert status.status == "completed"
+    assert status.documents_deleted == 2
+    assert status.files_total == status.files_deleted == 3
+    assert status.finished_at is not None
+
+
+async def test_running_deletion_reports_progress(directory, sessionmaker, monkeypatch):
+    monkeypatch.setattr(settings, "DIRECTORY_DELETE_WAIT", 0)
+    monkeypatch.setattr(settings, "DIRECTORY_DELETE_PROGRESS_INTERVAL", 0.05)
+    release = threading.Event()
+    original = services.remove_tree
+
+    def slow_remove_tree(root, progress):
+        progress.files_total = 3
+        progress.files_deleted = 1
+        release.wait(5)
+        progress.files_deleted = 0
+        original(root, progress)
+
+    monkeypatch.setattr(services, "remove_tree", slow_remove_tree)
+    service = DirectoryService()
+    async with sessionmaker() as db:
+        deletion = await service.delete_directory(db, "docs")
+    assert deletion.status == "running"
+
+    await asyncio.sleep(0.3)
+    async with sessionmaker() as db:
+        status = await DirectoryService().get_deletion_status(db, deletion.id)
+    assert status.status == "running"
+    assert (status.files_total, status.files_deleted) == (3, 1)
+
+    release.set()
+    await asyncio.wait(list(service._deletion_tasks.values()), timeout=5)
+    async with sessionmaker() as db:
+        status = await DirectoryService().get_deletion_status(db, deletion.id)
+    assert status.status == "completed"
+    assert status.files_deleted == 3
+
+
+async def test_unknown_deletion_is_not_found(sessionmaker):
+    async with sessionmaker() as db:
+        with pytest.raises(HTTPException) as error:
+            await DirectoryService().get_deletion_status(db, "0" * 32)
+    assert error.value.status_code == 404
+
+
+async def test_startup_closes_interrupted_deletions(directory, sessionmaker):
+    async with sessionmaker() as db:
+        deletion = await DirectoryService().delete_directory(db, "docs")
+        # Como si el proceso se hubiera detenido a mitad
+        await db.execute(
+            update(DirectoryDeletion)
+            .where(DirectoryDeletion.id == deletion.id)
+            .values(status="running", finished_at=None, started_at=datetime.now() - timedelta(minutes=1))
+        )
+        await db.commit()
+
+    await services.empty_trash()
+    async with sessionmaker() as db:
+        status = await DirectoryService().get_deletion_status(db, deletion.id)
+    assert status.status == "completed"
+    assert status.finished_at is not None
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la reconstrucción del índice de directorios.
+"""
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import select
+
+from app import directory_index
+from app.models.directory import Directory
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_startups_build_the_index_once(upload_dir, sessionmaker, monkeypatch):
+    for path in ["docs/a.pdf", "docs/2024/b.pdf", "docs/2024/c.pdf", "otros/d.pdf"]:
+        (upload_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (upload_dir / path).write_bytes(b"1234")
+
+    original = directory_index.scan_upload_dir
+    scans = 0
+
+    def scan_upload_dir(root):
+        # Recorrido lento: los demás workers arrancan mientras tanto
+        nonlocal scans
+        scans += 1
+        time.sleep(0.3)
+        return original(root)
+
+    monkeypatch.setattr(directory_index, "scan_upload_dir", scan_upload_dir)
+    await asyncio.gather(*(directory_index.ensure_built() for _ in range(3)))
+
+    assert scans == 1
+    async with sessionmaker() as db:
+        rows = {row.path: (row.files_count, row.total_bytes) for row in await db.scalars(select(Directory))}
+    assert rows == {"docs": (1, 4), "docs/2024": (2, 8), "otros": (1, 4)}
+
+
+async def test_rebuild_replaces_an_existing_index(upload_dir, sessionmaker):
+    (upload_dir / "docs").mkdir(parents=True)
+    (upload_dir / "docs" / "a.pdf").write_bytes(b"12")
+    async with sessionmaker() as db:
+        await directory_index.rebuild(db)
+    (upload_dir / "docs" / "b.pdf").write_bytes(b"345")
+
+    await asyncio.gather(*(_rebuild(sessionmaker) for _ in range(2)))
+
+    async with sessionmaker() as db:
+        rows = {row.path: (row.files_count, row.total_bytes) for row in await db.scalars(select(Directory))}
+    assert rows == {"docs": (2, 5)}
+
+
+async def _rebuild(sessionmaker):
+    async with sessionmaker() as db:
+        return await directory_index.rebuild(db)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del registro de operaciones de archivo con blobs compartidos.
+"""
+
+import asyncio
+import hashlib
+
+import pytest
+from sqlalchemy import func, select
+
+from app import file_journal
+from app.models.document import Document
+from app.models.pending_file_operation import PendingFileOperation
+from app.services import DocumentService
+
+pytestmark = pytest.mark.anyio
+
+CONTENT = b"%PDF-1.4 contenido compartido"
+
+
+@pytest.fixture
+def orphan_blob(cas_storage):
+    """Blob que ningún documento usa (clave, ruta)."""
+    storage_key = cas_storage.key_for(None, hashlib.sha256(CONTENT).hexdigest())
+    path = cas_storage.path(storage_key)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(CONTENT)
+    return storage_key, path
+
+
+async def test_unused_blob_is_deleted(orphan_blob, sessionmaker):
+    storage_key, path = orphan_blob
+    async with sessionmaker() as db:
+        operations = await file_journal.record(db, [(file_journal.OPERATION_DELETE, storage_key, None)])
+        await db.commit()
+        assert await file_journal.apply(db, operations) == 0
+        assert await db.scalar(select(func.count()).select_from(PendingFileOperation)) == 0
+    assert not path.exists()
+
+
+async def test_blob_in_use_is_kept(orphan_blob, sessionmaker, register_document):
+    storage_key, path = orphan_blob
+    async with sessionmaker() as db:
+        await register_document(DocumentService(), db, "docs", "a.pdf", CONTENT)
+        operations = await file_journal.record(db, [(file_journal.OPERATION_DELETE, storage_key, None)])
+        await db.commit()
+        assert await file_journal.apply(db, operations) == 0
+        assert await db.scalar(select(func.count()).select_from(PendingFileOperation)) == 0
+    assert path.read_bytes() == CONTENT
+
+
+async def test_upload_reusing_blob_during_deletion_keeps_it(
+    orphan_blob, sessionmaker, register_document, before_file_operation
+):
+    """Una subida del mismo contenido mientras se elimina el blob no se queda sin archivo."""
+    storage_key, path = orphan_blob
+    service = DocumentService()
+
+    async def upload():
+        async with sessionmaker() as db:
+            return await register_document(service, db, "docs", "a.pdf", CONTENT)
+
+    uploads = before_file_operation(upload)
+    async with sessionmaker() as db:
+        operations = await file_journal.record(db, [(file_journal.OPERATION_DELETE, storage_key, None)])
+        await db.commit()
+        await file_journal.apply(db, operations)
+
+    document = await asyncio.wrap_future(uploads[0])
+    async with sessionmaker() as db:
+        assert await db.scalar(select(Document.storage_key).where(Document.id == document.id)) == storage_key
+    assert path.read_bytes() == CONTENT
+
+
+async def test_failed_upload_keeps_blob_reused_by_another(orphan_blob, sessionmaker, register_document):
+    """Deshacer una subida que creó el blob no lo elimina si otra ya lo usa."""
+    storage_key, path = orphan_blob
+    path.unlink()
+    service = DocumentService()
+    async with sessionmaker() as db:
+        await register_document(service, db, "docs", "a.pdf", CONTENT)
+    async with sessionmaker() as db:
+        await file_journal.discard(db, [storage_key])
+    assert path.read_bytes() == CONTENT
+
+    async with sessionmaker() as db:
+        await db.execute(Document.__table__.delete())
+        await db.commit()
+        await file_journal.discard(db, [storage_key])
+    assert not path.exists()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del listado paginado de archivos con documentos guardados por contenido.
+"""
+
+import pytest
+
+from app.services import DocumentService, FileService
+
+pytestmark = pytest.mark.anyio
+
+
+async def list_all(service, db, path, limit, sort="name", descending=False):
+    """Recorre todas las páginas y devuelve los nombres en orden."""
+    names, cursor = [], None
+    while True:
+        page = await service.list_files_page(path, db, limit, cursor, sort, descending)
+        names.extend(item.name for item in page.items)
+        if not page.has_more:
+            return names
+        cursor = page.next_cursor
+
+
+@pytest.fixture
+async def mixed_directory(cas_storage, sessionmaker, register_document):
+    """Directorio con archivos en disco y documentos guardados como blobs."""
+    document_service = DocumentService()
+    async with sessionmaker() as db:
+        for name in ["a.pdf", "c.pdf", "Á.pdf", "_x.pdf"]:
+            await register_document(document_service, db, "docs", name, name.encode())
+    for name in ["B.pdf", "D.pdf", "b.pdf", "Z.pdf"]:
+        (cas_storage.root / "docs" / name).write_bytes(name.encode())
+    return sorted(["a.pdf", "c.pdf", "Á.pdf", "_x.pdf", "B.pdf", "D.pdf", "b.pdf", "Z.pdf"])
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 100])
+async def test_pages_mix_disk_files_and_blob_documents(mixed_directory, sessionmaker, limit):
+    async with sessionmaker() as db:
+        names = await list_all(FileService(), db, "docs", limit)
+    assert names == mixed_directory
+
+
+@pytest.mark.parametrize("limit", [1, 3])
+async def test_descending_pages_mix_disk_files_and_blob_documents(mixed_directory, sessionmaker, limit):
+    async with sessionmaker() as db:
+        names = await list_all(FileService(), db, "docs", limit, descending=True)
+    assert names == mixed_directory[::-1]
+
+
+@pytest.mark.parametrize("sort", ["size", "mtime"])
+async def test_every_file_is_listed_once_for_other_sorts(mixed_directory, sessionmaker, sort):
+    async with sessionmaker() as db:
+        names = await list_all(FileService(), db, "docs", 2, sort=sort)
+    assert sorted(names) == mixed_directory
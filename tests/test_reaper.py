@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del recolector de documentos eliminados con almacenamiento por contenido.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.models.document import Document
+from app.reaper import DocumentReaper
+from app.services import DocumentService
+
+pytestmark = pytest.mark.anyio
+
+CONTENT = b"%PDF-1.4 contenido eliminado"
+
+
+async def purge_all():
+    return await DocumentReaper().purge(before=datetime.now() + timedelta(days=1))
+
+
+@pytest.fixture
+async def deleted_document(cas_storage, sessionmaker, register_document):
+    """Documento eliminado (aún sin purgar) y la ruta de su blob."""
+    service = DocumentService()
+    async with sessionmaker() as db:
+        document = await register_document(service, db, "docs", "a.pdf", CONTENT)
+        await service.delete_document_by_id(db, document.id)
+        storage_key = await db.scalar(select(Document.storage_key).where(Document.id == document.id))
+    return document, cas_storage.path(storage_key)
+
+
+async def test_purge_deletes_unused_blob(deleted_document, sessionmaker):
+    _, path = deleted_document
+    assert await purge_all() == 1
+    async with sessionmaker() as db:
+        assert await db.scalar(select(func.count()).select_from(Document)) == 0
+    assert not path.exists()
+
+
+async def test_purge_keeps_blob_of_another_document(deleted_document, sessionmaker, register_document):
+    _, path = deleted_document
+    async with sessionmaker() as db:
+        await register_document(DocumentService(), db, "other", "b.pdf", CONTENT)
+    assert await purge_all() == 1
+    assert path.read_bytes() == CONTENT
+
+
+async def test_upload_during_purge_keeps_blob(
+    deleted_document, sessionmaker, register_document, before_file_operation
+):
+    """Una subida del mismo contenido mientras se purga no pierde el blob."""
+    _, path = deleted_document
+
+    async def upload():
+        async with sessionmaker() as db:
+            return await register_document(DocumentService(), db, "other", "b.pdf", CONTENT)
+
+    uploads = before_file_operation(upload)
+    assert await purge_all() == 1
+
+    document = await asyncio.wrap_future(uploads[0])
+    async with sessionmaker() as db:
+        assert await db.scalar(select(Document.is_active).where(Document.id == document.id))
+    assert path.read_bytes() == CONTENT
+
+
+async def test_restore_after_purge_is_not_found(deleted_document, sessionmaker):
+    document, _ = deleted_document
+    await purge_all()
+    async with sessionmaker() as db:
+        with pytest.raises(HTTPException) as error:
+            await DocumentService().restore_document(db, document.id)
+    assert error.value.status_code == 404
+
+
+async def test_restore_keeps_blob(deleted_document, sessionmaker):
+    document, path = deleted_document
+    async with sessionmaker() as db:
+        restored = await DocumentService().restore_document(db, document.id)
+    assert restored.id == document.id
+    assert await purge_all() == 0
+    assert path.read_bytes() == CONTENT
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las respuestas de descarga (``app.responses``).
+"""
+
+import os
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.responses import (
+    MAX_RANGES,
+    build_file_response,
+    etag_matches,
+    if_range_allows,
+    is_not_modified,
+    parse_range_header,
+)
+
+CONTENT = bytes(range(256)) * 4  # 1024 bytes
+
+
+class TestParseRangeHeader:
+    def test_single_range(self):
+        assert parse_range_header("bytes=0-99", 1000) == [(0, 99)]
+
+    def test_open_ended_range(self):
+        assert parse_range_header("bytes=900-", 1000) == [(900, 999)]
+
+    def test_end_past_size_is_clamped(self):
+        assert parse_range_header("bytes=900-5000", 1000) == [(900, 999)]
+
+    def test_suffix_range(self):
+        assert parse_range_header("bytes=-100", 1000) == [(900, 999)]
+
+    def test_suffix_range_past_size_returns_whole_file(self):
+        assert parse_range_header("bytes=-5000", 1000) == [(0, 999)]
+
+    def test_zero_suffix_is_unsatisfiable(self):
+        assert parse_range_header("bytes=-0", 1000) == []
+
+    def test_start_past_size_is_unsatisfiable(self):
+        assert parse_range_header("bytes=1000-", 1000) == []
+
+    def test_open_ended_range_on_empty_file_is_unsatisfiable(self):
+        assert parse_range_header("bytes=5-", 0) == []
+
+    def test_suffix_range_on_empty_file_is_unsatisfiable(self):
+        assert parse_range_header("bytes=-5", 0) == []
+
+    def test_unsatisfiable_ranges_are_dropped(self):
+        assert parse_range_header("bytes=2000-3000,0-9", 1000) == [(0, 9)]
+
+    def test_overlapping_ranges_are_merged(self):
+        assert parse_range_header("bytes=0-99,50-149", 1000) == [(0, 149)]
+
+    def test_adjacent_ranges_are_merged(self):
+        assert parse_range_header("bytes=0-99,100-199", 1000) == [(0, 199)]
+
+    def test_contained_range_is_merged(self):
+        assert parse_range_header("bytes=0-499,100-199", 1000) == [(0, 499)]
+
+    def test_ranges_are_sorted(self):
+        assert parse_range_header("bytes=500-599, 0-9", 1000) == [(0, 9), (500, 599)]
+
+    def test_max_ranges_is_accepted(self):
+        header = "bytes=" + ",".join(f"{i * 10}-{i * 10}" for i in range(MAX_RANGES))
+        assert len(parse_range_header(header, 1000)) == MAX_RANGES
+
+    def test_too_many_ranges_are_ignored(self):
+        header = "bytes=" + ",".join(f"{i * 10}-{i * 10}" for i in range(MAX_RANGES + 1))
+        assert parse_range_header(header, 1000) is None
+
+    @pytest.mark.parametrize("header", [
+        "items=0-9",
+        "bytes=",
+        "bytes=abc",
+        "bytes=9-0",
+        "bytes=a-9",
+        "bytes=0-9,x",
+    ])
+    def test_invalid_header_is_ignored(self, header):
+        assert parse_range_header(header, 1000) is None
+
+
+class TestConditionalHeaders:
+    def test_etag_matches_strong(self):
+        assert etag_matches('"abc"', '"abc"')
+
+    def test_etag_matches_weak_comparison(self):
+        assert etag_matches('W/"abc"', '"abc"')
+        assert etag_matches('"abc"', 'W/"abc"')
+
+    def test_etag_matches_list_and_wildcard(self):
+        assert etag_matches('"x", "abc"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"x", "y"', '"abc"')
+
+    def test_if_none_match_takes_precedence_over_if_modified_since(self):
+        headers = {"if-none-match": '"other"', "if-modified-since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+        assert not is_not_modified(headers, '"abc"', 0)
+
+    def test_if_modified_since(self):
+        assert is_not_modified({"if-modified-since": "Fri, 01 Jan 2100 00:00:00 GMT"}, '"abc"', 0)
+        assert not is_not_modified({"if-modified-since": "Thu, 01 Jan 1970 00:00:00 GMT"}, '"abc"', 60)
+        assert not is_not_modified({"if-modified-since": "not a date"}, '"abc"', 0)
+
+    def test_if_range_without_header(self):
+        assert if_range_allows({}, '"abc"', "date")
+
+    def test_if_range_strong_etag(self):
+        assert if_range_allows({"if-range": '"abc"'}, '"abc"', "date")
+        assert not if_range_allows({"if-range": '"old"'}, '"abc"', "date")
+
+    def test_if_range_weak_etag_never_matches(self):
+        assert not if_range_allows({"if-range": 'W/"abc"'}, 'W/"abc"', "date")
+        assert not if_range_allows({"if-range": '"abc"'}, 'W/"abc"', "date")
+
+    def test_if_range_date(self):
+        date = "Fri, 01 Jan 2021 00:00:00 GMT"
+        assert if_range_allows({"if-range": date}, '"abc"', date)
+        assert not if_range_allows({"if-range": "Sat, 02 Jan 2021 00:00:00 GMT"}, '"abc"', date)
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Aplicación mínima que sirve un archivo con ``build_file_response``."""
+    files = {"data.pdf": CONTENT, "empty.pdf": b""}
+    for name, content in files.items():
+        (tmp_path / name).write_bytes(content)
+
+    app = FastAPI()
+
+    @app.api_route("/{name}", methods=["GET", "HEAD"])
+    async def download(name: str, request: Request, strong: bool = False):
+        fd = os.open(tmp_path / name, os.O_RDONLY)
+        stat_result = os.fstat(fd)
+        etag = '"strong-etag"' if strong else None
+        return build_file_response(request.headers, fd, stat_result, name, etag, request.method)
+
+    return TestClient(app)
+
+
+class TestFileRangeResponse:
+    def test_full_file(self, client):
+        response = client.get("/data.pdf")
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-length"] == str(len(CONTENT))
+        assert response.headers["etag"].startswith('W/"')
+
+    def test_head_sends_no_body(self, client):
+        response = client.head("/data.pdf")
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["content-length"] == str(len(CONTENT))
+
+    def test_single_range(self, client):
+        response = client.get("/data.pdf", headers={"range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[10:20]
+        assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+        assert response.headers["content-length"] == "10"
+
+    def test_suffix_range_past_size(self, client):
+        response = client.get("/data.pdf", headers={"range": "bytes=-5000"})
+        assert response.status_code == 206
+        assert response.content == CONTENT
+        assert response.headers["content-range"] == f"bytes 0-{len(CONTENT) - 1}/{len(CONTENT)}"
+
+    def test_overlapping_ranges_are_sent_once(self, client):
+        response = client.get("/data.pdf", headers={"range": "bytes=0-9,5-14"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[:15]
+
+    def test_multiple_ranges(self, client):
+        response = client.get("/data.pdf", headers={"range": "bytes=0-3,100-103"})
+        assert response.status_code == 206
+        content_type = response.headers["content-type"]
+        assert content_type.startswith("multipart/byteranges; boundary=")
+        boundary = content_type.split("boundary=")[1]
+        body = response.content
+        assert response.headers["content-length"] == str(len(body))
+        assert body.endswith(f"\r\n--{boundary}--\r\n".encode())
+        parts = body.split(f"--{boundary}".encode())[1:-1]
+        assert len(parts) == 2
+        for part, (start, end) in zip(parts, [(0, 3), (100, 103)]):
+            head, _, data = part.partition(b"\r\n\r\n")
+            assert f"Content-Range: bytes {start}-{end}/{len(CONTENT)}".encode() in head
+            assert data == CONTENT[start:end + 1] + b"\r\n"
+
+    def test_too_many_ranges_returns_full_file(self, client):
+        header = "bytes=" + ",".join(f"{i * 10}-{i * 10}" for i in range(MAX_RANGES + 1))
+        response = client.get("/data.pdf", headers={"range": header})
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+    def test_unsatisfiable_range_returns_416(self, client):
+        response = client.get("/data.pdf", headers={"range": f"bytes={len(CONTENT)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    def test_open_ended_range_on_empty_file_returns_416(self, client):
+        response = client.get("/empty.pdf", headers={"range": "bytes=5-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */0"
+
+    def test_empty_file(self, client):
+        response = client.get("/empty.pdf")
+        assert response.status_code == 200
+        assert response.content == b""
+
+    def test_if_none_match_returns_304(self, client):
+        etag = client.get("/data.pdf").headers["etag"]
+        response = client.get("/data.pdf", headers={"if-none-match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_if_range_with_weak_etag_returns_full_file(self, client):
+        etag = client.get("/data.pdf").headers["etag"]
+        response = client.get("/data.pdf", headers={"range": "bytes=0-9", "if-range": etag})
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+    def test_if_range_with_strong_etag_returns_range(self, client):
+        response = client.get(
+            "/data.pdf?strong=true",
+            headers={"range": "bytes=0-9", "if-range": '"strong-etag"'}
+        )
+        assert response.status_code == 206
+        assert response.content == CONTENT[:10]
+
+    def test_if_range_with_stale_date_returns_full_file(self, client):
+        response = client.get(
+            "/data.pdf",
+            headers={"range": "bytes=0-9", "if-range": "Thu, 01 Jan 1970 00:00:00 GMT"}
+        )
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+    def test_if_range_with_last_modified_returns_range(self, client):
+        last_modified = client.get("/data.pdf").headers["last-modified"]
+        response = client.get("/data.pdf", headers={"range": "bytes=0-9", "if-range": last_modified})
+        assert response.status_code == 206
+        assert response.content == CONTENT[:10]
+
+    def test_non_ascii_filename(self, tmp_path):
+        (tmp_path / "año.pdf").write_bytes(b"x")
+        app = FastAPI()
+
+        @app.get("/")
+        async def download(request: Request):
+            fd = os.open(tmp_path / "año.pdf", os.O_RDONLY)
+            return build_file_response(request.headers, fd, os.fstat(fd), "año.pdf")
+
+        response = TestClient(app).get("/")
+        assert response.headers["content-disposition"] == "attachment; filename*=utf-8''a%C3%B1o.pdf"